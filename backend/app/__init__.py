@@ -1,9 +1,9 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from dotenv import load_dotenv
+import json
 import os
 
 # Load environment variables
@@ -11,7 +11,6 @@ load_dotenv()
 
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
 jwt = JWTManager()
 
 
@@ -23,18 +22,91 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'postgresql://localhost/ai_tour_guide')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string')
+    app.config['REDIS_URL'] = os.getenv('REDIS_URL')
+    app.config['GUIDE_READ_MODEL'] = os.getenv('GUIDE_READ_MODEL', 'true').lower() == 'true'
+    app.config['JOBS_BACKEND'] = os.getenv('JOBS_BACKEND')
+    app.config['JOBS_LEASE_SECONDS'] = float(os.getenv('JOBS_LEASE_SECONDS', '300'))
+    app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER')
+    app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', '587'))
+    app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
+    app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
+    app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'no-reply@ai-tour-guide.local')
+    # Hard cap on any request body; JSON endpoints enforce smaller limits
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', str(16 * 1024 * 1024)))
+    app.config['STARTUP_TARGET_MS'] = float(os.getenv('STARTUP_TARGET_MS', '600'))
+    # Idle days before an account without bookings, messages or a guide profile is archived
+    app.config['USER_ARCHIVE_AFTER_DAYS'] = int(os.getenv('USER_ARCHIVE_AFTER_DAYS', '90'))
+    # Seconds before a gap in outbox event IDs is treated as a rolled-back transaction
+    app.config['OUTBOX_GAP_TIMEOUT'] = float(os.getenv('OUTBOX_GAP_TIMEOUT', '60'))
+    # Guide photo storage (defaults to <instance>/photos) and serving
+    app.config['PHOTO_STORAGE_DIR'] = os.getenv('PHOTO_STORAGE_DIR')
+    app.config['PHOTO_MAX_BYTES'] = int(os.getenv('PHOTO_MAX_BYTES', str(10 * 1024 * 1024)))
+    app.config['PHOTO_THUMBNAIL_WORKERS'] = int(os.getenv('PHOTO_THUMBNAIL_WORKERS', '2'))
+    # nginx internal location mapped to PHOTO_STORAGE_DIR; unset serves files with send_file
+    app.config['PHOTO_ACCEL_REDIRECT'] = os.getenv('PHOTO_ACCEL_REDIRECT')
+    # Guide views buffered per process before one batched insert
+    app.config['VIEW_LOG_BUFFER_SIZE'] = int(os.getenv('VIEW_LOG_BUFFER_SIZE', '500'))
+    # Natural-language search: 'rules' or a 'module:Class' QueryBackend, cache and batching
+    app.config['QUERY_PARSER_BACKEND'] = os.getenv('QUERY_PARSER_BACKEND', 'rules')
+    app.config['QUERY_PARSER_CACHE_SIZE'] = int(os.getenv('QUERY_PARSER_CACHE_SIZE', '10000'))
+    app.config['QUERY_PARSER_CACHE_TTL'] = float(os.getenv('QUERY_PARSER_CACHE_TTL', '300'))
+    app.config['QUERY_PARSER_MAX_BATCH'] = int(os.getenv('QUERY_PARSER_MAX_BATCH', '64'))
+    app.config['QUERY_PARSER_BATCH_WAIT_MS'] = float(os.getenv('QUERY_PARSER_BATCH_WAIT_MS', '0'))
+    # Memory-mapped catalogue snapshot shared by all workers; unset keeps per-process indexes
+    app.config['CATALOGUE_SNAPSHOT_PATH'] = os.getenv('CATALOGUE_SNAPSHOT_PATH')
+    app.config['CATALOGUE_SNAPSHOT_CHECK_SECONDS'] = float(os.getenv('CATALOGUE_SNAPSHOT_CHECK_SECONDS', '5'))
+    # Seconds stored responses to Idempotency-Key requests are replayed, and an in-progress key is held
+    app.config['IDEMPOTENCY_TTL'] = int(os.getenv('IDEMPOTENCY_TTL', str(24 * 3600)))
+    app.config['IDEMPOTENCY_LOCK_SECONDS'] = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '60'))
+    # Slow-query log: off unless a threshold is set; see app/services/slow_queries.py
+    slow_query_threshold = os.getenv('SLOW_QUERY_THRESHOLD_MS')
+    app.config['SLOW_QUERY_THRESHOLD_MS'] = float(slow_query_threshold) if slow_query_threshold else None
+    app.config['SLOW_QUERY_SAMPLE_RATE'] = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', '1.0'))
+    app.config['SLOW_QUERY_ANALYZE_RATE'] = float(os.getenv('SLOW_QUERY_ANALYZE_RATE', '0.0'))
+    app.config['SLOW_QUERY_LOG_SIZE'] = int(os.getenv('SLOW_QUERY_LOG_SIZE', '200'))
+    app.config['SLOW_QUERY_LOG_FILE'] = os.getenv('SLOW_QUERY_LOG_FILE')
+    # Per-worker LRU of users' complete favorite sets; 0 queries the page's flags every time
+    app.config['FAVORITES_CACHE_SIZE'] = int(os.getenv('FAVORITES_CACHE_SIZE', '0'))
+    app.config['FAVORITES_CACHE_TTL'] = float(os.getenv('FAVORITES_CACHE_TTL', '30'))
+    # Sampling profiler; see app/services/profiler.py
+    app.config['PROFILER_INTERVAL_MS'] = float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+    app.config['PROFILER_CONTINUOUS_HZ'] = float(os.getenv('PROFILER_CONTINUOUS_HZ', '0'))
+    app.config['PROFILER_KEEP'] = int(os.getenv('PROFILER_KEEP', '20'))
+    app.config['PROFILER_OUTPUT_DIR'] = os.getenv('PROFILER_OUTPUT_DIR')
+    # Shared secret for /api/admin/* (sent as X-Admin-Token); unset disables the admin endpoints
+    app.config['ADMIN_API_TOKEN'] = os.getenv('ADMIN_API_TOKEN')
+    # Per-endpoint concurrency budgets (JSON); unset uses the admission defaults
+    admission_limits = os.getenv('ADMISSION_LIMITS')
+    app.config['ADMISSION_LIMITS'] = json.loads(admission_limits) if admission_limits else None
     
     # Initialize extensions with app
     db.init_app(app)
-    migrate.init_app(app, db)
     jwt.init_app(app)
     CORS(app)
+
+    # Shed excess load per endpoint before it reaches a view
+    from app.services import admission
+    admission.init_app(app)
+
+    # Record slow statements when SLOW_QUERY_THRESHOLD_MS is set
+    from app.services import slow_queries
+    slow_queries.init_app(app)
+
+    # Sample admin-flagged requests, and live traffic when PROFILER_CONTINUOUS_HZ is set
+    from app.services import profiler
+    profiler.init_app(app)
     
     # Register blueprints
     from app.routes.main import main_bp
     from app.routes.auth import auth_bp
     from app.routes.profile import profile_bp
     from app.routes.guides import guides_bp
+    from app.routes.bookings import bookings_bp
+    from app.routes.messages import messages_bp
+    from app.routes.saved_searches import saved_searches_bp
+    from app.routes.photos import photos_bp
+    from app.routes.favorites import favorites_bp
+    from app.routes.admin import admin_bp
     # from app.routes.users import users_bp
     # from app.routes.tours import tours_bp
     
@@ -42,7 +114,20 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(profile_bp, url_prefix='/api')
     app.register_blueprint(guides_bp, url_prefix='/api')
+    app.register_blueprint(bookings_bp, url_prefix='/api')
+    app.register_blueprint(messages_bp, url_prefix='/api')
+    app.register_blueprint(saved_searches_bp, url_prefix='/api')
+    app.register_blueprint(photos_bp, url_prefix='/api')
+    app.register_blueprint(favorites_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
     # app.register_blueprint(users_bp, url_prefix='/api/users')
     # app.register_blueprint(tours_bp, url_prefix='/api/tours')
+
+    # Write-side listeners that maintain the guide read model and the outbox
+    from app.services import guide_documents, outbox  # noqa: F401
+
+    # CLI commands (flask db, flask worker, flask jobs ...)
+    from app.cli import register_commands
+    register_commands(app)
     
     return app
@@ -0,0 +1,26 @@
+"""
+Data backfills run by ``flask backfill run``.
+
+Each backfill pairs with a DDL-only migration that adds the target columns
+as nullable; deploy the migration first, then run the backfill online.
+"""
+
+from app.models import Guide
+from app.models.guide import parse_price_range
+from app.services.backfills import backfill
+
+guides_table = Guide.__table__
+
+
+@backfill(
+    'guides.price_bounds', guides_table, columns=['price_range'],
+    where=lambda t: t.c.price_range.isnot(None) & t.c.price_min.is_(None),
+)
+def price_bounds(rows):
+    """Parse guides.price_range into the price_min/price_max columns."""
+    updates = []
+    for row in rows:
+        price_min, price_max = parse_price_range(row.price_range)
+        if price_min is not None:
+            updates.append({'id': row.id, 'price_min': price_min, 'price_max': price_max})
+    return updates
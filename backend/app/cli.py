@@ -0,0 +1,370 @@
+"""
+Flask CLI commands for operating the backend.
+"""
+
+import signal
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+from app import db
+from app.models import BackfillCheckpoint
+from app.services import (
+    also_viewed, backfills, catalogue, exports, guide_documents, idempotency, outbox, slow_queries, user_archive,
+)
+from app.services.jobs import RedisBackend, Worker, get_backend
+from app.utils.startup import profile_startup
+
+jobs_cli = AppGroup('jobs', help='Inspect and manage the background job queue.')
+guides_cli = AppGroup('guides', help='Maintain guide read models and indexes.')
+backfill_cli = AppGroup('backfill', help='Run online, batched data backfills.')
+users_cli = AppGroup('users', help='Manage user accounts and their archive.')
+outbox_cli = AppGroup('outbox', help='Inspect and consume the user/guide change feed.')
+idempotency_cli = AppGroup('idempotency', help='Manage stored responses to Idempotency-Key requests.')
+slow_queries_cli = AppGroup('slow-queries', help='Read the slow-query log.')
+
+
+def _require_backend():
+    backend = get_backend()
+    if backend is None:
+        raise click.ClickException('JOBS_BACKEND is eager; there is no queue to work on')
+    return backend
+
+
+@click.command('worker')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+@with_appcontext
+def worker_command(burst):
+    """Run a background job worker."""
+    import app.tasks  # noqa: F401  (registers the jobs)
+
+    worker = Worker(current_app._get_current_object(), _require_backend())
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    click.echo('Worker started')
+    worker.run(burst=burst)
+    click.echo('Worker stopped')
+
+
+@jobs_cli.command('stats')
+def jobs_stats():
+    """Show queue lengths."""
+    for name, value in _require_backend().stats().items():
+        click.echo(f'{name}: {value}')
+
+
+@jobs_cli.command('dead')
+@click.option('--limit', default=20, show_default=True)
+def jobs_dead(limit):
+    """List dead-lettered jobs."""
+    for job in _require_backend().dead_letters(limit):
+        last_line = (job.last_error or '').strip().splitlines()[-1:] or ['']
+        click.echo(f'{job.id} {job.name} attempts={job.attempts} error={last_line[0]}')
+
+
+@jobs_cli.command('retry-dead')
+def jobs_retry_dead():
+    """Move every dead-lettered job back onto the queue."""
+    click.echo(f'Requeued {_require_backend().requeue_dead()} jobs')
+
+
+@jobs_cli.command('recover')
+def jobs_recover():
+    """Requeue jobs whose worker stopped renewing their lease (Redis only)."""
+    backend = _require_backend()
+    if not isinstance(backend, RedisBackend):
+        raise click.ClickException('recover is only needed for the Redis backend')
+    click.echo(f'Recovered {backend.recover()} jobs')
+
+
+@guides_cli.command('rebuild-documents')
+@click.option('--batch-size', default=500, show_default=True)
+def rebuild_documents(batch_size):
+    """Rebuild every denormalized guide document from the source tables."""
+    click.echo(f'Rebuilt {guide_documents.rebuild_all(batch_size)} guide documents')
+
+
+@guides_cli.command('build-also-viewed')
+@click.option('--window-days', default=also_viewed.DEFAULT_WINDOW_DAYS, show_default=True,
+              help='Days of view history to use; older views are pruned.')
+@click.option('--top-k', default=also_viewed.DEFAULT_TOP_K, show_default=True)
+@click.option('--min-co-views', default=also_viewed.DEFAULT_MIN_CO_VIEWS, show_default=True)
+def build_also_viewed(window_days, top_k, min_co_views):
+    """Rebuild "travelers also viewed" lists from the guide view log (run from cron)."""
+    also_viewed.flush_views()
+    count = also_viewed.build_also_viewed(window_days=window_days, top_k=top_k, min_co_views=min_co_views)
+    click.echo(f'Built also-viewed lists for {count} guides')
+
+
+@guides_cli.command('write-snapshot')
+@click.option('--path', default=None, help='Destination (defaults to CATALOGUE_SNAPSHOT_PATH).')
+@click.option('--watch', type=float, default=None,
+              help='Rewrite the snapshot every N seconds until interrupted.')
+def write_snapshot(path, watch):
+    """Write the memory-mapped guide catalogue snapshot shared by web workers."""
+    while True:
+        try:
+            written = catalogue.write_snapshot(path)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        finally:
+            db.session.remove()
+        click.echo(f"Wrote {written['guides']} guides ({written['bytes']} bytes) to {written['path']}")
+        if not watch:
+            break
+        time.sleep(watch)
+
+
+def _load_backfills():
+    import app.backfills  # noqa: F401  (registers the backfills)
+
+    return backfills.registry
+
+
+@backfill_cli.command('list')
+def backfill_list():
+    """List registered backfills and their checkpoints."""
+    for name, spec in sorted(_load_backfills().items()):
+        checkpoint = db.session.get(BackfillCheckpoint, name)
+        state = 'not started'
+        if checkpoint is not None:
+            state = f'{checkpoint.status}, {checkpoint.rows_processed} rows, last key {checkpoint.last_key}'
+        click.echo(f'{name}: {state}')
+        if spec.description:
+            click.echo(f'    {spec.description}')
+
+
+@backfill_cli.command('run')
+@click.argument('name')
+@click.option('--batch-size', type=int, default=None, help='Rows per chunk (defaults to the backfill\'s own).')
+@click.option('--rate', type=float, default=None, help='Maximum rows per second.')
+@click.option('--max-chunks', type=int, default=None, help='Stop after this many chunks; rerun to resume.')
+@click.option('--restart', is_flag=True, help='Ignore the checkpoint and start from the beginning.')
+def backfill_run(name, batch_size, rate, max_chunks, restart):
+    """Run or resume a backfill."""
+    if name not in _load_backfills():
+        raise click.ClickException(f'Unknown backfill: {name}')
+
+    def report(progress):
+        remaining = '?' if progress.remaining_estimate is None else progress.remaining_estimate
+        state = 'done' if progress.done else f'~{remaining} remaining'
+        click.echo(
+            f'{progress.name}: {progress.rows_processed} rows processed, {progress.rows_updated} updated, '
+            f'{state} ({progress.rows_per_second:.0f} rows/s)'
+        )
+
+    try:
+        checkpoint = backfills.run_backfill(
+            name, batch_size=batch_size, max_rows_per_second=rate, max_chunks=max_chunks,
+            restart=restart, progress=report,
+        )
+    except backfills.BackfillConflictError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'{name}: {checkpoint.status} (last key {checkpoint.last_key})')
+
+
+@users_cli.command('archive')
+@click.option('--days', type=int, default=None, help='Idle days before archival (default USER_ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', default=user_archive.DEFAULT_BATCH_SIZE, show_default=True)
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches; rerun to continue.')
+def users_archive(days, batch_size, max_batches):
+    """Move inactive accounts that own nothing to the archive table."""
+    archived = user_archive.archive_inactive_users(
+        older_than_days=days, batch_size=batch_size, max_batches=max_batches,
+        progress=lambda total: click.echo(f'Archived {total} accounts so far'),
+    )
+    sizes = user_archive.table_sizes()
+    click.echo(f"Archived {archived} accounts ({sizes['users']} active, {sizes['archived_users']} archived)")
+
+
+@outbox_cli.command('status')
+def outbox_status():
+    """Show each consumer's offset and how far it lags the feed."""
+    consumers = outbox.consumer_status()
+    if not consumers:
+        click.echo('No consumers registered')
+    for status in consumers:
+        click.echo(f"{status['consumer']}: offset {status['last_event_id']}, {status['lag']} behind")
+
+
+@outbox_cli.command('tail')
+@click.option('--after', type=int, default=0, show_default=True, help='Print events after this ID.')
+@click.option('--limit', default=20, show_default=True)
+def outbox_tail(after, limit):
+    """Print change events without moving any consumer offset."""
+    for change in outbox.read_events(after, limit):
+        click.echo(f'{change.id} {change.created_at.isoformat()} '
+                   f'{change.aggregate_type}.{change.event_type} {change.aggregate_id}')
+
+
+def _load_consumers():
+    import app.consumers  # noqa: F401  (registers the consumers)
+
+    return outbox.registry
+
+
+@outbox_cli.command('consume')
+@click.argument('name')
+@click.option('--batch-size', default=outbox.DEFAULT_BATCH_SIZE, show_default=True)
+@click.option('--follow', is_flag=True, help='Keep polling for new events.')
+def outbox_consume(name, batch_size, follow):
+    """Deliver pending events to a registered consumer."""
+    handler = _load_consumers().get(name)
+    if handler is None:
+        raise click.ClickException(f'Unknown consumer: {name}')
+    delivered = outbox.consume(name, handler, batch_size=batch_size, follow=follow)
+    click.echo(f'{name}: delivered {delivered} events')
+
+
+@outbox_cli.command('prune')
+@click.option('--days', default=7, show_default=True, help='Keep events newer than this.')
+def outbox_prune(days):
+    """Delete old events that every consumer has processed."""
+    click.echo(f'Pruned {outbox.prune(days)} events')
+
+
+@idempotency_cli.command('prune')
+def idempotency_prune():
+    """Delete stored responses whose replay window has passed (run from cron)."""
+    click.echo(f'Pruned {idempotency.prune_expired()} idempotency keys')
+
+
+@slow_queries_cli.command('show')
+@click.option('--file', 'path', default=None, help='JSON-lines log (defaults to SLOW_QUERY_LOG_FILE).')
+@click.option('--limit', default=20, show_default=True, help='Most recent entries shown.')
+@click.option('--plans/--no-plans', default=True, show_default=True)
+def slow_queries_show(path, limit, plans):
+    """Show the slowest statements recorded by all workers, newest first."""
+    path = path or current_app.config.get('SLOW_QUERY_LOG_FILE')
+    if not path:
+        raise click.ClickException('Set SLOW_QUERY_LOG_FILE or pass --file')
+    try:
+        entries = slow_queries.read_log_file(path, limit)
+    except FileNotFoundError:
+        raise click.ClickException(f'{path} does not exist yet')
+    for entry in entries:
+        endpoint = entry['endpoint'] or '-'
+        click.echo(f"{entry['at']}  {entry['duration_ms']:9.1f} ms  {endpoint}  [{entry['fingerprint']}]")
+        click.echo(f"    {entry['sql']}")
+        if plans and entry['plan']:
+            label = 'EXPLAIN ANALYZE' if entry['analyzed'] else 'EXPLAIN'
+            click.echo(f'    {label}:')
+            for line in entry['plan']:
+                click.echo(f'      {line}')
+
+
+class MigrationsGroup(click.MultiCommand):
+    """
+    ``flask db``, importing Flask-Migrate (and Alembic) on first use.
+
+    Alembic is the most expensive import the app has and only migrations
+    need it, so web and job workers start without it.
+    """
+
+    def _group(self):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_group
+
+        if 'migrate' not in current_app.extensions:
+            Migrate(current_app._get_current_object(), db)
+        return db_group
+
+    def list_commands(self, ctx):
+        return self._group().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._group().get_command(ctx, name)
+
+
+@click.command('export')
+@click.argument('tables', nargs=-1)
+@click.option('--out', 'out_dir', required=True, type=click.Path(file_okay=False), help='Snapshot directory.')
+@click.option('--format', 'fmt', type=click.Choice(exports.FORMATS), default='jsonl', show_default=True)
+@click.option('--since', default=None,
+              help='Only rows changed since this ISO timestamp, or since a previous snapshot (directory or manifest).')
+@click.option('--batch-size', default=exports.DEFAULT_BATCH_SIZE, show_default=True)
+@with_appcontext
+def export_command(tables, out_dir, fmt, since, batch_size):
+    """Stream TABLES (default: all exportable tables) into a compressed snapshot."""
+    try:
+        since_at = exports.parse_since(since) if since else None
+        manifest = exports.export_tables(
+            out_dir, names=list(tables) or None, fmt=fmt, since=since_at, batch_size=batch_size,
+        )
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    for name, entry in manifest['tables'].items():
+        deleted = f", {entry['deleted']} deleted" if 'deleted' in entry else ''
+        click.echo(f"{name}: {entry['rows']} rows{deleted} -> {entry['file']}")
+    click.echo(f"Snapshot written to {out_dir} (until {manifest['until']})")
+
+
+@click.command('import')
+@click.argument('snapshot_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--table', 'tables', multiple=True, help='Import only this table (repeatable).')
+@click.option('--batch-size', default=exports.DEFAULT_BATCH_SIZE, show_default=True)
+@click.option('--rebuild-documents/--no-rebuild-documents', default=True, show_default=True,
+              help='Rebuild the guide read model afterwards.')
+@click.option('--events/--no-events', default=True, show_default=True,
+              help='Append outbox events for imported and deleted users and guides.')
+@with_appcontext
+def import_command(snapshot_dir, tables, batch_size, rebuild_documents, events):
+    """Restore a snapshot written by `flask export` (upserts by primary key)."""
+    try:
+        summary = exports.import_snapshot(snapshot_dir, names=list(tables) or None, batch_size=batch_size,
+                                          events=events)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    for name, counts in summary.items():
+        click.echo(f"{name}: {counts['rows']} rows upserted, {counts['deleted']} deleted")
+    if rebuild_documents and summary:
+        click.echo(f'Rebuilt {guide_documents.rebuild_all()} guide documents')
+
+
+@click.command('startup-profile')
+@click.option('--top', default=15, show_default=True, help='Modules to list per section.')
+@click.option('--target-ms', type=float, default=None,
+              help='Fail if import + create_app exceeds this (defaults to STARTUP_TARGET_MS).')
+@with_appcontext
+def startup_profile(top, target_ms):
+    """Cold-start the app in a fresh interpreter and report where the time goes."""
+    if target_ms is None:
+        target_ms = current_app.config.get('STARTUP_TARGET_MS')
+    try:
+        profile = profile_startup()
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f'import app:   {profile.import_ms:8.1f} ms')
+    click.echo(f'create_app(): {profile.create_app_ms:8.1f} ms')
+    click.echo(f'total:        {profile.total_ms:8.1f} ms')
+
+    click.echo('\nTop-level imports (cumulative / self ms):')
+    for module in profile.top(top, max_depth=0):
+        click.echo(f'  {module.cumulative_ms:8.1f} {module.self_ms:8.1f}  {module.name}')
+    click.echo('\nApplication modules (cumulative / self ms):')
+    for module in profile.top(top, prefix='app'):
+        click.echo(f'  {module.cumulative_ms:8.1f} {module.self_ms:8.1f}  {module.name}')
+
+    if target_ms:
+        if profile.total_ms > target_ms:
+            raise click.ClickException(f'Cold start {profile.total_ms:.0f} ms exceeds target {target_ms:.0f} ms')
+        click.echo(f'\nWithin cold-start target of {target_ms:.0f} ms')
+
+
+def register_commands(app):
+    """Attach the backend's CLI commands to ``app``."""
+    app.cli.add_command(MigrationsGroup('db', help='Perform database migrations.'))
+    app.cli.add_command(startup_profile)
+    app.cli.add_command(worker_command)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(guides_cli)
+    app.cli.add_command(backfill_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(slow_queries_cli)
+    app.cli.add_command(export_command)
+    app.cli.add_command(import_command)
@@ -0,0 +1,20 @@
+"""
+Change-feed consumers run by ``flask outbox consume``.
+
+Each consumer receives batches of ``ChangeEvent`` from the user/guide
+outbox and must be idempotent: after a crash the last batch is delivered
+again.
+"""
+
+from flask import current_app
+
+from app.services.outbox import consumer
+
+
+@consumer('changes.log')
+def log_changes(events):
+    """Write each change to the application log (an audit trail of account changes)."""
+    for change in events:
+        current_app.logger.info(
+            'outbox %s: %s %s %s', change.id, change.aggregate_type, change.event_type, change.aggregate_id
+        )
@@ -1,7 +1,18 @@
-from .user import User
+from .user import ArchivedUser, User
 from .guide import Guide
+from .availability import GuideAvailability
+from .booking import Booking
+from .message import Conversation, Message
+from .guide_document import GuideDocument
+from .saved_search import SavedSearch, SavedSearchMatch, SavedSearchTerm
+from .backfill import BackfillCheckpoint
+from .outbox import OutboxEvent, OutboxOffset
+from .photo import GuidePhoto
+from .guide_view import GuideAlsoViewed, GuideView
+from .idempotency import IdempotencyKey
+from .favorite import Favorite
 # from .tour import Tour
-# from .booking import Booking
-# from .message import Message
 
-__all__ = ['User', 'Guide']  # Add other models to this list as they are created
+__all__ = ['User', 'ArchivedUser', 'Guide', 'GuideAvailability', 'Booking', 'Conversation', 'Message', 'GuideDocument',
+           'SavedSearch', 'SavedSearchTerm', 'SavedSearchMatch', 'BackfillCheckpoint', 'OutboxEvent', 'OutboxOffset',
+           'GuidePhoto', 'GuideView', 'GuideAlsoViewed', 'IdempotencyKey', 'Favorite']  # Add other models to this list as they are created
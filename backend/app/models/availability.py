@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+
+from sqlalchemy import and_, func, or_, select
+
+from app import db
+
+
+def month_start(day: date) -> date:
+    """Return the first day of the month containing ``day``."""
+    return day.replace(day=1)
+
+
+def day_bit(day: date) -> int:
+    """Return the bit representing ``day`` inside its month's mask."""
+    return 1 << (day.day - 1)
+
+
+def month_masks(start: date, end: date) -> dict:
+    """
+    Split an inclusive date range into per-month bitmasks.
+
+    Args:
+        start (date): First day of the range
+        end (date): Last day of the range (inclusive)
+
+    Returns:
+        dict: Mapping of first-of-month date to the mask of days in range
+    """
+    masks = {}
+    day = start
+    while day <= end:
+        key = month_start(day)
+        masks[key] = masks.get(key, 0) | day_bit(day)
+        day += timedelta(days=1)
+    return masks
+
+
+class GuideAvailability(db.Model):
+    """
+    Per-guide, per-month availability calendar.
+
+    Each row stores one month for one guide as a 31-bit integer where bit
+    ``n`` is set when the guide is free on day ``n + 1``. A date-range query
+    touches at most one row per month in range, so availability can be
+    intersected with the other guide filters inside a single indexed
+    subquery instead of loading per-guide calendars.
+    """
+
+    __tablename__ = 'guide_availability'
+
+    guide_id = db.Column(db.String(36), db.ForeignKey('guides.id', ondelete='CASCADE'), primary_key=True)
+
+    # First day of the month this row describes
+    month = db.Column(db.Date, primary_key=True)
+
+    # Bit n set => available on day n + 1
+    days_mask = db.Column(db.Integer, nullable=False, default=0)
+
+    # Covering index for range lookups: month first, then guide and mask
+    __table_args__ = (
+        db.Index('ix_guide_availability_month_guide', 'month', 'guide_id', 'days_mask'),
+    )
+
+    @classmethod
+    def available_guide_ids(cls, start: date, end: date):
+        """
+        Build a subquery selecting guides free on every day in the range.
+
+        Args:
+            start (date): First day of the range
+            end (date): Last day of the range (inclusive)
+
+        Returns:
+            Select: Subquery of guide ids suitable for ``column.in_()``
+        """
+        masks = month_masks(start, end)
+        conditions = [
+            and_(cls.month == month, cls.days_mask.bitwise_and(mask) == mask)
+            for month, mask in masks.items()
+        ]
+        return (
+            select(cls.guide_id)
+            .where(or_(*conditions))
+            .group_by(cls.guide_id)
+            .having(func.count() == len(masks))
+        )
+
+    def available_days(self):
+        """Yield each available date stored in this row."""
+        mask = self.days_mask or 0
+        day = self.month
+        while day.month == self.month.month:
+            if mask & day_bit(day):
+                yield day
+            day += timedelta(days=1)
+
+    def __repr__(self):
+        return f'<GuideAvailability {self.guide_id} {self.month:%Y-%m}>'
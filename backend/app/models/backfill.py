@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from app import db
+
+BACKFILL_RUNNING = 'running'
+BACKFILL_COMPLETED = 'completed'
+
+
+class BackfillCheckpoint(db.Model):
+    """
+    Persisted progress of one online backfill.
+
+    ``last_key`` is the highest key processed so far; a resumed run continues
+    strictly after it. The row is advanced in the same transaction as each
+    chunk's writes, so a crash never loses or repeats a committed chunk.
+    """
+
+    __tablename__ = 'backfill_checkpoints'
+
+    name = db.Column(db.String(100), primary_key=True)
+    last_key = db.Column(db.String(255), nullable=True)
+    rows_processed = db.Column(db.BigInteger, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default=BACKFILL_RUNNING)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'last_key': self.last_key,
+            'rows_processed': self.rows_processed,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+    def __repr__(self):
+        return f'<BackfillCheckpoint {self.name} {self.status}>'
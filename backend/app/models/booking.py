@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime
+
+from app import db
+
+BOOKING_CONFIRMED = 'confirmed'
+BOOKING_CANCELLED = 'cancelled'
+
+
+class Booking(db.Model):
+    """
+    A traveler's booking of a guide for a single day.
+
+    The partial unique index on ``(guide_id, date)`` over confirmed bookings
+    is the last line of defence against double-booking; the booking service
+    claims the day from the guide's availability mask first so conflicting
+    requests normally fail fast without touching this index.
+    """
+
+    __tablename__ = 'bookings'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    guide_id = db.Column(db.String(36), db.ForeignKey('guides.id'), nullable=False, index=True)
+    traveler_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=BOOKING_CONFIRMED)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index(
+            'uq_bookings_guide_date_confirmed', 'guide_id', 'date', unique=True,
+            postgresql_where=db.text(f"status = '{BOOKING_CONFIRMED}'"),
+            sqlite_where=db.text(f"status = '{BOOKING_CONFIRMED}'"),
+        ),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'guide_id': self.guide_id,
+            'traveler_id': self.traveler_id,
+            'date': self.date.isoformat(),
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<Booking {self.id} {self.guide_id} {self.date}>'
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from app import db
+
+
+class Favorite(db.Model):
+    """
+    A guide on a traveler's shortlist.
+
+    The ``(user_id, guide_id)`` primary key makes adding a favorite
+    idempotent and lets a page of guides be checked with a single
+    index-only ``user_id = ? AND guide_id IN (...)`` lookup.
+    """
+
+    __tablename__ = 'favorites'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    guide_id = db.Column(db.String(36), db.ForeignKey('guides.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Favorite {self.guide_id} of {self.user_id}>'
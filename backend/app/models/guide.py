@@ -1,7 +1,30 @@
+import re
+
 from app import db
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from .user import User
 
+# Matches price ranges such as '8000-15000', '8,000 - 15,000' or '9000'
+PRICE_RANGE_PATTERN = re.compile(r'^\s*(\d[\d,]*)\s*(?:[-~〜]\s*(\d[\d,]*))?\s*$')
+
+
+def parse_price_range(value):
+    """
+    Parse a free-text price range into integer bounds.
+
+    Args:
+        value (str): Stored ``price_range`` such as ``'8000-15000'``
+
+    Returns:
+        tuple: ``(price_min, price_max)``, or ``(None, None)`` if unparseable
+    """
+    match = PRICE_RANGE_PATTERN.match(value or '')
+    if not match:
+        return None, None
+    low = int(match.group(1).replace(',', ''))
+    high = int(match.group(2).replace(',', '')) if match.group(2) else low
+    return min(low, high), max(low, high)
+
 
 class Guide(User):
     """
@@ -25,9 +48,18 @@ class Guide(User):
     areas = db.Column(db.String(255), nullable=True)  # comma-separated
     price_range = db.Column(db.String(50), nullable=True)
 
+    # Numeric bounds parsed from price_range (kept in sync on write)
+    price_min = db.Column(db.Integer, nullable=True)
+    price_max = db.Column(db.Integer, nullable=True)
+
     # Relationship back to the base User row
     user = relationship('User', back_populates='guide', uselist=False)
 
+    @validates('price_range')
+    def _sync_price_bounds(self, key, value):
+        self.price_min, self.price_max = parse_price_range(value)
+        return value
+
     def to_dict(self):
         base = super().to_dict()
         base.update({
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app import db
+
+# Locale used for documents that are not localized
+DEFAULT_LOCALE = 'default'
+
+
+class GuideDocument(db.Model):
+    """
+    Denormalized, precomputed JSON response for one guide (per locale).
+
+    The read endpoints serve ``body`` verbatim, so reading a guide needs no
+    ``users``/``guides`` join and no ORM hydration. The filterable fields
+    are copied alongside so listings can filter this table alone. Rows are
+    derived data: they are rewritten by write-side mapper events and can
+    be rebuilt at any time with ``flask guides rebuild-documents``.
+    """
+
+    __tablename__ = 'guide_documents'
+
+    guide_id = db.Column(db.String(36), primary_key=True)
+    locale = db.Column(db.String(16), primary_key=True, default=DEFAULT_LOCALE)
+
+    # Copies of the filterable guide fields
+    languages = db.Column(db.String(255), nullable=True)
+    areas = db.Column(db.String(255), nullable=True)
+    rating = db.Column(db.Float, nullable=True, index=True)
+
+    # Serialized response document
+    body = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GuideDocument {self.guide_id} {self.locale}>'
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from app import db
+
+
+class GuideView(db.Model):
+    """
+    Append-only log of guide profile views.
+
+    Written in buffered batches by ``app.services.also_viewed``; rows are
+    never updated and are pruned once they fall out of the recommendation
+    window. ``viewer_key`` identifies a signed-in user (``u:<id>``) or an
+    anonymous visitor (``a:<hash>``). ``guide_id`` deliberately has no
+    foreign key so that logging never waits on the guides table.
+    """
+
+    __tablename__ = 'guide_views'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    guide_id = db.Column(db.String(36), nullable=False)
+    viewer_key = db.Column(db.String(64), nullable=False)
+    viewed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<GuideView {self.guide_id} by {self.viewer_key}>'
+
+
+class GuideAlsoViewed(db.Model):
+    """
+    Precomputed "travelers also viewed" list for one guide.
+
+    ``related`` is a JSON list of ``[guide_id, score, co_views]`` in rank
+    order, rebuilt wholesale by ``flask guides build-also-viewed``.
+    """
+
+    __tablename__ = 'guide_also_viewed'
+
+    guide_id = db.Column(db.String(36), primary_key=True)
+    related = db.Column(db.Text, nullable=False)
+    built_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GuideAlsoViewed {self.guide_id}>'
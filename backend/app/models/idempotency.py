@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app import db
+
+# Lifecycle of a stored idempotency key
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_COMPLETED = 'completed'
+
+
+class IdempotencyKey(db.Model):
+    """
+    Outcome of a request made with an ``Idempotency-Key`` header.
+
+    The row is inserted (as the lock) before the view runs and filled with
+    the response once it finishes, so a retry with the same key gets the
+    stored response back. ``id`` is a hash of the client scope, endpoint and
+    key; ``fingerprint`` is a hash of the request itself, whose body is not
+    stored.
+    """
+
+    __tablename__ = 'idempotency_keys'
+
+    id = db.Column(db.String(64), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_IN_PROGRESS)
+    response_status = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    response_mimetype = db.Column(db.String(100), nullable=True)
+    # An in-progress key whose worker died is taken over after this time
+    locked_until = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.id[:12]} {self.status}>'
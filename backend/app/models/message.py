@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from app import db
+
+# Longest accepted message body (the column size)
+MAX_MESSAGE_LENGTH = 2000
+
+# 64-bit ids on PostgreSQL; SQLite only auto-increments INTEGER primary keys
+BigIntegerId = db.BigInteger().with_variant(db.Integer(), 'sqlite')
+
+
+class Conversation(db.Model):
+    """
+    A message thread between one traveler and one guide.
+    """
+
+    __tablename__ = 'conversations'
+
+    id = db.Column(BigIntegerId, primary_key=True)
+    traveler_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    guide_id = db.Column(db.String(36), db.ForeignKey('guides.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('traveler_id', 'guide_id', name='uq_conversations_traveler_guide'),
+    )
+
+    def has_participant(self, user_id):
+        return user_id in (self.traveler_id, self.guide_id)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'traveler_id': self.traveler_id,
+            'guide_id': self.guide_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_message_at': self.last_message_at.isoformat() if self.last_message_at else None,
+        }
+
+    def __repr__(self):
+        return f'<Conversation {self.id}>'
+
+
+class Message(db.Model):
+    """
+    A single message in a conversation.
+
+    Ids increase monotonically, so ``(conversation_id, id)`` doubles as the
+    pagination cursor and the SSE ``Last-Event-ID``.
+    """
+
+    __tablename__ = 'messages'
+
+    id = db.Column(BigIntegerId, primary_key=True)
+    conversation_id = db.Column(BigIntegerId, db.ForeignKey('conversations.id'), nullable=False)
+    sender_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    body = db.Column(db.String(MAX_MESSAGE_LENGTH), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_messages_conversation_id_id', 'conversation_id', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'conversation_id': self.conversation_id,
+            'sender_id': self.sender_id,
+            'body': self.body,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<Message {self.id}>'
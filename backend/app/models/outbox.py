@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from app import db
+
+# Event types written to the outbox
+EVENT_CREATED = 'created'
+EVENT_UPDATED = 'updated'
+EVENT_DELETED = 'deleted'
+EVENT_ARCHIVED = 'archived'
+EVENT_RESTORED = 'restored'
+
+
+class OutboxEvent(db.Model):
+    """
+    One committed change to a user or guide, in commit-visible ID order.
+
+    Rows are inserted in the same transaction as the change they describe,
+    so an event exists if and only if its change was committed. ``payload``
+    is the JSON-serialized public representation of the row after the
+    change (just the ID and email for deletions and archival).
+    """
+
+    __tablename__ = 'outbox_events'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    aggregate_type = db.Column(db.String(20), nullable=False)
+    aggregate_id = db.Column(db.String(36), nullable=False, index=True)
+    event_type = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<OutboxEvent {self.id} {self.aggregate_type}.{self.event_type}>'
+
+
+class OutboxOffset(db.Model):
+    """Highest outbox event ID a named consumer has fully processed."""
+
+    __tablename__ = 'outbox_offsets'
+
+    consumer = db.Column(db.String(100), primary_key=True)
+    last_event_id = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'consumer': self.consumer,
+            'last_event_id': self.last_event_id,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f'<OutboxOffset {self.consumer} {self.last_event_id}>'
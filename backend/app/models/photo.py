@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+
+from app import db
+
+
+class GuidePhoto(db.Model):
+    """
+    A photo uploaded by a guide.
+
+    The image bytes live in content-addressed storage under their SHA-256
+    digest (see ``app.services.photos``); this row only links a guide to a
+    digest, so identical uploads share one file.
+    """
+
+    __tablename__ = 'guide_photos'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    guide_id = db.Column(db.String(36), db.ForeignKey('guides.id'), nullable=False, index=True)
+    digest = db.Column(db.String(64), nullable=False, index=True)
+    content_type = db.Column(db.String(50), nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    # Set once the background job has rendered every thumbnail size
+    thumbnails_ready = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'guide_id': self.guide_id,
+            'digest': self.digest,
+            'content_type': self.content_type,
+            'size_bytes': self.size_bytes,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<GuidePhoto {self.digest[:12]}>'
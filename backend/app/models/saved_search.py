@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+
+from app import db
+
+# Leading characters of a search term stored in ``SavedSearchTerm.gram``
+GRAM_LENGTH = 3
+
+
+class SavedSearch(db.Model):
+    """
+    A traveler's stored guide search, used to alert them about new matches.
+
+    The criteria use the ``/api/guides`` filter semantics: ``languages`` and
+    ``areas`` are comma-separated lists where any token may match, and
+    ``min_rating`` is inclusive.
+    """
+
+    __tablename__ = 'saved_searches'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    traveler_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=True)
+    languages = db.Column(db.String(255), nullable=True)
+    areas = db.Column(db.String(255), nullable=True)
+    min_rating = db.Column(db.Float, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'languages': self.languages,
+            'areas': self.areas,
+            'min_rating': self.min_rating,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<SavedSearch {self.id}>'
+
+
+class SavedSearchTerm(db.Model):
+    """
+    Reverse index from search terms to the saved searches using them.
+
+    Each saved search is indexed under every term of one anchor field
+    (``areas`` if set, else ``languages``), or under ``('*', '')`` when it
+    has neither. ``gram`` holds the term's first ``GRAM_LENGTH`` characters:
+    a term can only occur in a guide's token if its gram does, so a guide is
+    looked up by its (few) short substrings rather than by every substring.
+    """
+
+    __tablename__ = 'saved_search_terms'
+    __table_args__ = (db.Index('ix_saved_search_terms_field_gram', 'field', 'gram'),)
+
+    field = db.Column(db.String(16), primary_key=True)
+    term = db.Column(db.String(64), primary_key=True)
+    saved_search_id = db.Column(
+        db.String(36), db.ForeignKey('saved_searches.id', ondelete='CASCADE'), primary_key=True
+    )
+    gram = db.Column(db.String(GRAM_LENGTH), nullable=False)
+
+
+class SavedSearchMatch(db.Model):
+    """A guide that has already been reported for a saved search."""
+
+    __tablename__ = 'saved_search_matches'
+
+    saved_search_id = db.Column(
+        db.String(36), db.ForeignKey('saved_searches.id', ondelete='CASCADE'), primary_key=True
+    )
+    guide_id = db.Column(db.String(36), primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -25,6 +25,9 @@ class User(db.Model):
     # Timestamp for user creation
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    # Last successful login (at day granularity); drives archival of inactive accounts
+    last_login_at = db.Column(db.DateTime, nullable=True)
+
     # One-to-one guide profile (if the user is a guide)
     guide = relationship('Guide', uselist=False, back_populates='user')
     
@@ -70,3 +73,37 @@ class User(db.Model):
             str: User representation showing email
         """
         return f'<User {self.email}>'
+
+
+
+class ArchivedUser(db.Model):
+    """
+    Cold storage for inactive accounts moved out of ``users``.
+
+    Rows keep the original ID, email and password hash so that an archived
+    account can log in again; it is moved back to ``users`` on its next
+    successful login (see ``app.services.user_archive``).
+    """
+    __tablename__ = 'archived_users'
+
+    id = db.Column(db.String(36), primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    hashed_password = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    last_login_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def check_password(self, password):
+        """
+        Verify a password against the archived hash.
+
+        Args:
+            password (str): Plain text password to verify
+
+        Returns:
+            bool: True if password matches, False otherwise
+        """
+        return check_password_hash(self.hashed_password, password)
+
+    def __repr__(self):
+        return f'<ArchivedUser {self.email}>'
@@ -0,0 +1,103 @@
+"""
+Operator endpoints, authenticated with the ``ADMIN_API_TOKEN`` shared secret.
+
+Every route answers 404 while ``ADMIN_API_TOKEN`` is unset, so a default
+deployment exposes nothing here.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+
+from app.services import profiler, slow_queries
+from app.utils.admin_auth import admin_enabled, admin_token_valid
+
+admin_bp = Blueprint('admin', __name__)
+
+# Entries returned by the slow-query endpoint unless ?limit= asks for fewer
+MAX_SLOW_QUERIES = 200
+
+
+@admin_bp.before_request
+def require_admin_token():
+    """Reject requests without the configured admin token."""
+    if not admin_enabled():
+        return jsonify({'error': 'Not found'}), 404
+    if not admin_token_valid():
+        return jsonify({'error': 'Invalid admin token'}), 401
+    return None
+
+
+@admin_bp.get('/slow-queries')
+def list_slow_queries():
+    """Return this worker's slow statements and a per-query summary.
+
+    Query params:
+      - limit: most recent entries returned (default and max 200)
+
+    Each worker keeps its own ring buffer; use ``SLOW_QUERY_LOG_FILE`` and
+    ``flask slow-queries show`` for all workers at once.
+    """
+    log = slow_queries.get_log(current_app)
+    if log is None:
+        return jsonify({'error': 'Slow-query logging is disabled (set SLOW_QUERY_THRESHOLD_MS)'}), 404
+    try:
+        limit = min(max(int(request.args.get('limit', MAX_SLOW_QUERIES)), 1), MAX_SLOW_QUERIES)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    return jsonify({
+        'threshold_ms': log.threshold * 1000,
+        'summary': log.summary(),
+        'entries': log.entries(limit),
+    }), 200
+
+
+@admin_bp.delete('/slow-queries')
+def clear_slow_queries():
+    """Empty this worker's slow-query buffer."""
+    log = slow_queries.get_log(current_app)
+    if log is not None:
+        log.clear()
+    return '', 204
+
+
+@admin_bp.get('/profiles')
+def list_profiles():
+    """List this worker's recent per-request profiles (metadata only)."""
+    return jsonify({'profiles': profiler.get_store().list()}), 200
+
+
+@admin_bp.get('/profiles/continuous')
+def continuous_profile():
+    """Return the continuous sampler's aggregate as collapsed stacks.
+
+    Query params:
+      - endpoint: only stacks sampled under this endpoint
+    """
+    sampler = profiler.get_continuous()
+    if sampler is None:
+        return jsonify({'error': 'Continuous profiling is disabled (set PROFILER_CONTINUOUS_HZ)'}), 404
+    response = current_app.response_class(
+        sampler.profile.collapsed(request.args.get('endpoint')), mimetype='text/plain'
+    )
+    response.headers['X-Profile-Samples'] = str(sampler.profile.samples)
+    if sampler.started_at:
+        response.headers['X-Profile-Since'] = sampler.started_at
+    return response
+
+
+@admin_bp.delete('/profiles/continuous')
+def reset_continuous_profile():
+    """Discard the continuous sampler's aggregate."""
+    sampler = profiler.get_continuous()
+    if sampler is not None:
+        sampler.profile.clear()
+    return '', 204
+
+
+@admin_bp.get('/profiles/<profile_id>')
+def get_profile(profile_id):
+    """Return one per-request profile as collapsed stacks (``text/plain``)."""
+    collapsed = profiler.get_store().get(profile_id)
+    if collapsed is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return current_app.response_class(collapsed, mimetype='text/plain')
@@ -1,13 +1,56 @@
-from flask import Blueprint, request, jsonify
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify
 from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
 from app import db
+from app.models.outbox import EVENT_CREATED
 from app.models.user import User
+from app.services import outbox, user_archive
+from app.services.idempotency import idempotent
+from app.tasks import send_welcome_email
+from app.utils.db import insert_ignore_conflicts
+from app.utils.validators import load_body, validate_body
 
 auth_bp = Blueprint('auth', __name__)
 
+# Threads used to hash batch passwords (the KDF releases the GIL)
+HASH_WORKERS = 8
+
+# Largest accepted batch registration body
+MAX_BATCH_BODY_BYTES = 256 * 1024
+
+
+def _validate_credentials(data):
+    """
+    Normalize and validate registration credentials.
+
+    Args:
+        data: Parsed JSON object with ``email`` and ``password``
+
+    Returns:
+        tuple: ``(email, password, error)`` where ``error`` is None when valid
+    """
+    loaded, error, valid = load_body('credentials', data)
+    if error:
+        return valid.get('email'), None, error
+    return loaded['email'], loaded['password'], None
+
+
+def _enqueue_welcome_email(user_id):
+    """Queue the welcome email; failing to enqueue never fails registration."""
+    try:
+        send_welcome_email.delay(user_id)
+    except Exception:
+        current_app.logger.exception('Failed to enqueue welcome email for %s', user_id)
+
 
 @auth_bp.route('/register', methods=['POST'])
-def register():
+@idempotent
+@validate_body('credentials')
+def register(data):
     """
     User registration endpoint for the AI Tour Guide Matcher platform.
     
@@ -21,27 +64,12 @@ def register():
         500: Registration failed due to server error
     """
     try:
-        # Get JSON data from request
-        data = request.get_json()
-        
-        # Validate required fields
-        if not data or not data.get('email') or not data.get('password'):
-            return jsonify({'error': 'Email and password are required'}), 400
-        
-        email = data['email'].strip().lower()
-        password = data['password']
+        # Required fields, email format and password length were checked by
+        # the schema before any query or hashing
+        email, password = data['email'], data['password']
         
-        # Basic email validation
-        if '@' not in email or len(email) < 5:
-            return jsonify({'error': 'Invalid email format'}), 400
-        
-        # Basic password validation
-        if len(password) < 6:
-            return jsonify({'error': 'Password must be at least 6 characters long'}), 400
-        
-        # Check if user with email already exists
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
+        # Check if user with email already exists (including archived accounts)
+        if user_archive.emails_taken([email]):
             return jsonify({'error': 'User with this email already exists'}), 409
         
         # Create new user
@@ -51,6 +79,9 @@ def register():
         # Add to database
         db.session.add(user)
         db.session.commit()
+
+        # Side effects run in the background worker, off the request path
+        _enqueue_welcome_email(user.id)
         
         # Return success response
         return jsonify({
@@ -67,8 +98,87 @@ def register():
         return jsonify({'error': 'Registration failed'}), 500
 
 
+@auth_bp.route('/register/batch', methods=['POST'])
+@idempotent
+@validate_body('batch_registration', max_bytes=MAX_BATCH_BODY_BYTES)
+def register_batch(data):
+    """
+    Batch registration endpoint for partner onboarding.
+    
+    Accepts ``{"users": [{"email": ..., "password": ...}, ...]}`` and
+    registers every valid, unused email. Existing emails are filtered with
+    one SELECT before hashing so conflicts cost no KDF run, the remaining
+    passwords are hashed in parallel, and all rows are written with a
+    single ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` that also
+    resolves races with concurrent registrations.
+    
+    Returns:
+        200: Per-item results, each with status created, conflict or invalid
+        400: Body is not a non-empty list of at most 100 users
+        500: Registration failed due to server error
+    """
+    items = data['users']
+    results = [None] * len(items)
+    candidates = {}  # email -> (index, password)
+    for index, item in enumerate(items):
+        email, password, error = _validate_credentials(item)
+        if error:
+            results[index] = {'index': index, 'email': email, 'status': 'invalid', 'error': error}
+        elif email in candidates:
+            results[index] = {'index': index, 'email': email, 'status': 'conflict',
+                              'error': 'Duplicate email in batch'}
+        else:
+            candidates[email] = (index, password)
+
+    try:
+        # Skip hashing for emails that are already taken, hot or archived
+        if candidates:
+            for email in user_archive.emails_taken(candidates):
+                index, _ = candidates.pop(email)
+                results[index] = {'index': index, 'email': email, 'status': 'conflict',
+                                  'error': 'User with this email already exists'}
+
+        emails = list(candidates)
+        with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(emails) or 1)) as pool:
+            hashes = list(pool.map(generate_password_hash, [candidates[e][1] for e in emails]))
+
+        now = datetime.utcnow()
+        rows = [
+            {'id': str(uuid.uuid4()), 'email': email, 'hashed_password': hashed, 'created_at': now}
+            for email, hashed in zip(emails, hashes)
+        ]
+        inserted = insert_ignore_conflicts(
+            User.__table__, rows, index_elements=['email'], returning=[User.id, User.email]
+        )
+        # The Core insert bypasses the outbox mapper listeners
+        outbox.append_events(db.session, [
+            outbox.event_row('user', EVENT_CREATED, row.id,
+                             {'id': row.id, 'email': row.email, 'created_at': now.isoformat()})
+            for row in inserted
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return jsonify({'error': 'Registration failed'}), 500
+
+    created = {row.email: row.id for row in inserted}
+    for email, (index, _) in candidates.items():
+        if email in created:
+            results[index] = {'index': index, 'email': email, 'status': 'created', 'id': created[email]}
+            _enqueue_welcome_email(created[email])
+        else:
+            # Lost a race with a concurrent registration
+            results[index] = {'index': index, 'email': email, 'status': 'conflict',
+                              'error': 'User with this email already exists'}
+
+    summary = {status: sum(1 for r in results if r['status'] == status)
+               for status in ('created', 'conflict', 'invalid')}
+    return jsonify({'results': results, **summary}), 200
+
+
 @auth_bp.route('/login', methods=['POST'])
-def login():
+@validate_body('login')
+def login(data):
     """
     User login endpoint for the AI Tour Guide Matcher platform.
     
@@ -78,25 +188,29 @@ def login():
         200: Login successful with JWT access token
         400: Invalid input data
         401: Invalid credentials (user not found or incorrect password)
+        409: Archived account's email was taken by another account
         500: Login failed due to server error
     """
     try:
-        # Get JSON data from request
-        data = request.get_json()
+        # Presence and sizes were checked by the schema
+        email, password = data['email'], data['password']
         
-        # Validate required fields
-        if not data or not data.get('email') or not data.get('password'):
-            return jsonify({'error': 'Email and password are required'}), 400
-        
-        email = data['email'].strip().lower()
-        password = data['password']
-        
-        # Find user by email
+        # Find user by email, falling back to the archive of inactive accounts
         user = User.query.filter_by(email=email).first()
+        if user is None:
+            archived = user_archive.find_archived_user(email)
+            if archived is None or not archived.check_password(password):
+                return jsonify({'error': 'Invalid credentials'}), 401
+            try:
+                user = user_archive.restore_user(archived)
+            except user_archive.EmailInUseError:
+                return jsonify({'error': 'This email is now used by another account'}), 409
         
         # Check if user exists and password is correct
-        if not user or not user.check_password(password):
+        elif not user.check_password(password):
             return jsonify({'error': 'Invalid credentials'}), 401
+
+        user_archive.record_login(user)
         
         # Create JWT access token
         access_token = create_access_token(identity=user.id)
@@ -112,4 +226,5 @@ def login():
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Login failed'}), 500
\ No newline at end of file
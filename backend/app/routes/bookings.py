@@ -0,0 +1,79 @@
+"""
+Booking routes blueprint for the AI Tour Guide Matcher API.
+Contains endpoints for booking guides and managing a user's bookings.
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from app import db
+from app.models import Booking, Guide
+from app.services.bookings import BookingError, cancel_booking, create_booking
+from app.services.idempotency import idempotent
+from app.utils.validators import validate_body
+
+bookings_bp = Blueprint('bookings', __name__)
+
+
+@bookings_bp.post('/bookings')
+@jwt_required()
+@idempotent
+@validate_body('booking')
+def book_guide(data):
+    """
+    Book a guide for a single day.
+
+    JSON body:
+      - guide_id: ID of the guide
+      - date: ISO date of the tour
+
+    Returns:
+        201: Booking created
+        400: Invalid input data
+        404: Guide not found
+        409: Guide not available on that date
+    """
+    guide_id, day = data['guide_id'], data['date']
+    if db.session.get(Guide, guide_id) is None:
+        return jsonify({'error': 'Guide not found'}), 404
+
+    try:
+        booking = create_booking(get_jwt_identity(), guide_id, day)
+    except BookingError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+    return jsonify({'message': 'Booking confirmed', 'booking': booking.to_dict()}), 201
+
+
+@bookings_bp.get('/bookings')
+@jwt_required()
+def list_bookings():
+    """
+    List the authenticated user's bookings.
+
+    Query params:
+      - role: 'traveler' (default) or 'guide'
+    """
+    user_id = get_jwt_identity()
+    column = Booking.guide_id if request.args.get('role') == 'guide' else Booking.traveler_id
+    bookings = Booking.query.filter(column == user_id).order_by(Booking.date).all()
+    return jsonify([b.to_dict() for b in bookings]), 200
+
+
+@bookings_bp.post('/bookings/<string:booking_id>/cancel')
+@jwt_required()
+def cancel(booking_id: str):
+    """
+    Cancel a booking as its traveler or guide.
+
+    Returns:
+        200: Booking cancelled
+        400: Booking already cancelled
+        404: Booking not found
+    """
+    try:
+        booking = cancel_booking(booking_id, get_jwt_identity())
+    except BookingError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+    return jsonify({'message': 'Booking cancelled', 'booking': booking.to_dict()}), 200
@@ -0,0 +1,106 @@
+"""
+Favorites routes blueprint for the AI Tour Guide Matcher API.
+Lets travelers shortlist guides and check a page of guides in one call.
+"""
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from app import db
+from app.models import Guide
+from app.services import favorites, guide_documents
+
+favorites_bp = Blueprint('favorites', __name__)
+
+# Guide IDs accepted by one membership check
+MAX_CHECK_IDS = 100
+
+# Favorites returned per page unless ?limit= asks for fewer
+MAX_FAVORITES_PAGE = 100
+
+
+@favorites_bp.put('/favorites/<string:guide_id>')
+@jwt_required()
+def add_favorite(guide_id: str):
+    """
+    Add a guide to the authenticated traveler's favorites.
+
+    Adding a guide that is already a favorite is not an error.
+
+    Returns:
+        201: Favorite added
+        200: Guide was already a favorite
+        404: Guide not found
+    """
+    if db.session.get(Guide, guide_id) is None:
+        return jsonify({'error': 'Guide not found'}), 404
+    if favorites.add_favorite(get_jwt_identity(), guide_id):
+        return jsonify({'message': 'Added to favorites', 'guide_id': guide_id}), 201
+    return jsonify({'message': 'Already in favorites', 'guide_id': guide_id}), 200
+
+
+@favorites_bp.delete('/favorites/<string:guide_id>')
+@jwt_required()
+def remove_favorite(guide_id: str):
+    """
+    Remove a guide from the authenticated traveler's favorites.
+
+    Returns:
+        200: Favorite removed
+        404: Guide was not a favorite
+    """
+    if not favorites.remove_favorite(get_jwt_identity(), guide_id):
+        return jsonify({'error': 'Guide is not in favorites'}), 404
+    return jsonify({'message': 'Removed from favorites', 'guide_id': guide_id}), 200
+
+
+@favorites_bp.get('/favorites')
+@jwt_required()
+def list_favorites():
+    """
+    List the authenticated traveler's favorite guides, most recently added first.
+
+    Query params:
+      - limit: guides per page (default and max 100)
+      - offset: guides to skip (default 0)
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', MAX_FAVORITES_PAGE)), 1), MAX_FAVORITES_PAGE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+
+    user_id = get_jwt_identity()
+    guide_ids = favorites.favorite_ids(user_id, limit=limit, offset=offset)
+    if current_app.config.get('GUIDE_READ_MODEL', True):
+        bodies = guide_documents.get_document_bodies(guide_ids)
+    else:
+        bodies = guide_documents.get_guide_bodies(guide_ids)
+    body = '{"total":%d,"guides":[%s]}' % (favorites.count_favorites(user_id), ','.join(bodies))
+    return Response(body, status=200, mimetype='application/json')
+
+
+@favorites_bp.get('/favorites/check')
+@jwt_required()
+def check_favorites():
+    """
+    Report which of a page of guides the traveler has favorited.
+
+    Query params:
+      - guide_ids: comma-separated guide IDs (at most 100)
+
+    Resolves the whole page with one query (or from the per-user cache),
+    rather than one request per guide card.
+
+    Returns:
+        200: ``{"favorited": {guide_id: bool}}``
+        400: Missing or too many guide IDs
+    """
+    guide_ids = [g.strip() for g in request.args.get('guide_ids', '').split(',') if g.strip()]
+    if not guide_ids:
+        return jsonify({'error': 'guide_ids is required'}), 400
+    if len(guide_ids) > MAX_CHECK_IDS:
+        return jsonify({'error': f'At most {MAX_CHECK_IDS} guide_ids can be checked at once'}), 400
+
+    favorited = favorites.favorited_ids(get_jwt_identity(), guide_ids)
+    return jsonify({'favorited': {guide_id: guide_id in favorited for guide_id in guide_ids}}), 200
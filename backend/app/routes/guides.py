@@ -1,10 +1,64 @@
-from flask import Blueprint, jsonify, request
-from sqlalchemy import or_
-from app.models import Guide
+import json
+from datetime import date, timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required, verify_jwt_in_request
+from app import db
+from app.models import Guide, GuideAvailability
+from app.models.availability import day_bit, month_start
+from app.services import also_viewed, catalogue, facets, favorites, guide_documents, query_parser, suggest
+from app.services.guide_filters import GuideFilter, parse_date_range
+from app.utils.tokens import TOKEN_FIELDS
+from app.utils.validators import validate_body
 
 
 guides_bp = Blueprint('guides', __name__)
 
+# Default window returned by the availability calendar endpoint
+DEFAULT_CALENDAR_DAYS = 90
+
+# Guides returned by the also-viewed endpoint unless ?limit= asks for more
+DEFAULT_ALSO_VIEWED = 10
+
+
+def _json_response(body: str):
+    """Wrap an already serialized JSON body in a response."""
+    return Response(body, status=200, mimetype='application/json')
+
+
+def _list_bodies(guide_filter, favorites_of=None):
+    """
+    JSON bodies of the matching guides from the read model or, when disabled, the guide tables.
+
+    With ``favorites_of`` (a user ID), each body gets a ``favorited`` flag,
+    resolved for the whole list with one membership lookup.
+    """
+    with_ids = favorites_of is not None
+    if current_app.config.get('GUIDE_READ_MODEL', True):
+        rows = guide_documents.list_document_bodies(guide_filter, with_ids=with_ids)
+    else:
+        rows = guide_documents.list_guide_bodies(guide_filter, with_ids=with_ids)
+    if not with_ids:
+        return rows
+    favorited = favorites.favorited_ids(favorites_of, [guide_id for guide_id, _ in rows])
+    return favorites.annotate_bodies(rows, favorited)
+
+
+def _favorites_of():
+    """
+    The caller's user ID when ``?include=favorited`` is requested.
+
+    Returns:
+        tuple: ``(user_id, error_response)``; both None when not requested
+    """
+    if 'favorited' not in request.args.get('include', '').split(','):
+        return None, None
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return None, (jsonify({'error': 'include=favorited requires authentication'}), 401)
+    return user_id, None
+
 
 @guides_bp.get('/guides')
 def list_guides():
@@ -13,45 +67,264 @@ def list_guides():
     Query params:
       - languages: comma-separated string (e.g., 'ja,en')
       - areas: comma-separated string (e.g., 'tokyo,kyoto')
+      - specialties: comma-separated string (e.g., 'ramen,history')
       - min_rating: float (e.g., '4.5')
+      - max_price: integer; guide's cheapest price must be within it
+      - available_from: ISO date; guide must be free on every day from here
+      - available_to: ISO date (inclusive, defaults to available_from)
+      - include: 'favorited' adds a per-guide ``favorited`` flag (requires a JWT)
+
+    Serves the precomputed guide documents when the read model is enabled,
+    otherwise encodes rows selected from the guide tables (no ORM loading).
     """
-    query = Guide.query
-
-    # Languages filter: match any token (case-insensitive, partial)
-    languages_param = request.args.get('languages')
-    if languages_param:
-        tokens = [t.strip() for t in languages_param.split(',') if t.strip()]
-        if tokens:
-            lang_conditions = [Guide.languages.ilike(f"%{t}%") for t in tokens]
-            query = query.filter(or_(*lang_conditions))
-
-    # Areas filter: match any token (case-insensitive, partial)
-    areas_param = request.args.get('areas')
-    if areas_param:
-        tokens = [t.strip() for t in areas_param.split(',') if t.strip()]
-        if tokens:
-            area_conditions = [Guide.areas.ilike(f"%{t}%") for t in tokens]
-            query = query.filter(or_(*area_conditions))
-
-    # Minimum rating filter
-    min_rating_param = request.args.get('min_rating')
-    if min_rating_param:
-        try:
-            min_rating_val = float(min_rating_param)
-            query = query.filter(Guide.rating >= min_rating_val)
-        except ValueError:
-            # Ignore invalid min_rating values
-            pass
-
-    guides = query.all()
-    return jsonify([g.to_dict() for g in guides]), 200
+    try:
+        guide_filter = GuideFilter.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    favorites_of, error = _favorites_of()
+    if error:
+        return error
+
+    return _json_response('[' + ','.join(_list_bodies(guide_filter, favorites_of)) + ']')
+
+
+@guides_bp.get('/guides/search')
+def search_guides():
+    """Return guides matching a natural-language query.
+
+    Query params:
+      - q: free text such as 'English-speaking ramen expert in Tokyo under ¥10,000'
+      - available_from / available_to, include: as for ``/guides``
+
+    The response echoes the filters extracted from ``q`` so clients can
+    show them as editable chips. When the parser is backed up the request
+    gets 503 with ``Retry-After``.
+    """
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({'error': 'q is required'}), 400
+    if len(text) > query_parser.MAX_QUERY_LENGTH:
+        return jsonify({'error': f'q must be at most {query_parser.MAX_QUERY_LENGTH} characters'}), 400
+    try:
+        available_from, available_to = parse_date_range(
+            request.args.get('available_from'), request.args.get('available_to')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    favorites_of, error = _favorites_of()
+    if error:
+        return error
+
+    try:
+        parsed = query_parser.parse_query(text)
+    except query_parser.ParseTimeoutError:
+        # Parser backlog; the parse finishes in the background and a retry hits the cache
+        response = jsonify({'error': 'Search is busy, please retry'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    guide_filter = parsed.to_filter(available_from=available_from, available_to=available_to)
+    guides = '[' + ','.join(_list_bodies(guide_filter, favorites_of)) + ']'
+    filters = json.dumps(parsed.to_dict(), ensure_ascii=False)
+    return _json_response(f'{{"query":{json.dumps(text)},"filters":{filters},"guides":{guides}}}')
+
+
+@guides_bp.get('/guides/suggest')
+def suggest_tokens():
+    """Return autocomplete suggestions for a guide attribute.
+
+    Query params:
+      - field: one of 'areas', 'languages', 'specialties'
+      - q: typed prefix (case-insensitive)
+      - limit: maximum suggestions (default 10, max 50)
+
+    Answered from the shared catalogue snapshot when one is configured,
+    otherwise from an in-memory prefix index; no database query per request.
+    """
+    field = request.args.get('field')
+    if field not in TOKEN_FIELDS:
+        return jsonify({'error': f"field must be one of: {', '.join(TOKEN_FIELDS)}"}), 400
+    prefix = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), suggest.MAX_SUGGESTIONS)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    snapshot = catalogue.get_snapshot()
+    if snapshot is not None:
+        suggestions = snapshot.suggest(field, prefix, limit)
+    else:
+        suggestions = suggest.suggest(field, prefix, limit)
+    response = jsonify({
+        'field': field,
+        'q': prefix,
+        'suggestions': [{'value': value, 'count': count} for value, count in suggestions],
+    })
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response, 200
+
+
+@guides_bp.get('/guides/facets')
+def facet_counts():
+    """Return guide counts per filter value for the current filters.
+
+    Accepts the same filter params as ``/guides`` plus:
+      - limit: values per language/area/specialty facet (default 20, max 100)
+
+    Counts come from the shared catalogue snapshot when one is configured,
+    otherwise from in-memory bitmap indexes; each facet ignores its own
+    filter so alternative values keep meaningful counts.
+    """
+    try:
+        guide_filter = GuideFilter.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', facets.DEFAULT_FACET_LIMIT)), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    snapshot = catalogue.get_snapshot()
+    if snapshot is not None:
+        response = jsonify(catalogue.facet_counts(snapshot, guide_filter, limit))
+    else:
+        response = jsonify(facets.facet_counts(guide_filter, limit))
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response, 200
 
 
 @guides_bp.get('/guides/<string:guide_id>')
 def get_guide(guide_id: str):
     """Return a single guide profile by ID.
 
-    Uses Guide.query.get_or_404 to return 404 when not found.
+    Serves the precomputed document when available and otherwise falls
+    back to Guide.query.get_or_404, which returns 404 when not found.
+    Successful reads are logged (buffered) as views for recommendations.
     """
+    if current_app.config.get('GUIDE_READ_MODEL', True):
+        body = guide_documents.get_document_body(guide_id)
+        if body is not None:
+            also_viewed.record_view(guide_id)
+            return _json_response(body)
+
     guide = Guide.query.get_or_404(guide_id)
+    also_viewed.record_view(guide_id)
     return jsonify(guide.to_dict()), 200
+
+
+@guides_bp.get('/guides/<string:guide_id>/also-viewed')
+def get_also_viewed(guide_id: str):
+    """Return guides that travelers who viewed this guide also viewed.
+
+    Query params:
+      - limit: guides to return (default 10, max 20)
+
+    Lists are precomputed offline from the view log and served from
+    memory; only the returned guides' documents (or, with the read model
+    off, their rows) are read from the database.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_ALSO_VIEWED)), 1), also_viewed.DEFAULT_TOP_K)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    guide_ids = also_viewed.also_viewed(guide_id, limit)
+    if current_app.config.get('GUIDE_READ_MODEL', True):
+        bodies = guide_documents.get_document_bodies(guide_ids)
+    else:
+        bodies = guide_documents.get_guide_bodies(guide_ids)
+    response = _json_response('{"guide_id":%s,"guides":[%s]}' % (json.dumps(guide_id), ','.join(bodies)))
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
+
+@guides_bp.get('/guides/<string:guide_id>/availability')
+def get_availability(guide_id: str):
+    """Return the dates a guide is available within a range.
+
+    Query params:
+      - from: ISO date (defaults to today)
+      - to: ISO date, inclusive (defaults to 90 days after ``from``)
+    """
+    Guide.query.get_or_404(guide_id)
+
+    start_param = request.args.get('from') or date.today().isoformat()
+    end_param = request.args.get('to')
+    try:
+        start, end = parse_date_range(start_param, end_param)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not end_param:
+        end = start + timedelta(days=DEFAULT_CALENDAR_DAYS - 1)
+
+    rows = (
+        GuideAvailability.query
+        .filter(GuideAvailability.guide_id == guide_id)
+        .filter(GuideAvailability.month.between(month_start(start), month_start(end)))
+        .order_by(GuideAvailability.month)
+        .all()
+    )
+    dates = [d.isoformat() for row in rows for d in row.available_days() if start <= d <= end]
+
+    return jsonify({
+        'guide_id': guide_id,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'available_dates': dates,
+    }), 200
+
+
+@guides_bp.put('/guides/<string:guide_id>/availability')
+@jwt_required()
+@validate_body('availability_update')
+def update_availability(guide_id: str, data):
+    """Mark dates as available or unavailable for the authenticated guide.
+
+    JSON body:
+      - dates: list of ISO dates
+      - available: bool (defaults to true)
+
+    Returns:
+        200: Updated calendar summary
+        400: Invalid input data
+        403: Authenticated user is not this guide
+        404: Guide not found
+    """
+    if get_jwt_identity() != guide_id:
+        return jsonify({'error': 'You can only update your own availability'}), 403
+    Guide.query.get_or_404(guide_id)
+
+    available = data['available']
+    days = sorted(set(data['dates']))
+
+    # Group the requested days into one mask per month
+    changes = {}
+    for day in days:
+        key = month_start(day)
+        changes[key] = changes.get(key, 0) | day_bit(day)
+
+    # Lock the affected months so concurrent bookings see a consistent mask
+    existing = {
+        row.month: row
+        for row in GuideAvailability.query
+        .filter(GuideAvailability.guide_id == guide_id)
+        .filter(GuideAvailability.month.in_(list(changes)))
+        .with_for_update()
+    }
+    for month, mask in changes.items():
+        row = existing.get(month)
+        if row is None:
+            row = GuideAvailability(guide_id=guide_id, month=month, days_mask=0)
+            db.session.add(row)
+        if available:
+            row.days_mask = (row.days_mask or 0) | mask
+        else:
+            row.days_mask = (row.days_mask or 0) & ~mask
+
+    db.session.commit()
+
+    return jsonify({
+        'guide_id': guide_id,
+        'available': available,
+        'updated_dates': [d.isoformat() for d in days],
+    }), 200
@@ -7,6 +7,8 @@ from flask import Blueprint, jsonify
 from datetime import datetime
 import os
 
+from app.services import admission, favorites, query_parser
+
 # Create blueprint for main routes
 main_bp = Blueprint('main', __name__)
 
@@ -45,7 +47,11 @@ def system_status():
         'endpoints': {
             'health': '/api/health',
             'status': '/api/status',
+            'metrics': '/api/metrics',
             'auth': '/api/auth/*',
+            'guides': '/api/guides/*',
+            'bookings': '/api/bookings/*',
+            'conversations': '/api/conversations/*',
             'users': '/api/users/*',
             'tours': '/api/tours/*'
         },
@@ -53,6 +59,24 @@ def system_status():
     }), 200
 
 
+@main_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Per-process load-shedding, query parser and cache metrics.
+
+    Returns:
+        JSON response with admission counters per limited endpoint, the
+        query parser's cache and batching counters, and the favorite-set
+        cache counters
+    """
+    return jsonify({
+        'admission': admission.metrics(),
+        'query_parser': query_parser.metrics(),
+        'favorites': favorites.metrics(),
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200
+
+
 @main_bp.route('/', methods=['GET'])
 def root():
     """
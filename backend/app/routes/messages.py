@@ -0,0 +1,243 @@
+"""
+Messaging routes blueprint for the AI Tour Guide Matcher API.
+Contains traveler–guide conversations, cursor-paginated message history and
+a Server-Sent Events stream for live delivery.
+"""
+
+import json
+import time
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Conversation, Guide, Message
+from app.services.pubsub import get_broker
+from app.utils.validators import validate_body
+
+messages_bp = Blueprint('messages', __name__)
+
+# Page size bounds for message history
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15
+
+# Streams are closed after this long so clients reconnect and rebalance
+MAX_STREAM_SECONDS = 300
+
+
+def _channel(conversation_id):
+    return f'conversation:{conversation_id}'
+
+
+def _sse_event(message):
+    """Format a message dict as a Server-Sent Event."""
+    return f"id: {message['id']}\nevent: message\ndata: {json.dumps(message)}\n\n"
+
+
+def _get_conversation_or_404(conversation_id, user_id):
+    conversation = db.session.get(Conversation, conversation_id)
+    if conversation is None or not conversation.has_participant(user_id):
+        return None
+    return conversation
+
+
+@messages_bp.post('/conversations')
+@jwt_required()
+@validate_body('conversation')
+def start_conversation(data):
+    """
+    Start (or return the existing) conversation with a guide.
+
+    JSON body:
+      - guide_id: ID of the guide to message
+
+    Returns:
+        201: Conversation created
+        200: Conversation already existed
+        400: Invalid input data
+        404: Guide not found
+    """
+    user_id = get_jwt_identity()
+    guide_id = data['guide_id']
+    if guide_id == user_id:
+        return jsonify({'error': 'Cannot start a conversation with yourself'}), 400
+    if db.session.get(Guide, guide_id) is None:
+        return jsonify({'error': 'Guide not found'}), 404
+
+    existing = Conversation.query.filter_by(traveler_id=user_id, guide_id=guide_id).first()
+    if existing:
+        return jsonify(existing.to_dict()), 200
+
+    conversation = Conversation(traveler_id=user_id, guide_id=guide_id)
+    db.session.add(conversation)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Created concurrently by another request
+        db.session.rollback()
+        existing = Conversation.query.filter_by(traveler_id=user_id, guide_id=guide_id).first()
+        return jsonify(existing.to_dict()), 200
+    return jsonify(conversation.to_dict()), 201
+
+
+@messages_bp.get('/conversations')
+@jwt_required()
+def list_conversations():
+    """List the authenticated user's conversations, most recently active first."""
+    user_id = get_jwt_identity()
+    conversations = (
+        Conversation.query
+        .filter(or_(Conversation.traveler_id == user_id, Conversation.guide_id == user_id))
+        .order_by(Conversation.last_message_at.desc().nullslast(), Conversation.id.desc())
+        .all()
+    )
+    return jsonify([c.to_dict() for c in conversations]), 200
+
+
+@messages_bp.get('/conversations/<int:conversation_id>/messages')
+@jwt_required()
+def list_messages(conversation_id: int):
+    """
+    Return a page of message history, newest first.
+
+    Query params:
+      - before: message id cursor; only older messages are returned
+      - limit: page size (default 50, max 200)
+
+    The response's ``next_cursor`` is passed as ``before`` to fetch the
+    next (older) page; it is null on the last page.
+    """
+    if _get_conversation_or_404(conversation_id, get_jwt_identity()) is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        before = int(request.args['before']) if request.args.get('before') else None
+    except ValueError:
+        return jsonify({'error': 'limit and before must be integers'}), 400
+
+    # Keyset pagination on (conversation_id, id); fetch one extra to detect more pages
+    query = Message.query.filter(Message.conversation_id == conversation_id)
+    if before is not None:
+        query = query.filter(Message.id < before)
+    rows = query.order_by(Message.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        'messages': [m.to_dict() for m in rows],
+        'next_cursor': rows[-1].id if has_more else None,
+    }), 200
+
+
+@messages_bp.post('/conversations/<int:conversation_id>/messages')
+@jwt_required()
+@validate_body('message')
+def send_message(conversation_id: int, data):
+    """
+    Post a message and push it to every open stream for the conversation.
+
+    JSON body:
+      - body: message text (1-2000 characters)
+
+    Returns:
+        201: Message stored and published
+        400: Invalid input data
+        404: Conversation not found
+    """
+    user_id = get_jwt_identity()
+    conversation = _get_conversation_or_404(conversation_id, user_id)
+    if conversation is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+
+    body = data['body']
+    message = Message(conversation_id=conversation_id, sender_id=user_id, body=body)
+    db.session.add(message)
+    conversation.last_message_at = datetime.utcnow()
+    db.session.commit()
+
+    # Publish only after commit so subscribers never see rolled-back messages
+    payload = message.to_dict()
+    get_broker().publish(_channel(conversation_id), json.dumps(payload))
+    return jsonify(payload), 201
+
+
+@messages_bp.get('/conversations/<int:conversation_id>/stream')
+@jwt_required()
+def stream_messages(conversation_id: int):
+    """
+    Stream new messages as Server-Sent Events.
+
+    Clients resume after a disconnect by sending ``Last-Event-ID`` (or
+    ``?last_event_id=``); anything missed is replayed from the database
+    before live delivery starts. The stream holds no database connection
+    while idle and sends a keep-alive comment every 15 seconds.
+    """
+    if _get_conversation_or_404(conversation_id, get_jwt_identity()) is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_seen = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be an integer'}), 400
+
+    # Subscribe before reading the backlog so nothing published in between is lost
+    subscription = get_broker().subscribe(_channel(conversation_id))
+    missed = []
+    if last_seen is not None:
+        try:
+            missed = [
+                m.to_dict() for m in Message.query
+                .filter(Message.conversation_id == conversation_id, Message.id > last_seen)
+                .order_by(Message.id)
+                .limit(MAX_PAGE_SIZE)
+            ]
+        except Exception:
+            subscription.close()
+            raise
+    if missed:
+        last_seen = missed[-1]['id']
+
+    # A full backlog page means there may be more; end the stream after it so
+    # the client reconnects with the newer Last-Event-ID instead of skipping a gap
+    backlog_truncated = len(missed) == MAX_PAGE_SIZE
+
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_SECONDS', HEARTBEAT_SECONDS)
+    max_duration = current_app.config.get('SSE_MAX_STREAM_SECONDS', MAX_STREAM_SECONDS)
+
+    def generate(last_seen):
+        try:
+            yield 'retry: 3000\n\n'
+            for message in missed:
+                yield _sse_event(message)
+            if backlog_truncated:
+                return
+
+            deadline = time.monotonic() + max_duration
+            while not subscription.overflowed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                raw = subscription.get(timeout=min(heartbeat, remaining))
+                if raw is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                message = json.loads(raw)
+                if last_seen is not None and message['id'] <= last_seen:
+                    continue
+                last_seen = message['id']
+                yield _sse_event(message)
+        finally:
+            subscription.close()
+
+    return Response(generate(last_seen), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
@@ -0,0 +1,153 @@
+"""
+Guide photo routes: streaming upload, listing and immutable file serving.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import select
+
+from app import db
+from app.models import Guide, GuidePhoto
+from app.services import photos
+from app.tasks import generate_photo_thumbnails
+
+photos_bp = Blueprint('photos', __name__)
+
+# Most photos a single guide may keep
+MAX_PHOTOS_PER_GUIDE = 20
+
+# Allowance for multipart boundaries and headers on top of the image itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+guides_table = Guide.__table__
+
+
+def _photo_count(guide_id) -> int:
+    return GuidePhoto.query.filter_by(guide_id=guide_id).count()
+
+
+def _limit_reached():
+    return jsonify({'error': f'At most {MAX_PHOTOS_PER_GUIDE} photos per guide'}), 409
+
+
+def _enqueue_thumbnails(digest, content_type):
+    """Queue thumbnail rendering; failing to enqueue never fails the upload."""
+    try:
+        generate_photo_thumbnails.delay(digest, content_type)
+    except Exception:
+        current_app.logger.exception('Failed to enqueue thumbnails for %s', digest)
+
+
+@photos_bp.route('/guides/<guide_id>/photos', methods=['POST'])
+@jwt_required()
+def upload_photo(guide_id: str):
+    """
+    Upload a photo for the authenticated guide.
+
+    Expects ``multipart/form-data`` with the image in the ``photo`` field.
+    The body is streamed to storage as it arrives; thumbnails are rendered
+    in the background and appear in the listing once ready.
+
+    Returns:
+        201: Stored photo with its URL
+        400: Missing file or unsupported image type
+        403: Authenticated user is not this guide
+        404: Guide not found
+        409: Photo limit reached
+        413: Image too large
+    """
+    if get_jwt_identity() != guide_id:
+        return jsonify({'error': 'You can only upload your own photos'}), 403
+    Guide.query.get_or_404(guide_id)
+
+    max_bytes = current_app.config.get('PHOTO_MAX_BYTES', photos.DEFAULT_MAX_BYTES)
+    if request.content_length is not None and request.content_length > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        return jsonify({'error': f'Photos must be at most {max_bytes // (1024 * 1024)} MB'}), 413
+    # Cheap early refusal; the authoritative check runs under the guide lock below
+    if _photo_count(guide_id) >= MAX_PHOTOS_PER_GUIDE:
+        return _limit_reached()
+
+    try:
+        digest, content_type, size = photos.store_upload(request.environ, max_bytes=max_bytes)
+    except photos.PhotoError as e:
+        return jsonify({'error': str(e)}), e.status
+
+    # Serialize concurrent uploads for this guide between the count and the insert
+    db.session.execute(select(guides_table.c.id).where(guides_table.c.id == guide_id).with_for_update())
+    if _photo_count(guide_id) >= MAX_PHOTOS_PER_GUIDE:
+        db.session.rollback()
+        return _limit_reached()
+
+    photo = GuidePhoto(guide_id=guide_id, digest=digest, content_type=content_type, size_bytes=size)
+    # An identical image that already has thumbnails needs no new job
+    photo.thumbnails_ready = db.session.query(
+        GuidePhoto.query.filter_by(digest=digest, thumbnails_ready=True).exists()
+    ).scalar()
+    db.session.add(photo)
+    db.session.commit()
+
+    if not photo.thumbnails_ready:
+        _enqueue_thumbnails(digest, content_type)
+    return jsonify(photos.describe(photo)), 201
+
+
+@photos_bp.route('/guides/<guide_id>/photos', methods=['GET'])
+def list_photos(guide_id: str):
+    """
+    List a guide's photos, newest first.
+
+    Returns:
+        200: ``{"photos": [...]}``
+    """
+    rows = (
+        GuidePhoto.query.filter_by(guide_id=guide_id)
+        .order_by(GuidePhoto.created_at.desc())
+        .all()
+    )
+    return jsonify({'photos': [photos.describe(photo) for photo in rows]}), 200
+
+
+def _parse_filename(filename):
+    digest, _, ext = filename.partition('.')
+    if not photos.DIGEST_PATTERN.match(digest):
+        return None, None
+    return digest, ext
+
+
+@photos_bp.route('/photos/<filename>', methods=['GET'])
+def serve_photo(filename: str):
+    """
+    Serve an original photo by its content address (``<sha256>.<ext>``).
+
+    Returns:
+        200/206/304: Image bytes (Range and conditional requests supported)
+        404: Unknown photo
+    """
+    digest, ext = _parse_filename(filename)
+    content_type = photos.CONTENT_TYPES.get(ext)
+    response = None
+    if digest and content_type:
+        response = photos.send_photo(photos.photo_path(digest, content_type), content_type, digest)
+    if response is None:
+        return jsonify({'error': 'Photo not found'}), 404
+    return response
+
+
+@photos_bp.route('/photos/thumbs/<int:size>/<filename>', methods=['GET'])
+def serve_thumbnail(size: int, filename: str):
+    """
+    Serve a photo thumbnail (``<sha256>.jpg``) at one of the rendered sizes.
+
+    Returns:
+        200/206/304: JPEG thumbnail
+        404: Unknown size, or the thumbnail has not been rendered yet
+    """
+    digest, ext = _parse_filename(filename)
+    response = None
+    if digest and ext == 'jpg' and size in photos.THUMBNAIL_SIZES:
+        response = photos.send_photo(
+            photos.thumbnail_path(digest, size), photos.THUMBNAIL_CONTENT_TYPE, f'{digest}-{size}'
+        )
+    if response is None:
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    return response
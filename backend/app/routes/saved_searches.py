@@ -0,0 +1,73 @@
+"""
+Saved search routes blueprint for the AI Tour Guide Matcher API.
+Lets travelers store guide searches and be alerted when new guides match.
+"""
+
+from flask import Blueprint, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from app import db
+from app.models import SavedSearch
+from app.services.saved_searches import create_saved_search, delete_saved_search
+from app.utils.validators import validate_body
+
+saved_searches_bp = Blueprint('saved_searches', __name__)
+
+# Maximum number of saved searches per traveler
+MAX_SAVED_SEARCHES = 20
+
+
+@saved_searches_bp.post('/saved-searches')
+@jwt_required()
+@validate_body('saved_search')
+def save_search(data):
+    """
+    Save a guide search for the authenticated traveler.
+
+    JSON body (same semantics as the ``/guides`` filters):
+      - languages: list or comma-separated string
+      - areas: list or comma-separated string
+      - min_rating: number
+      - name: optional label
+
+    Returns:
+        201: Saved search created
+        400: Invalid input data or too many saved searches
+    """
+    traveler_id = get_jwt_identity()
+    if SavedSearch.query.filter_by(traveler_id=traveler_id).count() >= MAX_SAVED_SEARCHES:
+        return jsonify({'error': f'At most {MAX_SAVED_SEARCHES} saved searches are allowed'}), 400
+
+    search = create_saved_search(traveler_id, **data)
+    return jsonify({'message': 'Search saved', 'saved_search': search.to_dict()}), 201
+
+
+@saved_searches_bp.get('/saved-searches')
+@jwt_required()
+def list_saved_searches():
+    """List the authenticated traveler's saved searches, newest first."""
+    searches = (
+        SavedSearch.query
+        .filter_by(traveler_id=get_jwt_identity())
+        .order_by(SavedSearch.created_at.desc())
+        .all()
+    )
+    return jsonify([s.to_dict() for s in searches]), 200
+
+
+@saved_searches_bp.delete('/saved-searches/<string:search_id>')
+@jwt_required()
+def remove_saved_search(search_id: str):
+    """
+    Delete one of the authenticated traveler's saved searches.
+
+    Returns:
+        200: Saved search deleted
+        404: Saved search not found (or owned by someone else)
+    """
+    search = db.session.get(SavedSearch, search_id)
+    if search is None or search.traveler_id != get_jwt_identity():
+        return jsonify({'error': 'Saved search not found'}), 404
+
+    delete_saved_search(search)
+    return jsonify({'message': 'Saved search deleted'}), 200
@@ -0,0 +1,223 @@
+"""
+Request body schemas for the API.
+
+Every JSON body is validated here before a view touches the database or
+hashes a password. Limits mirror the column sizes so oversized input is
+rejected up front rather than by the database. Each validation failure
+carries the user-facing message the endpoint has always returned.
+
+This module imports marshmallow; load schemas through
+``app.utils.validators.get_schema`` so the import (and schema compilation)
+happens once, on first use, instead of at worker startup.
+"""
+
+from marshmallow import (
+    EXCLUDE, Schema, ValidationError, fields, pre_load, validate, validates_schema,
+)
+
+from app.models.message import MAX_MESSAGE_LENGTH
+from app.services.saved_searches import MAX_TERM_LENGTH
+from app.utils.validators import validate_email
+
+# Column sizes (see the models)
+EMAIL_MAX_LENGTH = 120
+ID_MAX_LENGTH = 36
+SEARCH_NAME_MAX_LENGTH = 100
+TERM_LIST_MAX_LENGTH = 255
+
+# Longest password accepted; bounds the work a single KDF run can be made to do
+PASSWORD_MIN_LENGTH = 6
+PASSWORD_MAX_LENGTH = 128
+
+# Most accounts accepted by one batch registration request
+MAX_BATCH_SIZE = 100
+
+# Most dates accepted in a single availability update
+MAX_AVAILABILITY_DATES = 366
+
+ISO_DATE_ERROR = 'dates must be ISO formatted (YYYY-MM-DD)'
+
+
+class BaseSchema(Schema):
+    """Base for request schemas; unknown keys are ignored, as before."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+
+def _email_format(value):
+    if not validate_email(value):
+        raise ValidationError('Invalid email format')
+
+
+class CredentialsSchema(BaseSchema):
+    """Registration credentials (also used for each batch item)."""
+
+    email = fields.String(
+        required=True,
+        error_messages={'invalid': 'Invalid email format'},
+        validate=[
+            validate.Length(max=EMAIL_MAX_LENGTH, error=f'Email must be at most {EMAIL_MAX_LENGTH} characters'),
+            _email_format,
+        ],
+    )
+    password = fields.String(
+        required=True,
+        error_messages={'invalid': 'Password must be a string'},
+        validate=[
+            validate.Length(
+                min=PASSWORD_MIN_LENGTH, error=f'Password must be at least {PASSWORD_MIN_LENGTH} characters long'
+            ),
+            validate.Length(
+                max=PASSWORD_MAX_LENGTH, error=f'Password must be at most {PASSWORD_MAX_LENGTH} characters long'
+            ),
+        ],
+    )
+
+    @pre_load
+    def normalize(self, data, **kwargs):
+        if not isinstance(data, dict) or not data.get('email') or not data.get('password'):
+            raise ValidationError('Email and password are required')
+        data = dict(data)
+        if isinstance(data['email'], str):
+            data['email'] = data['email'].strip().lower()
+        return data
+
+
+class LoginSchema(CredentialsSchema):
+    """Login credentials; only sizes are checked, not the password policy."""
+
+    email = fields.String(
+        required=True,
+        error_messages={'invalid': 'Invalid email format'},
+        validate=validate.Length(max=EMAIL_MAX_LENGTH, error=f'Email must be at most {EMAIL_MAX_LENGTH} characters'),
+    )
+    password = fields.String(
+        required=True,
+        error_messages={'invalid': 'Password must be a string'},
+        validate=validate.Length(
+            max=PASSWORD_MAX_LENGTH, error=f'Password must be at most {PASSWORD_MAX_LENGTH} characters long'
+        ),
+    )
+
+
+class BatchRegistrationSchema(BaseSchema):
+    """Envelope of a batch registration; items are validated one by one."""
+
+    users = fields.List(
+        fields.Raw(),
+        required=True,
+        error_messages={'required': 'users must be a non-empty list', 'invalid': 'users must be a non-empty list',
+                        'null': 'users must be a non-empty list'},
+        validate=[
+            validate.Length(min=1, error='users must be a non-empty list'),
+            validate.Length(max=MAX_BATCH_SIZE, error=f'At most {MAX_BATCH_SIZE} users per batch'),
+        ],
+    )
+
+
+class BookingSchema(BaseSchema):
+    """Body of ``POST /bookings``."""
+
+    guide_id = fields.String(
+        required=True,
+        error_messages={'required': 'guide_id and date are required', 'null': 'guide_id and date are required',
+                        'invalid': 'guide_id must be a string'},
+        validate=validate.Length(min=1, max=ID_MAX_LENGTH, error='guide_id and date are required'),
+    )
+    date = fields.Date(
+        required=True,
+        error_messages={'required': 'guide_id and date are required', 'null': 'guide_id and date are required',
+                        'invalid': 'date must be ISO formatted (YYYY-MM-DD)'},
+    )
+
+
+class AvailabilityUpdateSchema(BaseSchema):
+    """Body of ``PUT /guides/<id>/availability``."""
+
+    dates = fields.List(
+        fields.Date(error_messages={'invalid': ISO_DATE_ERROR, 'null': ISO_DATE_ERROR}),
+        required=True,
+        error_messages={'required': 'dates must be a non-empty list', 'invalid': 'dates must be a non-empty list',
+                        'null': 'dates must be a non-empty list'},
+        validate=[
+            validate.Length(min=1, error='dates must be a non-empty list'),
+            validate.Length(max=MAX_AVAILABILITY_DATES, error=f'At most {MAX_AVAILABILITY_DATES} dates per request'),
+        ],
+    )
+    available = fields.Boolean(load_default=True, error_messages={'invalid': 'available must be a boolean'})
+
+
+class ConversationSchema(BaseSchema):
+    """Body of ``POST /conversations``."""
+
+    guide_id = fields.String(
+        required=True,
+        error_messages={'required': 'guide_id is required', 'null': 'guide_id is required',
+                        'invalid': 'guide_id must be a string'},
+        validate=validate.Length(min=1, max=ID_MAX_LENGTH, error='guide_id is required'),
+    )
+
+
+class MessageSchema(BaseSchema):
+    """Body of ``POST /conversations/<id>/messages``."""
+
+    body = fields.String(
+        required=True,
+        error_messages={'required': 'Message body is required', 'null': 'Message body is required',
+                        'invalid': 'Message body is required'},
+        validate=[
+            validate.Predicate('strip', error='Message body is required'),
+            validate.Length(max=MAX_MESSAGE_LENGTH, error=f'Message must be at most {MAX_MESSAGE_LENGTH} characters'),
+        ],
+    )
+
+
+class TermList(fields.Field):
+    """Comma-separated terms given as a string or a list; loads as 'a,b' or None."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, list):
+            value = ','.join(str(v) for v in value)
+        if not isinstance(value, str):
+            raise ValidationError(f'{attr} must be a list or a comma-separated string')
+        terms = [t.strip() for t in value.split(',') if t.strip()]
+        if any(len(term) > MAX_TERM_LENGTH for term in terms):
+            raise ValidationError(f'Search terms must be at most {MAX_TERM_LENGTH} characters')
+        joined = ','.join(terms)
+        if len(joined) > TERM_LIST_MAX_LENGTH:
+            raise ValidationError('Too many search terms')
+        return joined or None
+
+
+class SavedSearchSchema(BaseSchema):
+    """Body of ``POST /saved-searches``."""
+
+    name = fields.String(
+        load_default=None, allow_none=True,
+        validate=validate.Length(
+            max=SEARCH_NAME_MAX_LENGTH, error=f'name must be at most {SEARCH_NAME_MAX_LENGTH} characters'
+        ),
+    )
+    languages = TermList(load_default=None, allow_none=True)
+    areas = TermList(load_default=None, allow_none=True)
+    min_rating = fields.Float(
+        load_default=None, allow_none=True, error_messages={'invalid': 'min_rating must be a number'}
+    )
+
+    @validates_schema
+    def require_criterion(self, data, **kwargs):
+        if not data.get('languages') and not data.get('areas') and data.get('min_rating') is None:
+            raise ValidationError('At least one of languages, areas or min_rating is required')
+
+
+SCHEMAS = {
+    'credentials': CredentialsSchema,
+    'login': LoginSchema,
+    'batch_registration': BatchRegistrationSchema,
+    'booking': BookingSchema,
+    'availability_update': AvailabilityUpdateSchema,
+    'conversation': ConversationSchema,
+    'message': MessageSchema,
+    'saved_search': SavedSearchSchema,
+}
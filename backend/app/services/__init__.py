@@ -0,0 +1 @@
+# Services module for domain logic shared by routes, CLI commands and jobs
@@ -0,0 +1,170 @@
+"""
+Per-endpoint admission control.
+
+Each limited endpoint (or whole blueprint) gets an in-flight budget and a
+short, bounded wait queue. A request that finds the budget full waits for
+at most ``wait`` seconds in a queue of at most ``queue`` requests; when the
+queue is full or the wait expires it is shed with ``503`` and a
+``Retry-After`` header. A storm on one expensive endpoint (password
+hashing on login) therefore exhausts that endpoint's budget only, and the
+remaining worker threads keep serving health checks and guide listings.
+
+Limits come from ``ADMISSION_LIMITS``: a mapping from endpoint name
+(``'auth.login'``) or blueprint name (``'auth'``) to either an int
+(the in-flight limit) or a dict with ``limit``, ``queue``, ``wait`` and
+``retry_after``. Endpoint entries win over blueprint entries. Budgets and
+counters are per process.
+"""
+
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+# Applied when ADMISSION_LIMITS is not configured
+DEFAULT_LIMITS = {
+    'auth.login': {'limit': 4, 'queue': 16, 'wait': 0.5},
+    'auth.register': {'limit': 4, 'queue': 16, 'wait': 0.5},
+    'auth.register_batch': {'limit': 1, 'queue': 2, 'wait': 1.0},
+    # Uploads hold a worker for as long as the client takes to send the body
+    'photos.upload_photo': {'limit': 4, 'queue': 4, 'wait': 2.0},
+}
+
+DEFAULT_QUEUE = 0
+DEFAULT_WAIT = 0.0
+DEFAULT_RETRY_AFTER = 1
+
+
+class ConcurrencyLimiter:
+    """
+    In-flight budget with a bounded wait queue.
+
+    Args:
+        name (str): Endpoint or blueprint the budget applies to
+        limit (int): Maximum concurrent requests
+        queue (int): Maximum requests waiting for a slot
+        wait (float): Longest time a request may wait, in seconds
+        retry_after (int): ``Retry-After`` seconds sent when shedding
+    """
+
+    def __init__(self, name, limit, queue=DEFAULT_QUEUE, wait=DEFAULT_WAIT, retry_after=DEFAULT_RETRY_AFTER):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.wait = wait
+        self.retry_after = retry_after
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting briefly if allowed; False means shed."""
+        with self._condition:
+            if self.in_flight < self.limit and not self.waiting:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            if self.waiting >= self.queue:
+                self.shed_queue_full += 1
+                return False
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.wait
+            try:
+                while self.in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_timeout += 1
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        """Return a slot and wake one waiter."""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def stats(self) -> dict:
+        """Counters for the metrics endpoint."""
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'queue': self.queue,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'shed': self.shed_queue_full + self.shed_timeout,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_timeout': self.shed_timeout,
+            }
+
+
+def _build_limiters(config) -> dict:
+    limiters = {}
+    if config is None:
+        config = DEFAULT_LIMITS
+    for name, spec in config.items():
+        if isinstance(spec, int):
+            spec = {'limit': spec}
+        limiters[name] = ConcurrencyLimiter(
+            name,
+            limit=int(spec['limit']),
+            queue=int(spec.get('queue', DEFAULT_QUEUE)),
+            wait=float(spec.get('wait', DEFAULT_WAIT)),
+            retry_after=int(spec.get('retry_after', DEFAULT_RETRY_AFTER)),
+        )
+    return limiters
+
+
+def get_limiters(app=None) -> dict:
+    """Return this process's limiters, built from config on first use."""
+    app = app or current_app._get_current_object()
+    limiters = app.extensions.get('admission')
+    if limiters is None:
+        limiters = app.extensions.setdefault('admission', _build_limiters(app.config.get('ADMISSION_LIMITS')))
+    return limiters
+
+
+def _limiter_for_request():
+    limiters = get_limiters()
+    if request.endpoint in limiters:
+        return limiters[request.endpoint]
+    return limiters.get(request.blueprint)
+
+
+def _admit():
+    limiter = _limiter_for_request()
+    if limiter is None:
+        return None
+    if not limiter.acquire():
+        response = jsonify({'error': 'Service is busy, please retry shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(limiter.retry_after)
+        return response
+    g.admission_limiter = limiter
+    return None
+
+
+def _release(exc=None):
+    limiter = g.pop('admission_limiter', None)
+    if limiter is not None:
+        limiter.release()
+
+
+def init_app(app):
+    """Install the admission hooks on ``app``."""
+    app.before_request(_admit)
+    app.teardown_request(_release)
+
+
+def metrics() -> dict:
+    """Admission counters keyed by endpoint or blueprint name."""
+    return {name: limiter.stats() for name, limiter in get_limiters().items()}
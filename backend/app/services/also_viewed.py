@@ -0,0 +1,285 @@
+"""
+"Travelers also viewed" recommendations from guide co-views.
+
+Three stages, each cheap where it runs:
+
+* Logging: ``record_view`` appends to a per-process buffer; a background
+  thread writes the buffer to the append-only ``guide_views`` table in one
+  multi-row INSERT once it holds ``VIEW_LOG_BUFFER_SIZE`` views or its
+  oldest view is ``FLUSH_SECONDS`` old (a timer flushes quiet buffers).
+  Views still buffered when a worker dies are lost, which only dents the
+  statistics.
+* Building (offline, ``flask guides build-also-viewed``): the distinct
+  (viewer, guide) pairs of the last ``window_days`` form a sparse binary
+  viewer x guide matrix ``V``; ``V.T @ V`` counts how many viewers saw
+  each pair of guides. Pairs are scored by cosine similarity (co-views
+  over the geometric mean of both guides' viewers) so that popular guides
+  do not top every list, and the best ``top_k`` per guide are stored in
+  ``guide_also_viewed``.
+* Serving: the stored lists are held in a ``LocalIndex`` refreshed every
+  ``ALSO_VIEWED_TTL`` seconds; deleted guides drop out immediately.
+
+NumPy and SciPy are imported by the build only.
+"""
+
+import atexit
+import hashlib
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import delete, insert, select
+
+from app import db
+from app.models import GuideAlsoViewed, GuideView
+from app.services.local_index import LocalIndex
+
+DEFAULT_BUFFER_SIZE = 500
+
+# Oldest a buffered view may get before the buffer is flushed
+FLUSH_SECONDS = 10
+
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_TOP_K = 20
+
+# Guide pairs co-viewed by fewer viewers are noise
+DEFAULT_MIN_CO_VIEWS = 2
+
+# Viewers who opened more guides than this are crawlers, not travelers
+MAX_GUIDES_PER_VIEWER = 200
+
+# Default seconds before the in-memory lists are reloaded
+DEFAULT_TTL = 600
+
+views_table = GuideView.__table__
+also_viewed_table = GuideAlsoViewed.__table__
+
+
+class ViewBuffer:
+    """
+    Thread-safe list of pending view rows.
+
+    With ``on_expire`` set, a timer started by the first buffered row hands
+    the batch to ``on_expire`` once it is ``flush_seconds`` old, so views
+    are written even when no further view arrives to trigger the flush.
+
+    Args:
+        max_size (int): Rows that trigger a flush
+        on_expire (callable): ``on_expire(rows)`` called from the timer thread
+        flush_seconds (float): Oldest a buffered row may get
+    """
+
+    def __init__(self, max_size, on_expire=None, flush_seconds=FLUSH_SECONDS):
+        self.max_size = max_size
+        self.on_expire = on_expire
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._rows = []
+        self._oldest = None
+        self._timer = None
+
+    def add(self, row):
+        """Append a row; returns the drained batch when it is time to flush."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._rows:
+                self._oldest = now
+                self._start_timer()
+            self._rows.append(row)
+            if len(self._rows) >= self.max_size or now - self._oldest >= self.flush_seconds:
+                return self._drain()
+        return None
+
+    def drain(self):
+        with self._lock:
+            return self._drain()
+
+    def _start_timer(self):
+        if self.on_expire is not None:
+            self._timer = threading.Timer(self.flush_seconds, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expire(self):
+        with self._lock:
+            # A timer whose batch was already drained must not flush the next one early
+            if threading.current_thread() is not self._timer:
+                return
+            rows = self._drain()
+        if rows:
+            self.on_expire(rows)
+
+    def _drain(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def _buffer(app) -> ViewBuffer:
+    buffer = app.extensions.get('view_buffer')
+    if buffer is None:
+        created = ViewBuffer(
+            app.config.get('VIEW_LOG_BUFFER_SIZE', DEFAULT_BUFFER_SIZE),
+            on_expire=None if app.testing else lambda rows: _write_in_context(app, lambda: rows),
+        )
+        buffer = app.extensions.setdefault('view_buffer', created)
+        if buffer is created and not app.testing:
+            # Write what is left when the worker shuts down cleanly
+            atexit.register(_write_in_context, app, buffer.drain)
+    return buffer
+
+
+def _write(rows):
+    if rows:
+        db.session.execute(insert(views_table), rows)
+        db.session.commit()
+
+
+def _write_in_context(app, drain):
+    try:
+        with app.app_context():
+            try:
+                _write(drain())
+            finally:
+                db.session.remove()
+    except Exception:
+        app.logger.exception('Failed to write guide views')
+
+
+def viewer_key() -> str:
+    """Identify the viewer: the signed-in user, else a daily visitor hash."""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    if identity:
+        return f'u:{identity}'
+    visitor = f"{request.remote_addr}|{request.user_agent.string}|{date.today().isoformat()}"
+    return 'a:' + hashlib.sha256(visitor.encode()).hexdigest()[:32]
+
+
+def record_view(guide_id):
+    """Buffer one view of ``guide_id`` by the current request's viewer."""
+    app = current_app._get_current_object()
+    batch = _buffer(app).add({'guide_id': guide_id, 'viewer_key': viewer_key(), 'viewed_at': datetime.utcnow()})
+    if batch:
+        threading.Thread(target=_write_in_context, args=(app, lambda: batch), daemon=True).start()
+
+
+def flush_views():
+    """Write buffered views synchronously (tests, shutdown, CLI)."""
+    _write(_buffer(current_app._get_current_object()).drain())
+
+
+def compute_also_viewed(pairs, top_k=DEFAULT_TOP_K, min_co_views=DEFAULT_MIN_CO_VIEWS):
+    """
+    Rank co-viewed guides for every guide.
+
+    Args:
+        pairs (list): ``(viewer_key, guide_id)`` tuples; duplicates allowed
+        top_k (int): Related guides kept per guide
+        min_co_views (int): Minimum shared viewers for a pair to count
+
+    Returns:
+        dict: ``guide_id -> [(related_id, score, co_views), ...]`` best first
+    """
+    import numpy as np
+    from scipy import sparse
+
+    if not pairs:
+        return {}
+    viewers, guides = zip(*pairs)
+    viewer_ids, viewer_codes = np.unique(np.asarray(viewers, dtype=object), return_inverse=True)
+    guide_ids, guide_codes = np.unique(np.asarray(guides, dtype=object), return_inverse=True)
+
+    views = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (viewer_codes, guide_codes)),
+        shape=(len(viewer_ids), len(guide_ids)),
+    )
+    views.data[:] = 1  # duplicate (viewer, guide) entries were summed
+    guides_per_viewer = np.asarray(views.sum(axis=1)).ravel()
+    views = sparse.diags((guides_per_viewer <= MAX_GUIDES_PER_VIEWER).astype(np.float32)) @ views
+    views.eliminate_zeros()
+
+    co_views = (views.T @ views).tocoo()
+    viewers_per_guide = np.asarray(views.sum(axis=0)).ravel()
+    keep = (co_views.row != co_views.col) & (co_views.data >= min_co_views)
+    rows, cols, counts = co_views.row[keep], co_views.col[keep], co_views.data[keep]
+    scores = counts / np.sqrt(viewers_per_guide[rows] * viewers_per_guide[cols])
+
+    # Sort by guide, then score descending; keep each guide's first top_k entries
+    order = np.lexsort((-scores, rows))
+    rows, cols, counts, scores = rows[order], cols[order], counts[order], scores[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side='left')
+    top = rank < top_k
+
+    result = {}
+    for row, col, score, count in zip(rows[top], cols[top], scores[top], counts[top]):
+        result.setdefault(guide_ids[row], []).append((guide_ids[col], round(float(score), 4), int(count)))
+    return result
+
+
+def build_also_viewed(window_days=DEFAULT_WINDOW_DAYS, top_k=DEFAULT_TOP_K,
+                      min_co_views=DEFAULT_MIN_CO_VIEWS) -> int:
+    """
+    Rebuild ``guide_also_viewed`` from the view log and prune older views.
+
+    Returns:
+        int: Number of guides with a stored list
+    """
+    cutoff = datetime.utcnow() - timedelta(days=window_days)
+    pairs = db.session.execute(
+        select(views_table.c.viewer_key, views_table.c.guide_id)
+        .where(views_table.c.viewed_at >= cutoff)
+        .distinct()
+    ).tuples().all()
+    lists = compute_also_viewed(pairs, top_k=top_k, min_co_views=min_co_views)
+
+    now = datetime.utcnow()
+    db.session.execute(delete(also_viewed_table))
+    if lists:
+        db.session.execute(insert(also_viewed_table), [
+            {'guide_id': guide_id, 'related': json.dumps(related, separators=(',', ':')), 'built_at': now}
+            for guide_id, related in lists.items()
+        ])
+    db.session.execute(delete(views_table).where(views_table.c.viewed_at < cutoff))
+    db.session.commit()
+    return len(lists)
+
+
+class AlsoViewedTable:
+    """In-memory ``guide_id -> [related_id, ...]`` lists."""
+
+    def __init__(self, lists):
+        self._lists = lists
+
+    @classmethod
+    def load(cls) -> 'AlsoViewedTable':
+        rows = db.session.execute(select(also_viewed_table.c.guide_id, also_viewed_table.c.related)).all()
+        return cls({row.guide_id: [item[0] for item in json.loads(row.related)] for row in rows})
+
+    def related(self, guide_id, limit):
+        return self._lists.get(guide_id, [])[:limit]
+
+    def apply(self, snapshots):
+        """Drop deleted guides from every list (swapping in a new dict)."""
+        deleted = {snapshot['id'] for snapshot in snapshots if snapshot['deleted']}
+        if deleted:
+            self._lists = {
+                guide_id: [related for related in items if related not in deleted]
+                for guide_id, items in self._lists.items() if guide_id not in deleted
+            }
+
+
+also_viewed_index = LocalIndex('also_viewed_index', AlsoViewedTable.load, 'ALSO_VIEWED_TTL', DEFAULT_TTL)
+
+
+def also_viewed(guide_id, limit=10) -> list:
+    """Return up to ``limit`` guide IDs co-viewed with ``guide_id``, best first."""
+    return also_viewed_index.get().related(guide_id, limit)
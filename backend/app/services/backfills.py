@@ -0,0 +1,269 @@
+"""
+Online, batched data backfills.
+
+Schema migrations stay DDL-only (add a nullable column, then deploy); the
+data change runs afterwards as a registered backfill while the app keeps
+serving traffic:
+
+    @backfill('guides.price_bounds', Guide.__table__, columns=['price_range'])
+    def price_bounds(rows):
+        return [{'id': row.id, 'price_min': ...} for row in rows]
+
+``run_backfill`` walks the table in keyset order (``key > last_key ORDER BY
+key LIMIT n``), so every chunk is an index range scan no matter how far the
+run has progressed. Each chunk's updates and the checkpoint advance commit
+together in one short transaction with a bounded lock wait; an optional
+rows-per-second limit sleeps between chunks to leave headroom for live
+traffic. An interrupted run resumes after the last committed chunk.
+
+Updates are plain Core statements and bypass mapper events; if a backfill
+changes columns that feed the guide read model, follow it with
+``flask guides rebuild-documents``.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, bindparam, func, select, update
+
+from app import db
+from app.models import BackfillCheckpoint
+from app.models.backfill import BACKFILL_COMPLETED, BACKFILL_RUNNING
+from app.utils.db import run_with_retries, set_local_lock_timeout
+
+# Rows per chunk when a backfill does not set its own
+DEFAULT_BATCH_SIZE = 500
+
+# Upper bound on how long a chunk may wait for a row lock (PostgreSQL)
+LOCK_TIMEOUT = '2s'
+
+checkpoints_table = BackfillCheckpoint.__table__
+
+
+class BackfillConflictError(Exception):
+    """Another runner advanced the same backfill concurrently."""
+
+
+@dataclass
+class BackfillSpec:
+    """Registration record for a backfill."""
+
+    name: str
+    table: object
+    func: Callable
+    columns: List[str]
+    key: str = 'id'
+    where: Optional[Callable] = None
+    batch_size: int = DEFAULT_BATCH_SIZE
+    description: str = ''
+
+    @property
+    def key_column(self):
+        return self.table.c[self.key]
+
+    def chunk_query(self, last_key, limit):
+        """Select the next keyset-ordered chunk after ``last_key``."""
+        query = select(self.key_column, *[self.table.c[name] for name in self.columns if name != self.key])
+        if self.where is not None:
+            query = query.where(self.where(self.table))
+        if last_key is not None:
+            query = query.where(self.key_column > last_key)
+        return query.order_by(self.key_column).limit(limit)
+
+    def remaining_query(self, last_key):
+        """Count the rows still to be visited after ``last_key``."""
+        query = select(func.count()).select_from(self.table)
+        if self.where is not None:
+            query = query.where(self.where(self.table))
+        if last_key is not None:
+            query = query.where(self.key_column > last_key)
+        return query
+
+
+registry = {}
+
+
+def backfill(name, table, columns, key='id', where=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Register a backfill.
+
+    The decorated function receives a chunk of rows (key plus ``columns``)
+    and returns a list of dicts, each holding the row's key and the new
+    column values. Rows needing no change may be omitted. The function
+    must be idempotent: a chunk may be reprocessed after a failed commit.
+
+    Args:
+        name (str): Unique backfill name (also the checkpoint name)
+        table: Table to walk
+        columns (list): Columns passed to the function
+        key (str): Unique, indexed column defining the keyset order
+        where (callable): ``where(table)`` returning an extra filter, e.g. to
+            skip rows that are already done
+        batch_size (int): Default rows per chunk
+    """
+
+    def decorator(func_):
+        registry[name] = BackfillSpec(
+            name=name, table=table, func=func_, columns=list(columns), key=key,
+            where=where, batch_size=batch_size, description=(func_.__doc__ or '').strip(),
+        )
+        return func_
+
+    return decorator
+
+
+@dataclass
+class BackfillProgress:
+    """Progress report passed to the ``progress`` callback after each chunk."""
+
+    name: str
+    rows_processed: int
+    rows_updated: int
+    last_key: Optional[str]
+    remaining_estimate: Optional[int]
+    rows_per_second: float
+    done: bool = False
+    chunks: int = 0
+
+
+def _load_checkpoint(name, restart):
+    checkpoint = db.session.get(BackfillCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(name=name, rows_processed=0, status=BACKFILL_RUNNING)
+        db.session.add(checkpoint)
+    elif restart:
+        checkpoint.last_key = None
+        checkpoint.rows_processed = 0
+        checkpoint.status = BACKFILL_RUNNING
+        checkpoint.started_at = datetime.utcnow()
+        checkpoint.completed_at = None
+    db.session.commit()
+    return checkpoint
+
+
+def _decode_key(spec, raw):
+    if raw is None:
+        return None
+    python_type = spec.key_column.type.python_type
+    return raw if python_type is str else python_type(raw)
+
+
+def _run_chunk(spec, expected_last_key, batch_size):
+    """Process one chunk and advance the checkpoint atomically."""
+    set_local_lock_timeout(LOCK_TIMEOUT)
+    rows = db.session.execute(spec.chunk_query(_decode_key(spec, expected_last_key), batch_size)).all()
+    if not rows:
+        return None, 0, 0
+
+    updates = spec.func(rows) or []
+    if updates:
+        value_keys = [name for name in updates[0] if name != spec.key]
+        statement = (
+            update(spec.table)
+            .where(spec.key_column == bindparam('_key'))
+            .values({name: bindparam(name) for name in value_keys})
+        )
+        params = [dict({name: item[name] for name in value_keys}, _key=item[spec.key]) for item in updates]
+        db.session.execute(statement, params)
+
+    new_last_key = str(getattr(rows[-1], spec.key))
+    condition = checkpoints_table.c.last_key == expected_last_key
+    if expected_last_key is None:
+        condition = checkpoints_table.c.last_key.is_(None)
+    advanced = db.session.execute(
+        update(checkpoints_table)
+        .where(and_(checkpoints_table.c.name == spec.name, condition))
+        .values(
+            last_key=new_last_key,
+            rows_processed=checkpoints_table.c.rows_processed + len(rows),
+            updated_at=datetime.utcnow(),
+        )
+    )
+    if advanced.rowcount != 1:
+        db.session.rollback()
+        raise BackfillConflictError(f'Backfill {spec.name} was advanced by another runner')
+    db.session.commit()
+    return new_last_key, len(rows), len(updates)
+
+
+def run_backfill(name, batch_size=None, max_rows_per_second=None, max_chunks=None,
+                 restart=False, progress=None) -> BackfillCheckpoint:
+    """
+    Run (or resume) a registered backfill.
+
+    Args:
+        name (str): Registered backfill name
+        batch_size (int): Rows per chunk (defaults to the backfill's own)
+        max_rows_per_second (float): Throttle; None runs unthrottled
+        max_chunks (int): Stop after this many chunks (resume later)
+        restart (bool): Discard the checkpoint and start from the beginning
+        progress (callable): Called with a ``BackfillProgress`` per chunk
+
+    Returns:
+        BackfillCheckpoint: Final checkpoint state
+
+    Raises:
+        KeyError: If the backfill is not registered
+        BackfillConflictError: If another runner is processing the same backfill
+    """
+    spec = registry[name]
+    batch_size = batch_size or spec.batch_size
+    checkpoint = _load_checkpoint(name, restart)
+    if checkpoint.status == BACKFILL_COMPLETED:
+        return checkpoint
+
+    last_key = checkpoint.last_key
+    rows_processed = checkpoint.rows_processed
+    remaining = None
+    if progress is not None:
+        remaining = db.session.execute(spec.remaining_query(_decode_key(spec, last_key))).scalar()
+        db.session.commit()
+
+    started = time.monotonic()
+    rows_this_run = updated = chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        chunk_started = time.monotonic()
+        new_last_key, count, changed = run_with_retries(
+            lambda: _run_chunk(spec, last_key, batch_size)
+        )
+        if new_last_key is None:
+            db.session.execute(
+                update(checkpoints_table)
+                .where(checkpoints_table.c.name == name)
+                .values(status=BACKFILL_COMPLETED, completed_at=datetime.utcnow(), updated_at=datetime.utcnow())
+            )
+            db.session.commit()
+            break
+
+        last_key = new_last_key
+        chunks += 1
+        rows_processed += count
+        rows_this_run += count
+        updated += changed
+        if remaining is not None:
+            remaining = max(remaining - count, 0)
+
+        if max_rows_per_second:
+            # Sleep off whatever the chunk finished ahead of the allowed rate
+            time.sleep(max(0.0, count / max_rows_per_second - (time.monotonic() - chunk_started)))
+
+        if progress is not None:
+            elapsed = time.monotonic() - started
+            progress(BackfillProgress(
+                name=name, rows_processed=rows_processed, rows_updated=updated, last_key=last_key,
+                remaining_estimate=remaining, rows_per_second=rows_this_run / elapsed if elapsed else 0.0,
+                chunks=chunks,
+            ))
+
+    db.session.expire_all()
+    checkpoint = db.session.get(BackfillCheckpoint, name)
+    if progress is not None and checkpoint.status == BACKFILL_COMPLETED:
+        elapsed = time.monotonic() - started
+        progress(BackfillProgress(
+            name=name, rows_processed=checkpoint.rows_processed, rows_updated=updated,
+            last_key=checkpoint.last_key, remaining_estimate=0,
+            rows_per_second=rows_this_run / elapsed if elapsed else 0.0, done=True, chunks=chunks,
+        ))
+    return checkpoint
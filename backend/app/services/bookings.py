@@ -0,0 +1,142 @@
+"""
+Booking engine.
+
+A booking claims one day from the guide's availability bitmap with a single
+conditional UPDATE (compare-and-clear on the day bit) and inserts the
+booking row in the same short transaction. Under contention only one
+transaction can clear the bit; every other request sees ``rowcount == 0``
+and fails fast with ``SlotUnavailableError`` instead of queueing on locks.
+Transient serialization failures and deadlocks are retried with backoff.
+"""
+
+from datetime import date
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Booking, GuideAvailability
+from app.models.availability import day_bit, month_start
+from app.models.booking import BOOKING_CANCELLED, BOOKING_CONFIRMED
+from app.utils.db import run_with_retries, set_local_lock_timeout
+
+# Upper bound on how long a booking transaction may wait for a row lock (PostgreSQL)
+LOCK_TIMEOUT = '2s'
+
+
+class BookingError(Exception):
+    """Base class for booking failures carrying an HTTP status code."""
+
+    status_code = 400
+
+
+class SlotUnavailableError(BookingError):
+    """The guide is not available (or already booked) on the requested day."""
+
+    status_code = 409
+
+
+class BookingNotFoundError(BookingError):
+    """The booking does not exist or is not visible to the caller."""
+
+    status_code = 404
+
+
+def create_booking(traveler_id: str, guide_id: str, day: date) -> Booking:
+    """
+    Book ``guide_id`` for ``day`` on behalf of ``traveler_id``.
+
+    Args:
+        traveler_id (str): ID of the booking user
+        guide_id (str): ID of the guide being booked
+        day (date): Day of the tour
+
+    Returns:
+        Booking: The committed booking
+
+    Raises:
+        BookingError: If the traveler tries to book themselves
+        SlotUnavailableError: If the day is not (or no longer) available
+    """
+    if traveler_id == guide_id:
+        raise BookingError('Guides cannot book themselves')
+
+    bit = day_bit(day)
+
+    def attempt():
+        # Bound lock waits so a stuck transaction cannot stall every booking
+        set_local_lock_timeout(LOCK_TIMEOUT)
+        claim = (
+            update(GuideAvailability)
+            .where(GuideAvailability.guide_id == guide_id)
+            .where(GuideAvailability.month == month_start(day))
+            .where(GuideAvailability.days_mask.bitwise_and(bit) == bit)
+            .values(days_mask=GuideAvailability.days_mask - bit)
+            .execution_options(synchronize_session=False)
+        )
+        if db.session.execute(claim).rowcount != 1:
+            db.session.rollback()
+            raise SlotUnavailableError('Guide is not available on this date')
+
+        booking = Booking(guide_id=guide_id, traveler_id=traveler_id, date=day)
+        db.session.add(booking)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A confirmed booking already exists for this day
+            db.session.rollback()
+            raise SlotUnavailableError('Guide is already booked on this date')
+        return booking
+
+    return run_with_retries(attempt)
+
+
+def cancel_booking(booking_id: str, user_id: str) -> Booking:
+    """
+    Cancel a confirmed booking and release the day back to the guide.
+
+    Either the traveler or the guide may cancel.
+
+    Args:
+        booking_id (str): ID of the booking
+        user_id (str): ID of the user requesting cancellation
+
+    Returns:
+        Booking: The cancelled booking
+
+    Raises:
+        BookingNotFoundError: If the booking is missing or not the caller's
+        BookingError: If the booking is already cancelled
+    """
+    booking = db.session.get(Booking, booking_id)
+    if booking is None or user_id not in (booking.traveler_id, booking.guide_id):
+        raise BookingNotFoundError('Booking not found')
+
+    bit = day_bit(booking.date)
+
+    def attempt():
+        # Bound lock waits so a stuck transaction cannot stall every booking
+        set_local_lock_timeout(LOCK_TIMEOUT)
+        cancelled = db.session.execute(
+            update(Booking)
+            .where(Booking.id == booking_id)
+            .where(Booking.status == BOOKING_CONFIRMED)
+            .values(status=BOOKING_CANCELLED)
+            .execution_options(synchronize_session=False)
+        )
+        if cancelled.rowcount != 1:
+            db.session.rollback()
+            raise BookingError('Booking is already cancelled')
+
+        db.session.execute(
+            update(GuideAvailability)
+            .where(GuideAvailability.guide_id == booking.guide_id)
+            .where(GuideAvailability.month == month_start(booking.date))
+            .values(days_mask=GuideAvailability.days_mask.bitwise_or(bit))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        db.session.refresh(booking)
+        return booking
+
+    return run_with_retries(attempt)
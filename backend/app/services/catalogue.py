@@ -0,0 +1,334 @@
+"""
+Memory-mapped, columnar snapshot of the guide catalogue.
+
+The ``LocalIndex`` indexes (facets, autocomplete) are built in every
+worker process, so their memory grows with the worker count. With
+``CATALOGUE_SNAPSHOT_PATH`` set, those lookups are answered from one file
+instead: ``write_snapshot`` (``flask guides write-snapshot``) serializes the
+catalogue into flat columns and every worker maps the file read-only. The
+OS page cache keeps a single copy shared by all processes, and a worker
+"loads" the snapshot by mapping it, without parsing.
+
+A new version is written to a temporary file next to the live one and
+renamed over it, so readers see either the old or the new file, never a
+partial one. Workers re-``stat`` the path at most every
+``CATALOGUE_SNAPSHOT_CHECK_SECONDS`` and map the new inode when it
+changes; requests still holding the old snapshot keep a valid mapping
+until they finish. The data is as fresh as the last write (run the
+command from cron or with ``--watch``); a worker's own edits are not
+reflected until then.
+
+File layout (little-endian)::
+
+    b'GCAT' | u32 version | u32 header length | JSON header | sections
+
+The header lists each section's dtype, offset and length; sections are
+8-byte aligned. Columns are indexed by row (guides sorted by ID):
+
+* ``ids``: fixed-width ASCII guide IDs, binary-searchable
+* ``rating``: float64, NaN when unrated
+* ``price_min``: int64, ``NO_PRICE`` when unknown
+* ``<field>.tokens`` / ``<field>.token_offsets``: the sorted distinct
+  tokens of a field, NUL-terminated and concatenated, and their starts
+* ``<field>.postings`` / ``<field>.posting_offsets``: for each token, the
+  rows carrying it (CSR layout)
+
+NumPy is imported by the functions that read or write the file only.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+from app import db
+from app.models import Guide, GuideAvailability
+from app.services.facets import DEFAULT_FACET_LIMIT, FILTERED_FIELDS, RATING_BUCKETS
+from app.utils.tokens import TOKEN_FIELDS, normalize_token, split_tokens
+
+MAGIC = b'GCAT'
+VERSION = 1
+
+_PREAMBLE = struct.Struct('<4sII')
+_ALIGNMENT = 8
+
+# Sentinel for guides without a parsed price
+NO_PRICE = -1
+
+# Default seconds between checks for a newer snapshot file
+DEFAULT_CHECK_SECONDS = 5
+
+
+def _columns(rows):
+    """Turn guide rows into the snapshot's named NumPy arrays."""
+    import numpy as np
+
+    rows = sorted(rows, key=lambda row: row.id)
+    id_width = max((len(row.id) for row in rows), default=1)
+    arrays = {
+        'ids': np.array([row.id.encode('ascii') for row in rows], dtype=f'S{id_width}'),
+        'rating': np.array([np.nan if row.rating is None else row.rating for row in rows], dtype='<f8'),
+        'price_min': np.array([NO_PRICE if row.price_min is None else row.price_min for row in rows], dtype='<i8'),
+    }
+    for name in TOKEN_FIELDS:
+        postings = {}
+        for position, row in enumerate(rows):
+            for token in split_tokens(getattr(row, name)):
+                postings.setdefault(token, []).append(position)
+        tokens = sorted(postings)
+        encoded = [token.encode('utf-8') + b'\0' for token in tokens]
+        arrays[f'{name}.tokens'] = np.frombuffer(b''.join(encoded), dtype='u1')
+        arrays[f'{name}.token_offsets'] = np.cumsum([0] + [len(e) for e in encoded], dtype='<u4')
+        arrays[f'{name}.postings'] = np.array([p for token in tokens for p in postings[token]], dtype='<u4')
+        arrays[f'{name}.posting_offsets'] = np.cumsum([0] + [len(postings[t]) for t in tokens], dtype='<u4')
+    return arrays
+
+
+def write_snapshot(path=None) -> dict:
+    """
+    Write the current catalogue to ``path`` and atomically replace the old file.
+
+    Args:
+        path (str): Destination (defaults to ``CATALOGUE_SNAPSHOT_PATH``)
+
+    Returns:
+        dict: ``path``, ``guides`` and ``bytes`` written
+    """
+    path = path or current_app.config.get('CATALOGUE_SNAPSHOT_PATH')
+    if not path:
+        raise ValueError('CATALOGUE_SNAPSHOT_PATH is not configured')
+    guides = Guide.__table__
+    rows = db.session.execute(
+        select(guides.c.id, guides.c.rating, guides.c.price_min, *[guides.c[name] for name in TOKEN_FIELDS])
+    ).all()
+    arrays = _columns(rows)
+
+    sections, offset = {}, 0
+    for name, array in arrays.items():
+        sections[name] = {'dtype': array.dtype.str, 'offset': offset, 'count': len(array)}
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+    header = json.dumps({'guides': len(rows), 'built_at': time.time(), 'sections': sections}).encode()
+    data_start = -(-(_PREAMBLE.size + len(header)) // _ALIGNMENT) * _ALIGNMENT
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalogue-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + sections[name]['offset'])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return {'path': path, 'guides': len(rows), 'bytes': data_start + offset}
+
+
+class _Tokens:
+    """Sorted token list decoded lazily from the mapped file (for ``bisect``)."""
+
+    def __init__(self, mapping, start, offsets):
+        self._map = mapping
+        self._start = start
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        start = self._start + int(self._offsets[i])
+        return self._map[start:self._start + int(self._offsets[i + 1]) - 1].decode('utf-8')
+
+    def matching(self, term):
+        """Indexes of tokens containing ``term``, found by scanning the mapped bytes."""
+        import numpy as np
+
+        if not term:
+            return np.arange(len(self))
+        needle = term.encode('utf-8')
+        end = self._start + int(self._offsets[-1])
+        starts, position = [], self._map.find(needle, self._start, end)
+        while position != -1:
+            starts.append(position - self._start)
+            position = self._map.find(needle, position + 1, end)
+        return np.unique(np.searchsorted(self._offsets, starts, side='right') - 1)
+
+
+class CatalogueSnapshot:
+    """
+    Read-only view of a snapshot file.
+
+    Every column is a NumPy array over the shared mapping; nothing is
+    copied into the process except the JSON header.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+
+        with open(path, 'rb') as f:
+            self.stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = _PREAMBLE.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} catalogue snapshot')
+        header = json.loads(self._map[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        data_start = -(-(_PREAMBLE.size + header_length) // _ALIGNMENT) * _ALIGNMENT
+
+        self.path = path
+        self.size = header['guides']
+        self.built_at = header['built_at']
+        self._columns = {
+            name: np.frombuffer(self._map, dtype=section['dtype'], count=section['count'],
+                                offset=data_start + section['offset'])
+            for name, section in header['sections'].items()
+        }
+        sections = header['sections']
+        self._tokens = {
+            name: _Tokens(self._map, data_start + sections[f'{name}.tokens']['offset'],
+                          self._columns[f'{name}.token_offsets'])
+            for name in TOKEN_FIELDS
+        }
+
+    def _token_counts(self, name, rows=None):
+        """Guides per token, optionally counting only rows where ``rows`` is True."""
+        import numpy as np
+
+        offsets = self._columns[f'{name}.posting_offsets']
+        if rows is None:
+            return np.diff(offsets)
+        postings = self._columns[f'{name}.postings']
+        if not len(postings):
+            return np.zeros(len(offsets) - 1, dtype=np.int64)
+        return np.add.reduceat(rows[postings].astype(np.int64), offsets[:-1].astype(np.intp))
+
+    def suggest(self, field, prefix, limit=10):
+        """Same contract as ``PrefixIndex.suggest``."""
+        import numpy as np
+
+        tokens = self._tokens[field]
+        prefix = normalize_token(prefix)
+        lo = bisect.bisect_left(tokens, prefix)
+        hi = bisect.bisect_left(tokens, prefix + '\U0010ffff', lo)
+        counts = self._token_counts(field)[lo:hi]
+        order = np.lexsort((np.arange(hi - lo), -counts))[:limit]
+        return [(tokens[lo + i], int(counts[i])) for i in order]
+
+    def _rows_for_ids(self, guide_ids):
+        """Boolean row mask of the given guide IDs."""
+        import numpy as np
+
+        ids = self._columns['ids']
+        rows = np.zeros(self.size, dtype=bool)
+        wanted = np.array([guide_id.encode('ascii') for guide_id in guide_ids], dtype=ids.dtype)
+        if len(wanted):
+            positions = np.searchsorted(ids, wanted)
+            found = positions < self.size
+            found[found] &= ids[positions[found]] == wanted[found]
+            rows[positions[found]] = True
+        return rows
+
+    def counts(self, guide_filter, available_ids=None, limit=DEFAULT_FACET_LIMIT) -> dict:
+        """Same contract as ``FacetIndex.counts``; the price filter is applied from the snapshot."""
+        import numpy as np
+
+        masks = {}
+        for name in FILTERED_FIELDS:
+            terms = getattr(guide_filter, name)
+            if terms:
+                postings = self._columns[f'{name}.postings']
+                offsets = self._columns[f'{name}.posting_offsets']
+                rows = np.zeros(self.size, dtype=bool)
+                for term in terms:
+                    for token in self._tokens[name].matching(normalize_token(term)):
+                        rows[postings[offsets[token]:offsets[token + 1]]] = True
+                masks[name] = rows
+        rating = self._columns['rating']
+        if guide_filter.min_rating is not None:
+            masks['rating'] = rating >= guide_filter.min_rating
+        if available_ids is not None:
+            masks['available'] = self._rows_for_ids(available_ids)
+        if guide_filter.max_price is not None:
+            price = self._columns['price_min']
+            masks['price'] = (price != NO_PRICE) & (price <= guide_filter.max_price)
+
+        def combined(excluded=None):
+            rows = np.ones(self.size, dtype=bool)
+            for key, value in masks.items():
+                if key != excluded:
+                    rows &= value
+            return rows
+
+        facets = {}
+        for name in TOKEN_FIELDS:
+            counts = self._token_counts(name, combined(excluded=name))
+            order = np.lexsort((np.arange(len(counts)), -counts))
+            order = order[counts[order] > 0][:limit]
+            facets[name] = [{'value': self._tokens[name][i], 'count': int(counts[i])} for i in order]
+
+        base = combined(excluded='rating')
+        facets['rating'] = [
+            {'min': threshold, 'count': int(np.count_nonzero(base & (rating >= threshold)))}
+            for threshold in RATING_BUCKETS
+        ]
+        return {'total': int(np.count_nonzero(combined())), 'facets': facets}
+
+
+_open_lock = threading.Lock()
+
+
+def get_snapshot():
+    """
+    Return this process's mapping of the configured snapshot.
+
+    Returns:
+        CatalogueSnapshot: Latest mapped snapshot, or None when snapshots
+        are not configured or not written yet
+    """
+    app = current_app._get_current_object()
+    path = app.config.get('CATALOGUE_SNAPSHOT_PATH')
+    if not path:
+        return None
+    entry = app.extensions.get('catalogue_snapshot')
+    now = time.monotonic()
+    check_every = app.config.get('CATALOGUE_SNAPSHOT_CHECK_SECONDS', DEFAULT_CHECK_SECONDS)
+    if entry is not None and now - entry[0] < check_every:
+        return entry[1]
+
+    with _open_lock:
+        entry = app.extensions.get('catalogue_snapshot')
+        snapshot = entry[1] if entry is not None else None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        if stat is None:
+            snapshot = None
+        elif snapshot is None or (stat.st_ino, stat.st_mtime_ns) != (snapshot.stat.st_ino, snapshot.stat.st_mtime_ns):
+            snapshot = CatalogueSnapshot(path)
+        app.extensions['catalogue_snapshot'] = (now, snapshot)
+        return snapshot
+
+
+def facet_counts(snapshot, guide_filter, limit=DEFAULT_FACET_LIMIT) -> dict:
+    """Facet counts from ``snapshot``; availability is the one filter resolved in SQL."""
+    available_ids = None
+    if guide_filter.available_from is not None:
+        available_ids = db.session.execute(
+            GuideAvailability.available_guide_ids(guide_filter.available_from, guide_filter.available_to)
+        ).scalars().all()
+    return snapshot.counts(guide_filter, available_ids, limit)
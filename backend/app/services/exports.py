@@ -0,0 +1,576 @@
+"""
+Streaming table exports (snapshots) and their import.
+
+``flask export`` writes each table to one file in a snapshot directory,
+plus a ``manifest.json`` describing the tables, row counts and columns.
+Rows are read with ``yield_per`` (a server-side cursor on PostgreSQL) and
+written one partition at a time. Memory use therefore depends on the batch
+size, not the table size. All tables are read in one transaction
+(REPEATABLE READ on PostgreSQL), so a snapshot is consistent across tables.
+
+Formats:
+
+* ``jsonl``: gzip-compressed JSON lines, one object per row
+* ``csv``: gzip-compressed CSV with a header row; NULL is written as ``\\N``
+* ``parquet``: columnar, one row group per batch (needs the optional
+  ``pyarrow`` package)
+
+Datetimes are written as ISO-8601 strings (native timestamps in Parquet).
+Every column is exported, including password hashes, so that a snapshot
+can be restored; treat snapshot files as secrets.
+
+**Incremental exports** (``--since``) contain only rows that changed at or
+after the given time. For users and guides, changes come from the outbox
+change feed, along with a ``<table>.deleted.gz`` file listing rows deleted
+or archived since then. Archived accounts are exported from
+``archived_users`` like any other table, so an archive (or a restore) is
+replayed as a move between the two tables rather than lost. Pass the ``since`` of a previous manifest, or the
+manifest itself, so that each export starts where the last one ended.
+Successive exports overlap by ``SINCE_OVERLAP`` so that changes committed
+while the previous export was running are not missed. The outbox must
+still hold events back to ``since``; keep ``flask outbox prune --days``
+longer than the export interval.
+
+``flask import`` upserts a snapshot's rows in batches, in table order, and
+then applies its deletions in reverse order. It writes with Core
+statements, bypassing the mapper listeners, so it appends the outbox
+events itself, in the same transaction as each batch: ``created`` or
+``updated`` for every upserted user or guide (a guide's user row counts
+as a ``guide`` aggregate, as in the listeners), and for every removed row
+the source's own last removal event (``deleted``, ``archived`` or
+``restored``), which the ``.deleted.gz`` files record. Feed consumers (and later incremental exports) therefore see imported
+changes; ``--no-events`` skips them, e.g. when seeding an empty database
+whose consumers start from scratch. Saved-search matching does not run
+for imported guides, and the command rebuilds the guide read model
+afterwards.
+
+Other tables are exported by adding an ``ExportTable`` to ``TABLES``.
+"""
+
+import csv
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, or_, select
+
+from app import db
+from app.models import ArchivedUser, Guide, OutboxEvent, User
+from app.models.outbox import EVENT_ARCHIVED, EVENT_CREATED, EVENT_DELETED, EVENT_RESTORED, EVENT_UPDATED
+from app.services import guide_documents, outbox
+from app.utils.db import upsert_statement
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+DEFAULT_BATCH_SIZE = 2000
+
+MANIFEST = 'manifest.json'
+
+# Written in CSV files for NULL (as in PostgreSQL's COPY)
+CSV_NULL = '\\N'
+
+# Re-export window before a previous export's ``since`` to cover its in-flight commits
+SINCE_OVERLAP = timedelta(minutes=1)
+
+EXTENSIONS = {'jsonl': '.jsonl.gz', 'csv': '.csv.gz', 'parquet': '.parquet'}
+
+users_table = User.__table__
+guides_table = Guide.__table__
+archived_table = ArchivedUser.__table__
+events_table = OutboxEvent.__table__
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """
+    A table that can be exported and imported.
+
+    Args:
+        name: Name used on the command line and in the manifest
+        table: SQLAlchemy ``Table``
+        changed: ``changed(since)`` returns a filter selecting rows changed
+            at or after ``since``; None means the table only supports full exports
+        deleted: ``deleted(since)`` returns a select of ``(id, aggregate type,
+            event type)`` for rows removed at or after ``since``, from each
+            row's last removal event
+        aggregate: Outbox aggregate whose removal events this table replays;
+            None emits no events
+        payload: ``payload()`` returns a select of the event payload columns
+            of upserted rows, filtered by the table's ``id``; None emits no
+            events for upserts
+    """
+
+    name: str
+    table: object
+    changed: Optional[Callable] = None
+    deleted: Optional[Callable] = None
+    aggregate: Optional[str] = None
+    payload: Optional[Callable] = None
+
+    @property
+    def key(self) -> list:
+        return [column.name for column in self.table.primary_key.columns]
+
+
+def _feed_ids(since, aggregates, event_types=None):
+    query = select(events_table.c.aggregate_id).where(
+        events_table.c.created_at >= since, events_table.c.aggregate_type.in_(aggregates)
+    )
+    if event_types:
+        query = query.where(events_table.c.event_type.in_(event_types))
+    return query.distinct()
+
+
+def _feed_deleted(table, aggregates, event_types=(EVENT_DELETED, EVENT_ARCHIVED)):
+    def deleted(since):
+        latest = (
+            select(func.max(events_table.c.id))
+            .where(
+                events_table.c.created_at >= since,
+                events_table.c.aggregate_type.in_(aggregates),
+                events_table.c.event_type.in_(event_types),
+            )
+            .group_by(events_table.c.aggregate_id)
+        )
+        return select(events_table.c.aggregate_id, events_table.c.aggregate_type, events_table.c.event_type).where(
+            events_table.c.id.in_(latest), events_table.c.aggregate_id.not_in(select(table.c.id))
+        )
+
+    return deleted
+
+
+# Export order; imports apply deletions in reverse
+TABLES = {
+    'users': ExportTable(
+        'users', users_table,
+        # Login touches are deliberately not in the feed, but last_login_at is a timestamp itself
+        changed=lambda since: or_(
+            users_table.c.id.in_(_feed_ids(since, ['user', 'guide'])), users_table.c.last_login_at >= since
+        ),
+        deleted=_feed_deleted(users_table, ['user', 'guide']),
+        aggregate='user',
+        payload=lambda: select(users_table.c.id, users_table.c.email, users_table.c.created_at),
+    ),
+    'guides': ExportTable(
+        'guides', guides_table,
+        changed=lambda since: guides_table.c.id.in_(_feed_ids(since, ['guide'])),
+        deleted=_feed_deleted(guides_table, ['guide']),
+        aggregate='guide',
+        payload=guide_documents.guide_rows_select,
+    ),
+    # Archiving moves a row here from users; restoring moves it back
+    'archived_users': ExportTable(
+        'archived_users', archived_table,
+        changed=lambda since: archived_table.c.archived_at >= since,
+        deleted=_feed_deleted(archived_table, ['user'], [EVENT_RESTORED]),
+        aggregate='user',
+    ),
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Cannot export {type(value).__name__}')
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return str
+
+
+def _decoder(column, from_text):
+    """Function turning an exported value back into the column's Python type."""
+    kind = _python_type(column)
+    if kind is datetime:
+        convert = datetime.fromisoformat
+    elif kind is date:
+        convert = date.fromisoformat
+    elif kind is bool and from_text:
+        convert = lambda value: value in ('1', 'true', 'True')  # noqa: E731
+    elif kind in (int, float) and from_text:
+        convert = kind
+    elif from_text:
+        convert = str
+    else:
+        return lambda value: value
+
+    def decode(value):
+        if value is None or (from_text and value == CSV_NULL):
+            return None
+        return value if isinstance(value, kind) else convert(value)
+
+    return decode
+
+
+class _JsonlWriter:
+    def __init__(self, path, columns):
+        self.columns = columns
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(dict(zip(self.columns, row)), default=_json_default) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self.file = gzip.open(path, 'wt', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(
+            [CSV_NULL if value is None else _json_default(value) if isinstance(value, (datetime, date)) else value
+             for value in row]
+            for row in rows
+        )
+
+    def close(self):
+        self.file.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError('The parquet format needs pyarrow (pip install pyarrow)') from e
+    return pyarrow, pyarrow.parquet
+
+
+def _arrow_type(pa, column):
+    kind = _python_type(column)
+    if kind is datetime:
+        return pa.timestamp('us')
+    if kind is date:
+        return pa.date32()
+    if kind is bool:
+        return pa.bool_()
+    if kind is int:
+        return pa.int64()
+    if kind is float:
+        return pa.float64()
+    return pa.string()
+
+
+class _ParquetWriter:
+    def __init__(self, path, table):
+        pa, pq = _import_pyarrow()
+        self.pa = pa
+        self.schema = pa.schema([(column.name, _arrow_type(pa, column)) for column in table.columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema,
+        ))
+
+    def close(self):
+        self.writer.close()
+
+
+def _writer(fmt, path, spec):
+    columns = [column.name for column in spec.table.columns]
+    if fmt == 'jsonl':
+        return _JsonlWriter(path, columns)
+    if fmt == 'csv':
+        return _CsvWriter(path, columns)
+    return _ParquetWriter(path, spec.table)
+
+
+def _read_batches(fmt, path, spec, batch_size):
+    """Yield lists of column-value dicts from an exported file."""
+    if fmt == 'parquet':
+        _, pq = _import_pyarrow()
+        decoders = {column.name: _decoder(column, from_text=False) for column in spec.table.columns}
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield [{name: decoders[name](value) for name, value in row.items()} for row in batch.to_pylist()]
+        return
+
+    from_text = fmt == 'csv'
+    decoders = {column.name: _decoder(column, from_text) for column in spec.table.columns}
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        records = csv.DictReader(f) if from_text else (json.loads(line) for line in f if line.strip())
+        batch = []
+        for record in records:
+            batch.append({name: decoders[name](value) for name, value in record.items() if name in decoders})
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def parse_since(value) -> datetime:
+    """
+    Parse ``--since``: an ISO timestamp, or a previous snapshot's manifest or directory.
+
+    For a manifest, returns its ``until`` minus ``SINCE_OVERLAP``.
+
+    Raises:
+        ValueError: If the value is neither
+    """
+    path = os.path.join(value, MANIFEST) if os.path.isdir(value) else value
+    if os.path.isfile(path):
+        with open(path, encoding='utf-8') as f:
+            return datetime.fromisoformat(json.load(f)['until']) - SINCE_OVERLAP
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'--since must be an ISO timestamp or a snapshot manifest: {value}')
+
+
+def export_tables(out_dir, names=None, fmt='jsonl', since=None, batch_size=DEFAULT_BATCH_SIZE, progress=None) -> dict:
+    """
+    Stream tables into a snapshot directory.
+
+    Args:
+        out_dir (str): Directory to write (created if missing)
+        names (list): Tables from ``TABLES`` to export (default all)
+        fmt (str): One of ``FORMATS``
+        since (datetime): Export only rows changed at or after this time
+        batch_size (int): Rows fetched and written per partition
+        progress (callable): Called with ``(table, rows_so_far)`` after each partition
+
+    Returns:
+        dict: The manifest written to ``out_dir/manifest.json``
+
+    Raises:
+        ValueError: Unknown table or format, or ``since`` given for a table
+            without change tracking
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format: {fmt}')
+    specs = [TABLES[name] for name in TABLES if names is None or name in names]
+    unknown = set(names or ()) - set(TABLES)
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+    if since is not None:
+        untracked = [spec.name for spec in specs if spec.changed is None]
+        if untracked:
+            raise ValueError(f"Incremental export is not supported for: {', '.join(untracked)}")
+    if fmt == 'parquet':
+        _import_pyarrow()
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        'format': fmt,
+        'since': since.isoformat() if since else None,
+        'until': datetime.utcnow().isoformat(),
+        'tables': {},
+    }
+    connection = db.engine.connect()
+    try:
+        if connection.dialect.name == 'postgresql':
+            connection = connection.execution_options(isolation_level='REPEATABLE READ')
+        with connection.begin():
+            for spec in specs:
+                manifest['tables'][spec.name] = _export_table(connection, spec, out_dir, fmt, since, batch_size,
+                                                              progress)
+    finally:
+        connection.close()
+
+    with open(os.path.join(out_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _export_table(connection, spec, out_dir, fmt, since, batch_size, progress):
+    query = select(spec.table).order_by(*spec.table.primary_key.columns)
+    if since is not None:
+        query = query.where(spec.changed(since))
+    filename = spec.name + EXTENSIONS[fmt]
+    writer = _writer(fmt, os.path.join(out_dir, filename), spec)
+    rows = 0
+    try:
+        result = connection.execution_options(yield_per=batch_size).execute(query)
+        for partition in result.partitions():
+            writer.write(partition)
+            rows += len(partition)
+            if progress:
+                progress(spec.name, rows)
+    finally:
+        writer.close()
+    entry = {'file': filename, 'rows': rows, 'columns': [column.name for column in spec.table.columns]}
+
+    if since is not None and spec.deleted is not None:
+        entry['deleted_file'] = f'{spec.name}.deleted.gz'
+        entry['deleted'] = 0
+        result = connection.execution_options(yield_per=batch_size).execute(spec.deleted(since))
+        with gzip.open(os.path.join(out_dir, entry['deleted_file']), 'wt', encoding='utf-8') as f:
+            for partition in result.partitions():
+                f.write(''.join('\t'.join(row) + '\n' for row in partition))
+                entry['deleted'] += len(partition)
+    return entry
+
+
+def read_manifest(snapshot_dir) -> dict:
+    with open(os.path.join(snapshot_dir, MANIFEST), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def import_snapshot(snapshot_dir, names=None, batch_size=DEFAULT_BATCH_SIZE, progress=None, events=True) -> dict:
+    """
+    Restore a snapshot written by ``export_tables``.
+
+    Rows are upserted by primary key, one committed batch at a time, so an
+    interrupted import can simply be rerun. Deletions recorded by an
+    incremental snapshot are applied afterwards, children first.
+
+    Args:
+        snapshot_dir (str): Directory containing ``manifest.json``
+        names (list): Tables to import (default every table in the snapshot)
+        batch_size (int): Rows per upsert statement and transaction
+        progress (callable): Called with ``(table, rows_so_far)`` after each batch
+        events (bool): Append outbox events for the imported changes
+
+    Returns:
+        dict: ``{table: {'rows': upserted, 'deleted': deleted}}``
+
+    Raises:
+        ValueError: If the snapshot holds an unknown table
+    """
+    manifest = read_manifest(snapshot_dir)
+    fmt = manifest['format']
+    unknown = set(manifest['tables']) - set(TABLES)
+    if unknown:
+        raise ValueError(f"Unknown tables in snapshot: {', '.join(sorted(unknown))}")
+    specs = [TABLES[name] for name in TABLES if name in manifest['tables'] and (names is None or name in names)]
+
+    names = [spec.name for spec in specs]
+    # Guides' user rows get their events from the guides table when it is imported too
+    guide_ids = set()
+    if events and {'users', 'guides'} <= set(names):
+        guides_file = os.path.join(snapshot_dir, manifest['tables']['guides']['file'])
+        for batch in _read_batches(fmt, guides_file, TABLES['guides'], batch_size):
+            guide_ids.update(row['id'] for row in batch)
+
+    summary = {}
+    for spec in specs:
+        entry = manifest['tables'][spec.name]
+        rows = 0
+        for batch in _read_batches(fmt, os.path.join(snapshot_dir, entry['file']), spec, batch_size):
+            ids = [row['id'] for row in batch]
+            if events and spec.payload is not None:
+                existing = set(db.session.execute(select(spec.table.c.id).where(spec.table.c.id.in_(ids))).scalars())
+            db.session.execute(upsert_statement(spec.table, batch, spec.key))
+            if events and spec.payload is not None:
+                _append_upserted(spec, ids, existing, names, guide_ids)
+            db.session.commit()
+            rows += len(batch)
+            if progress:
+                progress(spec.name, rows)
+        summary[spec.name] = {'rows': rows, 'deleted': 0}
+
+    for spec in reversed(specs):
+        deleted_file = manifest['tables'][spec.name].get('deleted_file')
+        if not deleted_file:
+            continue
+        key = spec.table.primary_key.columns[0]
+        for removals in _read_removals(os.path.join(snapshot_dir, deleted_file), batch_size):
+            ids = [row_id for row_id, _, _ in removals]
+            if events and spec.aggregate:
+                _append_removed(spec, removals, specs)
+            result = db.session.execute(delete(spec.table).where(key.in_(ids)))
+            db.session.commit()
+            summary[spec.name]['deleted'] += result.rowcount
+    return summary
+
+
+def _json_payload(row) -> dict:
+    return {name: value.isoformat() if isinstance(value, datetime) else value for name, value in row._mapping.items()}
+
+
+def _append_upserted(spec, ids, existing, names, guide_ids):
+    """
+    Append the events the mapper listeners would have written for an upserted batch.
+
+    New rows get ``created`` and existing ones ``updated``, with the
+    listeners' payloads. A guide's user row is a ``guide`` aggregate: its
+    event comes from the guides table when that is imported too, and is
+    sent with the guide payload otherwise. Accounts moved back from
+    ``archived_users`` get the source's ``restored`` event from that table
+    instead.
+    """
+    if spec.name == 'users':
+        guide_ids = guide_ids | set(db.session.execute(
+            select(guides_table.c.id).where(guides_table.c.id.in_(ids))
+        ).scalars())
+        skip = guide_ids if 'guides' in names else set()
+        if 'archived_users' in names:
+            skip |= set(db.session.execute(
+                select(archived_table.c.id).where(archived_table.c.id.in_(ids))
+            ).scalars())
+        ids = [row_id for row_id in ids if row_id not in skip]
+        groups = (
+            (spec, [row_id for row_id in ids if row_id not in guide_ids]),
+            (TABLES['guides'], [row_id for row_id in ids if row_id in guide_ids]),
+        )
+    else:
+        groups = ((spec, ids),)
+
+    rows = []
+    for source, source_ids in groups:
+        if source_ids:
+            for row in db.session.execute(source.payload().where(source.table.c.id.in_(source_ids))):
+                event_type = EVENT_UPDATED if row.id in existing else EVENT_CREATED
+                rows.append(outbox.event_row(source.aggregate, event_type, row.id, _json_payload(row)))
+    outbox.append_events(db.session, rows)
+
+
+def _append_removed(spec, removals, specs):
+    """
+    Replay the source's removal events (deleted, archived or restored) for rows present here.
+
+    Each event keeps its original type and aggregate. A guide's removal is
+    listed by both the users and guides tables; it is replayed once, by the
+    table whose aggregate it names when that table is imported too.
+    Payloads are the ones the listeners and ``user_archive`` write.
+    """
+    imported = {other.aggregate for other in specs}
+    removals = [
+        (row_id, aggregate or spec.aggregate, event_type) for row_id, aggregate, event_type in removals
+        if (aggregate or spec.aggregate) == spec.aggregate or aggregate not in imported
+    ]
+    ids = [row_id for row_id, _, _ in removals]
+    present = set(db.session.execute(select(spec.table.c.id).where(spec.table.c.id.in_(ids))).scalars())
+    accounts = {row.id: row for row in db.session.execute(
+        select(users_table.c.id, users_table.c.email, users_table.c.created_at).where(users_table.c.id.in_(present))
+    )}
+    rows = []
+    for row_id, aggregate, event_type in removals:
+        account = accounts.get(row_id)
+        if account is None:
+            continue
+        payload = {'id': account.id, 'email': account.email}
+        if event_type == EVENT_RESTORED:
+            payload = _json_payload(account)
+        rows.append(outbox.event_row(aggregate, event_type, row_id, payload))
+    outbox.append_events(db.session, rows)
+
+
+def _read_removals(path, batch_size):
+    """Yield lists of ``(id, aggregate type, event type)`` from a ``<table>.deleted.gz`` file."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        batch = []
+        for line in f:
+            if line.strip():
+                row_id, _, rest = line.strip().partition('\t')
+                aggregate, _, event_type = rest.partition('\t')
+                batch.append((row_id, aggregate or None, event_type or EVENT_DELETED))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,240 @@
+"""
+Faceted search counts from in-memory bitmap indexes.
+
+Every guide gets a slot (bit position). Each language, area and
+specialty token owns a bitmap of the guides carrying it, and each rating
+bucket owns a bitmap of guides at or above its threshold. Bitmaps are
+plain Python ints, so filters combine with ``|``/``&`` and counts come
+from ``int.bit_count()``.
+
+Counts are disjunctive: a field's own filter is left out when counting
+that field, so selecting "English" still shows how many guides speak
+Japanese under the remaining filters.
+
+The index shares the ``LocalIndex`` lifecycle with autocomplete: built
+lazily, updated from ``guides_changed`` and rebuilt after
+``FACET_INDEX_TTL`` seconds.
+"""
+
+import threading
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Guide, GuideAvailability
+from app.services.local_index import LocalIndex
+from app.utils.tokens import TOKEN_FIELDS, normalize_token, split_tokens
+
+# Default seconds before the index is rebuilt from the database
+DEFAULT_TTL = 300
+
+# Minimum ratings reported as rating facets (highest first)
+RATING_BUCKETS = (4.5, 4.0, 3.5, 3.0)
+
+# Default number of values returned per facet
+DEFAULT_FACET_LIMIT = 20
+
+# Filter attributes of ``GuideFilter`` matched against token bitmaps
+FILTERED_FIELDS = ('languages', 'areas', 'specialties')
+
+
+class FacetIndex:
+    """
+    Bitmap index over guide attributes.
+
+    Writers build replacement dicts under a lock and swap them in, so
+    readers never see a dict change size while iterating.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._free_slots = []
+        self._guides = {}
+        self._all = 0
+        self._bitmaps = {name: {} for name in TOKEN_FIELDS}
+        self._ratings = {threshold: 0 for threshold in RATING_BUCKETS}
+
+    @classmethod
+    def build(cls, rows) -> 'FacetIndex':
+        """
+        Build an index from guide rows.
+
+        Args:
+            rows: Iterable of mappings with ``id``, ``rating`` and token fields
+
+        Returns:
+            FacetIndex: Fully built index
+        """
+        index = cls()
+        index.apply([dict(row._mapping, deleted=False) for row in rows])
+        return index
+
+    @property
+    def size(self) -> int:
+        """Number of indexed guides."""
+        return len(self._slots)
+
+    def apply(self, snapshots):
+        """
+        Apply committed guide changes.
+
+        Args:
+            snapshots (list): Dicts from ``guide_events.snapshot``
+        """
+        with self._lock:
+            bitmaps = {name: dict(values) for name, values in self._bitmaps.items()}
+            ratings = dict(self._ratings)
+            all_mask = self._all
+
+            for snap in snapshots:
+                slot = self._slots.get(snap['id'])
+                if slot is not None:
+                    bit = 1 << slot
+                    tokens, rating = self._guides.pop(snap['id'])
+                    for name in TOKEN_FIELDS:
+                        for token in tokens[name]:
+                            remaining = bitmaps[name][token] & ~bit
+                            if remaining:
+                                bitmaps[name][token] = remaining
+                            else:
+                                del bitmaps[name][token]
+                    for threshold in RATING_BUCKETS:
+                        ratings[threshold] &= ~bit
+                    all_mask &= ~bit
+
+                if snap['deleted']:
+                    if slot is not None:
+                        del self._slots[snap['id']]
+                        self._free_slots.append(slot)
+                    continue
+
+                if slot is None:
+                    slot = self._free_slots.pop() if self._free_slots else len(self._slots)
+                    self._slots[snap['id']] = slot
+                bit = 1 << slot
+
+                tokens = {name: split_tokens(snap[name]) for name in TOKEN_FIELDS}
+                for name in TOKEN_FIELDS:
+                    for token in tokens[name]:
+                        bitmaps[name][token] = bitmaps[name].get(token, 0) | bit
+                rating = snap['rating']
+                if rating is not None:
+                    for threshold in RATING_BUCKETS:
+                        if rating >= threshold:
+                            ratings[threshold] |= bit
+                self._guides[snap['id']] = (tokens, rating)
+                all_mask |= bit
+
+            self._bitmaps, self._ratings, self._all = bitmaps, ratings, all_mask
+
+    def _match(self, name, terms):
+        """OR together bitmaps of tokens containing any of ``terms``."""
+        terms = [normalize_token(term) for term in terms]
+        mask = 0
+        for token, bitmap in self._bitmaps[name].items():
+            if any(term in token for term in terms):
+                mask |= bitmap
+        return mask
+
+    def _rating_mask(self, min_rating):
+        """Bitmap of guides rated at least ``min_rating``."""
+        if min_rating in self._ratings:
+            return self._ratings[min_rating]
+        mask = 0
+        for guide_id, (_, rating) in list(self._guides.items()):
+            slot = self._slots.get(guide_id)
+            if slot is not None and rating is not None and rating >= min_rating:
+                mask |= 1 << slot
+        return mask
+
+    def _ids_mask(self, guide_ids):
+        mask = 0
+        for guide_id in guide_ids:
+            slot = self._slots.get(guide_id)
+            if slot is not None:
+                mask |= 1 << slot
+        return mask
+
+    def counts(self, guide_filter, available_ids=None, limit=DEFAULT_FACET_LIMIT, priced_ids=None) -> dict:
+        """
+        Count guides per attribute value under a filter.
+
+        Args:
+            guide_filter (GuideFilter): Current search filters
+            available_ids (iterable): Guide ids passing the availability
+                filter, or None when no date range was requested
+            limit (int): Maximum values returned per token facet
+            priced_ids (iterable): Guide ids within ``max_price``, or None
+                when no price filter was requested
+
+        Returns:
+            dict: ``total`` matches plus per-field lists of
+            ``{'value', 'count'}`` (token facets) or ``{'min', 'count'}``
+            (rating buckets), most common first
+        """
+        masks = {'all': self._all}
+        for name in FILTERED_FIELDS:
+            terms = getattr(guide_filter, name)
+            if terms:
+                masks[name] = self._match(name, terms)
+        if guide_filter.min_rating is not None:
+            masks['rating'] = self._rating_mask(guide_filter.min_rating)
+        if available_ids is not None:
+            masks['available'] = self._ids_mask(available_ids)
+        if priced_ids is not None:
+            masks['price'] = self._ids_mask(priced_ids)
+
+        def combined(excluded=None):
+            mask = -1
+            for key, value in masks.items():
+                if key != excluded:
+                    mask &= value
+            return mask
+
+        facets = {}
+        for name in TOKEN_FIELDS:
+            base = combined(excluded=name)
+            values = [
+                (token, (bitmap & base).bit_count())
+                for token, bitmap in self._bitmaps[name].items()
+            ]
+            values = sorted((v for v in values if v[1]), key=lambda v: (-v[1], v[0]))[:limit]
+            facets[name] = [{'value': token, 'count': count} for token, count in values]
+
+        base = combined(excluded='rating')
+        facets['rating'] = [
+            {'min': threshold, 'count': (self._ratings[threshold] & base).bit_count()}
+            for threshold in RATING_BUCKETS
+        ]
+
+        return {'total': combined().bit_count(), 'facets': facets}
+
+
+def _load_index() -> FacetIndex:
+    guides = Guide.__table__
+    rows = db.session.execute(
+        select(guides.c.id, guides.c.rating, *[guides.c[name] for name in TOKEN_FIELDS])
+    ).all()
+    return FacetIndex.build(rows)
+
+
+facet_index = LocalIndex('facet_index', _load_index, 'FACET_INDEX_TTL', DEFAULT_TTL)
+
+
+def facet_counts(guide_filter, limit=DEFAULT_FACET_LIMIT) -> dict:
+    """
+    Compute facet counts for a filter from this process's index.
+
+    The availability range and price budget are the only filters not held
+    in memory; each is resolved with one query.
+    """
+    available_ids = None
+    if guide_filter.available_from is not None:
+        available_ids = db.session.execute(
+            GuideAvailability.available_guide_ids(guide_filter.available_from, guide_filter.available_to)
+        ).scalars().all()
+    priced_ids = None
+    if guide_filter.max_price is not None:
+        priced_ids = db.session.execute(guide_filter.matching_ids()).scalars().all()
+    return facet_index.get().counts(guide_filter, available_ids, limit, priced_ids)
@@ -0,0 +1,199 @@
+"""
+Travelers' favorite guides and bulk "favorited?" lookups.
+
+A page of guide cards needs one flag per card. ``favorited_ids`` resolves
+them for the whole page with a single query against the
+``(user_id, guide_id)`` primary key, instead of one query per card.
+
+With ``FAVORITES_CACHE_SIZE`` set, each worker also keeps the complete
+favorite sets of its most recently active users (LRU, so heavy users stay
+resident) and answers their lookups from memory. Changes made through this
+worker update the cached set immediately; changes made on other workers
+become visible once the entry is older than ``FAVORITES_CACHE_TTL``
+seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, func, select
+
+from app import db
+from app.models import Favorite
+from app.utils.db import insert_ignore_conflicts
+
+favorites_table = Favorite.__table__
+
+DEFAULT_CACHE_TTL = 30
+
+
+class FavoriteSets:
+    """
+    LRU of complete per-user favorite sets.
+
+    Args:
+        size (int): Users kept
+        ttl (float): Seconds an entry is trusted
+    """
+
+    def __init__(self, size, ttl=DEFAULT_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._sets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """The cached set for ``user_id``, or None when absent or stale."""
+        with self._lock:
+            entry = self._sets.get(user_id)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self._sets.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id, guide_ids):
+        with self._lock:
+            self._sets[user_id] = (time.monotonic(), frozenset(guide_ids))
+            self._sets.move_to_end(user_id)
+            while len(self._sets) > self.size:
+                self._sets.popitem(last=False)
+
+    def update(self, user_id, added=(), removed=()):
+        """Apply this worker's own change to a cached set, keeping its age."""
+        with self._lock:
+            entry = self._sets.get(user_id)
+            if entry is not None:
+                self._sets[user_id] = (entry[0], (entry[1] | set(added)) - set(removed))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'users': len(self._sets), 'hits': self.hits, 'misses': self.misses}
+
+
+def get_cache(app=None):
+    """Return this process's ``FavoriteSets``, or None when caching is off."""
+    app = app or current_app._get_current_object()
+    cache = app.extensions.get('favorite_sets')
+    if cache is None:
+        size = app.config.get('FAVORITES_CACHE_SIZE', 0)
+        if not size:
+            return None
+        cache = app.extensions.setdefault('favorite_sets', FavoriteSets(
+            size, ttl=app.config.get('FAVORITES_CACHE_TTL', DEFAULT_CACHE_TTL)
+        ))
+    return cache
+
+
+def metrics() -> dict:
+    """Favorite-set cache counters, or ``{'enabled': False}``."""
+    cache = get_cache()
+    if cache is None:
+        return {'enabled': False}
+    return {'enabled': True, **cache.stats()}
+
+
+def add_favorite(user_id, guide_id) -> bool:
+    """
+    Add ``guide_id`` to the user's favorites.
+
+    Returns:
+        bool: True if it was added, False if it was already a favorite
+    """
+    inserted = insert_ignore_conflicts(
+        favorites_table,
+        [{'user_id': user_id, 'guide_id': guide_id, 'created_at': datetime.utcnow()}],
+        index_elements=['user_id', 'guide_id'],
+        returning=[favorites_table.c.guide_id],
+    )
+    db.session.commit()
+    cache = get_cache()
+    if cache is not None:
+        cache.update(user_id, added=[guide_id])
+    return bool(inserted)
+
+
+def remove_favorite(user_id, guide_id) -> bool:
+    """
+    Remove ``guide_id`` from the user's favorites.
+
+    Returns:
+        bool: True if it was removed, False if it was not a favorite
+    """
+    result = db.session.execute(delete(favorites_table).where(
+        favorites_table.c.user_id == user_id, favorites_table.c.guide_id == guide_id
+    ))
+    db.session.commit()
+    cache = get_cache()
+    if cache is not None:
+        cache.update(user_id, removed=[guide_id])
+    return result.rowcount > 0
+
+
+def favorite_ids(user_id, limit=None, offset=0) -> list:
+    """The user's favorite guide IDs, most recently added first."""
+    query = (
+        select(favorites_table.c.guide_id)
+        .where(favorites_table.c.user_id == user_id)
+        .order_by(favorites_table.c.created_at.desc(), favorites_table.c.guide_id)
+        .offset(offset)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return db.session.execute(query).scalars().all()
+
+
+def count_favorites(user_id) -> int:
+    return db.session.execute(
+        select(func.count()).select_from(favorites_table).where(favorites_table.c.user_id == user_id)
+    ).scalar_one()
+
+
+def favorited_ids(user_id, guide_ids) -> set:
+    """
+    Return the subset of ``guide_ids`` the user has favorited.
+
+    One query for the whole page, or none when the user's set is cached.
+    """
+    guide_ids = set(guide_ids)
+    if not guide_ids:
+        return set()
+    cache = get_cache()
+    if cache is None:
+        return set(db.session.execute(
+            select(favorites_table.c.guide_id)
+            .where(favorites_table.c.user_id == user_id)
+            .where(favorites_table.c.guide_id.in_(guide_ids))
+        ).scalars())
+
+    cached = cache.get(user_id)
+    if cached is None:
+        cached = db.session.execute(
+            select(favorites_table.c.guide_id).where(favorites_table.c.user_id == user_id)
+        ).scalars().all()
+        cache.put(user_id, cached)
+        cached = set(cached)
+    return guide_ids & cached
+
+
+def annotate_bodies(rows, favorited) -> list:
+    """
+    Add ``"favorited"`` to pre-serialized guide bodies without re-encoding them.
+
+    Args:
+        rows: ``(guide_id, body)`` pairs; each body is a JSON object
+        favorited (set): Guide IDs to flag as favorited
+
+    Returns:
+        list: Annotated JSON bodies
+    """
+    return [
+        body[:-1] + (',"favorited":true}' if guide_id in favorited else ',"favorited":false}')
+        for guide_id, body in rows
+    ]
@@ -0,0 +1,235 @@
+"""
+Denormalized guide read model.
+
+Every write to a ``User``/``Guide`` row rewrites the guide's precomputed
+JSON document inside the same flush (and therefore the same transaction),
+using Core statements on the flush connection. Reads then select the
+stored document bodies directly. Writes that bypass the ORM (bulk Core
+statements, manual SQL) are repaired with ``rebuild_all``.
+
+Documents are encoded from Core rows by a precompiled row encoder rather
+than through ORM instances. ``list_guide_bodies`` uses the same encoder to
+serve listings from the source tables when the read model is disabled,
+so no list endpoint hydrates ``Guide`` objects.
+"""
+
+import json
+from datetime import datetime
+
+from sqlalchemy import delete, event, inspect, select
+
+from app import db
+from app.models import Guide, GuideDocument, User
+from app.models.guide_document import DEFAULT_LOCALE
+from app.utils.db import upsert_statement
+from app.utils.row_encoder import compile_row_encoder
+
+users_table = User.__table__
+guides_table = Guide.__table__
+documents_table = GuideDocument.__table__
+
+
+def guide_rows_select():
+    """Select exactly the columns that make up a guide document."""
+    return (
+        select(
+            users_table.c.id,
+            users_table.c.email,
+            users_table.c.created_at,
+            guides_table.c.name_romanized,
+            guides_table.c.bio,
+            guides_table.c.specialties,
+            guides_table.c.rating,
+            guides_table.c.languages,
+            guides_table.c.areas,
+            guides_table.c.price_range,
+        )
+        .select_from(guides_table.join(users_table, guides_table.c.id == users_table.c.id))
+    )
+
+
+# Document keys and value kinds, in ``guide_rows_select`` column order
+DOCUMENT_FIELDS = (
+    ('id', 'str'),
+    ('email', 'str'),
+    ('created_at', 'datetime'),
+    ('name_romanized', 'str'),
+    ('bio', 'str'),
+    ('specialties', 'str'),
+    ('rating', 'number'),
+    ('languages', 'str'),
+    ('areas', 'str'),
+    ('price_range', 'str'),
+)
+
+# Encodes a selected row as ``serialize(Guide.to_dict())`` would, without the intermediate dict
+encode_document = compile_row_encoder(DOCUMENT_FIELDS)
+
+
+def serialize(document) -> str:
+    """Serialize a document the way ``jsonify`` would (sorted, compact)."""
+    return json.dumps(document, sort_keys=True, separators=(',', ':'))
+
+
+def document_values(rows, locale=DEFAULT_LOCALE):
+    """Convert selected guide rows into ``guide_documents`` values."""
+    now = datetime.utcnow()
+    return [
+        {
+            'guide_id': row.id,
+            'locale': locale,
+            'languages': row.languages,
+            'areas': row.areas,
+            'rating': row.rating,
+            'body': encode_document(row),
+            'updated_at': now,
+        }
+        for row in rows
+    ]
+
+
+def refresh_documents(connection, guide_ids):
+    """
+    Rewrite the documents for ``guide_ids``, deleting those of missing guides.
+
+    Args:
+        connection: Connection to run on (the flush connection in events)
+        guide_ids (list): IDs of the guides that changed
+    """
+    guide_ids = list(guide_ids)
+    rows = connection.execute(guide_rows_select().where(guides_table.c.id.in_(guide_ids))).all()
+    if rows:
+        connection.execute(upsert_statement(
+            documents_table, document_values(rows), ['guide_id', 'locale'], connection.dialect.name
+        ))
+
+    missing = set(guide_ids) - {row.id for row in rows}
+    if missing:
+        connection.execute(delete(documents_table).where(documents_table.c.guide_id.in_(missing)))
+
+
+def rebuild_all(batch_size: int = 500) -> int:
+    """
+    Rebuild every guide document, committing one keyset-ordered chunk at a time.
+
+    Args:
+        batch_size (int): Guides per chunk
+
+    Returns:
+        int: Number of documents written
+    """
+    written = 0
+    last_id = ''
+    while True:
+        rows = db.session.execute(
+            guide_rows_select()
+            .where(guides_table.c.id > last_id)
+            .order_by(guides_table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        db.session.execute(upsert_statement(documents_table, document_values(rows), ['guide_id', 'locale']))
+        db.session.commit()
+        written += len(rows)
+        last_id = rows[-1].id
+
+    # Drop documents whose guide no longer exists
+    db.session.execute(
+        delete(documents_table).where(documents_table.c.guide_id.not_in(select(guides_table.c.id)))
+    )
+    db.session.commit()
+    return written
+
+
+def get_document_body(guide_id, locale=DEFAULT_LOCALE):
+    """
+    Return the stored JSON body for a guide, or None if it has no document.
+
+    Falls back to the default locale when ``locale`` has no document.
+    """
+    locales = [locale] if locale == DEFAULT_LOCALE else [locale, DEFAULT_LOCALE]
+    rows = db.session.execute(
+        select(documents_table.c.locale, documents_table.c.body)
+        .where(documents_table.c.guide_id == guide_id)
+        .where(documents_table.c.locale.in_(locales))
+    ).all()
+    bodies = dict(rows)
+    return next((bodies[loc] for loc in locales if loc in bodies), None)
+
+
+def get_document_bodies(guide_ids, locale=DEFAULT_LOCALE):
+    """Return stored JSON bodies for ``guide_ids`` in the given order, skipping missing guides."""
+    if not guide_ids:
+        return []
+    rows = db.session.execute(
+        select(documents_table.c.guide_id, documents_table.c.body)
+        .where(documents_table.c.guide_id.in_(guide_ids))
+        .where(documents_table.c.locale == locale)
+    ).all()
+    bodies = dict(rows)
+    return [bodies[guide_id] for guide_id in guide_ids if guide_id in bodies]
+
+
+def get_guide_bodies(guide_ids):
+    """Like ``get_document_bodies``, but encoded from the source tables (read model disabled)."""
+    if not guide_ids:
+        return []
+    rows = db.session.execute(guide_rows_select().where(guides_table.c.id.in_(guide_ids)))
+    bodies = {row[0]: encode_document(row) for row in rows}
+    return [bodies[guide_id] for guide_id in guide_ids if guide_id in bodies]
+
+
+def list_document_bodies(guide_filter, locale=DEFAULT_LOCALE, with_ids=False):
+    """
+    Return stored JSON bodies for every guide matching ``guide_filter``.
+
+    With ``with_ids``, return ``(guide_id, body)`` pairs instead.
+    """
+    columns = (documents_table.c.guide_id, documents_table.c.body) if with_ids else (documents_table.c.body,)
+    query = select(*columns).where(documents_table.c.locale == locale)
+    query = guide_filter.apply(query, model=GuideDocument, id_column=documents_table.c.guide_id)
+    result = db.session.execute(query)
+    return [tuple(row) for row in result] if with_ids else result.scalars().all()
+
+
+def list_guide_bodies(guide_filter, with_ids=False):
+    """
+    Return JSON bodies for every guide matching ``guide_filter``, built from the source tables.
+
+    Selects only the document columns as plain tuples and encodes each row
+    directly; no ORM identities are created. With ``with_ids``, return
+    ``(guide_id, body)`` pairs instead.
+    """
+    query = guide_filter.apply(guide_rows_select(), model=Guide, id_column=guides_table.c.id)
+    if with_ids:
+        return [(row[0], encode_document(row)) for row in db.session.execute(query)]
+    return [encode_document(row) for row in db.session.execute(query)]
+
+
+@event.listens_for(User, 'after_insert', propagate=True)
+def _guide_inserted(mapper, connection, target):
+    if isinstance(target, Guide):
+        refresh_documents(connection, [target.id])
+
+
+def _document_changed(target) -> bool:
+    """True if the flush changed any column that appears in the guide document."""
+    state = inspect(target)
+    return any(
+        key in state.mapper.column_attrs and state.attrs[key].history.has_changes()
+        for key, _ in DOCUMENT_FIELDS
+    )
+
+
+@event.listens_for(User, 'after_update', propagate=True)
+def _user_updated(mapper, connection, target):
+    # Plain User rows may still back a guide (no polymorphic discriminator).
+    # Login touches and password changes leave the document as it is.
+    if _document_changed(target):
+        refresh_documents(connection, [target.id])
+
+
+@event.listens_for(User, 'after_delete', propagate=True)
+def _user_deleted(mapper, connection, target):
+    connection.execute(delete(documents_table).where(documents_table.c.guide_id == target.id))
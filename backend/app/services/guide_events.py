@@ -0,0 +1,68 @@
+"""
+In-process notification of committed guide changes.
+
+Mapper listeners record a snapshot of each inserted, updated or deleted
+guide during flush; once the transaction commits, the snapshots are sent
+through the ``guides_changed`` signal. Rolled-back changes are discarded,
+so in-memory indexes subscribed to the signal only ever see committed data.
+
+The signal only covers writes made by this process; indexes that must see
+other workers' writes rebuild periodically.
+"""
+
+from blinker import Namespace
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.models import Guide, User
+from app.utils.tokens import TOKEN_FIELDS
+
+_signals = Namespace()
+
+# Sent with ``snapshots``: list of dicts (see ``snapshot``) after each commit
+guides_changed = _signals.signal('guides-changed')
+
+_PENDING_KEY = 'pending_guide_changes'
+
+
+def snapshot(guide, deleted=False) -> dict:
+    """Capture the indexable fields of a guide as a plain dict."""
+    data = {'id': guide.id, 'deleted': deleted, 'rating': None if deleted else guide.rating}
+    for name in TOKEN_FIELDS:
+        data[name] = None if deleted else getattr(guide, name)
+    return data
+
+
+def _record(target, deleted=False):
+    if not isinstance(target, Guide):
+        return
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, {})[target.id] = snapshot(target, deleted)
+
+
+@event.listens_for(User, 'after_insert', propagate=True)
+def _guide_inserted(mapper, connection, target):
+    _record(target)
+
+
+@event.listens_for(User, 'after_update', propagate=True)
+def _guide_updated(mapper, connection, target):
+    _record(target)
+
+
+@event.listens_for(User, 'after_delete', propagate=True)
+def _guide_deleted(mapper, connection, target):
+    _record(target, deleted=True)
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        guides_changed.send(session, snapshots=list(pending.values()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,177 @@
+"""
+Guide search filters shared by the guide listing endpoints.
+
+Parses the ``/api/guides`` query string once into a ``GuideFilter`` so that
+every consumer (listing, availability, later indexes) applies the same
+semantics.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_, select
+
+from app.models import Guide, GuideAvailability
+
+# Longest date range accepted by the availability filter
+MAX_AVAILABILITY_RANGE = timedelta(days=366)
+
+# Largest price bound applied (the price columns are 32-bit); higher bounds match every price
+MAX_PRICE = 2 ** 31 - 1
+
+
+def split_param(value: Optional[str]) -> List[str]:
+    """Split a comma-separated query parameter into trimmed tokens."""
+    if not value:
+        return []
+    return [t.strip() for t in value.split(',') if t.strip()]
+
+
+def parse_date_range(start_param: Optional[str], end_param: Optional[str]):
+    """
+    Parse an inclusive ISO date range from query parameters.
+
+    A missing end defaults to the start (single day); a missing start means
+    no range was requested.
+
+    Args:
+        start_param (str): ISO date for the first day
+        end_param (str): ISO date for the last day
+
+    Returns:
+        tuple: ``(start, end)`` dates, or ``(None, None)`` when no range given
+
+    Raises:
+        ValueError: If a date is malformed, reversed or the range is too long
+    """
+    if not start_param and not end_param:
+        return None, None
+    if not start_param:
+        raise ValueError('available_from is required when available_to is given')
+
+    start = date.fromisoformat(start_param)
+    end = date.fromisoformat(end_param) if end_param else start
+    if end < start:
+        raise ValueError('available_to must not be before available_from')
+    if end - start > MAX_AVAILABILITY_RANGE:
+        raise ValueError('Date range must not exceed 366 days')
+    return start, end
+
+
+@dataclass
+class GuideFilter:
+    """Structured form of the ``/api/guides`` filter query parameters."""
+
+    languages: List[str] = field(default_factory=list)
+    areas: List[str] = field(default_factory=list)
+    specialties: List[str] = field(default_factory=list)
+    min_rating: Optional[float] = None
+    # Guides whose cheapest price (``price_min``) is within budget
+    max_price: Optional[int] = None
+    available_from: Optional[date] = None
+    available_to: Optional[date] = None
+
+    @classmethod
+    def from_args(cls, args) -> 'GuideFilter':
+        """
+        Build a filter from request query arguments.
+
+        Invalid ``min_rating`` and ``max_price`` values (including infinite
+        prices) are ignored, matching the original listing behaviour, and
+        prices above ``MAX_PRICE`` are clamped to it; invalid dates raise because silently dropping an
+        availability constraint would return guides who are not free.
+
+        Args:
+            args: Mapping of query parameters (e.g. ``request.args``)
+
+        Returns:
+            GuideFilter: Parsed filter
+
+        Raises:
+            ValueError: If the availability range is invalid
+        """
+        min_rating = None
+        if args.get('min_rating'):
+            try:
+                min_rating = float(args['min_rating'])
+            except ValueError:
+                pass
+
+        max_price = None
+        if args.get('max_price'):
+            try:
+                price = float(args['max_price'])
+            except ValueError:
+                pass
+            else:
+                if math.isfinite(price):
+                    max_price = min(int(price), MAX_PRICE)
+
+        available_from, available_to = parse_date_range(
+            args.get('available_from'), args.get('available_to')
+        )
+
+        return cls(
+            languages=split_param(args.get('languages')),
+            areas=split_param(args.get('areas')),
+            specialties=split_param(args.get('specialties')),
+            min_rating=min_rating,
+            max_price=max_price,
+            available_from=available_from,
+            available_to=available_to,
+        )
+
+    def apply(self, query, model=Guide, id_column=None):
+        """
+        Apply the filter to a query over guides.
+
+        Languages, areas and specialties match any token (case-insensitive,
+        partial). Columns the model lacks (the read model holds no
+        specialties or prices) and the availability range are pushed down as
+        ``IN`` subqueries so the whole filter runs in one statement.
+
+        Args:
+            query: ORM query or Core ``Select``
+            model: Mapped class exposing ``languages``, ``areas`` and
+                ``rating`` columns (``Guide`` or the guide read model)
+            id_column: Column holding the guide id (defaults to ``model.id``)
+        """
+        id_column = id_column if id_column is not None else model.id
+
+        if self.languages:
+            query = query.filter(or_(*[model.languages.ilike(f"%{t}%") for t in self.languages]))
+
+        if self.areas:
+            query = query.filter(or_(*[model.areas.ilike(f"%{t}%") for t in self.areas]))
+
+        if self.specialties:
+            query = self._filter_guides(
+                query, model, id_column, or_(*[Guide.specialties.ilike(f"%{t}%") for t in self.specialties])
+            )
+
+        if self.min_rating is not None:
+            query = query.filter(model.rating >= self.min_rating)
+
+        if self.max_price is not None:
+            query = self._filter_guides(query, model, id_column, Guide.price_min <= self.max_price)
+
+        if self.available_from is not None:
+            available = GuideAvailability.available_guide_ids(self.available_from, self.available_to)
+            query = query.filter(id_column.in_(available))
+
+        return query
+
+    @staticmethod
+    def _filter_guides(query, model, id_column, condition):
+        """Filter on a ``guides`` column, via a subquery when ``model`` is not ``Guide``."""
+        if model is Guide:
+            return query.filter(condition)
+        return query.filter(id_column.in_(select(Guide.id).where(condition)))
+
+    def matching_ids(self):
+        """Select the IDs of guides within budget (None when no price filter is set)."""
+        if self.max_price is None:
+            return None
+        return select(Guide.id).where(Guide.price_min <= self.max_price)
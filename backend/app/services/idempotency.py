@@ -0,0 +1,225 @@
+"""
+Idempotency keys for retried POST requests.
+
+Clients that retry on timeouts send the same ``Idempotency-Key`` header
+with every attempt. The first attempt inserts an ``idempotency_keys`` row
+before the view runs; the primary key makes that insert the lock, so a
+concurrent retry gets 409 (with ``Retry-After``) instead of running the
+view a second time. When the view finishes its response is stored on the
+row, and later retries get it back verbatim (marked
+``Idempotent-Replayed: true``) without redoing password hashing or the
+transaction.
+
+A key is scoped to the caller (JWT identity, or anonymous) and endpoint,
+and bound to a fingerprint of the request: reusing it for a different
+request gets 422. Server errors (5xx) and exceptions release the key so
+the client can retry for real. Rows expire after ``IDEMPOTENCY_TTL``
+seconds; an in-progress row whose worker died is taken over after
+``IDEMPOTENCY_LOCK_SECONDS``. The worker only stores or releases the row
+while it still holds that lock (matched on ``locked_until``); a worker
+that was taken over leaves the new owner's row alone. ``flask idempotency
+prune`` deletes expired rows.
+
+The fingerprint reads the body, so oversized bodies get 413 here, before
+it is hashed, rather than in ``validate_body`` after it.
+
+Stored responses may contain access tokens; they are only replayed to a
+request with the same fingerprint, which covers the full request body.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from app import db
+from app.models import IdempotencyKey
+from app.models.idempotency import STATUS_COMPLETED, STATUS_IN_PROGRESS
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+MAX_KEY_LENGTH = 255
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_LOCK_SECONDS = 60
+
+keys_table = IdempotencyKey.__table__
+
+logger = logging.getLogger(__name__)
+
+
+def _caller():
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity() or ''
+    except Exception:
+        return ''
+
+
+def _record_id(key) -> str:
+    scope = f'{_caller()}\n{request.endpoint}\n{key}'
+    return hashlib.sha256(scope.encode()).hexdigest()
+
+
+def _fingerprint() -> str:
+    """
+    Hash of the method, path and body.
+
+    Raises:
+        RequestEntityTooLarge: If the body exceeds ``MAX_CONTENT_LENGTH``
+    """
+    max_bytes = request.max_content_length
+    if max_bytes is not None and request.content_length is not None and request.content_length > max_bytes:
+        raise RequestEntityTooLarge()
+    digest = hashlib.sha256(f'{request.method} {request.full_path}\n'.encode())
+    # The stream is limited to MAX_CONTENT_LENGTH, so chunked bodies are bounded too
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _claim(record_id, fingerprint):
+    """
+    Insert the in-progress row for ``record_id`` unless a live one exists.
+
+    Returns:
+        tuple: ``(lock, existing)``; ``lock`` is the claimed row's
+        ``locked_until`` (None when not claimed) and ``existing`` the row
+        found when the key was not claimed (None if it vanished in a race)
+    """
+    now = datetime.utcnow()
+    existing = db.session.execute(select(keys_table).where(keys_table.c.id == record_id)).first()
+    if existing is not None and (
+        existing.expires_at <= now
+        or (existing.status == STATUS_IN_PROGRESS and existing.locked_until <= now)
+    ):
+        # Expired, or abandoned by a worker that died mid-request
+        db.session.execute(delete(keys_table).where(
+            keys_table.c.id == record_id, keys_table.c.locked_until == existing.locked_until
+        ))
+        existing = None
+    if existing is None:
+        config = current_app.config
+        lock = now + timedelta(seconds=config.get('IDEMPOTENCY_LOCK_SECONDS', DEFAULT_LOCK_SECONDS))
+        try:
+            db.session.execute(insert(keys_table).values(
+                id=record_id,
+                fingerprint=fingerprint,
+                status=STATUS_IN_PROGRESS,
+                locked_until=lock,
+                expires_at=now + timedelta(seconds=config.get('IDEMPOTENCY_TTL', DEFAULT_TTL)),
+                created_at=now,
+            ))
+            db.session.commit()
+            return lock, None
+        except IntegrityError:
+            db.session.rollback()
+            existing = db.session.execute(select(keys_table).where(keys_table.c.id == record_id)).first()
+    db.session.commit()
+    return None, existing
+
+
+def _owned(record_id, lock):
+    """Where clause matching ``record_id`` only while this worker still holds its lock."""
+    return (
+        keys_table.c.id == record_id,
+        keys_table.c.status == STATUS_IN_PROGRESS,
+        keys_table.c.locked_until == lock,
+    )
+
+
+def _release(record_id, lock) -> bool:
+    """Delete the claimed row; False if the lock was lost to another worker."""
+    db.session.rollback()
+    result = db.session.execute(delete(keys_table).where(*_owned(record_id, lock)))
+    db.session.commit()
+    if result.rowcount == 0:
+        logger.warning('Lost the lock on idempotency key %s before releasing it', record_id)
+    return result.rowcount > 0
+
+
+def _complete(record_id, lock, response) -> bool:
+    """Store the response on the claimed row; False if the lock was lost to another worker."""
+    # Anything the view left uncommitted is discarded, as at request teardown
+    db.session.rollback()
+    result = db.session.execute(update(keys_table).where(*_owned(record_id, lock)).values(
+        status=STATUS_COMPLETED,
+        response_status=response.status_code,
+        response_body=response.get_data(as_text=True),
+        response_mimetype=response.mimetype,
+    ))
+    db.session.commit()
+    if result.rowcount == 0:
+        # The view outlived IDEMPOTENCY_LOCK_SECONDS and a retry took the key over
+        logger.warning('Lost the lock on idempotency key %s; response not stored', record_id)
+    return result.rowcount > 0
+
+
+def _in_progress_response():
+    response = jsonify({'error': f'A request with this {HEADER} is still in progress'})
+    response.status_code = 409
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def idempotent(view):
+    """
+    Make a POST view safe to retry with an ``Idempotency-Key`` header.
+
+    Requests without the header run the view as usual. Place the decorator
+    below ``@jwt_required()`` so keys are scoped to the caller.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be 1-{MAX_KEY_LENGTH} characters'}), 400
+
+        record_id = _record_id(key)
+        try:
+            fingerprint = _fingerprint()
+        except RequestEntityTooLarge:
+            limit = request.max_content_length
+            return jsonify({'error': f'Request body must be at most {limit} bytes'}), 413
+        lock, existing = _claim(record_id, fingerprint)
+        if lock is None:
+            if existing is None:
+                return _in_progress_response()
+            if existing.fingerprint != fingerprint:
+                return jsonify({'error': f'{HEADER} was already used for a different request'}), 422
+            if existing.status != STATUS_COMPLETED:
+                return _in_progress_response()
+            response = current_app.response_class(
+                existing.response_body, status=existing.response_status, mimetype=existing.response_mimetype
+            )
+            response.headers[REPLAYED_HEADER] = 'true'
+            return response
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _release(record_id, lock)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            _release(record_id, lock)
+        else:
+            _complete(record_id, lock, response)
+        return response
+
+    return wrapper
+
+
+def prune_expired() -> int:
+    """Delete expired keys; returns the number removed."""
+    result = db.session.execute(delete(keys_table).where(keys_table.c.expires_at <= datetime.utcnow()))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,428 @@
+"""
+Lightweight background job queue.
+
+Jobs are plain functions registered with ``@job``; ``enqueue`` (or the
+function's ``.delay``) serializes the call to JSON and hands it to the
+configured backend:
+
+- ``redis``: production broker. Ready jobs live in a list, delayed jobs and
+  retries in a sorted set scored by run time, and jobs that exhaust their
+  retries in a dead-letter list. A reserved job holds a lease that its
+  worker renews while the job runs; ``flask jobs recover`` requeues only
+  jobs whose lease has expired.
+- ``memory``: in-process stand-in with the same semantics, used by tests.
+- ``eager``: runs the job inline at enqueue time (development default when
+  Redis is not configured, preserving the previous inline behaviour).
+
+``flask worker`` runs a ``Worker`` that promotes due jobs, executes them in
+an application context, retries failures with exponential backoff and
+dead-letters them after ``max_retries``.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from flask import current_app
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Registered job functions by name
+registry = {}
+
+# Seconds a reserved job stays leased to its worker without a heartbeat
+DEFAULT_LEASE_SECONDS = 300
+
+# Requeue a processing job if its lease has expired; atomic so a late ack cannot race it
+_RECOVER_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 1 then
+    redis.call('LPUSH', KEYS[2], ARGV[1])
+end
+return redis.call('ZREM', KEYS[3], ARGV[1])
+"""
+
+
+@dataclass
+class JobSpec:
+    """Registration details for a job function."""
+
+    name: str
+    func: callable
+    max_retries: int = 3
+    backoff: float = 30.0
+
+
+@dataclass
+class Job:
+    """A serialized job invocation."""
+
+    name: str
+    args: list = field(default_factory=list)
+    kwargs: dict = field(default_factory=dict)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    run_at: float = 0.0
+    enqueued_at: float = field(default_factory=time.time)
+    last_error: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw) -> 'Job':
+        return cls(**json.loads(raw))
+
+
+def job(name=None, max_retries=3, backoff=30.0):
+    """
+    Register a function as a background job.
+
+    The decorated function gains a ``delay(*args, **kwargs)`` method that
+    enqueues it. Arguments must be JSON serializable.
+
+    Args:
+        name (str): Registry name (defaults to ``module.function``)
+        max_retries (int): Retries before the job is dead-lettered
+        backoff (float): Base retry delay in seconds, doubled per attempt
+    """
+
+    def decorator(func):
+        spec = JobSpec(name or f'{func.__module__}.{func.__name__}', func, max_retries, backoff)
+        registry[spec.name] = spec
+        func.job_name = spec.name
+        func.delay = lambda *args, **kwargs: enqueue(spec.name, *args, **kwargs)
+        return func
+
+    return decorator
+
+
+class MemoryBackend:
+    """Thread-safe in-process queue with scheduled and dead-letter sets."""
+
+    # Reserved jobs leave the queue immediately, so there is nothing to lease
+    lease_seconds = None
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._scheduled = []
+        self._ready = []
+        self._dead = []
+        self._seq = itertools.count()
+
+    def push(self, job: Job):
+        with self._lock:
+            if job.run_at > time.time():
+                heapq.heappush(self._scheduled, (job.run_at, next(self._seq), job.to_json()))
+            else:
+                self._ready.append(job.to_json())
+                self._lock.notify()
+
+    def promote_due(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            while self._scheduled and self._scheduled[0][0] <= now:
+                self._ready.append(heapq.heappop(self._scheduled)[2])
+                self._lock.notify()
+
+    def reserve(self, timeout=1.0) -> Optional[Job]:
+        with self._lock:
+            if not self._ready:
+                self._lock.wait(timeout)
+            if not self._ready:
+                return None
+            return Job.from_json(self._ready.pop(0))
+
+    def ack(self, job: Job):
+        """Jobs are removed from the ready list when reserved."""
+
+    def extend(self, job: Job):
+        """Nothing to renew; see ``lease_seconds``."""
+
+    def bury(self, job: Job):
+        with self._lock:
+            self._dead.append(job.to_json())
+
+    def dead_letters(self, limit=100):
+        with self._lock:
+            return [Job.from_json(raw) for raw in self._dead[-limit:]]
+
+    def requeue_dead(self):
+        with self._lock:
+            dead, self._dead = self._dead, []
+        for raw in dead:
+            job = Job.from_json(raw)
+            job.attempts, job.run_at = 0, 0.0
+            self.push(job)
+        return len(dead)
+
+    def stats(self):
+        with self._lock:
+            return {'ready': len(self._ready), 'scheduled': len(self._scheduled), 'dead': len(self._dead)}
+
+
+class RedisBackend:
+    """
+    Redis-backed queue.
+
+    Reserved jobs are moved atomically to a processing list and removed on
+    acknowledgement, so a worker that dies mid-job leaves it recoverable
+    with ``flask jobs recover``. Each reserved job has a lease (a sorted set
+    scored by expiry) that the worker extends while the job runs, so
+    recovery never steals jobs from live workers.
+
+    Args:
+        url (str): Redis URL
+        prefix (str): Key prefix
+        lease_seconds (float): Lease granted on reserve and on each renewal
+    """
+
+    def __init__(self, url, prefix='ai-tour-guide:jobs', lease_seconds=DEFAULT_LEASE_SECONDS):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self.lease_seconds = lease_seconds
+        self.ready_key = f'{prefix}:ready'
+        self.scheduled_key = f'{prefix}:scheduled'
+        self.processing_key = f'{prefix}:processing'
+        self.leases_key = f'{prefix}:leases'
+        self.dead_key = f'{prefix}:dead'
+        self._recover_script = self._redis.register_script(_RECOVER_SCRIPT)
+
+    def push(self, job: Job):
+        if job.run_at > time.time():
+            self._redis.zadd(self.scheduled_key, {job.to_json(): job.run_at})
+        else:
+            self._redis.lpush(self.ready_key, job.to_json())
+
+    def promote_due(self, now=None):
+        now = now or time.time()
+        for raw in self._redis.zrangebyscore(self.scheduled_key, 0, now, start=0, num=100):
+            # Only the worker whose ZREM succeeds promotes the job
+            if self._redis.zrem(self.scheduled_key, raw):
+                self._redis.lpush(self.ready_key, raw)
+
+    def reserve(self, timeout=1.0) -> Optional[Job]:
+        raw = self._redis.blmove(self.ready_key, self.processing_key, timeout, 'RIGHT', 'LEFT')
+        if raw is None:
+            return None
+        self._redis.zadd(self.leases_key, {raw: time.time() + self.lease_seconds})
+        job = Job.from_json(raw)
+        job._raw = raw
+        return job
+
+    def extend(self, job: Job):
+        """Renew the lease of a job this worker is still running."""
+        self._redis.zadd(self.leases_key, {job._raw: time.time() + self.lease_seconds}, xx=True)
+
+    def ack(self, job: Job):
+        raw = getattr(job, '_raw', job.to_json())
+        pipe = self._redis.pipeline()
+        pipe.lrem(self.processing_key, 1, raw)
+        pipe.zrem(self.leases_key, raw)
+        pipe.execute()
+
+    def bury(self, job: Job):
+        self._redis.lpush(self.dead_key, job.to_json())
+
+    def dead_letters(self, limit=100):
+        return [Job.from_json(raw) for raw in self._redis.lrange(self.dead_key, 0, limit - 1)]
+
+    def requeue_dead(self):
+        count = 0
+        while True:
+            raw = self._redis.rpop(self.dead_key)
+            if raw is None:
+                return count
+            job = Job.from_json(raw)
+            job.attempts, job.run_at = 0, 0.0
+            self.push(job)
+            count += 1
+
+    def recover(self, now=None):
+        """
+        Move jobs whose lease expired (their worker died) back to ready.
+
+        A job without a lease (its worker died between reserving and
+        leasing it) is given one now, so a later run recovers it.
+
+        Returns:
+            int: Number of jobs requeued
+        """
+        now = now or time.time()
+        for raw in self._redis.lrange(self.processing_key, 0, -1):
+            self._redis.zadd(self.leases_key, {raw: now + self.lease_seconds}, nx=True)
+        count = 0
+        for raw in self._redis.zrangebyscore(self.leases_key, 0, now):
+            count += self._recover_script(
+                keys=[self.processing_key, self.ready_key, self.leases_key], args=[raw]
+            )
+        return count
+
+    def stats(self):
+        return {
+            'ready': self._redis.llen(self.ready_key),
+            'scheduled': self._redis.zcard(self.scheduled_key),
+            'processing': self._redis.llen(self.processing_key),
+            'dead': self._redis.llen(self.dead_key),
+        }
+
+
+def get_backend():
+    """
+    Return the application's job backend, creating it on first use.
+
+    ``JOBS_BACKEND`` selects ``redis``, ``memory`` or ``eager``; it defaults to
+    ``redis`` when ``REDIS_URL`` is set and ``eager`` otherwise.
+    """
+    backend = current_app.extensions.get('jobs')
+    if backend is None:
+        kind = current_app.config.get('JOBS_BACKEND') or ('redis' if current_app.config.get('REDIS_URL') else 'eager')
+        if kind == 'redis':
+            backend = RedisBackend(
+                current_app.config['REDIS_URL'],
+                lease_seconds=current_app.config.get('JOBS_LEASE_SECONDS', DEFAULT_LEASE_SECONDS),
+            )
+        elif kind == 'memory':
+            backend = MemoryBackend()
+        elif kind == 'eager':
+            backend = None
+        else:
+            raise ValueError(f'Unknown JOBS_BACKEND: {kind}')
+        backend = current_app.extensions.setdefault('jobs', backend)
+    return backend
+
+
+def enqueue(name, *args, delay: float = 0, **kwargs) -> Job:
+    """
+    Enqueue a registered job.
+
+    Args:
+        name (str): Registered job name
+        *args: Positional arguments for the job function
+        delay (float): Seconds to wait before the job becomes runnable
+        **kwargs: Keyword arguments for the job function
+
+    Returns:
+        Job: The enqueued job
+    """
+    if name not in registry:
+        raise KeyError(f'Unknown job: {name}')
+    job_ = Job(name=name, args=list(args), kwargs=kwargs, run_at=time.time() + delay if delay else 0.0)
+
+    backend = get_backend()
+    if backend is None:
+        # Eager mode: run inline, but never let a side effect fail the request
+        try:
+            registry[name].func(*job_.args, **job_.kwargs)
+        except Exception:
+            logger.exception('Eager job %s failed', name)
+    else:
+        backend.push(job_)
+    return job_
+
+
+class Worker:
+    """
+    Executes jobs from a backend inside the application context.
+
+    Args:
+        app: Flask application
+        backend: Job backend to consume
+        poll_timeout (float): Seconds to block waiting for a job
+    """
+
+    def __init__(self, app, backend, poll_timeout=1.0):
+        self.app = app
+        self.backend = backend
+        self.poll_timeout = poll_timeout
+        self._stopping = threading.Event()
+
+    def stop(self):
+        """Finish the current job and exit the loop."""
+        self._stopping.set()
+
+    def run_one(self, timeout=None) -> bool:
+        """
+        Promote due jobs and run at most one.
+
+        Returns:
+            bool: True if a job was processed
+        """
+        self.backend.promote_due()
+        job_ = self.backend.reserve(self.poll_timeout if timeout is None else timeout)
+        if job_ is None:
+            return False
+
+        spec = registry.get(job_.name)
+        heartbeat = self._start_heartbeat(job_)
+        with self.app.app_context():
+            try:
+                if spec is None:
+                    raise KeyError(f'Unknown job: {job_.name}')
+                spec.func(*job_.args, **job_.kwargs)
+            except Exception:
+                db.session.rollback()
+                self._handle_failure(job_, spec, traceback.format_exc())
+            finally:
+                db.session.remove()
+                if heartbeat is not None:
+                    heartbeat.set()
+        self.backend.ack(job_)
+        return True
+
+    def _start_heartbeat(self, job_):
+        """Renew the job's lease every third of its length until the returned event is set."""
+        lease = getattr(self.backend, 'lease_seconds', None)
+        if not lease:
+            return None
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(lease / 3):
+                try:
+                    self.backend.extend(job_)
+                except Exception:
+                    logger.exception('Could not renew the lease of job %s (%s)', job_.name, job_.id)
+
+        threading.Thread(target=renew, name=f'job-heartbeat-{job_.id}', daemon=True).start()
+        return done
+
+    def _handle_failure(self, job_, spec, error):
+        job_.attempts += 1
+        job_.last_error = error
+        max_retries = spec.max_retries if spec else 0
+        if job_.attempts > max_retries:
+            logger.error('Job %s (%s) dead-lettered after %d attempts', job_.name, job_.id, job_.attempts)
+            self.backend.bury(job_)
+            return
+        retry_in = spec.backoff * (2 ** (job_.attempts - 1))
+        logger.warning('Job %s (%s) failed, retrying in %.0fs', job_.name, job_.id, retry_in)
+        job_.run_at = time.time() + retry_in
+        self.backend.push(job_)
+
+    def run_pending(self) -> int:
+        """Run every currently runnable job and return how many ran."""
+        count = 0
+        while self.run_one(timeout=0):
+            count += 1
+        return count
+
+    def run(self, burst=False):
+        """
+        Process jobs until stopped.
+
+        Args:
+            burst (bool): Exit once no runnable job is left
+        """
+        while not self._stopping.is_set():
+            if not self.run_one() and burst:
+                return
@@ -0,0 +1,73 @@
+"""
+Lifecycle of per-process in-memory indexes.
+
+``LocalIndex`` builds an index lazily on first use, keeps it in
+``app.extensions``, applies committed guide changes from this process via
+the ``guides_changed`` signal, and swaps in a fresh build from a
+background thread once the index is older than its TTL (to pick up writes
+made by other workers).
+"""
+
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+from app import db
+from app.services.guide_events import guides_changed
+
+
+class LocalIndex:
+    """
+    Lazily built, incrementally maintained per-process index.
+
+    Args:
+        name (str): Key under ``app.extensions``
+        loader (callable): Builds a new index; runs in an app context
+        ttl_setting (str): Config key holding the TTL in seconds
+        default_ttl (float): TTL used when the setting is absent
+
+    The index object must provide ``apply(snapshots)``.
+    """
+
+    def __init__(self, name, loader, ttl_setting, default_ttl=300):
+        self.name = name
+        self.loader = loader
+        self.ttl_setting = ttl_setting
+        self.default_ttl = default_ttl
+        self._rebuild_lock = threading.Lock()
+        guides_changed.connect(self._on_guides_changed, weak=False)
+
+    def get(self):
+        """Return the current index, building or refreshing it as needed."""
+        app = current_app._get_current_object()
+        entry = app.extensions.get(self.name)
+        if entry is None:
+            entry = app.extensions.setdefault(self.name, (time.monotonic(), self.loader()))
+        elif time.monotonic() - entry[0] > app.config.get(self.ttl_setting, self.default_ttl):
+            if self._rebuild_lock.acquire(blocking=False):
+                threading.Thread(target=self._rebuild, args=(app,), daemon=True).start()
+        return entry[1]
+
+    def rebuild(self):
+        """Synchronously rebuild and swap in a fresh index."""
+        index = self.loader()
+        current_app.extensions[self.name] = (time.monotonic(), index)
+        return index
+
+    def _rebuild(self, app):
+        try:
+            with app.app_context():
+                try:
+                    self.rebuild()
+                finally:
+                    db.session.remove()
+        finally:
+            self._rebuild_lock.release()
+
+    def _on_guides_changed(self, sender, snapshots):
+        if not has_app_context():
+            return
+        entry = current_app.extensions.get(self.name)
+        if entry is not None:
+            entry[1].apply(snapshots)
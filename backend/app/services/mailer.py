@@ -0,0 +1,42 @@
+"""
+Outgoing email delivery.
+
+Sends through SMTP when ``MAIL_SERVER`` is configured; otherwise the message
+is only logged, which keeps development and tests free of mail setup.
+"""
+
+import logging
+import smtplib
+from email.message import EmailMessage
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+def send_email(to: str, subject: str, body: str):
+    """
+    Send a plain-text email.
+
+    Args:
+        to (str): Recipient address
+        subject (str): Subject line
+        body (str): Plain-text body
+    """
+    config = current_app.config
+    if not config.get('MAIL_SERVER'):
+        logger.info('MAIL_SERVER not configured; email to %s not sent: %s', to, subject)
+        return
+
+    message = EmailMessage()
+    message['From'] = config.get('MAIL_DEFAULT_SENDER', 'no-reply@ai-tour-guide.local')
+    message['To'] = to
+    message['Subject'] = subject
+    message.set_content(body)
+
+    with smtplib.SMTP(config['MAIL_SERVER'], int(config.get('MAIL_PORT', 587)), timeout=10) as smtp:
+        if config.get('MAIL_USE_TLS', True):
+            smtp.starttls()
+        if config.get('MAIL_USERNAME'):
+            smtp.login(config['MAIL_USERNAME'], config.get('MAIL_PASSWORD', ''))
+        smtp.send_message(message)
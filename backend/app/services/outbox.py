@@ -0,0 +1,246 @@
+"""
+Transactional outbox and change feed for users and guides.
+
+Mapper listeners append an ``outbox_events`` row for every inserted,
+updated or deleted ``User``/``Guide`` on the flush connection, so the event
+commits (or rolls back) atomically with the change itself. Derived data in
+other processes (caches, search and vector indexes) follows the feed with
+a named consumer:
+
+    @consumer('search.reindex')
+    def reindex(events):
+        ...
+
+    consume('search.reindex', reindex)   # or: flask outbox consume search.reindex
+
+Each consumer's offset is stored in ``outbox_offsets`` and only advanced
+after its handler returns, giving at-least-once delivery: handlers must
+tolerate seeing an event again.
+
+Event IDs are allocated at insert time but become visible at commit, so a
+reader can briefly see ID 11 before a slower transaction commits ID 10.
+``read_events`` therefore stops at a gap until the event after it is older
+than ``OUTBOX_GAP_TIMEOUT`` seconds; a gap that stays open that long is a
+rolled-back transaction. Transactions running longer than the timeout can
+have their events skipped, so keep it above the longest write transaction.
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from flask import current_app
+from sqlalchemy import event, func, insert, inspect, select, update
+
+from app import db
+from app.models import Guide, OutboxEvent, OutboxOffset, User
+from app.models.outbox import EVENT_CREATED, EVENT_DELETED, EVENT_UPDATED
+from app.utils.db import insert_ignore_conflicts
+
+DEFAULT_BATCH_SIZE = 100
+
+# Seconds after which an unfilled ID gap is treated as a rolled-back transaction
+DEFAULT_GAP_TIMEOUT = 60
+
+# Changes to these columns alone are bookkeeping, not events
+IGNORED_COLUMNS = {'hashed_password', 'last_login_at', 'price_min', 'price_max'}
+
+events_table = OutboxEvent.__table__
+offsets_table = OutboxOffset.__table__
+
+
+@dataclass
+class ChangeEvent:
+    """A decoded outbox row as handed to consumers."""
+
+    id: int
+    aggregate_type: str
+    aggregate_id: str
+    event_type: str
+    payload: dict
+    created_at: datetime
+
+
+def aggregate_type(target) -> str:
+    """Outbox aggregate name for a user or guide instance."""
+    return 'guide' if isinstance(target, Guide) else 'user'
+
+
+def event_row(aggregate, event_type, aggregate_id, payload) -> dict:
+    """Build the values for one outbox row."""
+    return {
+        'aggregate_type': aggregate,
+        'aggregate_id': aggregate_id,
+        'event_type': event_type,
+        'payload': json.dumps(payload, sort_keys=True, separators=(',', ':')),
+        'created_at': datetime.utcnow(),
+    }
+
+
+def append_events(connection, rows):
+    """
+    Insert outbox rows on ``connection`` (the flush connection or the session).
+
+    Callers writing users with Core statements use this to keep the feed
+    complete; the ORM path is covered by the mapper listeners below.
+    """
+    if rows:
+        connection.execute(insert(events_table), rows)
+
+
+def _changed_columns(target):
+    state = inspect(target)
+    return {attr.key for attr in state.mapper.column_attrs if state.attrs[attr.key].history.has_changes()}
+
+
+@event.listens_for(User, 'after_insert', propagate=True)
+def _user_inserted(mapper, connection, target):
+    append_events(connection, [event_row(aggregate_type(target), EVENT_CREATED, target.id, target.to_dict())])
+
+
+@event.listens_for(User, 'after_update', propagate=True)
+def _user_updated(mapper, connection, target):
+    if _changed_columns(target) - IGNORED_COLUMNS:
+        append_events(connection, [event_row(aggregate_type(target), EVENT_UPDATED, target.id, target.to_dict())])
+
+
+@event.listens_for(User, 'after_delete', propagate=True)
+def _user_deleted(mapper, connection, target):
+    append_events(connection, [
+        event_row(aggregate_type(target), EVENT_DELETED, target.id, {'id': target.id, 'email': target.email})
+    ])
+
+
+def read_events(after_id, limit=DEFAULT_BATCH_SIZE, gap_timeout=None):
+    """
+    Read committed events after ``after_id`` in ID order.
+
+    Stops before the first ID gap that may still be filled by an in-flight
+    transaction (see the module docstring).
+
+    Args:
+        after_id (int): Last event ID already processed
+        limit (int): Maximum events to return
+        gap_timeout (float): Seconds before a gap is skipped (defaults to
+            ``OUTBOX_GAP_TIMEOUT``)
+
+    Returns:
+        list: ``ChangeEvent`` objects, possibly empty
+    """
+    if gap_timeout is None:
+        gap_timeout = current_app.config.get('OUTBOX_GAP_TIMEOUT', DEFAULT_GAP_TIMEOUT)
+    settled_before = datetime.utcnow() - timedelta(seconds=gap_timeout)
+    rows = db.session.execute(
+        select(events_table).where(events_table.c.id > after_id).order_by(events_table.c.id).limit(limit)
+    ).all()
+
+    events = []
+    expected = after_id + 1
+    for row in rows:
+        if row.id != expected and row.created_at > settled_before:
+            break
+        events.append(ChangeEvent(
+            id=row.id, aggregate_type=row.aggregate_type, aggregate_id=row.aggregate_id,
+            event_type=row.event_type, payload=json.loads(row.payload), created_at=row.created_at,
+        ))
+        expected = row.id + 1
+    return events
+
+
+def get_offset(name) -> int:
+    """Return a consumer's offset, registering it at 0 on first use."""
+    insert_ignore_conflicts(
+        offsets_table, [{'consumer': name, 'last_event_id': 0, 'updated_at': datetime.utcnow()}],
+        index_elements=['consumer'], returning=[offsets_table.c.consumer],
+    )
+    db.session.commit()
+    return db.session.execute(
+        select(offsets_table.c.last_event_id).where(offsets_table.c.consumer == name)
+    ).scalar()
+
+
+def commit_offset(name, event_id):
+    """Advance a consumer's offset to ``event_id`` (never moves it backwards)."""
+    db.session.execute(
+        update(offsets_table)
+        .where(offsets_table.c.consumer == name, offsets_table.c.last_event_id < event_id)
+        .values(last_event_id=event_id, updated_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def consume(name, handler, batch_size=DEFAULT_BATCH_SIZE, max_batches=None, follow=False,
+            poll_interval=1.0) -> int:
+    """
+    Feed outbox events to ``handler`` in batches, committing the offset after each.
+
+    If the handler raises, the offset stays put and the same events are
+    delivered again on the next run.
+
+    Args:
+        name (str): Consumer name (offset key)
+        handler (callable): Called with each non-empty list of ``ChangeEvent``
+        batch_size (int): Maximum events per batch
+        max_batches (int): Stop after this many batches
+        follow (bool): Keep polling instead of returning when caught up
+        poll_interval (float): Seconds to sleep between polls when following
+
+    Returns:
+        int: Number of events delivered
+    """
+    offset = get_offset(name)
+    delivered = batches = 0
+    while max_batches is None or batches < max_batches:
+        events = read_events(offset, batch_size)
+        db.session.commit()
+        if not events:
+            if not follow:
+                break
+            time.sleep(poll_interval)
+            continue
+        handler(events)
+        offset = events[-1].id
+        commit_offset(name, offset)
+        delivered += len(events)
+        batches += 1
+    return delivered
+
+
+def consumer_status() -> list:
+    """Offsets and lag (events behind the head) of every consumer."""
+    head = db.session.execute(select(func.max(events_table.c.id))).scalar() or 0
+    offsets = OutboxOffset.query.order_by(OutboxOffset.consumer).all()
+    return [dict(offset.to_dict(), lag=head - offset.last_event_id) for offset in offsets]
+
+
+def prune(older_than_days) -> int:
+    """
+    Delete events every consumer has processed and that are older than the window.
+
+    Returns:
+        int: Number of events deleted
+    """
+    low_water = db.session.execute(select(func.min(offsets_table.c.last_event_id))).scalar()
+    if low_water is None:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = db.session.execute(
+        events_table.delete().where(events_table.c.id <= low_water, events_table.c.created_at < cutoff)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+registry = {}
+
+
+def consumer(name):
+    """Register ``handler(events)`` as the named consumer for ``flask outbox consume``."""
+
+    def decorator(handler: Callable):
+        registry[name] = handler
+        return handler
+
+    return decorator
@@ -0,0 +1,274 @@
+"""
+Guide photo storage, thumbnails and serving.
+
+Uploads are parsed straight off the WSGI input stream: each multipart file
+part is written chunk by chunk to a temporary file inside the storage
+directory while its SHA-256 is computed, so no request holds a whole image
+in memory. The finished file is renamed (atomically, same filesystem) to
+its content address ``ab/cd/<digest>.<ext>``; re-uploading an identical
+image reuses the stored file.
+
+Thumbnails are rendered by a background job that fans the sizes out to a
+process pool, keeping image decoding off the web workers and the GIL.
+Pillow is only imported inside the pool's child processes.
+
+Files are immutable once written, so responses carry a one-year
+``immutable`` cache lifetime and the digest as a strong ETag. With
+``PHOTO_ACCEL_REDIRECT`` set, nginx serves the bytes via
+``X-Accel-Redirect``; otherwise ``send_file`` hands the open file to the
+WSGI server's file wrapper (``sendfile`` under gunicorn) and Werkzeug
+answers ``Range`` requests. Either way the image never passes through
+Python code in chunks.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app, send_file, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+
+# Accepted image types, detected from the file's magic bytes
+EXTENSIONS = {'image/jpeg': 'jpg', 'image/png': 'png', 'image/webp': 'webp'}
+CONTENT_TYPES = {ext: content_type for content_type, ext in EXTENSIONS.items()}
+
+# Longest side, in pixels, of each generated thumbnail
+THUMBNAIL_SIZES = (160, 480)
+THUMBNAIL_CONTENT_TYPE = 'image/jpeg'
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+# Content-addressed files never change
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+_SNIFF_BYTES = 12
+
+
+class PhotoError(Exception):
+    """An upload was rejected; ``status`` is the HTTP status to return."""
+
+    status = 400
+
+
+class PhotoTooLarge(PhotoError):
+    status = 413
+
+
+def sniff_content_type(head: bytes):
+    """Return the image content type for a file's first bytes, or None."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def storage_root() -> str:
+    return current_app.config.get('PHOTO_STORAGE_DIR') or os.path.join(current_app.instance_path, 'photos')
+
+
+def photo_path(digest, content_type) -> str:
+    """Storage path of an original, relative to the storage root."""
+    return f'{digest[:2]}/{digest[2:4]}/{digest}.{EXTENSIONS[content_type]}'
+
+
+def thumbnail_path(digest, size) -> str:
+    """Storage path of a thumbnail, relative to the storage root."""
+    return f'thumbs/{size}/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+
+
+def photo_url(digest, content_type) -> str:
+    return url_for('photos.serve_photo', filename=f'{digest}.{EXTENSIONS[content_type]}')
+
+
+def thumbnail_urls(digest) -> dict:
+    return {
+        str(size): url_for('photos.serve_thumbnail', size=size, filename=f'{digest}.jpg')
+        for size in THUMBNAIL_SIZES
+    }
+
+
+def describe(photo) -> dict:
+    """Public representation of a ``GuidePhoto`` including its URLs."""
+    data = photo.to_dict()
+    data['url'] = photo_url(photo.digest, photo.content_type)
+    data['thumbnails'] = thumbnail_urls(photo.digest) if photo.thumbnails_ready else {}
+    return data
+
+
+class _HashingFile:
+    """Temporary file that hashes, sizes and sniffs what is written to it."""
+
+    def __init__(self, directory, max_bytes):
+        self.file = tempfile.NamedTemporaryFile(dir=directory, prefix='upload-', delete=False)
+        self.max_bytes = max_bytes
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise PhotoTooLarge(f'Photos must be at most {self.max_bytes // (1024 * 1024)} MB')
+        if len(self.head) < _SNIFF_BYTES:
+            self.head += data[:_SNIFF_BYTES - len(self.head)]
+        self.sha256.update(data)
+        return self.file.write(data)
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.file.name):
+            os.unlink(self.file.name)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def store_upload(environ, field='photo', max_bytes=None):
+    """
+    Stream the ``field`` file of a multipart request into content-addressed storage.
+
+    The whole body is bounded by ``MAX_CONTENT_LENGTH``, as for any request
+    Flask parses itself; this matters for chunked bodies, which declare no
+    length up front.
+
+    Args:
+        environ (dict): WSGI environ of the request (its body is consumed)
+        field (str): Form field holding the image
+        max_bytes (int): Largest accepted image (defaults to ``PHOTO_MAX_BYTES``)
+
+    Returns:
+        tuple: ``(digest, content_type, size_bytes)``
+
+    Raises:
+        PhotoError: If the file is missing, too large or not a supported image
+    """
+    max_bytes = max_bytes or current_app.config.get('PHOTO_MAX_BYTES', DEFAULT_MAX_BYTES)
+    root = storage_root()
+    tmp_dir = os.path.join(root, 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    writers = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        writer = _HashingFile(tmp_dir, max_bytes)
+        writers.append(writer)
+        return writer
+
+    try:
+        max_content_length = current_app.config.get('MAX_CONTENT_LENGTH')
+        try:
+            _, _, files = parse_form_data(
+                environ, stream_factory=stream_factory, silent=False, max_content_length=max_content_length,
+            )
+        except RequestEntityTooLarge:
+            raise PhotoTooLarge(f'Request body must be at most {max_content_length} bytes')
+        upload = files.get(field)
+        if upload is None:
+            raise PhotoError(f'{field} file is required')
+        writer = upload.stream
+        content_type = sniff_content_type(writer.head)
+        if content_type is None:
+            raise PhotoError('Photo must be a JPEG, PNG or WebP image')
+
+        writer.file.flush()
+        os.fsync(writer.file.fileno())
+        writer.file.close()
+        digest = writer.sha256.hexdigest()
+        destination = os.path.join(root, photo_path(digest, content_type))
+        if not os.path.exists(destination):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.chmod(writer.file.name, 0o644)
+            os.replace(writer.file.name, destination)
+        return digest, content_type, writer.size
+    finally:
+        for writer in writers:
+            writer.discard()
+
+
+def render_thumbnail(source, destination, size):
+    """
+    Write a JPEG thumbnail of ``source`` no larger than ``size`` pixels.
+
+    Runs in a pool process; only this function imports Pillow.
+    """
+    from PIL import Image, ImageOps
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    partial = f'{destination}.{os.getpid()}.tmp'
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(partial, 'JPEG', quality=85, optimize=True, progressive=True)
+    os.chmod(partial, 0o644)
+    os.replace(partial, destination)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _thumbnail_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the parent has DB connections and threads that must not be forked
+            _pool = ProcessPoolExecutor(
+                max_workers=current_app.config.get('PHOTO_THUMBNAIL_WORKERS') or None,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def generate_thumbnails(digest, content_type) -> int:
+    """
+    Render every missing thumbnail size for a stored photo in the process pool.
+
+    Returns:
+        int: Number of thumbnails rendered
+    """
+    root = storage_root()
+    source = os.path.join(root, photo_path(digest, content_type))
+    pending = [
+        (os.path.join(root, thumbnail_path(digest, size)), size)
+        for size in THUMBNAIL_SIZES
+        if not os.path.exists(os.path.join(root, thumbnail_path(digest, size)))
+    ]
+    pool = _thumbnail_pool()
+    futures = [pool.submit(render_thumbnail, source, destination, size) for destination, size in pending]
+    for future in futures:
+        future.result()
+    return len(futures)
+
+
+def send_photo(relative_path, content_type, digest):
+    """
+    Respond with a stored file without copying it through Python.
+
+    Returns:
+        Response: The file response, or None if the file does not exist
+    """
+    path = os.path.join(storage_root(), relative_path)
+    if not os.path.isfile(path):
+        return None
+
+    prefix = current_app.config.get('PHOTO_ACCEL_REDIRECT')
+    if prefix:
+        response = current_app.response_class(mimetype=content_type)
+        response.headers['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{relative_path}"
+        response.set_etag(digest)
+    else:
+        response = send_file(path, mimetype=content_type, etag=digest, conditional=True, max_age=IMMUTABLE_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return response
@@ -0,0 +1,316 @@
+"""
+Sampling profiler for individual requests and for live traffic.
+
+Sampling happens on a separate thread. Every interval it reads the target
+threads' current frames (``sys._current_frames``) and counts their call
+stacks. The request itself is never traced, so the overhead is the
+sampler's own work and nothing more. Output uses the collapsed-stack format
+read by flamegraph.pl, speedscope and inferno:
+
+    flask.app:Flask.wsgi_app;...;app.routes.guides:list_guides 42
+
+There are two modes:
+
+* **Per request:** a request with ``X-Profile: 1`` (or ``?_profile=1``)
+  that also carries a valid ``X-Admin-Token`` is sampled every
+  ``PROFILER_INTERVAL_MS``. The profile is kept in a per-process buffer
+  of ``PROFILER_KEEP`` entries (and written to ``PROFILER_OUTPUT_DIR`` as
+  ``<id>.collapsed`` when that is set). The response gets
+  ``X-Profile-Id``; fetch the profile with
+  ``GET /api/admin/profiles/<id>``. ``X-Profile: inline`` returns the
+  collapsed stacks as the response body instead, with the view's status in
+  ``X-Profile-Status``. Without a valid token the flag is ignored.
+* **Continuous:** with ``PROFILER_CONTINUOUS_HZ`` set, one thread per
+  process samples every in-flight request at that rate. Stacks are
+  prefixed with the endpoint and aggregated until read from
+  ``GET /api/admin/profiles/continuous``. A few Hz is enough to find hot
+  paths over minutes of traffic at negligible cost.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+
+from flask import current_app, g, request
+
+from app.utils.admin_auth import admin_token_valid
+
+HEADER = 'X-Profile'
+QUERY_FLAG = '_profile'
+ID_HEADER = 'X-Profile-Id'
+INLINE = 'inline'
+
+DEFAULT_INTERVAL_MS = 5
+DEFAULT_KEEP = 20
+
+# Innermost frames kept per sample
+MAX_DEPTH = 128
+
+# Distinct stacks aggregated by the continuous sampler before folding into "[other]"
+MAX_STACKS = 20000
+
+_labels = {}
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    label = _labels.get(code)
+    if label is None:
+        module = frame.f_globals.get('__name__', '?')
+        label = _labels[code] = f'{module}:{getattr(code, "co_qualname", code.co_name)}'
+    return label
+
+
+def collapse(frame) -> str:
+    """Render ``frame``'s stack root-first as ``a;b;c``."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ';'.join(labels)
+
+
+class Profile:
+    """
+    Thread-safe counts of collapsed stacks.
+
+    Args:
+        max_stacks (int): Distinct stacks kept; later new stacks count as ``[other]``
+    """
+
+    def __init__(self, max_stacks=None):
+        self.max_stacks = max_stacks
+        self.samples = 0
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, stack):
+        with self._lock:
+            if self.max_stacks and stack not in self._stacks and len(self._stacks) >= self.max_stacks:
+                stack = '[other]'
+            self._stacks[stack] += 1
+            self.samples += 1
+
+    def clear(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def collapsed(self, prefix=None) -> str:
+        """Collapsed-stack text, most sampled first, optionally only stacks under ``prefix``."""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        if prefix:
+            stacks = [(stack, count) for stack, count in stacks if stack.startswith(prefix + ';')]
+        return ''.join(f'{stack} {count}\n' for stack, count in stacks)
+
+
+class RequestSampler:
+    """
+    Samples one thread's stack every ``interval`` seconds until stopped.
+
+    Args:
+        thread_id (int): ``threading.get_ident()`` of the thread to sample
+        interval (float): Seconds between samples
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.profile = Profile()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        return self.profile
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.profile.add(collapse(frame))
+
+
+class ContinuousSampler:
+    """
+    Samples every registered request thread at ``hz``, keyed by endpoint.
+
+    Args:
+        hz (float): Samples per second
+    """
+
+    def __init__(self, hz):
+        self.interval = 1 / hz
+        self.profile = Profile(max_stacks=MAX_STACKS)
+        self.started_at = None
+        self._active = {}
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, thread_id, endpoint):
+        self._ensure_running()
+        self._active[thread_id] = endpoint or 'unknown'
+
+    def unregister(self, thread_id):
+        self._active.pop(thread_id, None)
+
+    def stop(self):
+        self._stop.set()
+
+    def _ensure_running(self):
+        # A thread started before a fork does not exist in the child
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self.started_at = datetime.utcnow().isoformat()
+                threading.Thread(target=self._run, name='continuous-profiler', daemon=True).start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, endpoint in list(self._active.items()):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.profile.add(f'{endpoint};{collapse(frame)}')
+
+
+class ProfileStore:
+    """
+    The most recent per-request profiles of this process.
+
+    Args:
+        keep (int): Profiles kept in memory
+        directory (str): Optional directory profiles are also written to
+    """
+
+    def __init__(self, keep=DEFAULT_KEEP, directory=None):
+        self.directory = directory
+        self._profiles = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def add(self, meta, collapsed):
+        with self._lock:
+            self._profiles.append((meta, collapsed))
+        if self.directory:
+            path = os.path.join(self.directory, f'{meta["id"]}.collapsed')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(collapsed)
+
+    def list(self) -> list:
+        """Profile metadata, newest first."""
+        with self._lock:
+            return [meta for meta, _ in reversed(self._profiles)]
+
+    def get(self, profile_id):
+        """Collapsed stacks for ``profile_id``, or None."""
+        with self._lock:
+            for meta, collapsed in self._profiles:
+                if meta['id'] == profile_id:
+                    return collapsed
+        if self.directory and profile_id.isalnum():
+            path = os.path.join(self.directory, f'{profile_id}.collapsed')
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    return f.read()
+        return None
+
+
+def get_store(app=None) -> ProfileStore:
+    """Return this process's ``ProfileStore``, built from config on first use."""
+    app = app or current_app._get_current_object()
+    store = app.extensions.get('profiles')
+    if store is None:
+        store = app.extensions.setdefault('profiles', ProfileStore(
+            keep=app.config.get('PROFILER_KEEP', DEFAULT_KEEP),
+            directory=app.config.get('PROFILER_OUTPUT_DIR'),
+        ))
+    return store
+
+
+def get_continuous(app=None):
+    """Return the continuous sampler, or None when ``PROFILER_CONTINUOUS_HZ`` is unset."""
+    app = app or current_app._get_current_object()
+    sampler = app.extensions.get('continuous_profiler')
+    if sampler is None:
+        hz = app.config.get('PROFILER_CONTINUOUS_HZ')
+        if not hz:
+            return None
+        sampler = app.extensions.setdefault('continuous_profiler', ContinuousSampler(hz))
+    return sampler
+
+
+def _requested_mode():
+    return request.headers.get(HEADER) or request.args.get(QUERY_FLAG)
+
+
+def _start():
+    continuous = get_continuous()
+    if continuous is not None:
+        continuous.register(threading.get_ident(), request.endpoint)
+
+    mode = _requested_mode()
+    if not mode or mode == '0' or not admin_token_valid():
+        return
+    interval_ms = current_app.config.get('PROFILER_INTERVAL_MS', DEFAULT_INTERVAL_MS)
+    g.profiler = RequestSampler(threading.get_ident(), interval_ms / 1000).start()
+    g.profiler_mode = mode
+    g.profiler_started = time.perf_counter()
+
+
+def _finish(response):
+    sampler = g.pop('profiler', None)
+    if sampler is None:
+        return response
+    profile = sampler.stop()
+    meta = {
+        'id': uuid.uuid4().hex[:16],
+        'at': datetime.utcnow().isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - g.pop('profiler_started')) * 1000, 3),
+        'interval_ms': sampler.interval * 1000,
+        'samples': profile.samples,
+    }
+    collapsed = profile.collapsed()
+    get_store().add(meta, collapsed)
+
+    if g.pop('profiler_mode', None) == INLINE:
+        response = current_app.response_class(collapsed, mimetype='text/plain')
+        response.headers['X-Profile-Status'] = str(meta['status'])
+    response.headers[ID_HEADER] = meta['id']
+    response.headers['X-Profile-Samples'] = str(profile.samples)
+    return response
+
+
+def _teardown(exc=None):
+    sampler = g.pop('profiler', None)
+    if sampler is not None:
+        sampler.stop()
+    continuous = current_app.extensions.get('continuous_profiler')
+    if continuous is not None:
+        continuous.unregister(threading.get_ident())
+
+
+def init_app(app):
+    """Install the profiling hooks on ``app``."""
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.teardown_request(_teardown)
@@ -0,0 +1,146 @@
+"""
+Publish/subscribe fan-out for server-push delivery.
+
+``InProcessBroker`` delivers messages to subscribers in the same process and
+is all a single worker needs. ``RedisBroker`` relays publishes through Redis
+so that a message posted on one worker reaches streams held open by any
+other; each process keeps a single Redis subscription and fans out locally,
+so idle clients cost one queue each rather than one Redis connection each.
+"""
+
+import queue
+import threading
+
+from flask import current_app
+
+# Messages buffered per subscriber before it is considered too slow
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """
+    A subscriber's view of one channel.
+
+    When the subscriber falls more than ``SUBSCRIBER_QUEUE_SIZE`` messages
+    behind, it is marked as overflowed; streaming endpoints then end the
+    stream so the client reconnects and catches up from the database.
+    """
+
+    def __init__(self, broker, channel):
+        self._broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """
+        Wait for the next message.
+
+        Args:
+            timeout (float): Seconds to wait; ``None`` blocks indefinitely
+
+        Returns:
+            str: The message, or ``None`` if the timeout elapsed
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class InProcessBroker:
+    """Thread-safe pub/sub limited to the current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Pub/sub relayed through Redis for multi-process deployments.
+
+    Publishes go to Redis only; a background listener thread receives every
+    message on the ``channel_prefix`` pattern and fans it out to the local
+    subscribers, including those in the publishing process.
+    """
+
+    def __init__(self, url, channel_prefix='ai-tour-guide:'):
+        super().__init__()
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = channel_prefix
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, channel, message):
+        self._redis.publish(self._prefix + channel, message)
+
+    def subscribe(self, channel):
+        self._ensure_listener()
+        return super().subscribe(channel)
+
+    def _ensure_listener(self):
+        with self._listener_lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(self._prefix + '*')
+            self._listener = threading.Thread(target=self._listen, args=(pubsub,), daemon=True)
+            self._listener.start()
+
+    def _listen(self, pubsub):
+        for item in pubsub.listen():
+            channel = item['channel'].decode()[len(self._prefix):]
+            data = item['data']
+            super().publish(channel, data.decode() if isinstance(data, bytes) else data)
+
+
+def get_broker():
+    """
+    Return the application's broker, creating it on first use.
+
+    Uses Redis when ``REDIS_URL`` is configured, otherwise an in-process broker.
+    """
+    broker = current_app.extensions.get('pubsub')
+    if broker is None:
+        redis_url = current_app.config.get('REDIS_URL')
+        broker = RedisBroker(redis_url) if redis_url else InProcessBroker()
+        broker = current_app.extensions.setdefault('pubsub', broker)
+    return broker
@@ -0,0 +1,463 @@
+"""
+Natural-language guide search queries.
+
+``parse_query("English-speaking ramen expert in Tokyo under ¥10,000")``
+returns a ``ParsedQuery`` holding ``languages=['en']``, ``areas=['tokyo']``,
+``specialties=['ramen']`` and ``max_price=10000``, which converts to the
+same ``GuideFilter`` the listing endpoints use.
+
+Parsing goes through three layers:
+
+* An LRU cache of parsed queries keyed by the normalized text (entries
+  expire after ``QUERY_PARSER_CACHE_TTL`` seconds, since the vocabulary
+  they were parsed against changes as guides edit their profiles).
+* A micro-batcher: cache misses are queued to one background thread that
+  hands the backend every query waiting at that moment (up to
+  ``QUERY_PARSER_MAX_BATCH``, optionally lingering
+  ``QUERY_PARSER_BATCH_WAIT_MS`` for more). Concurrent requests for the
+  same text share one in-flight parse.
+* A pluggable ``QueryBackend``. The default ``RuleBasedBackend`` matches
+  price and rating patterns plus a dictionary built from static synonyms
+  and the live token vocabulary of the suggest index; an inference-backed
+  parser can be configured with ``QUERY_PARSER_BACKEND='module:Class'``
+  and benefits from the batching without further changes.
+
+A request that waits longer than ``PARSE_TIMEOUT`` for its batch gets
+``ParseTimeoutError``; the parse itself still completes and is cached.
+"""
+
+import importlib
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+from flask import current_app
+
+from app import db
+from app.services.guide_filters import MAX_PRICE, GuideFilter
+from app.services.suggest import suggest_index
+from app.utils.tokens import normalize_token
+
+# Longest query accepted, in characters
+MAX_QUERY_LENGTH = 200
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_CACHE_TTL = 300
+DEFAULT_MAX_BATCH = 64
+DEFAULT_BATCH_WAIT_MS = 0
+
+# Seconds a request waits for its parse before giving up
+PARSE_TIMEOUT = 5
+
+# Longest vocabulary phrase, in words, matched against the query
+MAX_PHRASE_WORDS = 4
+
+# Shorter latin tokens (language codes such as 'it' or 'no') are only
+# matched through the synonym table; they collide with ordinary words
+MIN_TOKEN_LENGTH = 3
+
+# Minimum rating implied by "top rated" and friends
+TOP_RATED = 4.5
+
+LANGUAGE_NAMES = {
+    'en': ('english', '英語'),
+    'ja': ('japanese', '日本語'),
+    'zh': ('chinese', 'mandarin', '中国語', '中文'),
+    'ko': ('korean', '韓国語', '한국어'),
+    'fr': ('french', 'français', 'フランス語'),
+    'es': ('spanish', 'español', 'スペイン語'),
+    'de': ('german', 'deutsch', 'ドイツ語'),
+    'it': ('italian', 'italiano', 'イタリア語'),
+    'pt': ('portuguese', 'português', 'ポルトガル語'),
+    'th': ('thai', 'タイ語'),
+}
+
+AREA_NAMES = {
+    'tokyo': ('東京',), 'kyoto': ('京都',), 'osaka': ('大阪',), 'nara': ('奈良',),
+    'yokohama': ('横浜',), 'kamakura': ('鎌倉',), 'hakone': ('箱根',), 'nikko': ('日光',),
+    'kanazawa': ('金沢',), 'kobe': ('神戸',), 'hiroshima': ('広島',), 'nagoya': ('名古屋',),
+    'fukuoka': ('福岡',), 'sapporo': ('札幌',), 'hokkaido': ('北海道',), 'okinawa': ('沖縄',),
+}
+
+SPECIALTY_NAMES = {
+    'food': ('foodie', 'gourmet', 'グルメ', '料理'),
+    'ramen': ('ラーメン',),
+    'sushi': ('寿司', 'すし'),
+    'sake': ('日本酒',),
+    'tea ceremony': ('茶道',),
+    'history': ('historical', '歴史'),
+    'temple': ('temples', '寺'),
+    'shrine': ('shrines', '神社'),
+    'anime': ('manga', 'アニメ'),
+    'shopping': ('ショッピング', '買い物'),
+    'nightlife': ('ナイトライフ',),
+    'hiking': ('hike', 'ハイキング', '登山'),
+    'photography': ('photo', 'photos', '写真'),
+}
+
+_MULTIPLIERS = {'k': 1000, '千': 1000, '万': 10000, 'man': 10000}
+# A whole number: not part of a longer number or of exponent notation such as 1e400
+_AMOUNT = (r'(?<![\d.,])(?<!\de)(\d+(?:,\d{3})*(?:\.\d+)?)(?![.,]?\d|e[+-]?\d)'
+           r'\s*(?:(k|千|万|man)(?![a-z]))?')
+PRICE_PATTERNS = (
+    re.compile(
+        r'(?:under|below|less than|cheaper than|max(?:imum)?|up to|within|at most|no more than'
+        r'|budget(?: of)?|予算|<=?)\s*(?:¥|\$|jpy)?\s*' + _AMOUNT + r'\s*(?:yen|円|jpy)?'
+    ),
+    re.compile(r'¥?\s*' + _AMOUNT + r'\s*(?:yen|円)?\s*(?:以下|以内|まで|未満|or less|or under|max)'),
+)
+RATING_PATTERNS = (
+    re.compile(r'(\d(?:\.\d)?)\s*\+?\s*(?:stars?|★)(?:\s*(?:\+|and up|or (?:more|higher|above)|以上))?'),
+    re.compile(r'(?:rated|rating|評価)\s*(?:of\s*)?(?:at least\s*|>=?\s*)?(\d(?:\.\d)?)'
+               r'(?:\s*(?:\+|以上|or (?:more|higher|above)))?'),
+)
+TOP_RATED_PATTERN = re.compile(r'(?:top|highly|best)[\s-]rated|高評価')
+
+# Runs of word characters outside the CJK blocks; CJK text has no spaces
+_WORD = re.compile(r'(?:(?![⺀-￯])[^\W_])+')
+_CJK = re.compile(r'[⺀-￯]')
+
+
+class ParseTimeoutError(Exception):
+    """The parse did not finish within the request's timeout."""
+
+
+def normalize_query(text) -> str:
+    """Fold width and case and collapse whitespace (the cache key)."""
+    return ' '.join(normalize_token(text).split())
+
+
+@dataclass
+class ParsedQuery:
+    """Structured filters extracted from a search query."""
+
+    query: str
+    languages: List[str] = field(default_factory=list)
+    areas: List[str] = field(default_factory=list)
+    specialties: List[str] = field(default_factory=list)
+    min_rating: Optional[float] = None
+    max_price: Optional[int] = None
+
+    def to_filter(self, **extra) -> GuideFilter:
+        """Build a ``GuideFilter``; ``extra`` sets the remaining fields (availability)."""
+        return GuideFilter(
+            languages=list(self.languages),
+            areas=list(self.areas),
+            specialties=list(self.specialties),
+            min_rating=self.min_rating,
+            max_price=self.max_price,
+            **extra,
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class QueryBackend:
+    """Turns batches of normalized queries into ``ParsedQuery`` objects."""
+
+    def parse_batch(self, queries) -> list:
+        """
+        Parse several queries in one call.
+
+        Args:
+            queries (list): Normalized query strings (no duplicates)
+
+        Returns:
+            list: One ``ParsedQuery`` per query, in order
+        """
+        raise NotImplementedError
+
+
+class _Dictionary:
+    """Phrase lookup tables for one vocabulary snapshot."""
+
+    def __init__(self, vocabulary):
+        # phrase -> [(field, token)]; spaced phrases are looked up by word
+        # n-gram, unspaced (CJK) phrases by substring search
+        self.spaced = {}
+        self.unspaced = {}
+
+        def add(phrase, field_name, token):
+            phrase = normalize_query(phrase)
+            if not phrase:
+                return
+            table = self.unspaced if _CJK.search(phrase) else self.spaced
+            entries = table.setdefault(phrase, [])
+            if (field_name, token) not in entries:
+                entries.append((field_name, token))
+
+        languages = set(vocabulary.get('languages', ()))
+        for code, names in LANGUAGE_NAMES.items():
+            # Emit the spelling the guides actually use, else the ISO code
+            known = [form for form in (code, *names) if form in languages]
+            for name in names:
+                for token in known or [code]:
+                    add(name, 'languages', token)
+        for field_name, table in (('areas', AREA_NAMES), ('specialties', SPECIALTY_NAMES)):
+            for canonical, aliases in table.items():
+                for phrase in (canonical, *aliases):
+                    add(phrase, field_name, canonical)
+
+        for field_name, tokens in vocabulary.items():
+            for token in tokens:
+                if len(token) >= MIN_TOKEN_LENGTH or _CJK.search(token):
+                    add(token, field_name, token)
+
+        self.unspaced_order = sorted(self.unspaced, key=len, reverse=True)
+
+
+class RuleBasedBackend(QueryBackend):
+    """Pattern and dictionary matching; no model, no network."""
+
+    def __init__(self):
+        self._dictionary = None
+        self._dictionary_tokens = ()
+
+    def parse_batch(self, queries) -> list:
+        dictionary = self._current_dictionary()
+        return [self.parse(text, dictionary) for text in queries]
+
+    def _current_dictionary(self):
+        """Rebuild the phrase tables only when the suggest index was swapped or changed."""
+        index = suggest_index.get()
+        vocabulary = {name: index.tokens(name) for name in ('languages', 'areas', 'specialties')}
+        # Hold on to the token lists: an id() of a freed list can be reused by its replacement
+        tokens = tuple(vocabulary.values())
+        if len(tokens) != len(self._dictionary_tokens) or any(
+            new is not old for new, old in zip(tokens, self._dictionary_tokens)
+        ):
+            self._dictionary = _Dictionary(vocabulary)
+            self._dictionary_tokens = tokens
+        return self._dictionary
+
+    def parse(self, text, dictionary) -> ParsedQuery:
+        """Parse one normalized query against ``dictionary``."""
+        parsed = ParsedQuery(query=text)
+        taken = []
+
+        def free(start, end):
+            return all(end <= s or start >= e for s, e in taken)
+
+        for pattern in PRICE_PATTERNS:
+            match = pattern.search(text)
+            if match and parsed.max_price is None:
+                amount = float(match.group(1).replace(',', '')) * _MULTIPLIERS.get(match.group(2), 1)
+                parsed.max_price = int(min(amount, MAX_PRICE))
+                taken.append(match.span())
+
+        for pattern in RATING_PATTERNS:
+            match = pattern.search(text)
+            if match and parsed.min_rating is None and free(*match.span()):
+                rating = float(match.group(1))
+                if 0 < rating <= 5:
+                    parsed.min_rating = rating
+                    taken.append(match.span())
+        if parsed.min_rating is None and TOP_RATED_PATTERN.search(text):
+            parsed.min_rating = TOP_RATED
+
+        def emit(entries, span):
+            taken.append(span)
+            for field_name, token in entries:
+                values = getattr(parsed, field_name)
+                if token not in values:
+                    values.append(token)
+
+        # Longest phrases first so "tea ceremony" wins over "tea"
+        words = list(_WORD.finditer(text))
+        for size in range(min(MAX_PHRASE_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                span = (words[i].start(), words[i + size - 1].end())
+                entries = dictionary.spaced.get(' '.join(w.group() for w in words[i:i + size]))
+                if entries and free(*span):
+                    emit(entries, span)
+        for phrase in dictionary.unspaced_order:
+            for match in re.finditer(re.escape(phrase), text):
+                if free(*match.span()):
+                    emit(dictionary.unspaced[phrase], match.span())
+        return parsed
+
+
+class LRUCache:
+    """Size-bounded, thread-safe mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+class QueryParser:
+    """
+    Cache in front of a micro-batching worker in front of a backend.
+
+    Args:
+        app (Flask): Application the worker thread runs its batches in
+        backend (QueryBackend): Parser implementation
+        cache_size (int): Parsed queries kept
+        cache_ttl (float): Seconds a parsed query stays valid
+        max_batch (int): Most queries handed to the backend at once
+        batch_wait (float): Seconds a batch lingers for more queries
+    """
+
+    def __init__(self, app, backend, cache_size=DEFAULT_CACHE_SIZE, cache_ttl=DEFAULT_CACHE_TTL,
+                 max_batch=DEFAULT_MAX_BATCH, batch_wait=DEFAULT_BATCH_WAIT_MS / 1000):
+        self.app = app
+        self.backend = backend
+        self.cache = LRUCache(cache_size, cache_ttl)
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.batches = 0
+        self.batched_queries = 0
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def parse(self, text, timeout=PARSE_TIMEOUT) -> ParsedQuery:
+        """
+        Return the parse of ``text``, waiting for the worker on a cache miss.
+
+        Raises:
+            ParseTimeoutError: If the worker has not parsed ``text`` within ``timeout`` seconds
+        """
+        key = normalize_query(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = Future()
+                self._queue.put(key)
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name='query-parser', daemon=True)
+                    self._worker.start()
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            raise ParseTimeoutError(f'Query not parsed within {timeout}s') from None
+
+    def _run(self):
+        while True:
+            keys = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(keys) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    keys.append(self._queue.get(block=remaining > 0, timeout=max(remaining, 0) or None))
+                except queue.Empty:
+                    break
+            try:
+                self._dispatch(keys)
+            except Exception as e:
+                # Keep the worker alive; fail whatever the batch left unresolved
+                self.app.logger.exception('Query parser batch failed')
+                with self._lock:
+                    futures = [self._pending.pop(key, None) for key in keys]
+                for future in futures:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+
+    def _dispatch(self, keys):
+        results, error = None, None
+        try:
+            with self.app.app_context():
+                try:
+                    parsed = list(self.backend.parse_batch(keys))
+                finally:
+                    db.session.remove()
+            if len(parsed) != len(keys):
+                raise ValueError(f'Backend returned {len(parsed)} results for {len(keys)} queries')
+            results = parsed
+        except Exception as e:
+            self.app.logger.exception('Query parser backend failed')
+            error = e
+
+        if results is not None:
+            for key, result in zip(keys, results):
+                self.cache.put(key, result)
+        with self._lock:
+            futures = [self._pending.pop(key) for key in keys]
+            self.batches += 1
+            self.batched_queries += len(keys)
+        for i, future in enumerate(futures):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches, queries = self.batches, self.batched_queries
+        return {
+            'cache': self.cache.stats(),
+            'batches': batches,
+            'queries': queries,
+            'mean_batch_size': round(queries / batches, 2) if batches else 0,
+        }
+
+
+def load_backend(name) -> QueryBackend:
+    """Instantiate the backend named by ``QUERY_PARSER_BACKEND`` ('rules' or 'module:Class')."""
+    if not name or name == 'rules':
+        return RuleBasedBackend()
+    module_name, _, class_name = name.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def get_parser(app) -> QueryParser:
+    """Return the application's parser, creating it on first use."""
+    parser = app.extensions.get('query_parser')
+    if parser is None:
+        config = app.config
+        parser = app.extensions.setdefault('query_parser', QueryParser(
+            app,
+            load_backend(config.get('QUERY_PARSER_BACKEND')),
+            cache_size=config.get('QUERY_PARSER_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+            cache_ttl=config.get('QUERY_PARSER_CACHE_TTL', DEFAULT_CACHE_TTL),
+            max_batch=config.get('QUERY_PARSER_MAX_BATCH', DEFAULT_MAX_BATCH),
+            batch_wait=config.get('QUERY_PARSER_BATCH_WAIT_MS', DEFAULT_BATCH_WAIT_MS) / 1000,
+        ))
+    return parser
+
+
+def parse_query(text) -> ParsedQuery:
+    """Parse a search query with the current application's parser."""
+    return get_parser(current_app._get_current_object()).parse(text)
+
+
+def metrics() -> dict:
+    """Cache and batching counters, or an empty dict before the first parse."""
+    parser = current_app.extensions.get('query_parser')
+    return parser.stats() if parser is not None else {}
@@ -0,0 +1,244 @@
+"""
+Saved guide searches and reverse matching of guides against them.
+
+Instead of re-running every saved search when a guide changes, each search
+is stored in a reverse index (``saved_search_terms``) under the terms of one
+anchor field, keyed by each term's first ``GRAM_LENGTH`` characters. Since
+the filters match tokens partially, a term can only match a guide if its
+gram is a substring of one of the guide's tokens; the guide's candidate
+searches are those whose gram is among its short substrings (at most
+``GRAM_LENGTH`` keys per character), plus the few searches without language
+or area criteria. Only candidates are checked against the full filter.
+
+Matching runs when a guide is inserted and when an update changes one of
+``PERCOLATE_FIELDS`` (login touches and other edits do not re-match). It
+runs in the flush that writes the guide, on the flush connection,
+so the recorded matches commit atomically with the guide. After commit the
+new matches of the whole transaction are enqueued as one notification job.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import and_, delete, event, inspect, or_, select
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Guide, SavedSearch, SavedSearchMatch, SavedSearchTerm, User
+from app.models.saved_search import GRAM_LENGTH
+from app.services.guide_filters import split_param
+from app.tasks import notify_saved_search_matches
+from app.utils.db import insert_ignore_conflicts
+from app.utils.tokens import normalize_token, split_tokens
+
+# Anchor used by searches without language or area criteria
+MATCH_ALL = ('*', '')
+
+# Fields that can anchor a search, in order of preference (most selective first)
+ANCHOR_FIELDS = ('areas', 'languages')
+
+# Longest storable search term (``SavedSearchTerm.term``)
+MAX_TERM_LENGTH = 64
+
+# Guide columns that can change whether a search matches
+PERCOLATE_FIELDS = ANCHOR_FIELDS + ('rating',)
+
+_PENDING_KEY = 'pending_saved_search_matches'
+
+logger = logging.getLogger(__name__)
+
+searches_table = SavedSearch.__table__
+terms_table = SavedSearchTerm.__table__
+users_table = User.__table__
+
+
+def search_terms(search):
+    """
+    Return the normalized ``(field, term)`` pairs a search is indexed under.
+
+    Args:
+        search: ``SavedSearch`` or a row with ``languages`` and ``areas``
+
+    Returns:
+        list: Reverse index keys for the search
+    """
+    for name in ANCHOR_FIELDS:
+        terms = {normalize_token(term) for term in split_param(getattr(search, name))}
+        if terms:
+            return sorted((name, term) for term in terms)
+    return [MATCH_ALL]
+
+
+def guide_keys(guide):
+    """
+    Return the reverse index keys that could select ``guide``.
+
+    Every substring of at most ``GRAM_LENGTH`` characters of every token of
+    the guide's anchor fields is a key: a search term occurring anywhere in
+    a token has its gram (leading characters) there too.
+    """
+    keys = {name: set() for name in ANCHOR_FIELDS}
+    for name in ANCHOR_FIELDS:
+        for token in split_tokens(getattr(guide, name)):
+            for start in range(len(token)):
+                for end in range(start + 1, min(len(token), start + GRAM_LENGTH) + 1):
+                    keys[name].add(token[start:end])
+    return keys
+
+
+def matches(search, guide) -> bool:
+    """
+    Check a guide against a saved search with ``/api/guides`` semantics.
+
+    Args:
+        search: Row with ``languages``, ``areas`` and ``min_rating``
+        guide: Object with ``languages``, ``areas`` and ``rating``
+    """
+    for name in ANCHOR_FIELDS:
+        terms = [normalize_token(term) for term in split_param(getattr(search, name))]
+        if terms:
+            value = normalize_token(getattr(guide, name) or '')
+            if not any(term in value for term in terms):
+                return False
+    if search.min_rating is not None:
+        if guide.rating is None or guide.rating < search.min_rating:
+            return False
+    return True
+
+
+def create_saved_search(traveler_id, name=None, languages=None, areas=None, min_rating=None):
+    """
+    Store a saved search together with its reverse index entries.
+
+    Args:
+        traveler_id (str): Owner of the search
+        name (str): Optional label
+        languages (str): Comma-separated language terms
+        areas (str): Comma-separated area terms
+        min_rating (float): Inclusive minimum rating
+
+    Returns:
+        SavedSearch: The committed search
+    """
+    search = SavedSearch(
+        traveler_id=traveler_id, name=name, languages=languages, areas=areas, min_rating=min_rating
+    )
+    db.session.add(search)
+    db.session.flush()
+    db.session.add_all(
+        SavedSearchTerm(field=field, term=term, gram=term[:GRAM_LENGTH], saved_search_id=search.id)
+        for field, term in search_terms(search)
+    )
+    db.session.commit()
+    return search
+
+
+def delete_saved_search(search):
+    """Delete a saved search, its index entries and its match history."""
+    db.session.execute(delete(terms_table).where(terms_table.c.saved_search_id == search.id))
+    db.session.execute(
+        delete(SavedSearchMatch.__table__).where(SavedSearchMatch.__table__.c.saved_search_id == search.id)
+    )
+    db.session.delete(search)
+    db.session.commit()
+
+
+def candidate_searches(connection, guide):
+    """
+    Select the saved searches whose anchor terms occur in the guide.
+
+    Args:
+        connection: Connection to run on
+        guide: Guide being matched
+
+    Returns:
+        list: Rows of the candidate searches with the owner's email
+    """
+    keys = guide_keys(guide)
+    clauses = [and_(terms_table.c.field == MATCH_ALL[0], terms_table.c.gram == MATCH_ALL[1])]
+    clauses += [
+        and_(terms_table.c.field == name, terms_table.c.gram.in_(sorted(values)))
+        for name, values in keys.items() if values
+    ]
+    candidate_ids = select(terms_table.c.saved_search_id).where(or_(*clauses))
+    return connection.execute(
+        select(searches_table, users_table.c.email)
+        .join(users_table, users_table.c.id == searches_table.c.traveler_id)
+        .where(searches_table.c.id.in_(candidate_ids))
+        .where(searches_table.c.traveler_id != guide.id)
+    ).all()
+
+
+def percolate(connection, guide):
+    """
+    Record new matches between ``guide`` and saved searches.
+
+    Each search reports a given guide once; matches already recorded are
+    skipped by the primary key.
+
+    Returns:
+        list: Notification payloads for the newly recorded matches
+    """
+    found = [row for row in candidate_searches(connection, guide) if matches(row, guide)]
+    if not found:
+        return []
+
+    now = datetime.utcnow()
+    inserted = insert_ignore_conflicts(
+        SavedSearchMatch.__table__,
+        [{'saved_search_id': row.id, 'guide_id': guide.id, 'created_at': now} for row in found],
+        ['saved_search_id', 'guide_id'],
+        [SavedSearchMatch.__table__.c.saved_search_id],
+        connection=connection,
+    )
+    new_ids = {row.saved_search_id for row in inserted}
+    return [
+        {
+            'email': row.email,
+            'search_id': row.id,
+            'search_name': row.name,
+            'guide_id': guide.id,
+            'guide_name': guide.name_romanized,
+        }
+        for row in found if row.id in new_ids
+    ]
+
+
+def _match_fields_changed(target) -> bool:
+    state = inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in PERCOLATE_FIELDS)
+
+
+def _percolate_guide(mapper, connection, target):
+    if not isinstance(target, Guide):
+        return
+    notifications = percolate(connection, target)
+    session = object_session(target)
+    if notifications and session is not None:
+        session.info.setdefault(_PENDING_KEY, []).extend(notifications)
+
+
+def _percolate_updated_guide(mapper, connection, target):
+    if isinstance(target, Guide) and _match_fields_changed(target):
+        _percolate_guide(mapper, connection, target)
+
+
+event.listen(User, 'after_insert', _percolate_guide, propagate=True)
+event.listen(User, 'after_update', _percolate_updated_guide, propagate=True)
+
+
+@event.listens_for(Session, 'after_commit')
+def _enqueue_notifications(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    try:
+        notify_saved_search_matches.delay(pending)
+    except Exception:
+        # The matches are committed; failing to enqueue must not fail the write
+        logger.exception('Failed to enqueue saved search notifications')
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_notifications(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,258 @@
+"""
+Opt-in slow-query log with EXPLAIN capture.
+
+With ``SLOW_QUERY_THRESHOLD_MS`` set, cursor events on the app's engines
+time every statement. Statements at or above the threshold are recorded:
+
+* ``sql``: the statement with literals replaced by ``?`` and expanded
+  ``IN`` lists collapsed, so repeats of one query share a ``fingerprint``
+* ``params``: the parameters' shape (names and types, never values)
+* ``duration_ms``, ``rowcount``, the Flask ``endpoint`` and a timestamp
+* ``plan``: ``EXPLAIN`` output for SELECTs (and WITH queries), run on the
+  same connection and transaction right after the statement. A
+  ``SLOW_QUERY_ANALYZE_RATE`` fraction of slow statements starting with
+  SELECT use ``EXPLAIN ANALYZE`` instead, which executes the query a second
+  time; WITH queries never do, since a data-modifying CTE would run again. Plans are reused per fingerprint for
+  ``PLAN_REUSE_SECONDS`` so a burst of one slow query costs one EXPLAIN.
+
+``SLOW_QUERY_SAMPLE_RATE`` records only that fraction of slow statements.
+Entries go to a per-process ring buffer of ``SLOW_QUERY_LOG_SIZE``
+entries (``GET /api/admin/slow-queries``) and, with ``SLOW_QUERY_LOG_FILE``
+set, are appended to a JSON-lines file shared by all workers
+(``flask slow-queries show``).
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from app import db
+
+DEFAULT_LOG_SIZE = 200
+
+# Seconds an EXPLAIN result is reused for later occurrences of the same query
+PLAN_REUSE_SECONDS = 60
+
+# Longest statement text kept per entry
+MAX_SQL_LENGTH = 4000
+
+# Distinct fingerprints whose plans are kept for reuse
+MAX_CACHED_PLANS = 1000
+
+EXPLAIN = {
+    'postgresql': ('EXPLAIN ', 'EXPLAIN (ANALYZE, BUFFERS) '),
+    'mysql': ('EXPLAIN ', 'EXPLAIN ANALYZE '),
+    'mariadb': ('EXPLAIN ', 'ANALYZE '),
+    'sqlite': ('EXPLAIN QUERY PLAN ', None),
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.$])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_IN_LIST = re.compile(rf'\b(IN\s*)\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+_READ_STATEMENT = re.compile(r'^\s*(?:select|with)\b', re.IGNORECASE)
+# Statements safe to execute again under EXPLAIN ANALYZE
+_SELECT_STATEMENT = re.compile(r'^\s*select\b', re.IGNORECASE)
+
+
+def normalize_sql(statement) -> str:
+    """Replace literals with ``?`` and collapse placeholder lists and whitespace."""
+    sql = _STRING_LITERAL.sub('?', statement)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub(r'\1(?...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def parameter_shape(parameters, executemany=False):
+    """Describe parameters by type only, e.g. ``{'id': 'str'}`` or ``['int', 'str']``."""
+    if executemany:
+        rows = list(parameters or [])
+        return {'rows': len(rows), 'each': parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class SlowQueryLog:
+    """
+    Thread-safe ring buffer of slow statements plus the plan reuse cache.
+
+    Args:
+        threshold_ms (float): Minimum duration recorded
+        sample_rate (float): Fraction of slow statements recorded
+        analyze_rate (float): Fraction of recorded SELECTs explained with ANALYZE (never WITH queries)
+        size (int): Entries kept in memory
+        path (str): Optional JSON-lines file to append entries to
+    """
+
+    def __init__(self, threshold_ms, sample_rate=1.0, analyze_rate=0.0, size=DEFAULT_LOG_SIZE, path=None):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.analyze_rate = analyze_rate
+        self.path = path
+        self._entries = deque(maxlen=size)
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def entries(self, limit=None) -> list:
+        """Recorded entries, newest first."""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+    def summary(self) -> list:
+        """Per-fingerprint count, total and max duration, slowest total first."""
+        groups = {}
+        for entry in self.entries():
+            group = groups.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'], 'sql': entry['sql'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            })
+            group['count'] += 1
+            group['total_ms'] = round(group['total_ms'] + entry['duration_ms'], 3)
+            group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        return sorted(groups.values(), key=lambda g: -g['total_ms'])
+
+    def record(self, conn, cursor, statement, parameters, executemany, duration):
+        """Record one slow statement (called from ``after_cursor_execute``)."""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        sql = normalize_sql(statement)[:MAX_SQL_LENGTH]
+        fingerprint = hashlib.sha1(sql.encode()).hexdigest()[:16]
+        plan, analyzed = None, False
+        if not executemany and _READ_STATEMENT.match(statement):
+            plan, analyzed = self._plan(conn, cursor, statement, parameters, fingerprint)
+        entry = {
+            'at': datetime.utcnow().isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'fingerprint': fingerprint,
+            'sql': sql,
+            'params': parameter_shape(parameters, executemany),
+            'rowcount': cursor.rowcount,
+            'endpoint': request.endpoint if has_request_context() else None,
+            'plan': plan,
+            'analyzed': analyzed,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def _plan(self, conn, cursor, statement, parameters, fingerprint):
+        prefixes = EXPLAIN.get(conn.dialect.name)
+        if prefixes is None:
+            return None, False
+        analyze = (
+            prefixes[1] is not None and self.analyze_rate > 0 and _SELECT_STATEMENT.match(statement) is not None
+            and random.random() < self.analyze_rate
+        )
+        now = time.monotonic()
+        if not analyze:
+            with self._lock:
+                cached = self._plans.get(fingerprint)
+            if cached is not None and now - cached[0] < PLAN_REUSE_SECONDS:
+                return cached[1], False
+        plan = explain(conn, cursor, prefixes[1] if analyze else prefixes[0], statement, parameters)
+        with self._lock:
+            if len(self._plans) >= MAX_CACHED_PLANS:
+                self._plans.clear()
+            self._plans[fingerprint] = (now, plan)
+        return plan, analyze
+
+
+def explain(conn, cursor, prefix, statement, parameters):
+    """
+    Run ``prefix + statement`` on the statement's own DBAPI connection.
+
+    The plan query bypasses SQLAlchemy events (no recursion) and, on
+    PostgreSQL, runs inside a savepoint so a failure cannot abort the
+    caller's transaction.
+
+    Returns:
+        list: Plan lines, or a one-line error description
+    """
+    dbapi_cursor = cursor.connection.cursor()
+    savepoint = conn.dialect.name == 'postgresql'
+    try:
+        if savepoint:
+            dbapi_cursor.execute('SAVEPOINT slow_query_explain')
+        dbapi_cursor.execute(prefix + statement, parameters)
+        lines = [' | '.join(str(value) for value in row) for row in dbapi_cursor.fetchall()]
+        if savepoint:
+            dbapi_cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+        return lines
+    except Exception as e:
+        if savepoint:
+            try:
+                dbapi_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            except Exception:
+                pass
+        return [f'EXPLAIN failed: {e}']
+    finally:
+        dbapi_cursor.close()
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context so failed statements leave nothing behind
+    context._slow_query_started = time.perf_counter()
+
+
+def _make_after_execute(log):
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_slow_query_started', None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration >= log.threshold:
+            log.record(conn, cursor, statement, parameters, executemany, duration)
+
+    return _after_execute
+
+
+def init_app(app):
+    """Attach the recorder to the app's engines when ``SLOW_QUERY_THRESHOLD_MS`` is set."""
+    threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS')
+    if threshold is None:
+        return
+    log = SlowQueryLog(
+        threshold,
+        sample_rate=app.config.get('SLOW_QUERY_SAMPLE_RATE', 1.0),
+        analyze_rate=app.config.get('SLOW_QUERY_ANALYZE_RATE', 0.0),
+        size=app.config.get('SLOW_QUERY_LOG_SIZE', DEFAULT_LOG_SIZE),
+        path=app.config.get('SLOW_QUERY_LOG_FILE'),
+    )
+    app.extensions['slow_queries'] = log
+    after_execute = _make_after_execute(log)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_execute)
+            event.listen(engine, 'after_cursor_execute', after_execute)
+
+
+def get_log(app):
+    """Return the app's ``SlowQueryLog``, or None when recording is off."""
+    return app.extensions.get('slow_queries')
+
+
+def read_log_file(path, limit=None) -> list:
+    """Entries from a ``SLOW_QUERY_LOG_FILE``, newest first."""
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries.reverse()
+    return entries[:limit] if limit else entries
@@ -0,0 +1,143 @@
+"""
+Autocomplete for guide areas, languages and specialties.
+
+Each field keeps a sorted array of its distinct normalized tokens plus a
+count of guides carrying each one. A prefix lookup is two binary searches
+over the array followed by a top-k by count, so suggestions are answered
+from memory without touching the database.
+
+The index is built lazily per process, updated incrementally from the
+``guides_changed`` signal for writes made by this process, and rebuilt in
+the background once it is older than ``SUGGEST_INDEX_TTL`` seconds to pick
+up other workers' writes.
+"""
+
+import bisect
+import heapq
+import threading
+from collections import Counter
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Guide
+from app.services.local_index import LocalIndex
+from app.utils.tokens import TOKEN_FIELDS, normalize_token, split_tokens
+
+# Default seconds before the index is rebuilt from the database
+DEFAULT_TTL = 300
+
+# Upper bound on suggestions per request
+MAX_SUGGESTIONS = 50
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index of guide tokens with per-token counts.
+
+    Readers never lock: every write replaces a field's key list with a new
+    list, so a reader works on a consistent snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {name: Counter() for name in TOKEN_FIELDS}
+        self._keys = {name: [] for name in TOKEN_FIELDS}
+        self._guide_tokens = {}
+
+    @classmethod
+    def build(cls, rows) -> 'PrefixIndex':
+        """
+        Build an index from guide rows.
+
+        Args:
+            rows: Iterable of objects or mappings with ``id`` and token fields
+
+        Returns:
+            PrefixIndex: Fully built index
+        """
+        index = cls()
+        for row in rows:
+            tokens = {name: split_tokens(_field(row, name)) for name in TOKEN_FIELDS}
+            index._guide_tokens[_field(row, 'id')] = tokens
+            for name, values in tokens.items():
+                index._counts[name].update(values)
+        for name in TOKEN_FIELDS:
+            index._keys[name] = sorted(index._counts[name])
+        return index
+
+    def apply(self, snapshots):
+        """
+        Incrementally apply committed guide changes.
+
+        Args:
+            snapshots (list): Dicts from ``guide_events.snapshot``
+        """
+        with self._lock:
+            for snap in snapshots:
+                old = self._guide_tokens.pop(snap['id'], None) or {name: set() for name in TOKEN_FIELDS}
+                new = {name: set() for name in TOKEN_FIELDS}
+                if not snap['deleted']:
+                    new = {name: split_tokens(snap[name]) for name in TOKEN_FIELDS}
+                    self._guide_tokens[snap['id']] = new
+
+                for name in TOKEN_FIELDS:
+                    removed, added = old[name] - new[name], new[name] - old[name]
+                    if not removed and not added:
+                        continue
+                    counts = self._counts[name]
+                    keys = list(self._keys[name])
+                    for token in removed:
+                        counts[token] -= 1
+                        if counts[token] <= 0:
+                            del counts[token]
+                            del keys[bisect.bisect_left(keys, token)]
+                    for token in added:
+                        if counts[token] == 0:
+                            bisect.insort(keys, token)
+                        counts[token] += 1
+                    self._keys[name] = keys
+
+    def tokens(self, field):
+        """Return the sorted distinct tokens of ``field`` (a snapshot; do not mutate)."""
+        return self._keys[field]
+
+    def suggest(self, field, prefix, limit=10):
+        """
+        Return the most common tokens starting with ``prefix``.
+
+        Args:
+            field (str): One of ``TOKEN_FIELDS``
+            prefix (str): Typed prefix (normalized before lookup)
+            limit (int): Maximum suggestions
+
+        Returns:
+            list: ``(token, count)`` tuples, most common first
+        """
+        keys = self._keys[field]
+        counts = self._counts[field]
+        prefix = normalize_token(prefix)
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + '\U0010ffff', lo)
+        matches = ((token, counts.get(token, 0)) for token in keys[lo:hi])
+        return heapq.nsmallest(limit, matches, key=lambda item: (-item[1], item[0]))
+
+
+def _field(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _load_index() -> PrefixIndex:
+    guides = Guide.__table__
+    rows = db.session.execute(
+        select(guides.c.id, *[guides.c[name] for name in TOKEN_FIELDS])
+    ).all()
+    return PrefixIndex.build(rows)
+
+
+suggest_index = LocalIndex('suggest_index', _load_index, 'SUGGEST_INDEX_TTL', DEFAULT_TTL)
+
+
+def suggest(field, prefix, limit=10):
+    """Answer a suggestion request from this process's index."""
+    return suggest_index.get().suggest(field, prefix, limit)
@@ -0,0 +1,223 @@
+"""
+Hot/cold split of user accounts.
+
+Abandoned sign-ups would otherwise make up most of ``users`` and its
+``ix_users_email`` index, which every registration and login probes. Accounts
+that have not logged in for ``USER_ARCHIVE_AFTER_DAYS`` and own nothing
+(no guide profile, bookings, conversations, messages, saved searches or
+favorites) are moved in batches to ``archived_users``, so the hot table only
+grows with active or engaged accounts.
+
+Archived accounts stay reachable by email: registration treats their
+emails as taken, and a successful login moves the account back to
+``users`` under its original ID.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, delete, exists, func, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import ArchivedUser, Booking, Conversation, Favorite, Guide, Message, SavedSearch, User
+from app.models.outbox import EVENT_ARCHIVED, EVENT_RESTORED
+from app.services import outbox
+from app.utils.db import insert_ignore_conflicts, run_with_retries, set_local_lock_timeout
+
+# Accounts idle longer than this are archived unless configured otherwise
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+
+DEFAULT_BATCH_SIZE = 500
+
+# Upper bound on how long a batch may wait for a row lock (PostgreSQL)
+LOCK_TIMEOUT = '2s'
+
+# last_login_at is refreshed at most this often, so most logins stay read-only
+LOGIN_TOUCH_INTERVAL = timedelta(days=1)
+
+users_table = User.__table__
+archived_table = ArchivedUser.__table__
+
+ARCHIVED_COLUMNS = ['id', 'email', 'hashed_password', 'created_at', 'last_login_at']
+
+# Rows referencing users.id; an account with any of them is never archived
+_OWNERSHIP = [
+    (Guide.__table__, 'id'),
+    (Booking.__table__, 'traveler_id'),
+    (Conversation.__table__, 'traveler_id'),
+    (Message.__table__, 'sender_id'),
+    (SavedSearch.__table__, 'traveler_id'),
+    (Favorite.__table__, 'user_id'),
+]
+
+
+def _eligible(cutoff):
+    """Filter selecting idle accounts that own no rows."""
+    conditions = [
+        users_table.c.created_at < cutoff,
+        or_(users_table.c.last_login_at.is_(None), users_table.c.last_login_at < cutoff),
+    ]
+    for table, column in _OWNERSHIP:
+        conditions.append(~exists().where(table.c[column] == users_table.c.id))
+    return and_(*conditions)
+
+
+def archive_batch(cutoff, after_id=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move one keyset-ordered batch of eligible accounts to the archive.
+
+    Candidate rows are locked (skipping rows other transactions hold, on
+    PostgreSQL) so a concurrent login or booking either finishes first and
+    makes the account ineligible, or waits until it has been archived.
+
+    Args:
+        cutoff (datetime): Accounts idle since before this are eligible
+        after_id (str): Last ID of the previous batch
+        batch_size (int): Maximum accounts to move
+
+    Returns:
+        tuple: ``(last_id, moved, scanned)``; ``last_id`` is None when no
+        eligible accounts remain after ``after_id``
+    """
+    set_local_lock_timeout(LOCK_TIMEOUT)
+    query = select(*[users_table.c[name] for name in ARCHIVED_COLUMNS]).where(_eligible(cutoff))
+    if after_id is not None:
+        query = query.where(users_table.c.id > after_id)
+    query = query.order_by(users_table.c.id).limit(batch_size).with_for_update(of=users_table, skip_locked=True)
+    rows = db.session.execute(query).all()
+    if not rows:
+        db.session.commit()
+        return None, 0, 0
+
+    now = datetime.utcnow()
+    archived = insert_ignore_conflicts(
+        archived_table,
+        [dict(row._mapping, archived_at=now) for row in rows],
+        index_elements=['id'],
+        returning=[archived_table.c.id],
+    )
+    ids = {row.id for row in archived}
+    if ids:
+        db.session.execute(delete(users_table).where(users_table.c.id.in_(ids)))
+        outbox.append_events(db.session, [
+            outbox.event_row('user', EVENT_ARCHIVED, row.id, {'id': row.id, 'email': row.email})
+            for row in rows if row.id in ids
+        ])
+    db.session.commit()
+    return rows[-1].id, len(ids), len(rows)
+
+
+def archive_inactive_users(older_than_days=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None,
+                           progress=None) -> int:
+    """
+    Archive every eligible account, one short transaction per batch.
+
+    Args:
+        older_than_days (int): Idle period before archival (defaults to
+            ``USER_ARCHIVE_AFTER_DAYS``)
+        batch_size (int): Accounts per batch
+        max_batches (int): Stop after this many batches; rerun to continue
+        progress (callable): Called with the running total after each batch
+
+    Returns:
+        int: Number of accounts archived
+    """
+    if older_than_days is None:
+        older_than_days = current_app.config.get('USER_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    after_id, total, batches = None, 0, 0
+    while max_batches is None or batches < max_batches:
+        last_id, moved, _ = run_with_retries(lambda: archive_batch(cutoff, after_id, batch_size))
+        if last_id is None:
+            break
+        after_id = last_id
+        total += moved
+        batches += 1
+        if progress is not None:
+            progress(total)
+    return total
+
+
+def emails_taken(emails) -> set:
+    """
+    Return the emails already used by a hot or archived account.
+
+    The hot table is checked first: an account archived between the two
+    queries is then still found in the archive.
+
+    Args:
+        emails (iterable): Normalized emails to check
+
+    Returns:
+        set: Subset of ``emails`` that are in use
+    """
+    emails = list(emails)
+    if not emails:
+        return set()
+    taken = set(db.session.execute(select(User.email).where(User.email.in_(emails))).scalars())
+    rest = [email for email in emails if email not in taken]
+    if rest:
+        taken.update(db.session.execute(select(ArchivedUser.email).where(ArchivedUser.email.in_(rest))).scalars())
+    return taken
+
+
+def find_archived_user(email):
+    """Look up an archived account by email (the cold-path fallback)."""
+    return ArchivedUser.query.filter_by(email=email).first()
+
+
+class EmailInUseError(Exception):
+    """The archived account's email was taken by another account in the meantime."""
+
+
+def restore_user(archived: ArchivedUser) -> User:
+    """
+    Move an archived account back to ``users`` under its original ID.
+
+    Concurrent restores of the same account are harmless: the second insert
+    is skipped and both callers get the restored row.
+
+    Args:
+        archived (ArchivedUser): Account to restore
+
+    Returns:
+        User: The hot account
+
+    Raises:
+        EmailInUseError: If a hot account now holds the same email; the
+            archived account is left in place
+    """
+    user_id = archived.id
+    row = {name: getattr(archived, name) for name in ARCHIVED_COLUMNS}
+    try:
+        restored = insert_ignore_conflicts(users_table, [row], index_elements=['id'], returning=[users_table.c.id])
+    except IntegrityError:
+        # Only the id conflict is ignored; ix_users_email still raises
+        db.session.rollback()
+        raise EmailInUseError(row['email'])
+    db.session.execute(delete(archived_table).where(archived_table.c.id == user_id))
+    if restored:
+        outbox.append_events(db.session, [outbox.event_row('user', EVENT_RESTORED, user_id, {
+            'id': user_id, 'email': row['email'],
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+        })])
+    db.session.commit()
+    return db.session.get(User, user_id)
+
+
+def record_login(user: User):
+    """Refresh ``last_login_at`` if it is older than a day (one UPDATE per day at most)."""
+    now = datetime.utcnow()
+    if user.last_login_at is None or now - user.last_login_at >= LOGIN_TOUCH_INTERVAL:
+        user.last_login_at = now
+        db.session.commit()
+
+
+def table_sizes() -> dict:
+    """Row counts of the hot and archived user tables."""
+    return {
+        'users': db.session.execute(select(func.count()).select_from(users_table)).scalar(),
+        'archived_users': db.session.execute(select(func.count()).select_from(archived_table)).scalar(),
+    }
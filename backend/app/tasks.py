@@ -0,0 +1,73 @@
+"""
+Background jobs run by ``flask worker``.
+
+Keep job bodies small and idempotent: a job may run more than once if a
+worker dies after finishing it but before acknowledging it.
+"""
+
+from app import db
+from app.models import GuidePhoto, User
+from app.services import also_viewed, catalogue, photos
+from app.services.jobs import job
+from app.services.mailer import send_email
+
+
+@job('users.send_welcome_email', max_retries=5, backoff=60)
+def send_welcome_email(user_id: str):
+    """Send the welcome email to a newly registered user."""
+    user = db.session.get(User, user_id)
+    if user is None:
+        return
+    send_email(
+        user.email,
+        'Welcome to AI Tour Guide Matcher',
+        'Thanks for signing up! Start exploring local guides at any time.',
+    )
+
+
+@job('saved_searches.notify', max_retries=5, backoff=60)
+def notify_saved_search_matches(matches: list):
+    """
+    Email travelers about guides that newly match their saved searches.
+
+    Args:
+        matches (list): Payloads from ``saved_searches.percolate``; one email
+            is sent per traveler covering all of their matches
+    """
+    by_email = {}
+    for match in matches:
+        by_email.setdefault(match['email'], []).append(match)
+
+    for email, items in by_email.items():
+        lines = [
+            f"- {item['guide_name'] or 'A new guide'} matches "
+            f"\"{item['search_name'] or 'your saved search'}\" (guide {item['guide_id']})"
+            for item in items
+        ]
+        send_email(email, 'New guides match your saved searches', '\n'.join(lines))
+
+
+@job('photos.generate_thumbnails', max_retries=3, backoff=60)
+def generate_photo_thumbnails(digest: str, content_type: str):
+    """
+    Render the thumbnails of an uploaded photo and mark its rows ready.
+
+    Args:
+        digest (str): SHA-256 of the stored original
+        content_type (str): Content type of the original
+    """
+    photos.generate_thumbnails(digest, content_type)
+    GuidePhoto.query.filter_by(digest=digest).update({'thumbnails_ready': True})
+    db.session.commit()
+
+
+@job('guides.build_also_viewed', max_retries=1, backoff=300)
+def build_also_viewed():
+    """Rebuild the "travelers also viewed" lists from the view log."""
+    also_viewed.build_also_viewed()
+
+
+@job('guides.write_catalogue_snapshot', max_retries=1, backoff=60)
+def write_catalogue_snapshot():
+    """Rewrite the shared catalogue snapshot (schedule every few minutes)."""
+    catalogue.write_snapshot()
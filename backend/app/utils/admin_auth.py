@@ -0,0 +1,24 @@
+"""
+Shared-secret authentication for operator features.
+"""
+
+import hmac
+
+from flask import current_app, request
+
+# Header carrying ``ADMIN_API_TOKEN``
+TOKEN_HEADER = 'X-Admin-Token'
+
+
+def admin_enabled() -> bool:
+    """True when ``ADMIN_API_TOKEN`` is configured."""
+    return bool(current_app.config.get('ADMIN_API_TOKEN'))
+
+
+def admin_token_valid() -> bool:
+    """Check the current request's admin token in constant time."""
+    expected = current_app.config.get('ADMIN_API_TOKEN')
+    if not expected:
+        return False
+    supplied = request.headers.get(TOKEN_HEADER, '')
+    return hmac.compare_digest(supplied.encode(), expected.encode())
@@ -0,0 +1,140 @@
+"""
+Database helpers shared across services.
+"""
+
+import random
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app import db
+
+# SQLSTATEs worth retrying: serialization failure, deadlock, lock timeout
+RETRYABLE_SQLSTATES = {'40001', '40P01', '55P03'}
+
+
+def is_retryable_error(error: DBAPIError) -> bool:
+    """
+    Decide whether a database error is a transient concurrency failure.
+
+    Args:
+        error (DBAPIError): Error raised by SQLAlchemy
+
+    Returns:
+        bool: True for serialization failures, deadlocks and lock timeouts
+    """
+    orig = getattr(error, 'orig', None)
+    code = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+    if code in RETRYABLE_SQLSTATES:
+        return True
+    # SQLite reports writer contention as a plain OperationalError
+    return 'database is locked' in str(orig).lower()
+
+
+def run_with_retries(operation, attempts: int = 5, base_delay: float = 0.01, max_delay: float = 0.5):
+    """
+    Run a short transaction, retrying transient concurrency failures.
+
+    The session is rolled back after every failed attempt and the delay
+    grows exponentially with full jitter, so contending clients spread out
+    instead of retrying in lockstep.
+
+    Args:
+        operation (callable): Zero-argument function that runs and commits
+            the transaction
+        attempts (int): Maximum number of attempts
+        base_delay (float): Initial backoff ceiling in seconds
+        max_delay (float): Upper bound for any single backoff in seconds
+
+    Returns:
+        The value returned by ``operation``
+    """
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except DBAPIError as e:
+            db.session.rollback()
+            if not is_retryable_error(e) or attempt == attempts - 1:
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * (2 ** attempt))))
+
+
+def set_local_lock_timeout(timeout: str):
+    """
+    Bound how long the current transaction may wait for a row lock.
+
+    Only PostgreSQL supports per-transaction lock timeouts; elsewhere this is
+    a no-op. A timeout surfaces as SQLSTATE 55P03, which is retryable.
+
+    Args:
+        timeout (str): PostgreSQL interval such as ``'2s'``
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(text(f"SET LOCAL lock_timeout = '{timeout}'"))
+
+
+def _dialect_insert(table, dialect=None):
+    """Return a dialect-specific INSERT supporting ON CONFLICT clauses."""
+    dialect = dialect or db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f'ON CONFLICT is not supported for {dialect}')
+    return insert(table)
+
+
+def insert_ignore_conflicts(table, rows, index_elements, returning, connection=None):
+    """
+    Insert many rows in one statement, skipping rows that hit a unique key.
+
+    Emits ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` on PostgreSQL and
+    the equivalent SQLite syntax.
+
+    Args:
+        table: Table (or mapped class) to insert into
+        rows (list): Column-value dicts
+        index_elements (list): Columns of the unique constraint to check
+        returning (list): Columns to return for the inserted rows
+        connection: Connection to run on (defaults to the session), e.g.
+            the flush connection inside mapper events
+
+    Returns:
+        list: Rows actually inserted (conflicting rows are absent)
+    """
+    if not rows:
+        return []
+    statement = (
+        _dialect_insert(table, connection.dialect.name if connection is not None else None)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=index_elements)
+        .returning(*returning)
+    )
+    return (connection or db.session).execute(statement).all()
+
+
+def upsert_statement(table, rows, index_elements, dialect=None):
+    """
+    Build an ``INSERT ... ON CONFLICT DO UPDATE`` for PostgreSQL or SQLite.
+
+    Every non-key column in ``rows`` is overwritten on conflict. The
+    statement is returned rather than executed so that callers inside
+    mapper events can run it on the flush connection.
+
+    Args:
+        table: Table to upsert into
+        rows (list): Column-value dicts, all with the same keys
+        index_elements (list): Columns of the conflicting unique key
+        dialect (str): Dialect name (defaults to the session's bind)
+
+    Returns:
+        Insert: Executable upsert statement
+    """
+    statement = _dialect_insert(table, dialect).values(rows)
+    update_columns = [key for key in rows[0] if key not in index_elements]
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={key: statement.excluded[key] for key in update_columns},
+    )
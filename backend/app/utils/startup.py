@@ -0,0 +1,123 @@
+"""
+Cold-start measurement for ``create_app``.
+
+Runs a fresh interpreter with ``-X importtime`` so the numbers reflect what
+a newly spawned web or job worker pays, not a warm process.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import List
+
+# Executed in the child interpreter; prints phase timings as JSON
+_PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+finished = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': finished - imported}))
+"""
+
+
+@dataclass
+class ModuleTiming:
+    """Import cost of one module, in milliseconds."""
+
+    name: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    """Result of one cold start."""
+
+    import_ms: float
+    create_app_ms: float
+    modules: List[ModuleTiming] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        """Time from importing ``app`` until ``create_app`` returned."""
+        return self.import_ms + self.create_app_ms
+
+    def top(self, limit=15, prefix=None, max_depth=None):
+        """
+        Return the most expensive imports by cumulative time.
+
+        Args:
+            limit (int): Number of modules to return
+            prefix (str): Only modules whose name starts with this
+            max_depth (int): Only modules imported at most this deep
+        """
+        modules = [
+            m for m in self.modules
+            if (prefix is None or m.name == prefix or m.name.startswith(prefix + '.'))
+            and (max_depth is None or m.depth <= max_depth)
+        ]
+        return sorted(modules, key=lambda m: m.cumulative_ms, reverse=True)[:limit]
+
+
+def parse_importtime(output: str) -> List[ModuleTiming]:
+    """
+    Parse ``python -X importtime`` output.
+
+    Lines look like ``import time:  self [us] |  cumulative | <indent>name``;
+    the indent (two spaces per level) gives the import depth.
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            timing = ModuleTiming(
+                name=name.strip(),
+                self_ms=int(self_us) / 1000,
+                cumulative_ms=int(cumulative_us) / 1000,
+                depth=(len(name) - len(name.lstrip(' ')) - 1) // 2,
+            )
+        except ValueError:
+            continue
+        timings.append(timing)
+    return timings
+
+
+def profile_startup(python=sys.executable, env=None) -> StartupProfile:
+    """
+    Cold-start the application in a child interpreter and time it.
+
+    Args:
+        python (str): Interpreter to run
+        env (dict): Environment for the child (defaults to this process's)
+
+    Returns:
+        StartupProfile: Phase timings and per-module import costs
+
+    Raises:
+        RuntimeError: If the child process fails
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', _PROBE],
+        cwd=backend_dir,
+        env=env if env is not None else os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'create_app failed in the child process:\n{result.stderr[-2000:]}')
+
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        import_ms=phases['import'] * 1000,
+        create_app_ms=phases['create_app'] * 1000,
+        modules=parse_importtime(result.stderr),
+    )
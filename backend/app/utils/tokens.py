@@ -0,0 +1,33 @@
+"""
+Normalization of the comma-separated guide attribute columns.
+"""
+
+import unicodedata
+
+# Guide columns stored as comma-separated token lists
+TOKEN_FIELDS = ('languages', 'areas', 'specialties')
+
+
+def normalize_token(value: str) -> str:
+    """
+    Normalize a single token for matching and indexing.
+
+    Applies NFKC (folding full-width characters), trims whitespace and
+    lowercases.
+    """
+    return unicodedata.normalize('NFKC', value).strip().lower()
+
+
+def split_tokens(value) -> set:
+    """
+    Split a comma-separated column value into a set of normalized tokens.
+
+    Args:
+        value (str): Column value such as ``'ja, EN'``; None is allowed
+
+    Returns:
+        set: Normalized, non-empty tokens
+    """
+    if not value:
+        return set()
+    return {token for token in (normalize_token(part) for part in value.split(',')) if token}
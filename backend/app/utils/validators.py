@@ -3,6 +3,17 @@ Validation utilities for user input
 """
 
 import re
+from functools import wraps
+
+from flask import jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Default cap on JSON request bodies validated with ``validate_body``
+DEFAULT_MAX_BODY_BYTES = 16 * 1024
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+_schemas = {}
 
 
 def validate_email(email: str) -> bool:
@@ -18,10 +29,7 @@ def validate_email(email: str) -> bool:
     if not email or not isinstance(email, str):
         return False
     
-    # Basic email regex pattern
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    
-    return bool(re.match(email_pattern, email))
+    return bool(EMAIL_PATTERN.match(email))
 
 
 def validate_password(password: str) -> bool:
@@ -39,4 +47,109 @@ def validate_password(password: str) -> bool:
         return False
     
     # Basic requirement: minimum 8 characters
-    return len(password) >= 8
\ No newline at end of file
+    return len(password) >= 8
+
+
+def get_schema(name: str):
+    """
+    Return the shared instance of a request schema from ``app.schemas``.
+
+    Schemas (and marshmallow itself) are imported and built on first use
+    and reused for every later request.
+
+    Args:
+        name (str): Key in ``app.schemas.SCHEMAS``
+
+    Returns:
+        Schema: Cached marshmallow schema instance
+    """
+    schema = _schemas.get(name)
+    if schema is None:
+        from app.schemas import SCHEMAS
+
+        schema = _schemas.setdefault(name, SCHEMAS[name]())
+    return schema
+
+
+def first_error(messages) -> str:
+    """
+    Pick the message to report from marshmallow's error structure.
+
+    Schema-level errors win, then field errors in declaration order; nested
+    errors (list items) are unwrapped.
+    """
+    if isinstance(messages, str):
+        return messages
+    if isinstance(messages, list):
+        return first_error(messages[0]) if messages else 'Invalid request body'
+    if isinstance(messages, dict) and messages:
+        if '_schema' in messages:
+            return first_error(messages['_schema'])
+        return first_error(next(iter(messages.values())))
+    return 'Invalid request body'
+
+
+def load_body(name: str, data):
+    """
+    Validate ``data`` against a named schema.
+
+    Args:
+        name (str): Schema name
+        data: Parsed JSON value
+
+    Returns:
+        tuple: ``(loaded, error, valid_data)``; ``error`` is None on success
+        and ``valid_data`` holds the fields that did validate
+    """
+    from marshmallow import ValidationError
+
+    try:
+        return get_schema(name).load(data), None, None
+    except ValidationError as e:
+        valid = e.valid_data if isinstance(e.valid_data, dict) else {}
+        return None, first_error(e.messages), valid
+
+
+def _too_large(max_bytes: int):
+    return jsonify({'error': f'Request body must be at most {max_bytes} bytes'}), 413
+
+
+def validate_body(name: str, max_bytes: int = DEFAULT_MAX_BODY_BYTES):
+    """
+    Validate the JSON body of a view before it runs.
+
+    Oversized bodies get 413 before they are parsed; anything that is not a
+    JSON object or fails the schema gets 400 with the schema's message. The
+    loaded body is passed to the view as the ``data`` keyword argument.
+
+    The limit applies to the bytes actually received, not only to the
+    declared Content-Length (chunked requests declare none); reading is
+    bounded by the app-wide ``MAX_CONTENT_LENGTH``.
+
+    Args:
+        name (str): Schema name in ``app.schemas.SCHEMAS``
+        max_bytes (int): Largest accepted body
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.content_length is not None and request.content_length > max_bytes:
+                return _too_large(max_bytes)
+            try:
+                raw = request.get_data(cache=True)
+            except RequestEntityTooLarge:
+                return _too_large(max_bytes)
+            if len(raw) > max_bytes:
+                return _too_large(max_bytes)
+            body = request.get_json(silent=True)
+            if not isinstance(body, dict):
+                return jsonify({'error': 'Request body must be a JSON object'}), 400
+            data, error, _ = load_body(name, body)
+            if error:
+                return jsonify({'error': error}), 400
+            return view(*args, data=data, **kwargs)
+
+        return wrapper
+
+    return decorator
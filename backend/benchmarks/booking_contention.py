@@ -0,0 +1,147 @@
+"""
+Concurrency benchmark for the booking engine.
+
+Many parallel clients try to book the same guide for the same handful of
+days. The run fails if any day ends up with more than one confirmed
+booking, and reports throughput and latency so contention collapse shows
+up as a drop in attempts/sec.
+
+Usage (from backend/):
+    python benchmarks/booking_contention.py --clients 32 --attempts 50 --days 5
+
+Set BENCH_DATABASE_URL to benchmark against PostgreSQL; by default a
+temporary SQLite file is used. Seeding drops every table in that database,
+so point it at a scratch database; the app's DATABASE_URL is never used.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_tmpdir = tempfile.mkdtemp(prefix='booking-bench-')
+# Never the app's DATABASE_URL: seeding drops and recreates every table
+os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from sqlalchemy import func  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Booking, Guide, GuideAvailability, User  # noqa: E402
+from app.models.availability import month_masks  # noqa: E402
+from app.models.booking import BOOKING_CONFIRMED  # noqa: E402
+from app.services.bookings import BookingError, create_booking  # noqa: E402
+
+
+def seed(app, clients, days):
+    """Create one guide available on ``days`` consecutive days and the travelers."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        guide = Guide(email='popular.guide@example.com', name_romanized='Popular Guide')
+        guide.set_password('password123')
+        db.session.add(guide)
+
+        travelers = []
+        for i in range(clients):
+            traveler = User(email=f'traveler{i}@example.com', hashed_password='x')
+            db.session.add(traveler)
+            travelers.append(traveler)
+        db.session.flush()
+
+        start = date.today() + timedelta(days=30)
+        dates = [start + timedelta(days=i) for i in range(days)]
+        for month, mask in month_masks(dates[0], dates[-1]).items():
+            db.session.add(GuideAvailability(guide_id=guide.id, month=month, days_mask=mask))
+        db.session.commit()
+        return guide.id, [t.id for t in travelers], dates
+
+
+def run(app, guide_id, traveler_ids, dates, attempts):
+    """Hammer the booking engine from one thread per traveler."""
+    latencies = []
+    outcomes = {'booked': 0, 'conflict': 0, 'error': 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(traveler_ids))
+
+    def client(traveler_id):
+        local_latencies = []
+        local = {'booked': 0, 'conflict': 0, 'error': 0}
+        with app.app_context():
+            barrier.wait()
+            for _ in range(attempts):
+                started = time.perf_counter()
+                try:
+                    create_booking(traveler_id, guide_id, random.choice(dates))
+                    local['booked'] += 1
+                except BookingError:
+                    local['conflict'] += 1
+                except Exception:
+                    db.session.rollback()
+                    local['error'] += 1
+                local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            for key, value in local.items():
+                outcomes[key] += value
+
+    threads = [threading.Thread(target=client, args=(t,)) for t in traveler_ids]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32, help='parallel clients')
+    parser.add_argument('--attempts', type=int, default=50, help='booking attempts per client')
+    parser.add_argument('--days', type=int, default=5, help='distinct bookable days')
+    args = parser.parse_args()
+
+    app = create_app()
+    guide_id, traveler_ids, dates = seed(app, args.clients, args.days)
+    elapsed, latencies, outcomes = run(app, guide_id, traveler_ids, dates, args.attempts)
+
+    with app.app_context():
+        per_day = dict(
+            db.session.query(Booking.date, func.count())
+            .filter(Booking.guide_id == guide_id, Booking.status == BOOKING_CONFIRMED)
+            .group_by(Booking.date)
+            .all()
+        )
+
+    total = len(latencies)
+    latencies.sort()
+    print(f"database:        {make_url(os.environ['DATABASE_URL']).render_as_string(hide_password=True)}")
+    print(f"clients:         {args.clients} x {args.attempts} attempts over {args.days} days")
+    print(f"elapsed:         {elapsed:.2f}s")
+    print(f"throughput:      {total / elapsed:.0f} attempts/s")
+    print(f"latency p50/p99: {statistics.median(latencies) * 1000:.1f}ms / "
+          f"{latencies[int(total * 0.99) - 1] * 1000:.1f}ms")
+    print(f"outcomes:        {outcomes}")
+    print(f"bookings/day:    {sorted(per_day.values())}")
+
+    double_booked = [d for d, count in per_day.items() if count > 1]
+    if double_booked:
+        print(f"FAIL: double-booked days: {double_booked}")
+        return 1
+    if outcomes['booked'] != len(dates):
+        print(f"FAIL: expected {len(dates)} bookings, got {outcomes['booked']}")
+        return 1
+    print('OK: no double-bookings')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
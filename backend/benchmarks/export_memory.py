@@ -0,0 +1,73 @@
+"""
+Memory benchmark for ``flask export``.
+
+Seeds guides at several table sizes and reports the peak Python heap
+(tracemalloc) while exporting users and guides, next to a
+``Guide.query.all()`` load of the same rows. The export's peak should stay
+flat as the table grows; the ORM load grows with it.
+
+Usage (from backend/):
+    python benchmarks/export_memory.py --sizes 5000 20000 80000 --format jsonl
+
+Set BENCH_DATABASE_URL to benchmark against PostgreSQL (server-side
+cursors); by default a temporary SQLite file is used. Seeding drops every
+table in that database, so point it at a scratch database; the app's
+DATABASE_URL is never used.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_tmpdir = tempfile.mkdtemp(prefix='export-bench-')
+
+# Points DATABASE_URL at BENCH_DATABASE_URL or a temporary SQLite file
+from guide_listing import seed  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Guide  # noqa: E402
+from app.services import exports  # noqa: E402
+
+
+def peak_bytes(app, func):
+    """Run ``func`` in a fresh session; return (result, peak heap bytes, seconds)."""
+    with app.app_context():
+        db.session.remove()
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000, 80000], help='guides per run')
+    parser.add_argument('--format', default='jsonl', choices=exports.FORMATS)
+    parser.add_argument('--batch-size', type=int, default=exports.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    app = create_app()
+    out_dir = os.path.join(_tmpdir, 'snapshot')
+    print(f"{'guides':>8} {'export MiB':>11} {'export s':>9} {'orm MiB':>9}")
+    for size in args.sizes:
+        seed(app, size)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        manifest, export_peak, export_seconds = peak_bytes(app, lambda: exports.export_tables(
+            out_dir, fmt=args.format, batch_size=args.batch_size,
+        ))
+        _, orm_peak, _ = peak_bytes(app, lambda: len(Guide.query.all()))
+        assert manifest['tables']['guides']['rows'] == size
+        print(f'{size:8d} {export_peak / 2**20:11.1f} {export_seconds:9.2f} {orm_peak / 2**20:9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Read-path benchmark for guide listings.
+
+Seeds a catalogue of guides and times three ways of producing the listing
+JSON, reporting rows/sec for each:
+
+* ``orm``: ``Guide.query.all()`` with joined-inheritance loading, then
+  ``to_dict()`` and JSON serialization per guide (the previous fallback)
+* ``core``: ``guide_documents.list_guide_bodies``, which selects only the
+  document columns as tuples and runs the precompiled row encoder
+* ``documents``: the stored read-model bodies, for reference
+
+The run fails if the ORM and Core paths produce different JSON.
+
+Usage (from backend/):
+    python benchmarks/guide_listing.py --guides 20000 --repeat 5
+
+Set BENCH_DATABASE_URL to benchmark against PostgreSQL; by default a
+temporary SQLite file is used. Seeding drops every table in that database,
+so point it at a scratch database; the app's DATABASE_URL is never used.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_tmpdir = tempfile.mkdtemp(prefix='listing-bench-')
+# Never the app's DATABASE_URL: seeding drops and recreates every table
+os.environ['DATABASE_URL'] = os.getenv('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Guide, User  # noqa: E402
+from app.services import guide_documents  # noqa: E402
+from app.services.guide_filters import GuideFilter  # noqa: E402
+
+LANGUAGES = ('en', 'ja', 'en,ja', 'zh,en', 'fr,en,ja')
+AREAS = ('Tokyo', 'Kyoto', 'Osaka, Nara', 'Hokkaido', 'Tokyo, Kamakura')
+
+
+def seed(app, count):
+    """Insert ``count`` guides with Core statements, then build their documents."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        now = datetime.utcnow()
+        ids = [str(uuid.uuid4()) for _ in range(count)]
+        db.session.execute(insert(User.__table__), [
+            {'id': guide_id, 'email': f'guide{i}@example.com', 'hashed_password': 'x',
+             'created_at': now}
+            for i, guide_id in enumerate(ids)
+        ])
+        db.session.execute(insert(Guide.__table__), [
+            {'id': guide_id, 'name_romanized': f'Guide {i}', 'bio': 'Local guide. ' * 8,
+             'specialties': 'Food, History', 'rating': round(3 + (i % 20) / 10, 1),
+             'languages': LANGUAGES[i % len(LANGUAGES)], 'areas': AREAS[i % len(AREAS)],
+             'price_range': '8000-15000', 'price_min': 8000, 'price_max': 15000}
+            for i, guide_id in enumerate(ids)
+        ])
+        db.session.commit()
+        guide_documents.rebuild_all(batch_size=2000)
+
+
+def orm_path():
+    return [guide_documents.serialize(guide.to_dict()) for guide in Guide.query.all()]
+
+
+def core_path():
+    return guide_documents.list_guide_bodies(GuideFilter())
+
+
+def documents_path():
+    return guide_documents.list_document_bodies(GuideFilter())
+
+
+def measure(app, func, repeat):
+    """Run ``func`` ``repeat`` times in fresh sessions; return (bodies, timings)."""
+    timings = []
+    with app.app_context():
+        for _ in range(repeat):
+            db.session.remove()
+            started = time.perf_counter()
+            bodies = func()
+            timings.append(time.perf_counter() - started)
+    return bodies, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--guides', type=int, default=20000, help='guides in the catalogue')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per path')
+    args = parser.parse_args()
+
+    app = create_app()
+    seed(app, args.guides)
+
+    results = {}
+    for name, func in (('orm', orm_path), ('core', core_path), ('documents', documents_path)):
+        results[name] = measure(app, func, args.repeat)
+
+    print(f'{args.guides} guides, best of {args.repeat} runs')
+    print(f"{'path':<10} {'best ms':>9} {'median ms':>10} {'rows/sec':>12}")
+    best_orm = min(results['orm'][1])
+    for name, (bodies, timings) in results.items():
+        best = min(timings)
+        print(f'{name:<10} {best * 1000:9.1f} {statistics.median(timings) * 1000:10.1f} '
+              f'{len(bodies) / best:12,.0f}  ({best_orm / best:.1f}x orm)')
+
+    if sorted(results['orm'][0]) != sorted(results['core'][0]):
+        print('FAIL: ORM and Core listings differ')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
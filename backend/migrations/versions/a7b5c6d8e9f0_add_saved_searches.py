@@ -0,0 +1,52 @@
+"""Add saved searches and their reverse index
+
+Revision ID: a7b5c6d8e9f0
+Revises: f6a4b5c7d8e9
+Create Date: 2025-10-07 16:40:12.583104
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b5c6d8e9f0'
+down_revision = 'f6a4b5c7d8e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('saved_searches',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('traveler_id', sa.String(length=36), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('languages', sa.String(length=255), nullable=True),
+    sa.Column('areas', sa.String(length=255), nullable=True),
+    sa.Column('min_rating', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['traveler_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_saved_searches_traveler_id'), 'saved_searches', ['traveler_id'], unique=False)
+    op.create_table('saved_search_terms',
+    sa.Column('field', sa.String(length=16), nullable=False),
+    sa.Column('term', sa.String(length=64), nullable=False),
+    sa.Column('saved_search_id', sa.String(length=36), nullable=False),
+    sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('field', 'term', 'saved_search_id')
+    )
+    op.create_table('saved_search_matches',
+    sa.Column('saved_search_id', sa.String(length=36), nullable=False),
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('saved_search_id', 'guide_id')
+    )
+
+
+def downgrade():
+    op.drop_table('saved_search_matches')
+    op.drop_table('saved_search_terms')
+    op.drop_index(op.f('ix_saved_searches_traveler_id'), table_name='saved_searches')
+    op.drop_table('saved_searches')
@@ -0,0 +1,31 @@
+"""Add travelers' favorite guides
+
+Revision ID: b4c2d3e5f6a7
+Revises: a3b1c2d4e5f6
+Create Date: 2025-10-17 14:08:51.624310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4c2d3e5f6a7'
+down_revision = 'a3b1c2d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('favorites',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['guide_id'], ['guides.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'guide_id')
+    )
+
+
+def downgrade():
+    op.drop_table('favorites')
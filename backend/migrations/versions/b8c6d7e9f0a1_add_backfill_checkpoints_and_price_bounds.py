@@ -0,0 +1,41 @@
+"""Add backfill checkpoints and guide price bounds
+
+Revision ID: b8c6d7e9f0a1
+Revises: a7b5c6d8e9f0
+Create Date: 2025-10-08 10:12:47.209836
+
+The new guide columns are added as nullable (a metadata-only change) and
+populated online afterwards with `flask backfill run guides.price_bounds`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c6d7e9f0a1'
+down_revision = 'a7b5c6d8e9f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('backfill_checkpoints',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_key', sa.String(length=255), nullable=True),
+    sa.Column('rows_processed', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    with op.batch_alter_table('guides', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('price_min', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('price_max', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('guides', schema=None) as batch_op:
+        batch_op.drop_column('price_max')
+        batch_op.drop_column('price_min')
+    op.drop_table('backfill_checkpoints')
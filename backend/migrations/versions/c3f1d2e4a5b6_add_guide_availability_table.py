@@ -0,0 +1,32 @@
+"""Add guide availability table
+
+Revision ID: c3f1d2e4a5b6
+Revises: a7a24637f934
+Create Date: 2025-10-01 10:12:44.201733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1d2e4a5b6'
+down_revision = 'a7a24637f934'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('guide_availability',
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('days_mask', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['guide_id'], ['guides.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('guide_id', 'month')
+    )
+    op.create_index('ix_guide_availability_month_guide', 'guide_availability', ['month', 'guide_id', 'days_mask'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_guide_availability_month_guide', table_name='guide_availability')
+    op.drop_table('guide_availability')
@@ -0,0 +1,33 @@
+"""Index saved search terms by their leading characters
+
+Revision ID: c5d3e4f6a7b8
+Revises: b4c2d3e5f6a7
+Create Date: 2025-10-18 09:41:22.517034
+
+Existing terms are filled in from their first three characters, matching
+GRAM_LENGTH in app/models/saved_search.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d3e4f6a7b8'
+down_revision = 'b4c2d3e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('saved_search_terms', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('gram', sa.String(length=3), nullable=False, server_default=''))
+    op.execute("UPDATE saved_search_terms SET gram = substr(term, 1, 3)")
+    with op.batch_alter_table('saved_search_terms', schema=None) as batch_op:
+        batch_op.alter_column('gram', server_default=None)
+        batch_op.create_index('ix_saved_search_terms_field_gram', ['field', 'gram'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('saved_search_terms', schema=None) as batch_op:
+        batch_op.drop_index('ix_saved_search_terms_field_gram')
+        batch_op.drop_column('gram')
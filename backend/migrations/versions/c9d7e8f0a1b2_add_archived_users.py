@@ -0,0 +1,45 @@
+"""Add archived users and users.last_login_at
+
+Revision ID: c9d7e8f0a1b2
+Revises: b8c6d7e9f0a1
+Create Date: 2025-10-10 09:41:15.632018
+
+Existing accounts start with a NULL last_login_at and become eligible for
+`flask users archive` once older than USER_ARCHIVE_AFTER_DAYS.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d7e8f0a1b2'
+down_revision = 'b8c6d7e9f0a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('archived_users',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_login_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_archived_users_email'), ['email'], unique=True)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_login_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('last_login_at')
+
+    with op.batch_alter_table('archived_users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_archived_users_email'))
+
+    op.drop_table('archived_users')
@@ -0,0 +1,47 @@
+"""Add the user/guide outbox and consumer offsets
+
+Revision ID: d0e8f9a1b2c3
+Revises: c9d7e8f0a1b2
+Create Date: 2025-10-11 14:03:52.871466
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e8f9a1b2c3'
+down_revision = 'c9d7e8f0a1b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('aggregate_type', sa.String(length=20), nullable=False),
+    sa.Column('aggregate_id', sa.String(length=36), nullable=False),
+    sa.Column('event_type', sa.String(length=20), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_outbox_events_aggregate_id'), ['aggregate_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_outbox_events_created_at'), ['created_at'], unique=False)
+
+    op.create_table('outbox_offsets',
+    sa.Column('consumer', sa.String(length=100), nullable=False),
+    sa.Column('last_event_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('consumer')
+    )
+
+
+def downgrade():
+    op.drop_table('outbox_offsets')
+    with op.batch_alter_table('outbox_events', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_outbox_events_created_at'))
+        batch_op.drop_index(batch_op.f('ix_outbox_events_aggregate_id'))
+
+    op.drop_table('outbox_events')
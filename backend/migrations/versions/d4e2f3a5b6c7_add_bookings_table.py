@@ -0,0 +1,42 @@
+"""Add bookings table
+
+Revision ID: d4e2f3a5b6c7
+Revises: c3f1d2e4a5b6
+Create Date: 2025-10-02 09:41:17.550218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e2f3a5b6c7'
+down_revision = 'c3f1d2e4a5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bookings',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('traveler_id', sa.String(length=36), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['guide_id'], ['guides.id'], ),
+    sa.ForeignKeyConstraint(['traveler_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bookings_guide_id'), 'bookings', ['guide_id'], unique=False)
+    op.create_index(op.f('ix_bookings_traveler_id'), 'bookings', ['traveler_id'], unique=False)
+    op.create_index('uq_bookings_guide_date_confirmed', 'bookings', ['guide_id', 'date'], unique=True,
+                    postgresql_where=sa.text("status = 'confirmed'"),
+                    sqlite_where=sa.text("status = 'confirmed'"))
+
+
+def downgrade():
+    op.drop_index('uq_bookings_guide_date_confirmed', table_name='bookings')
+    op.drop_index(op.f('ix_bookings_traveler_id'), table_name='bookings')
+    op.drop_index(op.f('ix_bookings_guide_id'), table_name='bookings')
+    op.drop_table('bookings')
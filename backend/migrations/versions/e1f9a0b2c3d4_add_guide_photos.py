@@ -0,0 +1,41 @@
+"""Add guide photos
+
+Revision ID: e1f9a0b2c3d4
+Revises: d0e8f9a1b2c3
+Create Date: 2025-10-13 16:27:08.114930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f9a0b2c3d4'
+down_revision = 'd0e8f9a1b2c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('guide_photos',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('content_type', sa.String(length=50), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('thumbnails_ready', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['guide_id'], ['guides.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('guide_photos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_guide_photos_digest'), ['digest'], unique=False)
+        batch_op.create_index(batch_op.f('ix_guide_photos_guide_id'), ['guide_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('guide_photos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_guide_photos_guide_id'))
+        batch_op.drop_index(batch_op.f('ix_guide_photos_digest'))
+
+    op.drop_table('guide_photos')
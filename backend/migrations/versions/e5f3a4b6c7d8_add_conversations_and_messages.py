@@ -0,0 +1,51 @@
+"""Add conversations and messages tables
+
+Revision ID: e5f3a4b6c7d8
+Revises: d4e2f3a5b6c7
+Create Date: 2025-10-03 14:22:05.918342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f3a4b6c7d8'
+down_revision = 'd4e2f3a5b6c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversations',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('traveler_id', sa.String(length=36), nullable=False),
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['guide_id'], ['guides.id'], ),
+    sa.ForeignKeyConstraint(['traveler_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('traveler_id', 'guide_id', name='uq_conversations_traveler_guide')
+    )
+    op.create_index(op.f('ix_conversations_guide_id'), 'conversations', ['guide_id'], unique=False)
+    op.create_index(op.f('ix_conversations_traveler_id'), 'conversations', ['traveler_id'], unique=False)
+    op.create_table('messages',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('conversation_id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('sender_id', sa.String(length=36), nullable=False),
+    sa.Column('body', sa.String(length=2000), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_messages_conversation_id_id', 'messages', ['conversation_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_messages_conversation_id_id', table_name='messages')
+    op.drop_table('messages')
+    op.drop_index(op.f('ix_conversations_traveler_id'), table_name='conversations')
+    op.drop_index(op.f('ix_conversations_guide_id'), table_name='conversations')
+    op.drop_table('conversations')
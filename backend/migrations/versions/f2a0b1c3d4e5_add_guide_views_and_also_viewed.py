@@ -0,0 +1,43 @@
+"""Add the guide view log and precomputed also-viewed lists
+
+Revision ID: f2a0b1c3d4e5
+Revises: e1f9a0b2c3d4
+Create Date: 2025-10-14 11:05:39.508217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a0b1c3d4e5'
+down_revision = 'e1f9a0b2c3d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('guide_views',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('viewer_key', sa.String(length=64), nullable=False),
+    sa.Column('viewed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('guide_views', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_guide_views_viewed_at'), ['viewed_at'], unique=False)
+
+    op.create_table('guide_also_viewed',
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('related', sa.Text(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('guide_id')
+    )
+
+
+def downgrade():
+    op.drop_table('guide_also_viewed')
+    with op.batch_alter_table('guide_views', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_guide_views_viewed_at'))
+
+    op.drop_table('guide_views')
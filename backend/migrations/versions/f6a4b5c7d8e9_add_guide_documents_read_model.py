@@ -0,0 +1,82 @@
+"""Add guide documents read model
+
+Revision ID: f6a4b5c7d8e9
+Revises: e5f3a4b6c7d8
+Create Date: 2025-10-06 11:03:52.417605
+
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a4b5c7d8e9'
+down_revision = 'e5f3a4b6c7d8'
+branch_labels = None
+depends_on = None
+
+# Guides per document-build chunk
+BATCH_SIZE = 500
+
+
+def upgrade():
+    op.create_table('guide_documents',
+    sa.Column('guide_id', sa.String(length=36), nullable=False),
+    sa.Column('locale', sa.String(length=16), nullable=False),
+    sa.Column('languages', sa.String(length=255), nullable=True),
+    sa.Column('areas', sa.String(length=255), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('guide_id', 'locale')
+    )
+    op.create_index(op.f('ix_guide_documents_rating'), 'guide_documents', ['rating'], unique=False)
+
+    # Populate documents for existing guides so reads work immediately.
+    # The document shape is frozen here; later shape changes rebuild with
+    # `flask guides rebuild-documents`.
+    connection = op.get_bind()
+    documents = sa.table('guide_documents',
+        sa.column('guide_id'), sa.column('locale'), sa.column('languages'), sa.column('areas'),
+        sa.column('rating'), sa.column('body'), sa.column('updated_at'))
+    select = (
+        'SELECT u.id, u.email, u.created_at, g.name_romanized, g.bio, g.specialties, '
+        'g.rating, g.languages, g.areas, g.price_range '
+        'FROM guides g JOIN users u ON u.id = g.id '
+    )
+    now = datetime.utcnow()
+    last_id = None
+    # Walk the guides in keyset order so only one chunk is held in memory
+    while True:
+        if last_id is None:
+            rows = connection.execute(sa.text(select + 'ORDER BY u.id LIMIT :limit'), {'limit': BATCH_SIZE})
+        else:
+            rows = connection.execute(sa.text(select + 'WHERE u.id > :last_id ORDER BY u.id LIMIT :limit'),
+                                      {'last_id': last_id, 'limit': BATCH_SIZE})
+        rows = rows.mappings().all()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            created_at = row['created_at']
+            if isinstance(created_at, datetime):
+                created_at = created_at.isoformat()
+            elif created_at is not None:
+                # SQLite returns DATETIME columns as text
+                created_at = str(created_at).replace(' ', 'T')
+            document = dict(row, created_at=created_at)
+            values.append({
+                'guide_id': row['id'], 'locale': 'default', 'languages': row['languages'],
+                'areas': row['areas'], 'rating': row['rating'], 'updated_at': now,
+                'body': json.dumps(document, sort_keys=True, separators=(',', ':')),
+            })
+        op.bulk_insert(documents, values)
+        last_id = rows[-1]['id']
+
+
+def downgrade():
+    op.drop_index(op.f('ix_guide_documents_rating'), table_name='guide_documents')
+    op.drop_table('guide_documents')
@@ -0,0 +1,110 @@
+"""
+Shared pytest fixtures for the AI Tour Guide Matcher backend test suite.
+
+Flask-SQLAlchemy creates its engines inside ``create_app``, so the test
+database URL must be in the environment before the app module is imported.
+Set ``TEST_DATABASE_URL`` to run the suite against another database.
+"""
+
+import os
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", "sqlite:///:memory:")
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Guide
+
+
+@pytest.fixture
+def app():
+    """
+    Create and configure a new Flask application instance for testing.
+
+    Returns:
+        Flask: Configured Flask application instance for testing
+    """
+    test_app = create_app()
+    test_app.config.update(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "JWT_SECRET_KEY": "test-jwt-secret",
+        }
+    )
+    return test_app
+
+
+@pytest.fixture
+def client(app):
+    """
+    Create a test client for the Flask application.
+
+    Args:
+        app: Flask application fixture
+
+    Returns:
+        FlaskClient: Test client for making HTTP requests
+    """
+    return app.test_client()
+
+
+@pytest.fixture
+def clean_db(app):
+    """
+    Provide a clean database for each test.
+
+    Args:
+        app: Flask application fixture
+
+    Yields:
+        SQLAlchemy: Database instance ready for testing
+    """
+    with app.app_context():
+        db.create_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def make_guide(clean_db):
+    """
+    Provide a factory that inserts a guide and returns its ID.
+
+    Args:
+        clean_db: Clean database fixture
+
+    Returns:
+        callable: ``make_guide(email, **fields) -> str``
+    """
+
+    def _make_guide(email, **fields):
+        guide = Guide(email=email, **fields)
+        guide.set_password("password123")
+        db.session.add(guide)
+        db.session.commit()
+        return guide.id
+
+    return _make_guide
+
+
+@pytest.fixture
+def auth_headers(app):
+    """
+    Provide a factory building Authorization headers for a user ID.
+
+    Args:
+        app: Flask application fixture
+
+    Returns:
+        callable: ``auth_headers(user_id) -> dict``
+    """
+
+    def _auth_headers(user_id):
+        with app.app_context():
+            token = create_access_token(identity=user_id)
+        return {"Authorization": f"Bearer {token}"}
+
+    return _auth_headers
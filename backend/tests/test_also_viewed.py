@@ -0,0 +1,101 @@
+"""
+Test suite for "travelers also viewed" recommendations.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.models import GuideView
+from app.services import also_viewed
+
+pytest.importorskip("scipy")
+
+
+class TestComputeAlsoViewed:
+    """Tests for the sparse co-occurrence ranking."""
+
+    def test_ranks_by_normalized_co_views(self):
+        """Pairs are scored by cosine similarity, not raw popularity."""
+        pairs = [
+            # "popular" is seen by everyone, "niche" only by the readers of "a"
+            ("v1", "a"), ("v1", "niche"), ("v1", "popular"),
+            ("v2", "a"), ("v2", "niche"), ("v2", "popular"),
+            ("v3", "popular"), ("v4", "popular"), ("v5", "popular"),
+            ("v1", "a"),  # duplicate views count once
+        ]
+        lists = also_viewed.compute_also_viewed(pairs, top_k=5, min_co_views=2)
+        assert [item[0] for item in lists["a"]] == ["niche", "popular"]
+        assert lists["a"][0] == ("niche", 1.0, 2)
+        assert "a" not in [item[0] for item in lists["a"]]
+
+    def test_top_k_threshold_and_crawlers(self, monkeypatch):
+        """Lists are truncated, rare pairs dropped and crawlers ignored."""
+        monkeypatch.setattr(also_viewed, "MAX_GUIDES_PER_VIEWER", 3)
+        pairs = [(f"v{i}", guide) for i in range(3) for guide in ("a", "b", "c")]
+        pairs += [("crawler", guide) for guide in ("a", "b", "c", "d", "e")]
+        pairs += [("v9", "a"), ("v9", "e")]
+
+        lists = also_viewed.compute_also_viewed(pairs, top_k=1, min_co_views=2)
+        assert set(lists) == {"a", "b", "c"}
+        assert all(len(items) == 1 for items in lists.values())
+        assert also_viewed.compute_also_viewed([], top_k=1) == {}
+
+
+class TestViewBuffer:
+    """Tests for the per-process view buffer."""
+
+    def test_quiet_buffer_is_flushed_by_timer(self):
+        """Buffered views are handed off once they are old, even without further views."""
+        flushed = threading.Event()
+        batches = []
+        buffer = also_viewed.ViewBuffer(100, on_expire=lambda rows: (batches.append(rows), flushed.set()),
+                                        flush_seconds=0.05)
+        assert buffer.add({"guide_id": "a"}) is None
+        assert buffer.add({"guide_id": "b"}) is None
+        assert flushed.wait(2)
+        assert batches == [[{"guide_id": "a"}, {"guide_id": "b"}]]
+        assert buffer.drain() == []
+
+    def test_drained_batch_cancels_its_timer(self):
+        """A batch flushed by size is not flushed again by its timer."""
+        batches = []
+        buffer = also_viewed.ViewBuffer(2, on_expire=batches.append, flush_seconds=0.05)
+        buffer.add({"guide_id": "a"})
+        assert buffer.add({"guide_id": "b"}) == [{"guide_id": "a"}, {"guide_id": "b"}]
+        time.sleep(0.15)
+        assert batches == []
+
+
+class TestAlsoViewedEndpoint:
+    """Tests for view logging and the served lists."""
+
+    def test_views_to_recommendations(self, app, client, make_guide, auth_headers):
+        """
+        Logged views feed the offline build and the endpoint serves its output.
+
+        Args:
+            app: Flask application fixture
+            client: Flask test client fixture
+            make_guide: Guide factory
+            auth_headers: Authorization header factory
+        """
+        tokyo, kyoto, osaka = (make_guide(f"{name}@example.com") for name in ("tokyo", "kyoto", "osaka"))
+        for traveler, guides in {"t1": (tokyo, kyoto), "t2": (tokyo, kyoto, osaka), "t3": (tokyo, kyoto)}.items():
+            for guide_id in guides:
+                assert client.get(f"/api/guides/{guide_id}", headers=auth_headers(traveler)).status_code == 200
+        assert GuideView.query.count() == 0  # still buffered
+
+        also_viewed.flush_views()
+        assert GuideView.query.count() == 7
+        assert also_viewed.build_also_viewed(min_co_views=2) == 2
+
+        body = client.get(f"/api/guides/{tokyo}/also-viewed").get_json()
+        assert body["guide_id"] == tokyo
+        assert [guide["id"] for guide in body["guides"]] == [kyoto]
+        assert client.get(f"/api/guides/{osaka}/also-viewed").get_json()["guides"] == []
+
+        # Served from the guide tables when the read model is off
+        app.config["GUIDE_READ_MODEL"] = False
+        assert client.get(f"/api/guides/{tokyo}/also-viewed").get_json() == body
@@ -0,0 +1,119 @@
+"""
+Test suite for guide availability calendars and the date-range guide filter.
+"""
+
+from datetime import date
+
+from app.models.availability import month_masks
+
+
+class TestMonthMasks:
+    """Tests for splitting date ranges into per-month bitmasks."""
+
+    def test_range_within_one_month(self):
+        """A range inside one month yields a single contiguous mask."""
+        masks = month_masks(date(2025, 10, 2), date(2025, 10, 4))
+        assert masks == {date(2025, 10, 1): 0b1110}
+
+    def test_range_spanning_months(self):
+        """A range crossing a month boundary yields one mask per month."""
+        masks = month_masks(date(2025, 10, 31), date(2025, 11, 1))
+        assert masks == {date(2025, 10, 1): 1 << 30, date(2025, 11, 1): 1}
+
+
+class TestAvailabilityEndpoints:
+    """Tests for reading and updating a guide's availability calendar."""
+
+    def test_update_and_read_calendar(self, client, make_guide, auth_headers):
+        """
+        A guide can mark dates available and read them back.
+
+        Args:
+            client: Flask test client fixture
+            make_guide: Guide factory fixture
+            auth_headers: Authorization header factory fixture
+        """
+        guide_id = make_guide("guide@example.com")
+
+        response = client.put(
+            f"/api/guides/{guide_id}/availability",
+            json={"dates": ["2025-10-30", "2025-10-31", "2025-11-01"]},
+            headers=auth_headers(guide_id),
+        )
+        assert response.status_code == 200
+
+        response = client.get(f"/api/guides/{guide_id}/availability?from=2025-10-01&to=2025-11-30")
+        assert response.status_code == 200
+        assert response.get_json()["available_dates"] == ["2025-10-30", "2025-10-31", "2025-11-01"]
+
+        # Marking a date unavailable clears only that day
+        client.put(
+            f"/api/guides/{guide_id}/availability",
+            json={"dates": ["2025-10-31"], "available": False},
+            headers=auth_headers(guide_id),
+        )
+        response = client.get(f"/api/guides/{guide_id}/availability?from=2025-10-01&to=2025-11-30")
+        assert response.get_json()["available_dates"] == ["2025-10-30", "2025-11-01"]
+
+    def test_update_other_guide_forbidden(self, client, make_guide, auth_headers):
+        """A guide cannot edit another guide's calendar."""
+        guide_id = make_guide("guide@example.com")
+        other_id = make_guide("other@example.com")
+
+        response = client.put(
+            f"/api/guides/{guide_id}/availability",
+            json={"dates": ["2025-10-30"]},
+            headers=auth_headers(other_id),
+        )
+        assert response.status_code == 403
+
+    def test_update_requires_dates(self, client, make_guide, auth_headers):
+        """An update without a list of valid dates is rejected."""
+        guide_id = make_guide("guide@example.com")
+
+        for payload in ({}, {"dates": []}, {"dates": ["not-a-date"]}):
+            response = client.put(
+                f"/api/guides/{guide_id}/availability", json=payload, headers=auth_headers(guide_id)
+            )
+            assert response.status_code == 400
+
+
+class TestAvailabilityFilter:
+    """Tests for ``/api/guides?available_from=&available_to=``."""
+
+    def test_filter_requires_every_day_in_range(self, client, make_guide, auth_headers):
+        """
+        Only guides free on every day of the range are returned, and the
+        availability filter combines with the other listing filters.
+
+        Args:
+            client: Flask test client fixture
+            make_guide: Guide factory fixture
+            auth_headers: Authorization header factory fixture
+        """
+        full = make_guide("full@example.com", languages="en,ja", rating=4.8)
+        partial = make_guide("partial@example.com", languages="en", rating=4.9)
+        low_rated = make_guide("low@example.com", languages="en", rating=3.0)
+
+        for guide_id, dates in (
+            (full, ["2025-10-31", "2025-11-01", "2025-11-02"]),
+            (partial, ["2025-10-31", "2025-11-02"]),
+            (low_rated, ["2025-10-31", "2025-11-01", "2025-11-02"]),
+        ):
+            client.put(
+                f"/api/guides/{guide_id}/availability",
+                json={"dates": dates},
+                headers=auth_headers(guide_id),
+            )
+
+        response = client.get(
+            "/api/guides?available_from=2025-10-31&available_to=2025-11-02&languages=en&min_rating=4.5"
+        )
+        assert response.status_code == 200
+        assert [g["id"] for g in response.get_json()] == [full]
+
+    def test_invalid_range_rejected(self, client, clean_db):
+        """Malformed or reversed ranges return 400 instead of being ignored."""
+        assert client.get("/api/guides?available_from=yesterday").status_code == 400
+        response = client.get("/api/guides?available_from=2025-11-02&available_to=2025-11-01")
+        assert response.status_code == 400
@@ -0,0 +1,91 @@
+"""
+Test suite for the online backfill framework.
+"""
+
+import pytest
+from sqlalchemy import update
+
+from app import db
+from app.backfills import guides_table
+from app.models import BackfillCheckpoint, Guide
+from app.services.backfills import BackfillConflictError, run_backfill
+
+
+@pytest.fixture
+def unparsed_guides(make_guide):
+    """Insert guides and clear their price bounds as if written before the columns existed."""
+    ids = [
+        make_guide(f"guide{i}@example.com", price_range=f"{8000 + i}-15000")
+        for i in range(5)
+    ]
+    make_guide("free@example.com", price_range="ask me")
+    db.session.execute(update(guides_table).values(price_min=None, price_max=None))
+    db.session.commit()
+    return ids
+
+
+class TestPriceBounds:
+    """Tests for keeping the parsed price columns in sync."""
+
+    def test_orm_writes_parse_price_range(self, clean_db, make_guide):
+        """Writes through the model keep price bounds current."""
+        guide = db.session.get(Guide, make_guide("guide@example.com", price_range="8,000 - 15,000"))
+        assert (guide.price_min, guide.price_max) == (8000, 15000)
+        guide.price_range = "unknown"
+        assert (guide.price_min, guide.price_max) == (None, None)
+
+
+class TestRunBackfill:
+    """Tests for chunked, resumable backfill runs."""
+
+    def test_resumes_from_checkpoint(self, unparsed_guides):
+        """
+        A stopped run continues after the last committed chunk.
+
+        Args:
+            unparsed_guides: IDs of guides needing the backfill
+        """
+        reports = []
+        checkpoint = run_backfill("guides.price_bounds", batch_size=2, max_chunks=1, progress=reports.append)
+        assert checkpoint.status == "running"
+        assert checkpoint.rows_processed == 2
+        assert reports[0].remaining_estimate == 4
+        parsed = {g.id for g in Guide.query.filter(Guide.price_min.isnot(None))}
+        assert parsed == {i for i in unparsed_guides if i <= checkpoint.last_key}
+
+        checkpoint = run_backfill("guides.price_bounds", batch_size=2, progress=reports.append)
+        assert checkpoint.status == "completed"
+        assert checkpoint.rows_processed == 6
+        assert reports[-1].done
+
+        mins = sorted(g.price_min for g in Guide.query.filter(Guide.id.in_(unparsed_guides)))
+        assert mins == [8000, 8001, 8002, 8003, 8004]
+
+    def test_completed_backfill_is_not_rerun(self, unparsed_guides):
+        """Completed backfills are no-ops unless restarted."""
+        run_backfill("guides.price_bounds")
+        db.session.execute(update(guides_table).values(price_min=None))
+        db.session.commit()
+
+        run_backfill("guides.price_bounds")
+        assert Guide.query.filter(Guide.price_min.isnot(None)).count() == 0
+
+        checkpoint = run_backfill("guides.price_bounds", restart=True)
+        assert checkpoint.rows_processed == 6
+        assert Guide.query.filter(Guide.price_min.isnot(None)).count() == 5
+
+    def test_concurrent_runner_detected(self, unparsed_guides):
+        """A checkpoint moved by another runner stops this one."""
+        run_backfill("guides.price_bounds", batch_size=2, max_chunks=1)
+
+        calls = []
+
+        def report(progress):
+            calls.append(progress)
+            checkpoint = db.session.get(BackfillCheckpoint, "guides.price_bounds")
+            checkpoint.last_key = "zzzz"
+            db.session.commit()
+
+        with pytest.raises(BackfillConflictError):
+            run_backfill("guides.price_bounds", batch_size=2, progress=report)
+        assert len(calls) == 1
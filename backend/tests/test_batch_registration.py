@@ -0,0 +1,68 @@
+"""
+Test suite for the batch user registration endpoint.
+"""
+
+from app.models.user import User
+
+
+class TestBatchRegistration:
+    """Tests for ``POST /api/auth/register/batch``."""
+
+    def test_mixed_batch_reports_per_item_status(self, client, clean_db):
+        """
+        Each item is reported as created, conflict or invalid in request order.
+
+        Verifies that:
+        - Valid new emails are created with hashed passwords
+        - Emails already registered and repeats within the batch conflict
+        - Invalid items are rejected without affecting the others
+
+        Args:
+            client: Flask test client fixture
+            clean_db: Clean database fixture
+        """
+        client.post("/api/auth/register", json={"email": "taken@example.com", "password": "password123"})
+
+        response = client.post(
+            "/api/auth/register/batch",
+            json={
+                "users": [
+                    {"email": "New.One@Example.com", "password": "password123"},
+                    {"email": "taken@example.com", "password": "password123"},
+                    {"email": "not-an-email", "password": "password123"},
+                    {"email": "new.one@example.com", "password": "password456"},
+                    {"email": "short@example.com", "password": "123"},
+                    {"email": "new.two@example.com", "password": "password123"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert [r["status"] for r in data["results"]] == [
+            "created", "conflict", "invalid", "conflict", "invalid", "created",
+        ]
+        assert (data["created"], data["conflict"], data["invalid"]) == (2, 2, 2)
+        assert data["results"][0]["email"] == "new.one@example.com"
+
+        created = User.query.filter_by(email="new.one@example.com").first()
+        assert created.id == data["results"][0]["id"]
+        assert created.check_password("password123")
+        assert User.query.count() == 3
+
+    def test_batch_users_can_log_in(self, client, clean_db):
+        """Accounts created by a batch behave like normally registered ones."""
+        client.post(
+            "/api/auth/register/batch",
+            json={"users": [{"email": "partner@example.com", "password": "password123"}]},
+        )
+        response = client.post("/api/auth/login", json={"email": "partner@example.com", "password": "password123"})
+        assert response.status_code == 200
+
+    def test_rejects_malformed_or_oversized_batches(self, client, clean_db):
+        """The body must be a non-empty list of at most 100 users."""
+        assert client.post("/api/auth/register/batch", json={}).status_code == 400
+        assert client.post("/api/auth/register/batch", json={"users": []}).status_code == 400
+        users = [{"email": f"u{i}@example.com", "password": "password123"} for i in range(101)]
+        assert client.post("/api/auth/register/batch", json={"users": users}).status_code == 400
+        assert User.query.count() == 0
@@ -0,0 +1,126 @@
+"""
+Test suite for the booking endpoints and booking engine.
+"""
+
+import pytest
+
+from app import db
+from app.models import Booking, User
+
+
+@pytest.fixture
+def traveler_id(clean_db):
+    """Insert a traveler account and return its ID."""
+    user = User(email="traveler@example.com")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def available_guide(client, make_guide, auth_headers):
+    """Insert a guide available on 2025-11-01 and 2025-11-02 and return its ID."""
+    guide_id = make_guide("guide@example.com")
+    client.put(
+        f"/api/guides/{guide_id}/availability",
+        json={"dates": ["2025-11-01", "2025-11-02"]},
+        headers=auth_headers(guide_id),
+    )
+    return guide_id
+
+
+class TestCreateBooking:
+    """Tests for ``POST /api/bookings``."""
+
+    def test_booking_claims_the_day(self, client, available_guide, traveler_id, auth_headers):
+        """
+        A successful booking removes the day from the guide's availability.
+
+        Args:
+            client: Flask test client fixture
+            available_guide: Guide with availability fixture
+            traveler_id: Traveler fixture
+            auth_headers: Authorization header factory fixture
+        """
+        response = client.post(
+            "/api/bookings",
+            json={"guide_id": available_guide, "date": "2025-11-01"},
+            headers=auth_headers(traveler_id),
+        )
+        assert response.status_code == 201
+        assert response.get_json()["booking"]["status"] == "confirmed"
+
+        calendar = client.get(f"/api/guides/{available_guide}/availability?from=2025-11-01&to=2025-11-30")
+        assert calendar.get_json()["available_dates"] == ["2025-11-02"]
+
+    def test_second_booking_same_day_conflicts(self, client, available_guide, traveler_id, auth_headers):
+        """The same day cannot be booked twice."""
+        payload = {"guide_id": available_guide, "date": "2025-11-01"}
+        assert client.post("/api/bookings", json=payload, headers=auth_headers(traveler_id)).status_code == 201
+
+        response = client.post("/api/bookings", json=payload, headers=auth_headers(traveler_id))
+        assert response.status_code == 409
+        assert Booking.query.count() == 1
+
+    def test_unavailable_day_conflicts(self, client, available_guide, traveler_id, auth_headers):
+        """Days the guide has not opened cannot be booked."""
+        response = client.post(
+            "/api/bookings",
+            json={"guide_id": available_guide, "date": "2025-11-05"},
+            headers=auth_headers(traveler_id),
+        )
+        assert response.status_code == 409
+
+    def test_invalid_input(self, client, available_guide, traveler_id, auth_headers):
+        """Missing fields, bad dates and unknown guides are rejected."""
+        headers = auth_headers(traveler_id)
+        assert client.post("/api/bookings", json={}, headers=headers).status_code == 400
+        response = client.post(
+            "/api/bookings", json={"guide_id": available_guide, "date": "11/01/2025"}, headers=headers
+        )
+        assert response.status_code == 400
+        response = client.post("/api/bookings", json={"guide_id": "missing", "date": "2025-11-01"}, headers=headers)
+        assert response.status_code == 404
+
+    def test_requires_authentication(self, client, available_guide):
+        """Anonymous users cannot book."""
+        response = client.post("/api/bookings", json={"guide_id": available_guide, "date": "2025-11-01"})
+        assert response.status_code == 401
+
+
+class TestCancelBooking:
+    """Tests for ``POST /api/bookings/<id>/cancel``."""
+
+    def test_cancel_releases_the_day(self, client, available_guide, traveler_id, auth_headers):
+        """
+        Cancelling a booking makes the day bookable again.
+
+        Args:
+            client: Flask test client fixture
+            available_guide: Guide with availability fixture
+            traveler_id: Traveler fixture
+            auth_headers: Authorization header factory fixture
+        """
+        headers = auth_headers(traveler_id)
+        payload = {"guide_id": available_guide, "date": "2025-11-01"}
+        booking_id = client.post("/api/bookings", json=payload, headers=headers).get_json()["booking"]["id"]
+
+        response = client.post(f"/api/bookings/{booking_id}/cancel", headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()["booking"]["status"] == "cancelled"
+
+        # Cancelling twice is rejected, and the day can be booked again
+        assert client.post(f"/api/bookings/{booking_id}/cancel", headers=headers).status_code == 400
+        assert client.post("/api/bookings", json=payload, headers=headers).status_code == 201
+
+    def test_cancel_by_stranger_not_found(self, client, available_guide, traveler_id, auth_headers, make_guide):
+        """Users unrelated to a booking cannot see or cancel it."""
+        payload = {"guide_id": available_guide, "date": "2025-11-01"}
+        booking_id = client.post(
+            "/api/bookings", json=payload, headers=auth_headers(traveler_id)
+        ).get_json()["booking"]["id"]
+
+        stranger = make_guide("stranger@example.com")
+        response = client.post(f"/api/bookings/{booking_id}/cancel", headers=auth_headers(stranger))
+        assert response.status_code == 404
@@ -0,0 +1,89 @@
+"""
+Test suite for the memory-mapped guide catalogue snapshot.
+"""
+
+import pytest
+
+from app.services import catalogue, facets, suggest
+from app.services.guide_filters import GuideFilter
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def snapshot_path(app, tmp_path):
+    """Configure a snapshot file that is re-checked on every request."""
+    path = tmp_path / "catalogue.snap"
+    app.config["CATALOGUE_SNAPSHOT_PATH"] = str(path)
+    app.config["CATALOGUE_SNAPSHOT_CHECK_SECONDS"] = 0
+    return path
+
+
+@pytest.fixture
+def guides(make_guide):
+    """Insert a small catalogue and return the guide IDs."""
+    return [
+        make_guide("a@example.com", languages="en,ja", areas="Tokyo, Shibuya",
+                   specialties="Ramen", rating=4.8, price_min=8000),
+        make_guide("b@example.com", languages="ja", areas="Kyoto",
+                   specialties="Temples, Tea Ceremony", rating=4.1, price_min=12000),
+        make_guide("c@example.com", languages="en,fr", areas="Tokyo",
+                   specialties="Ramen, Nightlife", rating=3.2),
+        make_guide("d@example.com", languages="zh", areas="Osaka", specialties="Food"),
+    ]
+
+
+class TestCatalogueSnapshot:
+    """Tests for writing and reading the snapshot file."""
+
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"languages": ["en"]},
+        {"areas": ["tok"], "min_rating": 4.0},
+        {"specialties": ["ramen"], "max_price": 10000},
+        {"languages": ["ja", "zh"], "areas": ["kyoto"], "min_rating": 3.7},
+    ])
+    def test_matches_in_process_indexes(self, guides, snapshot_path, filters):
+        """
+        Facet counts and suggestions equal the per-process indexes' answers.
+
+        Args:
+            guides: Inserted guide IDs
+            snapshot_path: Snapshot file location
+            filters: GuideFilter fields under test
+        """
+        assert catalogue.write_snapshot()["guides"] == len(guides)
+        snapshot = catalogue.get_snapshot()
+        guide_filter = GuideFilter(**filters)
+
+        assert catalogue.facet_counts(snapshot, guide_filter) == facets.facet_counts(guide_filter)
+        for field, prefix in (("areas", "t"), ("languages", ""), ("specialties", "tea"), ("areas", "zz")):
+            assert snapshot.suggest(field, prefix, 3) == suggest.suggest(field, prefix, 3)
+
+    def test_new_version_is_swapped_in(self, guides, snapshot_path, make_guide):
+        """Readers pick up a rewritten file while old mappings stay usable."""
+        catalogue.write_snapshot()
+        old = catalogue.get_snapshot()
+
+        make_guide("e@example.com", languages="en", areas="Nara")
+        catalogue.write_snapshot()
+        new = catalogue.get_snapshot()
+
+        assert new is not old
+        assert new.size == len(guides) + 1
+        assert new.suggest("areas", "na") == [("nara", 1)]
+        assert old.suggest("areas", "na") == []
+
+    def test_endpoints_serve_from_snapshot(self, client, guides, snapshot_path):
+        """With a snapshot configured the routes read it, not the database."""
+        catalogue.write_snapshot()
+        body = client.get("/api/guides/facets", query_string={"languages": "en"}).get_json()
+        assert body["total"] == 2
+
+        response = client.get("/api/guides/suggest", query_string={"field": "areas", "q": "to"})
+        assert response.get_json()["suggestions"] == [{"value": "tokyo", "count": 2}]
+
+
+def test_missing_snapshot_falls_back(app, clean_db, snapshot_path):
+    """Without a written file the in-process indexes are used."""
+    assert catalogue.get_snapshot() is None
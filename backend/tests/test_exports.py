@@ -0,0 +1,218 @@
+"""
+Test suite for streaming exports and snapshot imports.
+"""
+
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app import db
+from app.models import ArchivedUser, Guide, GuideDocument, OutboxEvent, User
+from app.services import exports, user_archive
+
+
+@pytest.fixture
+def populated(clean_db, make_guide):
+    """Two guides and a traveler with NULL-able fields left empty."""
+    make_guide("kyoto@example.com", name_romanized="Aiko", languages="ja,en", areas="Kyoto",
+               rating=4.75, price_range="8000-15000", bio='Says "hello", then\nleaves')
+    make_guide("tokyo@example.com", languages="en")
+    traveler = User(email="traveler@example.com")
+    traveler.set_password("password123")
+    db.session.add(traveler)
+    db.session.commit()
+    return traveler.id
+
+
+def table_rows():
+    return {
+        name: db.session.execute(select(spec.table).order_by(*spec.table.primary_key.columns)).all()
+        for name, spec in exports.TABLES.items()
+    }
+
+
+def wipe():
+    for table in (GuideDocument.__table__, Guide.__table__, OutboxEvent.__table__, User.__table__,
+                  ArchivedUser.__table__):
+        db.session.execute(delete(table))
+    db.session.commit()
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv", "parquet"])
+def test_round_trip(app, populated, tmp_path, fmt):
+    """
+    A restored snapshot reproduces every column, including NULLs and timestamps.
+
+    Args:
+        app: Flask application fixture
+        populated: Seeded users and guides
+        tmp_path: pytest temporary directory
+        fmt: Export format
+    """
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    runner = app.test_cli_runner()
+    before = table_rows()
+
+    result = runner.invoke(args=["export", "--out", str(tmp_path), "--format", fmt])
+    assert result.exit_code == 0, result.output
+    assert "users: 3 rows" in result.output and "guides: 2 rows" in result.output
+
+    wipe()
+    result = runner.invoke(args=["import", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert table_rows() == before
+    assert GuideDocument.query.count() == 2
+
+
+def test_export_streams_in_batches(app, populated, tmp_path):
+    """Rows are fetched and written one partition of ``batch_size`` at a time."""
+    progress = []
+    manifest = exports.export_tables(str(tmp_path), names=["users"], batch_size=2,
+                                     progress=lambda table, rows: progress.append(rows))
+    assert progress == [2, 3]
+    assert manifest["tables"]["users"]["rows"] == 3
+
+    with gzip.open(tmp_path / "users.jsonl.gz", "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert {r["email"] for r in records} == {"kyoto@example.com", "tokyo@example.com", "traveler@example.com"}
+    assert all("hashed_password" in r for r in records)
+
+
+def test_incremental_export_and_restore(app, populated, make_guide, tmp_path):
+    """An incremental snapshot carries changed rows and deletions on top of a full one."""
+    runner = app.test_cli_runner()
+    full, delta = tmp_path / "full", tmp_path / "delta"
+    assert runner.invoke(args=["export", "--out", str(full)]).exit_code == 0
+    since = datetime.utcnow()
+
+    guide = Guide.query.filter_by(email="kyoto@example.com").one()
+    guide.rating = 4.9
+    db.session.delete(db.session.get(User, populated))
+    db.session.commit()
+    make_guide("osaka@example.com")
+    after = table_rows()
+
+    result = runner.invoke(args=["export", "--out", str(delta), "--since", since.isoformat()])
+    assert result.exit_code == 0, result.output
+    manifest = exports.read_manifest(str(delta))
+    assert manifest["tables"]["users"]["rows"] == 2
+    assert manifest["tables"]["users"]["deleted"] == 1
+    assert manifest["tables"]["guides"]["rows"] == 2
+
+    wipe()
+    assert runner.invoke(args=["import", str(full)]).exit_code == 0
+    result = runner.invoke(args=["import", str(delta)])
+    assert "users: 2 rows upserted, 1 deleted" in result.output
+    assert table_rows() == after
+
+    # A previous snapshot can be given instead of a timestamp
+    assert exports.parse_since(str(delta)) == (
+        datetime.fromisoformat(manifest["until"]) - exports.SINCE_OVERLAP
+    )
+
+
+def test_incremental_export_includes_batch_registrations(app, client, populated, tmp_path):
+    """Accounts created by batch registration (Core inserts) are in the next incremental snapshot."""
+    since = datetime.utcnow()
+    response = client.post("/api/auth/register/batch", json={"users": [
+        {"email": "partner1@example.com", "password": "password123"},
+        {"email": "partner2@example.com", "password": "password123"},
+    ]})
+    assert response.get_json()["created"] == 2
+
+    exports.export_tables(str(tmp_path), names=["users"], since=since)
+    with gzip.open(tmp_path / "users.jsonl.gz", "rt") as f:
+        emails = {json.loads(line)["email"] for line in f}
+    assert emails == {"partner1@example.com", "partner2@example.com"}
+
+
+def feed(after_id=0):
+    return sorted(
+        (e.aggregate_type, e.event_type, e.aggregate_id, json.loads(e.payload))
+        for e in OutboxEvent.query.filter(OutboxEvent.id > after_id)
+    )
+
+
+def test_import_replays_the_source_events(app, populated, make_guide, tmp_path):
+    """Imports append the events the source wrote, unless --no-events is given."""
+    runner = app.test_cli_runner()
+    full, delta = tmp_path / "full", tmp_path / "delta"
+    leaving = User(email="leaving@example.com")
+    leaving.set_password("password123")
+    db.session.add(leaving)
+    db.session.commit()
+    assert runner.invoke(args=["export", "--out", str(full)]).exit_code == 0
+    since = datetime.utcnow()
+    last_id = db.session.query(db.func.max(OutboxEvent.id)).scalar()
+
+    db.session.delete(leaving)
+    Guide.query.filter_by(email="kyoto@example.com").one().rating = 4.9
+    db.session.commit()
+    assert user_archive.archive_batch(datetime.utcnow() + timedelta(days=1))[1] == 1
+    make_guide("osaka@example.com", languages="ja")
+    source = feed(last_id)
+    assert [(aggregate, event) for aggregate, event, _, _ in source] == [
+        ("guide", "created"), ("guide", "updated"), ("user", "archived"), ("user", "deleted"),
+    ]
+    assert runner.invoke(args=["export", "--out", str(delta), "--since", since.isoformat()]).exit_code == 0
+
+    wipe()
+    assert runner.invoke(args=["import", "--no-events", str(full)]).exit_code == 0
+    assert OutboxEvent.query.count() == 0
+    assert runner.invoke(args=["import", str(delta)]).exit_code == 0
+    assert feed() == source
+
+    # Rows new to the target are created; guides' user rows are guide events
+    wipe()
+    assert runner.invoke(args=["import", str(full)]).exit_code == 0
+    assert sorted((aggregate, event) for aggregate, event, _, _ in feed()) == [
+        ("guide", "created"), ("guide", "created"), ("user", "created"), ("user", "created"),
+    ]
+
+
+def test_archived_accounts_survive_export_and_import(app, client, populated, tmp_path):
+    """Archiving is replayed as a move; full snapshots keep archived accounts."""
+    runner = app.test_cli_runner()
+    full, delta = tmp_path / "full", tmp_path / "delta"
+    assert runner.invoke(args=["export", "--out", str(full)]).exit_code == 0
+    since = datetime.utcnow()
+    assert user_archive.archive_batch(datetime.utcnow() + timedelta(days=1))[1] == 1
+    after = table_rows()
+    assert len(after["archived_users"]) == 1
+
+    assert runner.invoke(args=["export", "--out", str(delta), "--since", since.isoformat()]).exit_code == 0
+    wipe()
+    assert runner.invoke(args=["import", str(full)]).exit_code == 0
+    assert runner.invoke(args=["import", str(delta)]).exit_code == 0
+    assert table_rows() == after
+
+    # The moved account can still log in, and its email stays taken
+    assert client.post("/api/auth/login", json={"email": "traveler@example.com",
+                                                 "password": "password123"}).status_code == 200
+    restored, snapshot = tmp_path / "restored", tmp_path / "with-archive"
+    assert runner.invoke(args=["export", "--out", str(restored), "--since", since.isoformat()]).exit_code == 0
+    wipe()
+    assert runner.invoke(args=["import", str(full)]).exit_code == 0
+    assert runner.invoke(args=["import", str(restored)]).exit_code == 0
+    assert ArchivedUser.query.count() == 0
+    assert db.session.get(User, populated) is not None
+
+    # A full snapshot taken while the account is archived restores it as archived
+    user_archive.archive_batch(datetime.utcnow() + timedelta(days=1))
+    assert runner.invoke(args=["export", "--out", str(snapshot)]).exit_code == 0
+    wipe()
+    assert runner.invoke(args=["import", str(snapshot)]).exit_code == 0
+    assert [row.id for row in ArchivedUser.query] == [populated]
+
+
+def test_invalid_arguments(app, clean_db, tmp_path):
+    """Unknown tables and unparseable --since values are reported, not raised."""
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["export", "bookings", "--out", str(tmp_path)])
+    assert result.exit_code != 0 and "Unknown tables: bookings" in result.output
+    result = runner.invoke(args=["export", "--out", str(tmp_path), "--since", "yesterday"])
+    assert result.exit_code != 0 and "--since" in result.output
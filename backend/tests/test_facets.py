@@ -0,0 +1,94 @@
+"""
+Test suite for faceted guide search counts.
+"""
+
+from app import db
+from app.models import Guide
+from app.services.facets import FacetIndex
+from app.services.guide_filters import GuideFilter
+
+
+def _snapshot(guide_id, rating=None, deleted=False, **fields):
+    data = {"id": guide_id, "deleted": deleted, "rating": rating}
+    for name in ("languages", "areas", "specialties"):
+        data[name] = fields.get(name)
+    return data
+
+
+class TestFacetIndex:
+    """Tests for the bitmap facet index."""
+
+    def test_counts_are_disjunctive_per_field(self):
+        """A field's own filter does not narrow that field's counts."""
+        index = FacetIndex()
+        index.apply([
+            _snapshot("1", rating=4.8, languages="en,ja", areas="tokyo"),
+            _snapshot("2", rating=4.2, languages="en", areas="kyoto"),
+            _snapshot("3", rating=3.2, languages="fr", areas="tokyo"),
+        ])
+
+        result = index.counts(GuideFilter(languages=["EN"]))
+        assert result["total"] == 2
+        assert result["facets"]["languages"] == [
+            {"value": "en", "count": 2},
+            {"value": "fr", "count": 1},
+            {"value": "ja", "count": 1},
+        ]
+        assert result["facets"]["areas"] == [
+            {"value": "kyoto", "count": 1},
+            {"value": "tokyo", "count": 1},
+        ]
+        assert result["facets"]["rating"][0] == {"min": 4.5, "count": 1}
+        assert result["facets"]["rating"][1] == {"min": 4.0, "count": 2}
+
+    def test_incremental_updates_reuse_slots(self):
+        """Updates move bits between values and deleted slots are reused."""
+        index = FacetIndex()
+        index.apply([_snapshot("1", languages="en"), _snapshot("2", languages="en")])
+        index.apply([_snapshot("1", languages="de"), _snapshot("2", deleted=True)])
+        index.apply([_snapshot("3", languages="de", rating=4.6)])
+
+        assert index.size == 2
+        result = index.counts(GuideFilter(min_rating=4.6))
+        assert result["total"] == 1
+        assert result["facets"]["languages"] == [{"value": "de", "count": 1}]
+
+    def test_availability_ids_narrow_counts(self):
+        """Guide ids from the availability query act as one more bitmap."""
+        index = FacetIndex()
+        index.apply([_snapshot("1", areas="nara"), _snapshot("2", areas="nara")])
+        result = index.counts(GuideFilter(), available_ids=["2", "unknown"])
+        assert result["facets"]["areas"] == [{"value": "nara", "count": 1}]
+
+
+class TestFacetEndpoint:
+    """Tests for ``/api/guides/facets``."""
+
+    def test_counts_follow_guide_writes(self, client, make_guide):
+        """
+        Facet counts match the listing and track committed changes.
+
+        Args:
+            client: Flask test client fixture
+            make_guide: Guide factory fixture
+        """
+        guide_id = make_guide("a@example.com", languages="en", areas="kyoto", rating=4.7)
+        make_guide("b@example.com", languages="ja", areas="kyoto", rating=4.0)
+
+        response = client.get("/api/guides/facets?areas=kyoto&min_rating=4.5")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["total"] == len(client.get("/api/guides?areas=kyoto&min_rating=4.5").get_json())
+        assert data["facets"]["languages"] == [{"value": "en", "count": 1}]
+
+        guide = db.session.get(Guide, guide_id)
+        guide.languages = "en,ja"
+        db.session.commit()
+
+        data = client.get("/api/guides/facets?languages=ja").get_json()
+        assert data["total"] == 2
+        assert {"value": "en", "count": 1} in data["facets"]["languages"]
+
+    def test_invalid_range_rejected(self, client, clean_db):
+        """Malformed availability ranges return 400."""
+        assert client.get("/api/guides/facets?available_from=nope").status_code == 400
@@ -0,0 +1,155 @@
+"""
+Test suite for favorites and bulk favorited-flag lookups.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import User
+from app.services import favorites
+
+
+@pytest.fixture
+def traveler_id(clean_db):
+    """Insert a traveler account and return its ID."""
+    user = User(email="traveler@example.com")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@contextmanager
+def count_favorite_queries():
+    """Count statements against the favorites table."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if "favorites" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+
+class TestFavoriteRoutes:
+    """Tests for adding, removing and listing favorites."""
+
+    def test_add_is_idempotent_and_listed(self, client, make_guide, traveler_id, auth_headers):
+        """
+        Adding twice keeps one row; the list holds guide documents.
+
+        Args:
+            client: Flask test client fixture
+            make_guide: Guide factory
+            traveler_id: Traveler account ID
+            auth_headers: Authorization header factory
+        """
+        headers = auth_headers(traveler_id)
+        guide_id = make_guide("guide@example.com", languages="en")
+
+        assert client.put(f"/api/favorites/{guide_id}", headers=headers).status_code == 201
+        assert client.put(f"/api/favorites/{guide_id}", headers=headers).status_code == 200
+        assert client.put("/api/favorites/missing", headers=headers).status_code == 404
+
+        body = client.get("/api/favorites", headers=headers).get_json()
+        assert body["total"] == 1
+        assert [g["id"] for g in body["guides"]] == [guide_id]
+
+        assert client.delete(f"/api/favorites/{guide_id}", headers=headers).status_code == 200
+        assert client.delete(f"/api/favorites/{guide_id}", headers=headers).status_code == 404
+        assert client.get("/api/favorites", headers=headers).get_json() == {"total": 0, "guides": []}
+
+    def test_list_without_read_model(self, app, client, make_guide, traveler_id, auth_headers):
+        """With the read model off the list is built from the guide tables, in favorite order."""
+        headers = auth_headers(traveler_id)
+        first, second = make_guide("first@example.com"), make_guide("second@example.com")
+        client.put(f"/api/favorites/{first}", headers=headers)
+        client.put(f"/api/favorites/{second}", headers=headers)
+        with_documents = client.get("/api/favorites", headers=headers).get_json()
+
+        app.config["GUIDE_READ_MODEL"] = False
+        assert client.get("/api/favorites", headers=headers).get_json() == with_documents
+        assert with_documents["total"] == 2 and len(with_documents["guides"]) == 2
+
+    def test_requires_authentication(self, client, clean_db):
+        """Favorites are per traveler."""
+        assert client.get("/api/favorites").status_code == 401
+        assert client.get("/api/favorites/check?guide_ids=a").status_code == 401
+
+
+class TestBulkMembership:
+    """Tests for resolving favorited flags for a page of guides."""
+
+    def test_check_resolves_page_in_one_query(self, app, client, make_guide, traveler_id, auth_headers):
+        """The whole page is checked with a single favorites query."""
+        headers = auth_headers(traveler_id)
+        ids = [make_guide(f"guide{i}@example.com") for i in range(5)]
+        client.put(f"/api/favorites/{ids[1]}", headers=headers)
+        client.put(f"/api/favorites/{ids[3]}", headers=headers)
+
+        with app.app_context(), count_favorite_queries() as statements:
+            response = client.get("/api/favorites/check?guide_ids=" + ",".join(ids), headers=headers)
+        assert response.get_json()["favorited"] == {
+            guide_id: guide_id in (ids[1], ids[3]) for guide_id in ids
+        }
+        assert len(statements) == 1
+
+        too_many = ",".join(f"g{i}" for i in range(101))
+        assert client.get(f"/api/favorites/check?guide_ids={too_many}", headers=headers).status_code == 400
+        assert client.get("/api/favorites/check", headers=headers).status_code == 400
+
+    @pytest.mark.parametrize("read_model", [True, False])
+    def test_guides_listing_annotation(self, app, client, make_guide, traveler_id, auth_headers, read_model):
+        """``include=favorited`` flags every listed guide, from either listing path."""
+        app.config["GUIDE_READ_MODEL"] = read_model
+        headers = auth_headers(traveler_id)
+        liked = make_guide("liked@example.com", languages="en")
+        other = make_guide("other@example.com", languages="en")
+        client.put(f"/api/favorites/{liked}", headers=headers)
+
+        guides = client.get("/api/guides?include=favorited", headers=headers).get_json()
+        assert {g["id"]: g["favorited"] for g in guides} == {liked: True, other: False}
+
+        # Without the flag the response is unchanged; anonymous callers cannot ask for it
+        assert "favorited" not in client.get("/api/guides", headers=headers).get_json()[0]
+        assert client.get("/api/guides?include=favorited").status_code == 401
+
+    def test_cached_sets_skip_the_query(self, app, client, make_guide, traveler_id, auth_headers):
+        """A cached user's flags come from memory and reflect this worker's writes."""
+        app.config["FAVORITES_CACHE_SIZE"] = 10
+        headers = auth_headers(traveler_id)
+        ids = [make_guide(f"guide{i}@example.com") for i in range(3)]
+        client.put(f"/api/favorites/{ids[0]}", headers=headers)
+        check = "/api/favorites/check?guide_ids=" + ",".join(ids)
+
+        client.get(check, headers=headers)
+        client.put(f"/api/favorites/{ids[2]}", headers=headers)
+        with app.app_context(), count_favorite_queries() as statements:
+            flags = client.get(check, headers=headers).get_json()["favorited"]
+        assert flags == {ids[0]: True, ids[1]: False, ids[2]: True}
+        assert statements == []
+
+        metrics = client.get("/api/metrics").get_json()["favorites"]
+        assert metrics["enabled"] and metrics["users"] == 1 and metrics["hits"] >= 1
+
+
+def test_favorite_sets_lru_and_ttl(monkeypatch):
+    """Least recently used users are evicted; stale entries are reloaded."""
+    now = [0.0]
+    monkeypatch.setattr(favorites.time, "monotonic", lambda: now[0])
+    sets = favorites.FavoriteSets(size=2, ttl=30)
+    sets.put("a", ["g1"])
+    sets.put("b", [])
+    assert sets.get("a") == {"g1"}
+    sets.put("c", [])
+    assert sets.get("b") is None and sets.get("a") == {"g1"}
+
+    now[0] = 31
+    assert sets.get("a") is None
@@ -0,0 +1,133 @@
+"""
+Test suite for the denormalized guide read model.
+"""
+
+from datetime import datetime
+
+from app import db
+from app.models import Guide, GuideDocument, User
+from app.services import guide_documents
+
+
+class TestDocumentMaintenance:
+    """Tests for keeping documents in sync with write-side changes."""
+
+    def test_insert_and_update_maintain_document(self, clean_db, make_guide):
+        """
+        Documents follow guide inserts and updates on either table.
+
+        Args:
+            clean_db: Clean database fixture
+            make_guide: Guide factory fixture
+        """
+        guide_id = make_guide("guide@example.com", name_romanized="Kenji", rating=4.5, languages="ja,en")
+        document = db.session.get(GuideDocument, (guide_id, "default"))
+        assert document is not None
+        assert document.languages == "ja,en"
+        assert '"name_romanized":"Kenji"' in document.body
+
+        guide = db.session.get(Guide, guide_id)
+        guide.rating = 4.9
+        guide.email = "renamed@example.com"
+        db.session.commit()
+        db.session.refresh(document)
+        assert document.rating == 4.9
+        assert '"email":"renamed@example.com"' in document.body
+
+    def test_non_document_columns_skip_refresh(self, clean_db, make_guide, monkeypatch):
+        """Login touches and password changes do not rewrite the document."""
+        guide_id = make_guide("guide@example.com")
+        refreshed = []
+        monkeypatch.setattr(guide_documents, "refresh_documents",
+                            lambda connection, ids: refreshed.extend(ids))
+
+        guide = db.session.get(Guide, guide_id)
+        guide.last_login_at = datetime.utcnow()
+        guide.set_password("another-password")
+        db.session.commit()
+        assert refreshed == []
+
+        guide.bio = "Food tours"
+        db.session.commit()
+        assert refreshed == [guide_id]
+
+    def test_plain_users_have_no_document(self, clean_db):
+        """Travelers (plain User rows) never get guide documents."""
+        user = User(email="traveler@example.com")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+        assert GuideDocument.query.count() == 0
+
+    def test_rebuild_all_repairs_missing_and_stale_documents(self, clean_db, make_guide):
+        """A full rebuild recreates lost documents and drops orphaned ones."""
+        guide_ids = [make_guide("first@example.com"), make_guide("second@example.com")]
+        GuideDocument.query.delete()
+        db.session.add(GuideDocument(guide_id="orphan", body="{}"))
+        db.session.commit()
+
+        assert guide_documents.rebuild_all(batch_size=1) == 2
+        assert sorted(d.guide_id for d in GuideDocument.query) == sorted(guide_ids)
+
+
+class TestDocumentReads:
+    """Tests for serving guides from stored documents."""
+
+    def test_get_and_list_serve_documents(self, app, client, make_guide):
+        """
+        The read model returns the same payload as the ORM path.
+
+        Args:
+            app: Flask application fixture
+            client: Flask test client fixture
+            make_guide: Guide factory fixture
+        """
+        guide_id = make_guide("guide@example.com", languages="en", areas="tokyo", rating=4.8)
+        make_guide("other@example.com", languages="fr", areas="paris", rating=4.1)
+
+        from_documents = client.get(f"/api/guides/{guide_id}").get_json()
+        listed = client.get("/api/guides?languages=en&areas=tokyo").get_json()
+
+        app.config["GUIDE_READ_MODEL"] = False
+        from_orm = client.get(f"/api/guides/{guide_id}").get_json()
+
+        assert from_documents == from_orm
+        assert listed == [from_orm]
+
+    def test_missing_document_falls_back_to_orm(self, client, make_guide):
+        """Guides without a document (e.g. before a rebuild) are still served."""
+        guide_id = make_guide("guide@example.com")
+        GuideDocument.query.delete()
+        db.session.commit()
+
+        assert client.get(f"/api/guides/{guide_id}").status_code == 200
+        assert client.get("/api/guides/missing").status_code == 404
+
+    def test_core_listing_matches_orm_serialization(self, app, client, make_guide):
+        """
+        With the read model off, listings are encoded from Core rows exactly as ``to_dict`` would be.
+
+        Args:
+            app: Flask application fixture
+            client: Flask test client fixture
+            make_guide: Guide factory fixture
+        """
+        guide_id = make_guide("guide@example.com", name_romanized='Ké "Ken" \\ 健二\n', rating=4.0,
+                              languages="en", specialties="Ramen", price_min=8000)
+        make_guide("other@example.com", languages="fr")
+        app.config["GUIDE_READ_MODEL"] = False
+
+        response = client.get("/api/guides", query_string={"languages": "en", "max_price": "9000"})
+        expected = guide_documents.serialize(db.session.get(Guide, guide_id).to_dict())
+        assert response.get_data(as_text=True) == f"[{expected}]"
+
+    def test_encoder_matches_to_dict_edge_cases(self, clean_db, make_guide):
+        """Stored bodies equal ``serialize(to_dict())`` for None, non-ASCII and float values."""
+        guide_ids = [
+            make_guide("none@example.com", rating=None, bio=None, areas=""),
+            make_guide("float@example.com", rating=1 / 3, bio="東京 \u2028 \"quoted\"\t"),
+            make_guide("tiny@example.com", rating=1e-7, name_romanized="Zoë"),
+        ]
+        for guide_id in guide_ids:
+            document = db.session.get(GuideDocument, (guide_id, "default"))
+            assert document.body == guide_documents.serialize(db.session.get(Guide, guide_id).to_dict())
@@ -0,0 +1,123 @@
+"""
+Test suite for Idempotency-Key handling on POST endpoints.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import IdempotencyKey, User
+from app.services import idempotency
+
+CREDENTIALS = {"email": "retry@example.com", "password": "password123"}
+
+
+def register(client, key, body=CREDENTIALS):
+    return client.post("/api/auth/register", json=body, headers={"Idempotency-Key": key})
+
+
+class TestIdempotentRegistration:
+    """Tests for replaying stored registration responses."""
+
+    def test_retry_replays_original_response(self, client, clean_db, monkeypatch):
+        """
+        A retried request gets the first response without hashing again.
+
+        Args:
+            client: Flask test client fixture
+            clean_db: Clean database fixture
+            monkeypatch: pytest monkeypatch fixture
+        """
+        first = register(client, "key-1")
+        assert first.status_code == 201
+
+        hashes = []
+        monkeypatch.setattr(User, "set_password", lambda self, password: hashes.append(password))
+        retry = register(client, "key-1")
+        assert retry.status_code == 201
+        assert retry.get_json() == first.get_json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert hashes == []
+        assert User.query.count() == 1
+
+        # Without a key the duplicate is a plain conflict
+        assert client.post("/api/auth/register", json=CREDENTIALS).status_code == 409
+
+    def test_key_reused_for_different_request(self, client, clean_db):
+        """A key bound to one body cannot be replayed for another."""
+        assert register(client, "key-1").status_code == 201
+        other = register(client, "key-1", {"email": "other@example.com", "password": "password123"})
+        assert other.status_code == 422
+        assert User.query.count() == 1
+
+    def test_in_progress_key_is_locked_until_abandoned(self, app, client, clean_db):
+        """Concurrent retries get 409 until the lock of a dead request times out."""
+        with app.test_request_context("/api/auth/register", method="POST", json=CREDENTIALS,
+                                      headers={"Idempotency-Key": "key-1"}):
+            record_id = idempotency._record_id("key-1")
+            lock, existing = idempotency._claim(record_id, idempotency._fingerprint())
+            assert lock is not None and existing is None
+
+        response = register(client, "key-1")
+        assert response.status_code == 409
+        assert response.headers["Retry-After"] == "1"
+
+        db.session.get(IdempotencyKey, record_id).locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert register(client, "key-1").status_code == 201
+
+    def test_server_errors_release_the_key(self, client, clean_db, monkeypatch):
+        """A failed attempt leaves nothing stored, so the retry runs for real."""
+        def fail(self, password):
+            raise RuntimeError("KDF unavailable")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(User, "set_password", fail)
+            assert register(client, "key-1").status_code == 500
+        assert IdempotencyKey.query.count() == 0
+        assert register(client, "key-1").status_code == 201
+
+    def test_taken_over_key_is_left_to_its_new_owner(self, app, client, clean_db):
+        """A worker whose lock expired neither stores nor releases the row it lost."""
+        with app.test_request_context("/api/auth/register", method="POST", json=CREDENTIALS,
+                                      headers={"Idempotency-Key": "key-1"}):
+            record_id = idempotency._record_id("key-1")
+            lock, _ = idempotency._claim(record_id, idempotency._fingerprint())
+
+        db.session.get(IdempotencyKey, record_id).locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert register(client, "key-1").status_code == 201
+        stored = db.session.get(IdempotencyKey, record_id).response_body
+
+        with app.test_request_context():
+            response = app.response_class("{}", status=201, mimetype="application/json")
+            assert idempotency._complete(record_id, lock, response) is False
+            assert idempotency._release(record_id, lock) is False
+        row = db.session.get(IdempotencyKey, record_id)
+        db.session.refresh(row)
+        assert row.response_body == stored
+
+    def test_oversized_body_is_rejected_before_hashing(self, app, client, clean_db):
+        """Bodies over MAX_CONTENT_LENGTH get 413 and claim nothing."""
+        app.config["MAX_CONTENT_LENGTH"] = 64
+        response = register(client, "key-1", {"email": "x" * 100 + "@example.com", "password": "password123"})
+        assert response.status_code == 413
+        assert IdempotencyKey.query.count() == 0
+
+    @pytest.mark.parametrize("key", ["", "k" * 256])
+    def test_invalid_keys_are_rejected(self, client, clean_db, key):
+        """Empty and overlong keys get 400."""
+        assert register(client, key).status_code == 400
+
+
+def test_prune_expired(app, client, clean_db):
+    """Expired rows are deleted; live ones are kept."""
+    register(client, "old")
+    register(client, "new", {"email": "new@example.com", "password": "password123"})
+    oldest = IdempotencyKey.query.order_by(IdempotencyKey.created_at).first()
+    oldest.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    assert idempotency.prune_expired() == 1
+    assert IdempotencyKey.query.count() == 1
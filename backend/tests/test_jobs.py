@@ -0,0 +1,122 @@
+"""
+Test suite for the background job queue and worker.
+"""
+
+import time
+
+import pytest
+
+from app.services.jobs import Worker, enqueue, get_backend, job, registry
+
+calls = []
+
+
+@job('tests.record', max_retries=2, backoff=0)
+def record(value):
+    calls.append(value)
+
+
+@job('tests.explode', max_retries=1, backoff=0)
+def explode():
+    calls.append('boom')
+    raise RuntimeError('boom')
+
+
+@job('tests.slow', max_retries=0, backoff=0)
+def slow():
+    time.sleep(0.1)
+    calls.append('slow')
+
+
+@pytest.fixture
+def memory_queue(app, clean_db):
+    """Configure the app with the in-process backend and return a worker."""
+    calls.clear()
+    app.config["JOBS_BACKEND"] = "memory"
+    app.extensions.pop("jobs", None)
+    return Worker(app, get_backend(), poll_timeout=0)
+
+
+class TestWorker:
+    """Tests for running, retrying and dead-lettering jobs."""
+
+    def test_enqueued_job_runs_in_worker(self, memory_queue):
+        """Jobs are deferred until a worker runs them."""
+        record.delay("hello")
+        assert calls == []
+        assert memory_queue.run_pending() == 1
+        assert calls == ["hello"]
+
+    def test_failed_job_retries_then_dead_letters(self, memory_queue):
+        """
+        A failing job is retried ``max_retries`` times and then buried.
+
+        Args:
+            memory_queue: Worker fixture using the in-process backend
+        """
+        explode.delay()
+        memory_queue.run_pending()
+
+        backend = memory_queue.backend
+        assert calls == ["boom", "boom"]
+        dead = backend.dead_letters()
+        assert len(dead) == 1
+        assert dead[0].attempts == 2
+        assert "RuntimeError" in dead[0].last_error
+
+        assert backend.requeue_dead() == 1
+        assert backend.stats()["ready"] == 1
+
+    def test_delayed_job_waits_until_due(self, memory_queue):
+        """Scheduled jobs are not runnable before their run time."""
+        enqueue("tests.record", "later", delay=60)
+        assert memory_queue.run_pending() == 0
+
+        memory_queue.backend.promote_due(now=time.time() + 61)
+        assert memory_queue.run_pending() == 1
+        assert calls == ["later"]
+
+    def test_lease_renewed_while_job_runs(self, memory_queue, monkeypatch):
+        """Leasing backends get heartbeats for as long as the job runs, then none."""
+        renewals = []
+        monkeypatch.setattr(memory_queue.backend, "lease_seconds", 0.03, raising=False)
+        monkeypatch.setattr(memory_queue.backend, "extend", lambda job_: renewals.append(job_.name), raising=False)
+
+        slow.delay()
+        assert memory_queue.run_pending() == 1
+        count = len(renewals)
+        assert count >= 2 and set(renewals) == {"tests.slow"}
+        time.sleep(0.05)
+        assert len(renewals) == count
+
+    def test_unknown_job_rejected(self, memory_queue):
+        """Enqueueing an unregistered job fails fast."""
+        with pytest.raises(KeyError):
+            enqueue("tests.missing")
+
+
+class TestEagerMode:
+    """Tests for running jobs inline when no broker is configured."""
+
+    def test_eager_runs_inline_and_swallows_errors(self, app, clean_db):
+        """Eager jobs run immediately and never raise into the caller."""
+        calls.clear()
+        app.config["JOBS_BACKEND"] = "eager"
+        app.extensions.pop("jobs", None)
+
+        record.delay("now")
+        explode.delay()
+        assert calls == ["now", "boom"]
+
+
+class TestRegistrationSideEffects:
+    """Tests for deferring registration side effects."""
+
+    def test_register_enqueues_welcome_email(self, app, client, memory_queue):
+        """Registering queues the welcome email instead of sending it inline."""
+        response = client.post("/api/auth/register", json={"email": "new@example.com", "password": "password123"})
+        assert response.status_code == 201
+
+        assert memory_queue.backend.stats()["ready"] == 1
+        assert "users.send_welcome_email" in registry
+        assert memory_queue.run_pending() == 1
@@ -0,0 +1,149 @@
+"""
+Test suite for traveler–guide messaging and Server-Sent Events delivery.
+"""
+
+import json
+
+import pytest
+
+from app import db
+from app.models import User
+from app.services.pubsub import InProcessBroker
+
+
+@pytest.fixture
+def conversation(client, make_guide, auth_headers):
+    """
+    Create a traveler, a guide and a conversation between them.
+
+    Returns:
+        dict: conversation id plus authorization headers for both sides
+    """
+    guide_id = make_guide("guide@example.com")
+    traveler = User(email="traveler@example.com")
+    traveler.set_password("password123")
+    db.session.add(traveler)
+    db.session.commit()
+
+    traveler_headers = auth_headers(traveler.id)
+    response = client.post("/api/conversations", json={"guide_id": guide_id}, headers=traveler_headers)
+    assert response.status_code == 201
+    return {
+        "id": response.get_json()["id"],
+        "traveler": traveler_headers,
+        "guide": auth_headers(guide_id),
+    }
+
+
+def _send(client, conversation, body, side="traveler"):
+    return client.post(
+        f"/api/conversations/{conversation['id']}/messages",
+        json={"body": body},
+        headers=conversation[side],
+    )
+
+
+class TestConversations:
+    """Tests for starting conversations and posting messages."""
+
+    def test_start_conversation_is_idempotent(self, client, conversation):
+        """Starting a conversation twice returns the existing one."""
+        response = client.get("/api/conversations", headers=conversation["traveler"])
+        guide_id = response.get_json()[0]["guide_id"]
+
+        response = client.post("/api/conversations", json={"guide_id": guide_id}, headers=conversation["traveler"])
+        assert response.status_code == 200
+        assert response.get_json()["id"] == conversation["id"]
+
+    def test_send_message_validation(self, client, conversation):
+        """Empty and oversized messages are rejected."""
+        assert _send(client, conversation, "").status_code == 400
+        assert _send(client, conversation, "x" * 2001).status_code == 400
+        assert _send(client, conversation, "こんにちは").status_code == 201
+
+    def test_non_participant_cannot_read(self, client, conversation, make_guide, auth_headers):
+        """Users outside the conversation get 404."""
+        stranger = auth_headers(make_guide("stranger@example.com"))
+        response = client.get(f"/api/conversations/{conversation['id']}/messages", headers=stranger)
+        assert response.status_code == 404
+
+
+class TestMessageHistory:
+    """Tests for cursor-paginated message history."""
+
+    def test_pages_walk_backwards_without_overlap(self, client, conversation):
+        """
+        History is returned newest first and ``next_cursor`` walks older pages.
+
+        Args:
+            client: Flask test client fixture
+            conversation: Conversation fixture
+        """
+        for i in range(5):
+            _send(client, conversation, f"message {i}", side="traveler" if i % 2 else "guide")
+
+        url = f"/api/conversations/{conversation['id']}/messages?limit=2"
+        bodies, cursor = [], None
+        while True:
+            page = client.get(url + (f"&before={cursor}" if cursor else ""), headers=conversation["guide"])
+            data = page.get_json()
+            bodies.extend(m["body"] for m in data["messages"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert bodies == [f"message {i}" for i in reversed(range(5))]
+
+
+class TestMessageStream:
+    """Tests for ``/api/conversations/<id>/stream``."""
+
+    def test_stream_delivers_new_messages(self, app, client, conversation):
+        """
+        A message posted after the stream opens is pushed to the subscriber.
+
+        Args:
+            app: Flask application fixture
+            client: Flask test client fixture
+            conversation: Conversation fixture
+        """
+        app.config["SSE_MAX_STREAM_SECONDS"] = 1
+        response = client.get(f"/api/conversations/{conversation['id']}/stream", headers=conversation["guide"])
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+
+        _send(client, conversation, "live message")
+        chunks = [chunk.decode() for chunk in response.response]
+        events = [c for c in chunks if c.startswith("id: ")]
+        assert len(events) == 1
+        assert json.loads(events[0].split("data: ", 1)[1])["body"] == "live message"
+
+    def test_stream_replays_after_last_event_id(self, app, client, conversation):
+        """Reconnecting with Last-Event-ID replays only the missed messages."""
+        app.config["SSE_MAX_STREAM_SECONDS"] = 0
+        first = _send(client, conversation, "seen").get_json()
+        _send(client, conversation, "missed")
+
+        headers = dict(conversation["guide"], **{"Last-Event-ID": str(first["id"])})
+        response = client.get(f"/api/conversations/{conversation['id']}/stream", headers=headers)
+        events = [c.decode() for c in response.response if c.startswith(b"id: ")]
+        assert len(events) == 1
+        assert '"missed"' in events[0]
+
+
+class TestInProcessBroker:
+    """Tests for the in-process pub/sub broker."""
+
+    def test_publish_fans_out_and_unsubscribes(self):
+        """Every subscriber on a channel receives messages until it closes."""
+        broker = InProcessBroker()
+        first = broker.subscribe("c")
+        second = broker.subscribe("c")
+        broker.publish("c", "hello")
+        assert first.get(timeout=0) == "hello"
+        assert second.get(timeout=0) == "hello"
+
+        first.close()
+        broker.publish("c", "again")
+        assert first.get(timeout=0) is None
+        assert second.get(timeout=0) == "again"
@@ -0,0 +1,119 @@
+"""
+Test suite for the user/guide outbox and change feed.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Guide, OutboxEvent, User
+from app.services import outbox
+
+
+def _events():
+    return [(e.aggregate_type, e.event_type, e.aggregate_id) for e in outbox.read_events(0, limit=1000)]
+
+
+class TestOutboxWrites:
+    """Tests for events written alongside mutations."""
+
+    def test_mutations_write_events_in_the_same_transaction(self, make_guide):
+        """
+        Committed changes produce events; rolled-back ones do not.
+
+        Args:
+            make_guide: Guide factory
+        """
+        guide_id = make_guide("guide@example.com", languages="en")
+        guide = db.session.get(Guide, guide_id)
+        guide.rating = 4.8
+        db.session.commit()
+
+        guide.rating = 1.0
+        db.session.flush()
+        db.session.rollback()
+
+        # Bookkeeping-only changes are not events
+        guide.last_login_at = datetime.utcnow()
+        db.session.commit()
+
+        assert _events() == [("guide", "created", guide_id), ("guide", "updated", guide_id)]
+        payload = outbox.read_events(1)[0].payload
+        assert payload["rating"] == 4.8
+        assert "hashed_password" not in payload
+
+    def test_registration_writes_user_event(self, client, clean_db):
+        """Accounts created through the API appear in the feed."""
+        response = client.post("/api/auth/register", json={"email": "new@example.com", "password": "password123"})
+        user_id = response.get_json()["user"]["id"]
+        assert _events() == [("user", "created", user_id)]
+
+    def test_batch_registration_writes_one_event_per_created_user(self, client, clean_db):
+        """Batch-registered accounts appear in the feed, conflicts and invalid items do not."""
+        client.post("/api/auth/register", json={"email": "taken@example.com", "password": "password123"})
+        response = client.post("/api/auth/register/batch", json={"users": [
+            {"email": "first@example.com", "password": "password123"},
+            {"email": "taken@example.com", "password": "password123"},
+            {"email": "not-an-email", "password": "password123"},
+            {"email": "second@example.com", "password": "password123"},
+        ]})
+        created = [r["id"] for r in response.get_json()["results"] if r["status"] == "created"]
+        assert len(created) == 2
+        events = outbox.read_events(0)
+        assert sorted((e.aggregate_type, e.event_type, e.aggregate_id) for e in events[1:]) == sorted(
+            ("user", "created", user_id) for user_id in created
+        )
+        assert {e.payload["email"] for e in events[1:]} == {"first@example.com", "second@example.com"}
+
+
+class TestConsume:
+    """Tests for cursor-based consumption."""
+
+    @pytest.fixture
+    def guide_ids(self, make_guide):
+        """Insert three guides (three events)."""
+        return [make_guide(f"guide{i}@example.com") for i in range(3)]
+
+    def test_offsets_advance_per_consumer(self, guide_ids):
+        """Each consumer gets every event once and resumes from its offset."""
+        batches = []
+        assert outbox.consume("search", batches.append, batch_size=2) == 3
+        assert [[e.aggregate_id for e in batch] for batch in batches] == [guide_ids[:2], guide_ids[2:]]
+        assert outbox.consume("search", batches.append) == 0
+
+        assert outbox.consume("cache", lambda events: None) == 3
+        assert {s["consumer"]: s["lag"] for s in outbox.consumer_status()} == {"cache": 0, "search": 0}
+
+    def test_failed_batch_is_redelivered(self, guide_ids):
+        """Offsets only move once the handler returns (at-least-once)."""
+        def fail(events):
+            raise RuntimeError("index unavailable")
+
+        with pytest.raises(RuntimeError):
+            outbox.consume("search", fail)
+        assert outbox.get_offset("search") == 0
+
+        seen = []
+        outbox.consume("search", lambda events: seen.extend(e.aggregate_id for e in events))
+        assert seen == guide_ids
+
+    def test_waits_on_fresh_id_gap(self, clean_db):
+        """A recent gap may still be filled by an in-flight transaction."""
+        now = datetime.utcnow()
+        for event_id, created_at in ((1, now), (3, now)):
+            db.session.add(OutboxEvent(id=event_id, aggregate_type="user", aggregate_id=str(event_id),
+                                       event_type="created", payload="{}", created_at=created_at))
+        db.session.commit()
+        assert [e.id for e in outbox.read_events(0, gap_timeout=60)] == [1]
+
+        db.session.get(OutboxEvent, 3).created_at = now - timedelta(minutes=5)
+        db.session.commit()
+        assert [e.id for e in outbox.read_events(0, gap_timeout=60)] == [1, 3]
+
+    def test_prune_keeps_unconsumed_events(self, guide_ids):
+        """Only events every consumer has processed are pruned."""
+        outbox.consume("search", lambda events: None, batch_size=2, max_batches=1)
+        assert outbox.prune(older_than_days=0) == 2
+        assert OutboxEvent.query.count() == 1
+        assert db.session.get(User, guide_ids[0]) is not None
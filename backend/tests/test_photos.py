@@ -0,0 +1,169 @@
+"""
+Test suite for guide photo upload, thumbnailing and serving.
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+from app import db
+from app.models import Guide, GuidePhoto
+from app.routes.photos import MAX_PHOTOS_PER_GUIDE
+from app.services import photos
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def storage(app, tmp_path):
+    """Point photo storage at a temporary directory."""
+    app.config["PHOTO_STORAGE_DIR"] = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def thumbnail_calls(monkeypatch):
+    """Record thumbnail rendering instead of starting the process pool."""
+    calls = []
+    monkeypatch.setattr(photos, "generate_thumbnails", lambda *args: calls.append(args))
+    return calls
+
+
+@pytest.fixture
+def upload(client, make_guide, auth_headers, storage, thumbnail_calls):
+    """Provide ``upload(body, filename) -> response`` for a fresh guide."""
+    guide_id = make_guide("guide@example.com")
+
+    def _upload(body, filename="photo.png"):
+        return client.post(
+            f"/api/guides/{guide_id}/photos",
+            data={"photo": (io.BytesIO(body), filename)},
+            content_type="multipart/form-data",
+            headers=auth_headers(guide_id),
+        )
+
+    return _upload
+
+
+class TestUpload:
+    """Tests for streaming uploads into content-addressed storage."""
+
+    def test_stores_by_content_hash(self, upload, storage, thumbnail_calls):
+        """
+        The file lands at its digest path and identical uploads share it.
+
+        Args:
+            upload: Upload helper
+            storage: Temporary storage root
+            thumbnail_calls: Recorded thumbnail jobs
+        """
+        digest = hashlib.sha256(PNG_BYTES).hexdigest()
+        response = upload(PNG_BYTES)
+        assert response.status_code == 201
+        body = response.get_json()
+        assert body["digest"] == digest
+        assert body["url"] == f"/api/photos/{digest}.png"
+        assert (storage / digest[:2] / digest[2:4] / f"{digest}.png").read_bytes() == PNG_BYTES
+        assert thumbnail_calls == [(digest, "image/png")]
+
+        assert upload(PNG_BYTES, filename="again.png").get_json()["digest"] == digest
+        assert os.listdir(storage / "tmp") == []
+
+    def test_rejects_non_images_and_oversized_files(self, app, upload, storage):
+        """Type and size are checked while streaming; partial files are removed."""
+        response = upload(b"#!/bin/sh\necho not an image\n", filename="photo.jpg")
+        assert response.status_code == 400
+        assert "JPEG, PNG or WebP" in response.get_json()["error"]
+
+        app.config["PHOTO_MAX_BYTES"] = 4096
+        assert upload(PNG_BYTES).status_code == 413
+        assert os.listdir(storage / "tmp") == []
+
+    def test_chunked_body_is_bounded_by_max_content_length(self, app, client, make_guide, auth_headers, storage):
+        """A chunked upload declares no length, so MAX_CONTENT_LENGTH is enforced while parsing."""
+        guide_id = make_guide("guide@example.com")
+        app.config["MAX_CONTENT_LENGTH"] = 4096
+        body = (b"--boundary\r\nContent-Disposition: form-data; name=\"photo\"; filename=\"photo.png\"\r\n"
+                b"Content-Type: image/png\r\n\r\n" + PNG_BYTES + b"\r\n--boundary--\r\n")
+        response = client.post(
+            f"/api/guides/{guide_id}/photos",
+            input_stream=io.BytesIO(body),
+            content_type="multipart/form-data; boundary=boundary",
+            headers={"Transfer-Encoding": "chunked", **auth_headers(guide_id)},
+            environ_overrides={"wsgi.input_terminated": True},
+        )
+        assert response.status_code == 413
+        assert os.listdir(storage / "tmp") == []
+
+    def test_limit_rechecked_after_concurrent_uploads(self, monkeypatch, upload):
+        """Photos added while the body streamed count against the limit before the insert."""
+        store_upload = photos.store_upload
+
+        def concurrent_uploads(environ, **kwargs):
+            stored = store_upload(environ, **kwargs)
+            guide_id = Guide.query.one().id
+            db.session.add_all([GuidePhoto(guide_id=guide_id, digest=f"{i:064x}", content_type="image/png",
+                                           size_bytes=1) for i in range(MAX_PHOTOS_PER_GUIDE)])
+            db.session.commit()
+            return stored
+
+        monkeypatch.setattr(photos, "store_upload", concurrent_uploads)
+        assert upload(PNG_BYTES).status_code == 409
+        assert GuidePhoto.query.count() == MAX_PHOTOS_PER_GUIDE
+
+    def test_thumbnail_job_marks_photos_ready(self, client, upload):
+        """Listings include thumbnail URLs once the job has run."""
+        from app.tasks import generate_photo_thumbnails
+
+        photo = upload(PNG_BYTES).get_json()
+        generate_photo_thumbnails(photo["digest"], "image/png")
+
+        listed = client.get(f"/api/guides/{photo['guide_id']}/photos").get_json()["photos"]
+        assert listed[0]["thumbnails"]["160"] == f"/api/photos/thumbs/160/{photo['digest']}.jpg"
+
+
+class TestServe:
+    """Tests for immutable, range-capable file responses."""
+
+    def test_range_and_cache_headers(self, client, upload):
+        """Originals are cacheable forever and support Range and ETags."""
+        url = upload(PNG_BYTES).get_json()["url"]
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data == PNG_BYTES
+        assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+        partial = client.get(url, headers={"Range": "bytes=0-7"})
+        assert partial.status_code == 206
+        assert partial.data == PNG_BYTES[:8]
+
+        cached = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        assert cached.status_code == 304
+
+        assert client.get("/api/photos/" + "0" * 64 + ".png").status_code == 404
+
+    def test_accel_redirect_leaves_bytes_to_nginx(self, app, client, upload):
+        """With PHOTO_ACCEL_REDIRECT set the response body is empty."""
+        photo = upload(PNG_BYTES).get_json()
+        app.config["PHOTO_ACCEL_REDIRECT"] = "/protected-photos/"
+
+        response = client.get(photo["url"])
+        digest = photo["digest"]
+        assert response.headers["X-Accel-Redirect"] == f"/protected-photos/{digest[:2]}/{digest[2:4]}/{digest}.png"
+        assert response.data == b""
+
+
+def test_render_thumbnail(tmp_path):
+    """Thumbnails fit within the requested size."""
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "source.png"
+    Image.new("RGBA", (1200, 800), (200, 10, 10, 255)).save(source)
+
+    destination = tmp_path / "thumbs" / "160.jpg"
+    photos.render_thumbnail(str(source), str(destination), 160)
+    with Image.open(destination) as thumbnail:
+        assert thumbnail.size == (160, 107)
+        assert thumbnail.format == "JPEG"
@@ -0,0 +1,104 @@
+"""
+Test suite for the sampling profiler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services import profiler
+
+TOKEN = "admin-secret"
+ADMIN = {"X-Admin-Token": TOKEN}
+
+
+def slow_view():
+    time.sleep(0.05)
+    return {"ok": True}
+
+
+@pytest.fixture
+def profiled_app(app):
+    """App with an admin token, fast sampling and a deliberately slow route."""
+    app.config.update({"ADMIN_API_TOKEN": TOKEN, "PROFILER_INTERVAL_MS": 1})
+    app.add_url_rule("/api/_slow", "slow", slow_view)
+    yield app
+    sampler = app.extensions.get("continuous_profiler")
+    if sampler is not None:
+        sampler.stop()
+
+
+def test_request_sampler_collapses_stacks():
+    """Samples of another thread come out root-first with counts."""
+    done = threading.Event()
+
+    def busy_leaf():
+        done.wait(1)
+
+    worker = threading.Thread(target=busy_leaf)
+    worker.start()
+    sampler = profiler.RequestSampler(worker.ident, 0.001).start()
+    time.sleep(0.05)
+    profile = sampler.stop()
+    done.set()
+    worker.join()
+
+    assert profile.samples > 0
+    stack, count = profile.collapsed().splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("threading:Thread._bootstrap")
+    assert "test_request_sampler_collapses_stacks.<locals>.busy_leaf" in stack
+    assert int(count) >= 1
+
+
+class TestPerRequestProfiling:
+    """Tests for admin-flagged single-request profiles."""
+
+    def test_stored_profile(self, profiled_app):
+        """The response carries an id that fetches the collapsed stacks."""
+        client = profiled_app.test_client()
+        response = client.get("/api/_slow", headers={"X-Profile": "1", **ADMIN})
+        assert response.status_code == 200
+        assert response.get_json() == {"ok": True}
+        profile_id = response.headers["X-Profile-Id"]
+        assert int(response.headers["X-Profile-Samples"]) > 0
+
+        listed = client.get("/api/admin/profiles", headers=ADMIN).get_json()["profiles"]
+        assert listed[0]["id"] == profile_id and listed[0]["endpoint"] == "slow"
+
+        body = client.get(f"/api/admin/profiles/{profile_id}", headers=ADMIN).get_data(as_text=True)
+        assert "slow_view" in body
+        assert client.get("/api/admin/profiles/missing", headers=ADMIN).status_code == 404
+
+    def test_inline_profile(self, profiled_app):
+        """``inline`` replaces the body with the profile."""
+        response = profiled_app.test_client().get("/api/_slow?_profile=inline", headers=ADMIN)
+        assert response.mimetype == "text/plain"
+        assert response.headers["X-Profile-Status"] == "200"
+        assert "slow_view" in response.get_data(as_text=True)
+
+    def test_flag_needs_admin_token(self, profiled_app):
+        """Without a valid token the flag is ignored."""
+        client = profiled_app.test_client()
+        for headers in ({"X-Profile": "1"}, {"X-Profile": "1", "X-Admin-Token": "nope"}):
+            response = client.get("/api/_slow", headers=headers)
+            assert response.get_json() == {"ok": True}
+            assert "X-Profile-Id" not in response.headers
+
+
+def test_continuous_sampling_aggregates_by_endpoint(profiled_app):
+    """Live requests are sampled and aggregated under their endpoint."""
+    client = profiled_app.test_client()
+    assert client.get("/api/admin/profiles/continuous", headers=ADMIN).status_code == 404
+
+    profiled_app.config["PROFILER_CONTINUOUS_HZ"] = 500
+    client.get("/api/_slow")
+    client.get("/api/_slow")
+
+    response = client.get("/api/admin/profiles/continuous?endpoint=slow", headers=ADMIN)
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines and all(line.startswith("slow;") for line in lines)
+    assert any("slow_view" in line for line in lines)
+
+    assert client.delete("/api/admin/profiles/continuous", headers=ADMIN).status_code == 204
+    assert client.get("/api/admin/profiles/continuous?endpoint=slow", headers=ADMIN).get_data(as_text=True) == ""
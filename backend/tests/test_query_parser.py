@@ -0,0 +1,201 @@
+"""
+Test suite for natural-language guide search.
+"""
+
+import threading
+
+import pytest
+
+from app.services import query_parser
+from app.services.guide_filters import MAX_PRICE
+from app.services.query_parser import QueryBackend, QueryParser, RuleBasedBackend, _Dictionary
+
+
+def parse(text, **vocabulary):
+    """Parse ``text`` with the rule backend against a fixed vocabulary."""
+    return RuleBasedBackend().parse(query_parser.normalize_query(text), _Dictionary(vocabulary))
+
+
+class TestRuleBasedBackend:
+    """Tests for pattern and dictionary matching."""
+
+    def test_english_query(self):
+        """Languages, specialties, areas and a yen budget are extracted."""
+        parsed = parse("English-speaking ramen expert in Tokyo under ¥10,000")
+        assert parsed.languages == ["en"]
+        assert parsed.specialties == ["ramen"]
+        assert parsed.areas == ["tokyo"]
+        assert parsed.max_price == 10000
+        assert parsed.min_rating is None
+
+    def test_japanese_query_and_vocabulary_spellings(self):
+        """Japanese synonyms map to the spellings guides actually use."""
+        parsed = parse("東京でラーメン 英語OK 1万円以下", languages=["english"], areas=["tokyo"])
+        assert parsed.languages == ["english"]
+        assert parsed.areas == ["tokyo"]
+        assert parsed.specialties == ["ramen"]
+        assert parsed.max_price == 10000
+
+    def test_ratings_phrases_and_short_codes(self):
+        """Longest phrases win and two-letter codes are not matched as words."""
+        parsed = parse("it's a 4.5+ stars tea ceremony in Shibuya, budget 8k",
+                       areas=["shibuya"], specialties=["tea", "tea ceremony"], languages=["it"])
+        assert parsed.min_rating == 4.5
+        assert parsed.specialties == ["tea ceremony"]
+        assert parsed.areas == ["shibuya"]
+        assert parsed.languages == []
+        assert parsed.max_price == 8000
+        assert parse("top rated guide").min_rating == query_parser.TOP_RATED
+
+    def test_out_of_range_amounts(self):
+        """Huge budgets are clamped to the price column range; exponents are not amounts."""
+        assert parse("under 999999999999999999999999 yen").max_price == MAX_PRICE
+        assert parse("under 1e400").max_price is None
+        assert parse("1e400円以下").max_price is None
+
+    def test_dictionary_rebuilt_when_vocabulary_swapped(self, monkeypatch):
+        """The phrase tables follow the suggest index's token lists by identity."""
+        vocabulary = {"languages": [], "areas": ["shibuya"], "specialties": []}
+        index = type("Index", (), {"tokens": lambda self, name: vocabulary[name]})()
+        monkeypatch.setattr(query_parser.suggest_index, "get", lambda: index)
+        backend = RuleBasedBackend()
+        first = backend._current_dictionary()
+        assert backend._current_dictionary() is first
+
+        vocabulary["areas"] = ["shinjuku"]
+        second = backend._current_dictionary()
+        assert second is not first
+        assert "shinjuku" in second.spaced
+
+
+class RecordingBackend(QueryBackend):
+    """Backend that records its batches and holds the first one until released."""
+
+    def __init__(self):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def parse_batch(self, queries):
+        self.batches.append(list(queries))
+        self.started.set()
+        self.release.wait(5)
+        return [query_parser.ParsedQuery(query=q) for q in queries]
+
+
+class TestQueryParser:
+    """Tests for the cache and micro-batching layers."""
+
+    def test_concurrent_misses_are_batched_and_deduplicated(self, app):
+        """
+        Queries queued while the backend is busy go out as one batch.
+
+        Args:
+            app: Flask application fixture
+        """
+        backend = RecordingBackend()
+        parser = QueryParser(app, backend)
+        results = {}
+
+        def run(name, text):
+            results[name] = parser.parse(text)
+
+        first = threading.Thread(target=run, args=("first", "kyoto"))
+        first.start()
+        assert backend.started.wait(5)
+
+        others = [threading.Thread(target=run, args=(f"t{i}", text))
+                  for i, text in enumerate(["Tokyo", "  TOKYO ", "osaka"])]
+        for thread in others:
+            thread.start()
+        while parser._queue.qsize() < 2:
+            threading.Event().wait(0.01)
+        backend.release.set()
+        for thread in [first, *others]:
+            thread.join(5)
+
+        assert [sorted(batch) for batch in backend.batches] == [["kyoto"], ["osaka", "tokyo"]]
+        assert results["t0"] is results["t1"]
+
+        # Served from the cache from now on
+        assert parser.parse("Osaka") is results["t2"]
+        assert len(backend.batches) == 2
+        assert parser.stats()["cache"]["hits"] >= 1
+
+    def test_short_backend_result_fails_batch_not_worker(self, app):
+        """
+        A backend returning fewer results than queries fails that batch only.
+
+        Args:
+            app: Flask application fixture
+        """
+        parser = QueryParser(app, ShortBackend())
+        with pytest.raises(ValueError):
+            parser.parse("kyoto", timeout=5)
+        assert parser.parse("osaka", timeout=5).query == "osaka"
+
+    def test_slow_batch_times_out_and_is_cached_later(self, app):
+        """A request outwaited by its batch gets ParseTimeoutError; the retry hits the cache."""
+        backend = RecordingBackend()
+        parser = QueryParser(app, backend)
+        with pytest.raises(query_parser.ParseTimeoutError):
+            parser.parse("kyoto", timeout=0.05)
+        backend.release.set()
+        assert parser.parse("kyoto", timeout=5).query == "kyoto"
+        assert len(backend.batches) == 1
+
+
+class ShortBackend(QueryBackend):
+    """Backend that drops the last result of every batch after the first."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def parse_batch(self, queries):
+        self.calls += 1
+        results = [query_parser.ParsedQuery(query=q) for q in queries]
+        return results if self.calls > 1 else results[:-1]
+
+
+class TestSearchEndpoint:
+    """Tests for GET /api/guides/search."""
+
+    def test_search_applies_parsed_filters(self, client, make_guide):
+        """
+        Only guides matching every extracted filter are returned.
+
+        Args:
+            client: Flask test client fixture
+            make_guide: Guide factory
+        """
+        match = make_guide("match@example.com", languages="en,ja", areas="Tokyo",
+                           specialties="Ramen, Sushi", price_min=8000)
+        make_guide("pricey@example.com", languages="en", areas="Tokyo", specialties="Ramen", price_min=20000)
+        make_guide("kyoto@example.com", languages="en", areas="Kyoto", specialties="Ramen", price_min=5000)
+
+        response = client.get("/api/guides/search", query_string={
+            "q": "English-speaking ramen expert in Tokyo under ¥10,000",
+        })
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["filters"]["max_price"] == 10000
+        assert [guide["id"] for guide in body["guides"]] == [match]
+
+        assert client.get("/api/guides/search").status_code == 400
+        huge = client.get("/api/guides/search", query_string={"q": "under 999999999999999999999999 yen"})
+        assert huge.status_code == 200
+        assert huge.get_json()["filters"]["max_price"] == MAX_PRICE
+        for bound in ("inf", "1e400", "-inf", "nan"):
+            assert client.get("/api/guides", query_string={"max_price": bound}).status_code == 200
+        listed = client.get("/api/guides", query_string={"specialties": "sushi", "max_price": "9000"})
+        assert [guide["id"] for guide in listed.get_json()] == [match]
+
+    def test_parser_timeout_is_503(self, client, clean_db, monkeypatch):
+        """A parser backlog asks the client to retry instead of failing with 500."""
+        def busy(text):
+            raise query_parser.ParseTimeoutError("busy")
+
+        monkeypatch.setattr(query_parser, "parse_query", busy)
+        response = client.get("/api/guides/search", query_string={"q": "ramen in Tokyo"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
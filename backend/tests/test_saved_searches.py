@@ -0,0 +1,148 @@
+"""
+Test suite for saved searches and reverse matching of new guides.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Guide, SavedSearchMatch, User
+from app.services import saved_searches
+
+
+@pytest.fixture
+def traveler_id(clean_db):
+    """Insert a traveler account and return its ID."""
+    user = User(email="traveler@example.com")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def sent_emails(monkeypatch):
+    """Capture emails sent by the notification job (eager mode)."""
+    sent = []
+    monkeypatch.setattr("app.tasks.send_email", lambda to, subject, body: sent.append((to, body)))
+    return sent
+
+
+class TestReverseIndex:
+    """Tests for the reverse index keys and the match predicate."""
+
+    def test_search_is_anchored_on_one_field(self):
+        """Searches are indexed under their area terms, else languages, else match-all."""
+        search = type("S", (), {"languages": "ar", "areas": "Marrakech, Fes", "min_rating": None})
+        assert saved_searches.search_terms(search) == [("areas", "fes"), ("areas", "marrakech")]
+        search.areas = None
+        assert saved_searches.search_terms(search) == [("languages", "ar")]
+        search.languages = None
+        assert saved_searches.search_terms(search) == [saved_searches.MATCH_ALL]
+
+    def test_guide_keys_cover_partial_terms(self):
+        """A guide produces every short substring of its tokens as a lookup key."""
+        guide = Guide(areas="Fes", languages="ar")
+        keys = saved_searches.guide_keys(guide)
+        assert keys["areas"] == {"f", "e", "s", "fe", "es", "fes"}
+        assert keys["languages"] == {"a", "r", "ar"}
+
+        guide.areas = "x" * 50 + "".join(chr(ord("a") + i % 26) for i in range(200))
+        assert len(saved_searches.guide_keys(guide)["areas"]) <= 3 * 250
+
+
+class TestSavedSearchAlerts:
+    """Tests for saving searches and notifying on matching guides."""
+
+    def test_new_matching_guide_notifies_once(self, client, traveler_id, auth_headers, make_guide, sent_emails):
+        """
+        A guide matching a saved search triggers one batched notification.
+
+        Args:
+            client: Flask test client fixture
+            traveler_id: Traveler fixture
+            auth_headers: Authorization header factory fixture
+            make_guide: Guide factory fixture
+            sent_emails: Captured email fixture
+        """
+        response = client.post(
+            "/api/saved-searches",
+            json={"name": "Marrakech", "languages": ["ar"], "areas": "marrakech", "min_rating": 4.0},
+            headers=auth_headers(traveler_id),
+        )
+        assert response.status_code == 201
+        client.post("/api/saved-searches", json={"languages": "ar"}, headers=auth_headers(traveler_id))
+
+        make_guide("fr@example.com", languages="fr", areas="Marrakech", rating=4.8)
+        assert sent_emails == []
+
+        guide_id = make_guide("ar@example.com", languages="ar,fr", areas="Marrakech", rating=4.5)
+        assert len(sent_emails) == 1
+        to, body = sent_emails[0]
+        assert to == "traveler@example.com"
+        assert body.count(guide_id) == 2
+
+        # Later edits do not report the same guide again
+        guide = db.session.get(Guide, guide_id)
+        guide.bio = "Updated bio"
+        db.session.commit()
+        assert len(sent_emails) == 1
+        assert SavedSearchMatch.query.count() == 2
+
+    def test_update_that_starts_matching_notifies(self, client, traveler_id, auth_headers, make_guide, sent_emails):
+        """Existing guides are checked again when their attributes change."""
+        client.post("/api/saved-searches", json={"areas": "kyoto"}, headers=auth_headers(traveler_id))
+        guide_id = make_guide("guide@example.com", areas="osaka")
+        assert sent_emails == []
+
+        guide = db.session.get(Guide, guide_id)
+        guide.areas = "osaka,kyoto"
+        db.session.commit()
+        assert len(sent_emails) == 1
+
+    def test_long_terms_match_inside_tokens(self, client, traveler_id, auth_headers, make_guide, sent_emails):
+        """Terms longer than the indexed gram still match anywhere in a token."""
+        client.post("/api/saved-searches", json={"areas": "rrakech"}, headers=auth_headers(traveler_id))
+        make_guide("other@example.com", areas="rrakesh")
+        make_guide("guide@example.com", areas="Marrakech-Medina")
+        assert len(sent_emails) == 1
+
+    def test_unrelated_updates_skip_matching(self, client, traveler_id, auth_headers, make_guide,
+                                             sent_emails, monkeypatch):
+        """Login touches and other non-matching columns do not re-run the reverse index."""
+        client.post("/api/saved-searches", json={"areas": "kyoto"}, headers=auth_headers(traveler_id))
+        guide_id = make_guide("guide@example.com", areas="osaka")
+        lookups = []
+        monkeypatch.setattr(saved_searches, "percolate",
+                            lambda connection, guide: lookups.append(guide.id) or [])
+
+        guide = db.session.get(Guide, guide_id)
+        guide.last_login_at = datetime.utcnow()
+        guide.bio = "Street food"
+        db.session.commit()
+        assert lookups == []
+
+        guide.rating = 4.2
+        db.session.commit()
+        assert lookups == [guide_id]
+
+    def test_list_and_delete(self, client, traveler_id, auth_headers, make_guide, sent_emails):
+        """Travelers manage their own searches; deleted searches stop matching."""
+        headers = auth_headers(traveler_id)
+        search_id = client.post(
+            "/api/saved-searches", json={"min_rating": 4.5}, headers=headers
+        ).get_json()["saved_search"]["id"]
+        assert [s["id"] for s in client.get("/api/saved-searches", headers=headers).get_json()] == [search_id]
+
+        other = make_guide("other@example.com")
+        assert client.delete(f"/api/saved-searches/{search_id}", headers=auth_headers(other)).status_code == 404
+        assert client.delete(f"/api/saved-searches/{search_id}", headers=headers).status_code == 200
+
+        make_guide("top@example.com", rating=5.0)
+        assert sent_emails == []
+
+    def test_empty_search_rejected(self, client, traveler_id, auth_headers):
+        """A search needs at least one criterion."""
+        response = client.post("/api/saved-searches", json={}, headers=auth_headers(traveler_id))
+        assert response.status_code == 400
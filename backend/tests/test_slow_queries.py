@@ -0,0 +1,100 @@
+"""
+Test suite for the slow-query log and its admin endpoint.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.services import slow_queries
+
+TOKEN = "admin-secret"
+
+
+@pytest.fixture
+def recording(app, tmp_path):
+    """Record every statement (threshold 0) into the buffer and a log file."""
+    app.config.update({
+        "SLOW_QUERY_THRESHOLD_MS": 0,
+        "SLOW_QUERY_LOG_FILE": str(tmp_path / "slow.jsonl"),
+        "ADMIN_API_TOKEN": TOKEN,
+    })
+    slow_queries.init_app(app)
+    return slow_queries.get_log(app)
+
+
+def test_normalize_sql_and_parameter_shape():
+    """Literals and IN lists are folded; parameters keep only their types."""
+    sql = "SELECT *\n FROM guides WHERE rating >= 4.5 AND name = 'O''Hara' AND id IN (?, ?, ?) LIMIT 10"
+    assert slow_queries.normalize_sql(sql) == (
+        "SELECT * FROM guides WHERE rating >= ? AND name = ? AND id IN (?...) LIMIT ?"
+    )
+    assert slow_queries.normalize_sql("SELECT lower(?) FROM users_1") == "SELECT lower(?) FROM users_1"
+    assert slow_queries.parameter_shape({"email": "a@example.com", "limit": 5}) == {"email": "str", "limit": "int"}
+    assert slow_queries.parameter_shape([("a", 1), ("b", 2)], executemany=True) == {"rows": 2, "each": ["str", "int"]}
+
+
+class TestSlowQueryLog:
+    """Tests for recording statements with their plans."""
+
+    def test_records_selects_with_plans(self, client, make_guide, recording, monkeypatch):
+        """
+        Slow SELECTs are stored with an EXPLAIN plan and their endpoint.
+
+        Args:
+            client: Flask test client fixture
+            make_guide: Guide factory
+            recording: Enabled slow-query log
+            monkeypatch: pytest monkeypatch fixture
+        """
+        make_guide("guide@example.com", languages="en")
+        recording.clear()
+        assert client.get("/api/guides?languages=en").status_code == 200
+
+        body = client.get("/api/admin/slow-queries", headers={"X-Admin-Token": TOKEN}).get_json()
+        entry = next(e for e in body["entries"] if e["endpoint"] == "guides.list_guides")
+        assert entry["sql"].startswith("SELECT")
+        assert entry["params"] and "en" not in str(entry["params"])
+        assert entry["plan"] and not entry["analyzed"]
+        assert body["summary"][0]["count"] >= 1
+
+        # Repeats reuse the cached plan rather than explaining again
+        explained = []
+        monkeypatch.setattr(slow_queries, "explain", lambda *args: explained.append(args) or ["plan"])
+        client.get("/api/guides?languages=en")
+        assert explained == []
+
+    def test_analyze_only_reruns_plain_selects(self, app, recording, monkeypatch):
+        """WITH statements get a plain EXPLAIN even when ANALYZE is sampled."""
+        monkeypatch.setitem(slow_queries.EXPLAIN, "sqlite", ("EXPLAIN QUERY PLAN ", "EXPLAIN QUERY PLAN "))
+        recording.analyze_rate = 1.0
+        with app.app_context():
+            with db.engine.connect() as connection:
+                connection.execute(text("WITH t(x) AS (SELECT 1) SELECT x FROM t"))
+                connection.execute(text("SELECT 1"))
+        analyzed = {entry["sql"].split()[0]: entry["analyzed"] for entry in recording.entries()}
+        assert analyzed == {"WITH": False, "SELECT": True}
+
+    def test_cli_reads_the_shared_file(self, app, client, make_guide, recording):
+        """``flask slow-queries show`` prints entries written by any worker."""
+        make_guide("guide@example.com")
+        client.get("/api/guides")
+
+        result = app.test_cli_runner().invoke(args=["slow-queries", "show", "--limit", "5"])
+        assert result.exit_code == 0
+        assert "EXPLAIN:" in result.output
+        assert "guides.list_guides" in result.output
+
+
+class TestAdminAuth:
+    """Tests for the shared-secret guard on admin routes."""
+
+    def test_disabled_without_token(self, client):
+        """Admin routes do not exist until a token is configured."""
+        assert client.get("/api/admin/slow-queries").status_code == 404
+
+    def test_wrong_token(self, app, client, recording):
+        """A wrong or missing token gets 401."""
+        assert client.get("/api/admin/slow-queries").status_code == 401
+        assert client.get("/api/admin/slow-queries", headers={"X-Admin-Token": "nope"}).status_code == 401
+        assert client.delete("/api/admin/slow-queries", headers={"X-Admin-Token": TOKEN}).status_code == 204
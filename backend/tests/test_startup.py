@@ -0,0 +1,44 @@
+"""
+Test suite for application cold start.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from app.utils.startup import parse_importtime
+
+# Modules a web or job worker must not pay for at startup
+HEAVY_OPTIONAL_MODULES = ("alembic", "flask_migrate", "redis", "requests", "marshmallow", "scipy")
+
+
+class TestColdStart:
+    """Tests guarding what ``create_app`` imports."""
+
+    def test_create_app_skips_heavy_optional_modules(self):
+        """Optional dependencies are imported where they are used, not at startup."""
+        probe = (
+            "import json, sys\n"
+            "from app import create_app\n"
+            "create_app()\n"
+            f"print(json.dumps([m for m in {HEAVY_OPTIONAL_MODULES!r} if m in sys.modules]))\n"
+        )
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", probe], cwd=backend_dir, capture_output=True, text=True, check=True
+        )
+        assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+    def test_parse_importtime(self):
+        """Import timings are parsed with their nesting depth."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   app.models.guide\n"
+            "import time:      2000 |      15000 | app\n"
+        )
+        modules = parse_importtime(output)
+        assert [(m.name, m.depth, m.cumulative_ms) for m in modules] == [
+            ("app.models.guide", 1, 0.12),
+            ("app", 0, 15.0),
+        ]
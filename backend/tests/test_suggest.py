@@ -0,0 +1,91 @@
+"""
+Test suite for guide attribute autocomplete.
+"""
+
+import time
+
+from app import db
+from app.models import Guide
+from app.services.suggest import PrefixIndex
+
+
+class TestPrefixIndex:
+    """Tests for the sorted-array prefix index."""
+
+    def test_prefix_lookup_orders_by_count(self):
+        """Matches are ranked by guide count, then alphabetically."""
+        index = PrefixIndex.build([
+            {"id": "1", "areas": "Tokyo, kyoto", "languages": "ja", "specialties": None},
+            {"id": "2", "areas": "tokyo,tokushima", "languages": "ja,en", "specialties": "food"},
+            {"id": "3", "areas": "ＴＯＫＹＯ", "languages": "en", "specialties": "food"},
+        ])
+        assert index.suggest("areas", "to") == [("tokyo", 3), ("tokushima", 1)]
+        assert index.suggest("areas", "KY") == [("kyoto", 1)]
+        assert index.suggest("areas", "x") == []
+        assert index.suggest("languages", "", limit=1) == [("en", 2)]
+
+    def test_incremental_updates(self):
+        """Applying snapshots adjusts counts and removes unused tokens."""
+        index = PrefixIndex.build([{"id": "1", "areas": "osaka", "languages": None, "specialties": None}])
+        index.apply([{"id": "2", "deleted": False, "areas": "osaka,okinawa", "languages": None, "specialties": None}])
+        assert index.suggest("areas", "o") == [("osaka", 2), ("okinawa", 1)]
+
+        index.apply([{"id": "2", "deleted": True, "areas": None, "languages": None, "specialties": None}])
+        assert index.suggest("areas", "o") == [("osaka", 1)]
+
+    def test_lookup_is_sub_millisecond(self):
+        """A lookup over tens of thousands of tokens stays well under 1ms."""
+        rows = [
+            {"id": str(i), "areas": f"area{i},area{i % 100}", "languages": "en", "specialties": None}
+            for i in range(20000)
+        ]
+        index = PrefixIndex.build(rows)
+
+        started = time.perf_counter()
+        for _ in range(100):
+            index.suggest("areas", "area1234")
+        assert (time.perf_counter() - started) / 100 < 0.001
+
+
+class TestSuggestEndpoint:
+    """Tests for ``/api/guides/suggest``."""
+
+    def test_suggestions_follow_guide_writes(self, client, make_guide):
+        """
+        Suggestions reflect guides added or edited after the index was built.
+
+        Args:
+            client: Flask test client fixture
+            make_guide: Guide factory fixture
+        """
+        guide_id = make_guide("kyoto@example.com", areas="kyoto")
+        response = client.get("/api/guides/suggest?field=areas&q=ky")
+        assert response.get_json()["suggestions"] == [{"value": "kyoto", "count": 1}]
+
+        make_guide("kyushu@example.com", areas="kyushu,kyoto")
+        guide = db.session.get(Guide, guide_id)
+        guide.areas = "tokyo"
+        db.session.commit()
+
+        response = client.get("/api/guides/suggest?field=areas&q=ky")
+        assert response.get_json()["suggestions"] == [
+            {"value": "kyoto", "count": 1},
+            {"value": "kyushu", "count": 1},
+        ]
+
+    def test_rolled_back_writes_are_ignored(self, client, make_guide):
+        """Uncommitted changes never reach the index."""
+        guide_id = make_guide("guide@example.com", areas="nara")
+        client.get("/api/guides/suggest?field=areas&q=n")
+
+        guide = db.session.get(Guide, guide_id)
+        guide.areas = "nagoya"
+        db.session.flush()
+        db.session.rollback()
+
+        response = client.get("/api/guides/suggest?field=areas&q=n")
+        assert response.get_json()["suggestions"] == [{"value": "nara", "count": 1}]
+
+    def test_invalid_field_rejected(self, client, clean_db):
+        """Only indexed fields can be queried."""
+        assert client.get("/api/guides/suggest?field=email&q=a").status_code == 400
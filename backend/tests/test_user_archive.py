@@ -0,0 +1,135 @@
+"""
+Test suite for archiving inactive user accounts.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import ArchivedUser, Guide, User
+from app.services import outbox, user_archive
+from app.services.user_archive import archive_inactive_users
+
+
+@pytest.fixture
+def make_user(clean_db):
+    """
+    Provide a factory inserting a user created ``age_days`` ago.
+
+    Args:
+        clean_db: Clean database fixture
+
+    Returns:
+        callable: ``make_user(email, age_days=0, **fields) -> str``
+    """
+
+    def _make_user(email, age_days=0, **fields):
+        user = User(email=email, created_at=datetime.utcnow() - timedelta(days=age_days), **fields)
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+    return _make_user
+
+
+class TestArchiveInactiveUsers:
+    """Tests for moving idle accounts to the archive."""
+
+    def test_only_idle_accounts_without_data_are_archived(self, make_user, make_guide):
+        """
+        Recent, recently active and guide accounts stay in the hot table.
+
+        Args:
+            make_user: User factory
+            make_guide: Guide factory
+        """
+        idle = [make_user(f"idle{i}@example.com", age_days=200) for i in range(5)]
+        recent = make_user("recent@example.com", age_days=5)
+        active = make_user("active@example.com", age_days=200,
+                           last_login_at=datetime.utcnow() - timedelta(days=3))
+        guide_id = make_guide("guide@example.com")
+        db.session.get(Guide, guide_id).created_at = datetime.utcnow() - timedelta(days=200)
+        db.session.commit()
+
+        totals = []
+        assert archive_inactive_users(older_than_days=90, batch_size=2, progress=totals.append) == 5
+        assert totals == [2, 4, 5]
+
+        assert {u.id for u in User.query} == {recent, active, guide_id}
+        archived = {a.id: a for a in ArchivedUser.query}
+        assert set(archived) == set(idle)
+        assert archived[idle[0]].email == "idle0@example.com"
+
+        # Nothing left to do on a second run
+        assert archive_inactive_users(older_than_days=90) == 0
+
+
+class TestArchivedLookups:
+    """Tests for the email fallback path into the archive."""
+
+    @pytest.fixture
+    def archived_id(self, make_user):
+        """Insert an idle account and archive it."""
+        user_id = make_user("sleeper@example.com", age_days=365)
+        archive_inactive_users(older_than_days=90)
+        assert db.session.get(User, user_id) is None
+        return user_id
+
+    def test_login_restores_account(self, client, archived_id):
+        """Logging in moves the account back under its original ID."""
+        response = client.post(
+            "/api/auth/login", json={"email": "sleeper@example.com", "password": "password123"}
+        )
+        assert response.status_code == 200
+        assert response.get_json()["user"]["id"] == archived_id
+
+        db.session.expire_all()
+        user = db.session.get(User, archived_id)
+        assert user.last_login_at is not None
+        assert ArchivedUser.query.count() == 0
+
+        # Both moves appear in the change feed
+        changes = [(e.event_type, e.aggregate_id) for e in outbox.read_events(0)]
+        assert changes[-2:] == [("archived", archived_id), ("restored", archived_id)]
+
+    def test_wrong_password_leaves_account_archived(self, client, archived_id):
+        """Failed logins do not restore the account."""
+        response = client.post(
+            "/api/auth/login", json={"email": "sleeper@example.com", "password": "wrong-password"}
+        )
+        assert response.status_code == 401
+        assert db.session.get(ArchivedUser, archived_id) is not None
+
+    def test_archived_email_cannot_be_registered_again(self, client, archived_id):
+        """Registration treats archived emails as taken."""
+        response = client.post(
+            "/api/auth/register", json={"email": "sleeper@example.com", "password": "password123"}
+        )
+        assert response.status_code == 409
+
+        response = client.post(
+            "/api/auth/register/batch",
+            json={"users": [{"email": "sleeper@example.com", "password": "password123"}]},
+        )
+        assert response.get_json()["results"][0]["status"] == "conflict"
+
+    def test_restore_when_email_was_taken(self, client, archived_id, monkeypatch):
+        """A hot account that took the email meanwhile gets 409, not a 500."""
+        find_archived_user = user_archive.find_archived_user
+
+        def race(email):
+            # Another account registers the email between the lookup and the restore
+            archived = find_archived_user(email)
+            db.session.execute(User.__table__.insert().values(
+                id="newcomer", email=email, hashed_password="x", created_at=datetime.utcnow(),
+            ))
+            return archived
+
+        monkeypatch.setattr(user_archive, "find_archived_user", race)
+        response = client.post(
+            "/api/auth/login", json={"email": "sleeper@example.com", "password": "password123"}
+        )
+        assert response.status_code == 409
+        assert db.session.get(ArchivedUser, archived_id) is not None
@@ -0,0 +1,134 @@
+"""
+Test suite for schema-driven request validation.
+"""
+
+import io
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.utils.validators import get_schema
+
+
+@pytest.fixture
+def query_count(app, clean_db):
+    """Count SQL statements executed while a test runs."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def no_hashing(monkeypatch):
+    """Fail the test if a password hash is computed."""
+
+    def fail(*args, **kwargs):
+        raise AssertionError("password hashed for invalid input")
+
+    monkeypatch.setattr("app.models.user.generate_password_hash", fail)
+    monkeypatch.setattr("app.routes.auth.generate_password_hash", fail)
+
+
+class TestFailFast:
+    """Invalid bodies are rejected before any query or KDF run."""
+
+    @pytest.mark.parametrize(
+        "body, message",
+        [
+            ({"email": "a" * 120 + "@example.com", "password": "password123"}, "at most 120"),
+            ({"email": "not-an-email", "password": "password123"}, "invalid email"),
+            ({"email": "user@example.com", "password": "x" * 129}, "at most 128"),
+            ({"email": "user@example.com"}, "required"),
+            ({"email": ["user@example.com"], "password": "password123"}, "invalid email"),
+        ],
+    )
+    def test_register_rejects_without_queries(self, client, query_count, no_hashing, body, message):
+        """
+        Registration input errors cost neither a query nor a hash.
+
+        Args:
+            client: Flask test client fixture
+            query_count: Executed statement recorder
+            no_hashing: Guard against password hashing
+            body: Request body
+            message: Expected fragment of the error message
+        """
+        response = client.post("/api/auth/register", json=body)
+        assert response.status_code == 400
+        assert message in response.get_json()["error"].lower()
+        assert query_count == []
+
+    def test_oversized_body_rejected_before_parsing(self, client, query_count):
+        """Bodies above the endpoint limit get 413."""
+        response = client.post(
+            "/api/auth/login",
+            data='{"email": "' + "a" * 20000 + '"}',
+            content_type="application/json",
+        )
+        assert response.status_code == 413
+        assert query_count == []
+
+    def test_oversized_body_without_length_rejected(self, client, query_count):
+        """Chunked bodies, which declare no Content-Length, are held to the same limit."""
+        body = ('{"email": "' + "a" * 20000 + '"}').encode()
+        response = client.post(
+            "/api/auth/login",
+            input_stream=io.BytesIO(body),
+            content_type="application/json",
+            headers={"Transfer-Encoding": "chunked"},
+            environ_overrides={"wsgi.input_terminated": True},
+        )
+        assert response.status_code == 413
+        assert query_count == []
+
+    def test_non_object_body_rejected(self, client, clean_db):
+        """Only JSON objects are accepted."""
+        response = client.post("/api/auth/login", json=["user@example.com", "password123"])
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "Request body must be a JSON object"
+
+
+class TestEndpointSchemas:
+    """Schemas applied to the other JSON endpoints."""
+
+    def test_message_and_booking_bodies(self, client, make_guide, auth_headers):
+        """Field errors keep the endpoints' existing messages."""
+        guide_id = make_guide("guide@example.com")
+        headers = auth_headers(guide_id)
+
+        response = client.post("/api/bookings", json={"guide_id": guide_id, "date": "11/01/2025"}, headers=headers)
+        assert response.get_json()["error"] == "date must be ISO formatted (YYYY-MM-DD)"
+
+        response = client.post("/api/conversations/1/messages", json={"body": "   "}, headers=headers)
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "Message body is required"
+
+        response = client.put(
+            f"/api/guides/{guide_id}/availability",
+            json={"dates": ["2025-11-01", "tomorrow"]},
+            headers=headers,
+        )
+        assert response.get_json()["error"] == "dates must be ISO formatted (YYYY-MM-DD)"
+
+    def test_availability_flag_parsed_as_boolean(self, client, make_guide, auth_headers):
+        """A string "false" no longer counts as truthy."""
+        guide_id = make_guide("guide@example.com")
+        response = client.put(
+            f"/api/guides/{guide_id}/availability",
+            json={"dates": ["2025-11-01"], "available": "false"},
+            headers=auth_headers(guide_id),
+        )
+        assert response.status_code == 200
+        assert response.get_json()["available"] is False
+
+    def test_schemas_are_built_once(self, app):
+        """Schema instances are cached per process."""
+        assert get_schema("credentials") is get_schema("credentials")